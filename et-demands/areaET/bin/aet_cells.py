@@ -21,8 +21,10 @@ import pandas as pd
 import xlrd
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../lib')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../cropET/bin')))
 import aet_config
 import aet_utils
+import csv_ingest
 import mod_dmis
 
 mmHaPerDay_to_cms = 0.001 * 10000 / 86400    # 0.001 (mm/m) * 10000 (m2/hectare) / 86400 (seconds/day)
@@ -233,19 +235,31 @@ class ETCell():
 
         crops_dict = {}
         try:
-            # Get list of 0 based line numbers to skip
-            # Ignore header but assume header was set as 1's based index
-            data_skip = [i for i in range(cfg.input_cet['header_lines']) if i + 1 != cfg.input_cet['names_line']]
             for ctCount in range(0, self.numUsedCropTypes, 1):
-                input_cet_path = os.path.join(cfg.input_cet['ws'], cfg.input_cet['name_format'].replace('%c', '%02d' % self.usedCropTypes[ctCount]) % self.cell_id)
+                if cfg.input_cet['file_type'] in ['PARQUET', 'HDF5']:
+                    # Columnar output of cropET has all cells and crops
+                    input_cet_path = os.path.join(cfg.input_cet['ws'], cfg.input_cet['columnar_name'])
+                else:
+                    input_cet_path = os.path.join(cfg.input_cet['ws'], cfg.input_cet['name_format'].replace('%c', '%02d' % self.usedCropTypes[ctCount]) % self.cell_id)
                 if not os.path.isfile(input_cet_path):
                     logging.error('ERROR:  input crop et file {} does not exist'.format(input_cet_path))
                     return False
                 logging.debug('  {0}'.format(input_cet_path))
-                crop_df = pd.read_csv(input_cet_path, engine = 'python',
-                        header = cfg.input_cet['names_line'] - len(data_skip) - 1,
-                        skiprows = data_skip, sep = cfg.input_cet['delimiter'],
-                        comment = "#", na_values = ['NaN'])
+                if cfg.input_cet['file_type'] in ['PARQUET', 'HDF5']:
+                    import crop_output
+                    crop_df = crop_output.read_columnar(
+                        input_cet_path, self.cell_id, self.usedCropTypes[ctCount])
+                    if crop_df.empty:
+                        logging.error('ERROR:  crop {0:02d} of cell {1} not found in {2}'.format(
+                            self.usedCropTypes[ctCount], self.cell_id, input_cet_path))
+                        return False
+                    crop_df = crop_df.drop(columns = ['CellID', 'Crop'])
+                else:
+                    crop_df = csv_ingest.read_table(input_cet_path,
+                            header_lines = cfg.input_cet['header_lines'],
+                            names_line = cfg.input_cet['names_line'],
+                            delimiter = cfg.input_cet['delimiter'],
+                            comment = "#", na_values = ['NaN'])
 
                 # Check fields
 
@@ -268,11 +282,10 @@ class ETCell():
                     crop_df['date'] = pd.to_datetime(crop_df['date'])
                 else:
                     if cfg.time_step == 'day':
-                        crop_df['date'] = crop_df[['year', 'month', 'day']].apply(
-                            lambda s : datetime.datetime(*s),axis = 1)
+                        crop_df['date'] = csv_ingest.ymd_datetimes(crop_df)
                     else:
-                        crop_df['date'] = crop_df[['year', 'month', 'day', 'hour']].apply(
-                        lambda s : datetime.datetime(*s),axis = 1)
+                        crop_df['date'] = csv_ingest.ymd_datetimes(
+                            crop_df, ['year', 'month', 'day', 'hour'])
                 crop_df.set_index('date', inplace = True)
 
                 # if cell_count == 0 and ctCount == 0:
@@ -365,9 +378,10 @@ class ETCell():
                         skiprows = data_skip, sep = cfg.input_cet['delimiter'],
                         comment = "#", na_values = ['NaN'])
             """
-            rdb_cet_df = pd.read_csv(input_cet_path, engine = 'python',
-                    header = cfg.input_cet['names_line'] - len(data_skip) - 1,
-                    skiprows = data_skip, sep = cfg.input_cet['delimiter'],
+            rdb_cet_df = csv_ingest.read_table(input_cet_path,
+                    header_lines = cfg.input_cet['header_lines'],
+                    names_line = cfg.input_cet['names_line'],
+                    delimiter = cfg.input_cet['delimiter'],
                     comment = "#", na_values = ['NaN'])
             crop_num_col = list(rdb_cet_df.columns)[0]
             rdb_cet_df[crop_num_col] = rdb_cet_df[[crop_num_col]].apply(lambda s: int(*s), axis = 1, raw = True, result_type = 'reduce')
@@ -392,11 +406,10 @@ class ETCell():
                 rdb_cet_df['date'] = pd.to_datetime(rdb_cet_df['date'])
             else:
                 if cfg.time_step == 'day':
-                    rdb_cet_df['date'] = rdb_cet_df[['year', 'month', 'day']].apply(
-                        lambda s : datetime.datetime(*s),axis = 1)
+                    rdb_cet_df['date'] = csv_ingest.ymd_datetimes(rdb_cet_df)
                 else:
-                    rdb_cet_df['date'] = rdb_cet_df[['year', 'month', 'day', 'hour']].apply(
-                    lambda s : datetime.datetime(*s),axis = 1)
+                    rdb_cet_df['date'] = csv_ingest.ymd_datetimes(
+                        rdb_cet_df, ['year', 'month', 'day', 'hour'])
             for ctCount in range(0, self.numUsedCropTypes, 1):
                 try:
                     crop_df = rdb_cet_df[rdb_cet_df[crop_num_col] == self.usedCropTypes[ctCount]]
@@ -595,9 +608,10 @@ class ETCell():
                         header = cfg.ccm_names_line - len(data_skip) - 1,
                         skiprows = data_skip, na_values = ['NaN'])
             else:
-                input_df = pd.read_csv(cfg.cell_mix_path, engine = 'python',
-                        header = cfg.ccm_names_line - len(data_skip) - 1,
-                        skiprows = data_skip, sep = cfg.ccm_delimiter)
+                input_df = csv_ingest.read_table(cfg.cell_mix_path,
+                        header_lines = cfg.ccm_header_lines,
+                        names_line = cfg.ccm_names_line,
+                        delimiter = cfg.ccm_delimiter)
             input_df.rename(columns = {input_df.columns[1]:'ETCellID'}, inplace = True)
             input_df['ETCellID'] = input_df[[input_df.columns[1]]].apply(lambda s: str(*s), axis = 1, raw = True, result_type = 'reduce')
             input_df = input_df.query('ETCellID == @self.cell_id').copy().reset_index(drop = True)
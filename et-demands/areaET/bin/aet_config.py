@@ -443,6 +443,17 @@ class AreaETConfig():
                 self.input_cet['name_format'] = '%s_crop_%c.csv'
             else:    # RDB format
                 self.input_cet['name_format'] = '%s_crop.csv'
+
+        # Columnar output of cropET (output_file_type parquet or hdf5)
+
+        if self.input_cet['file_type'] in ['PARQUET', 'HDF5']:
+            if self.input_cet['data_structure_type'] != "DRI":
+                logging.error('ERROR:  file_type {} requires DRI data_structure_type'.format(
+                    self.input_cet['file_type'].lower()))
+                sys.exit()
+            self.input_cet['columnar_name'] = {
+                'PARQUET': 'daily_crop_et.parquet',
+                'HDF5': 'daily_crop_et.h5'}[self.input_cet['file_type']]
         try:
             self.input_cet['header_lines'] = config.getint(input_cet_sec, 'header_lines')
             if self.input_cet['header_lines'] is None or self.input_cet['header_lines'] == 'None': self.input_cet['header_lines'] = 1
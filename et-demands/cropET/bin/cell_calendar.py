@@ -0,0 +1,183 @@
+"""cell_calendar.py
+Defines CellCalendar class and cell_calendar function
+Day invariant values (winter months, winter kc_max, open water Ts-Ta) are
+    computed once per cell for all run dates so daily kernels only index
+    arrays
+Called by crop_cycle.py, crop_cycle_jit.py and crop_cycle_vector.py
+
+"""
+
+import numpy as np
+
+# Kc max for winter time (Nov-Mar) by winter surface cover class
+# 1 bare soil, 2 mulched soil including grain stubble, 3 dormant turf/sod
+# ETo values from Allen 12/2007 (ETr values * 1.2 plus adj.),
+#   ETr values from Allen 3/2008
+wscc_kc_max = {1: {'eto': 1.1, 'etr': 0.9},
+               2: {'eto': 1.0, 'etr': 0.85},
+               3: {'eto': 0.95, 'etr': 0.8}}
+
+# Water surface minus air temperature (Ts-Ta) for deep lakes and reservoirs
+#   by month (index 1-12)
+ts_ta_water = [0., 4., 3., 1., 0., 0., 0., 0., 1., 1., 3., 4., 4.]
+
+
+class CellCalendar:
+    """Day invariant values of et cell for run dates
+
+    Attributes
+    ----------
+    step_dates : pandas.DatetimeIndex
+        daily dates of run
+    winter : ndarray
+        True for winter months (Nov-Mar) in northern hemisphere
+    winter_kc_max : dict
+        winter kc_max by winter surface cover class for refet type
+    moa_frac : ndarray
+        month of year fraction (1 to 12, centered on 15th)
+    ts_ta : ndarray
+        open water Ts-Ta interpolated at moa_frac
+    gs_windows : dict
+        growing season start windows by long term planting day and limit
+        (see gs_window())
+
+    Notes
+    -----
+    Values match util.is_winter(), compute_crop_et.compute_crop_et() and
+        open_water_evap.open_water_evap() computed for each day
+
+    """
+
+    def __init__(self, data, et_cell, step_dates):
+        """Compute calendar arrays
+
+        Parameters
+        ---------
+        data : dict
+            configuration data from INI file
+        et_cell : dict
+            ETCell instance
+        step_dates : pandas.DatetimeIndex
+            daily dates of run
+
+        """
+        self.step_dates = step_dates
+        month = step_dates.month.values.astype(np.int64)
+        day = step_dates.day.values.astype(np.int64)
+        self.doy = step_dates.dayofyear.values.astype(np.int64)
+
+        self.winter = (month < 4) | (month > 10)
+        if not et_cell.latitude > 0:
+            # Southern hemisphere
+            self.winter[:] = False
+        self.winter.setflags(write=False)
+
+        refet_type = data.refet['type']
+        self.winter_kc_max = {
+            wscc: wscc_kc[refet_type]
+            for wscc, wscc_kc in wscc_kc_max.items()
+            if refet_type in wscc_kc}
+
+        self.moa_frac = np.minimum(np.maximum(month + (day - 15) / 30.4, 1), 12)
+        moa_base = self.moa_frac.astype(np.int64)
+        ts_ta_array = np.array(ts_ta_water)
+        self.ts_ta = (
+            ts_ta_array[moa_base] +
+            (ts_ta_array[np.minimum(moa_base + 1, 12)] -
+             ts_ta_array[moa_base]) *
+            (self.moa_frac - moa_base))
+        self.moa_frac.setflags(write=False)
+        self.ts_ta.setflags(write=False)
+        self.gs_windows = {}
+
+    def gs_window(self, longterm_pl, gs_limit):
+        """Days too early and too late for start of growing season
+
+        Parameters
+        ----------
+        longterm_pl : int
+            long term planting or green-up day of year (0 if unknown)
+        gs_limit : int
+            days from long term planting day season can start
+
+        Returns
+        -------
+        : ndarray
+            True where day of year < longterm_pl - gs_limit
+        : ndarray
+            True where day of year > longterm_pl + gs_limit
+
+        Notes
+        -----
+        Both are all False if longterm_pl is unknown (see kcb_daily())
+
+        """
+        key = (int(longterm_pl), int(gs_limit))
+        try:
+            return self.gs_windows[key]
+        except KeyError:
+            pass
+        if longterm_pl > 0:
+            early = self.doy < (longterm_pl - gs_limit)
+            late = self.doy > (longterm_pl + gs_limit)
+        else:
+            early = np.zeros(self.doy.size, dtype=bool)
+            late = np.zeros(self.doy.size, dtype=bool)
+        early.setflags(write=False)
+        late.setflags(write=False)
+        self.gs_windows[key] = (early, late)
+        return early, late
+
+def cell_calendar(data, et_cell, step_dates):
+    """Calendar of et cell for run dates
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    et_cell : dict
+        ETCell instance
+    step_dates : pandas.DatetimeIndex
+        daily dates of run
+
+    Returns
+    -------
+    : CellCalendar
+
+    Notes
+    -----
+    Calendar is kept on et cell so it is computed once for all crops
+        (released with time series, see ETCellData.release_cell())
+
+    """
+    calendar = getattr(et_cell, 'calendar', None)
+    if (calendar is None or
+            (calendar.step_dates is not step_dates and
+             not calendar.step_dates.equals(step_dates))):
+        calendar = CellCalendar(data, et_cell, step_dates)
+        et_cell.calendar = calendar
+    return calendar
+
+def gs_limit(data, crop):
+    """Days from long term planting day growing season can start
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    crop : dict
+        CropParameters instance
+
+    Returns
+    -------
+    : int
+
+    Notes
+    -----
+    Limit is always 40 days for cumulative GDD based starts (case 1),
+        gs_limit_flag only applies to T30 based starts (case 2)
+
+    """
+    if crop.flag_for_means_to_estimate_pl_or_gu == 1 or data.gs_limit_flag:
+        return 40
+    return 365
@@ -0,0 +1,86 @@
+"""cell_prefetch.py
+Defines prefetch_cells function
+Time series of next cells are read in background threads while crop et of
+    current cell is computed
+Called by mod_crop_et.py
+
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import logging
+
+
+def prefetch_cells(data, cell_list, depth, cached=None):
+    """Read input time series of upcoming cells in background threads
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    cell_list : iterable
+        (cell_count, et_cell) in processing order
+    depth : int
+        number of cells read ahead of current cell (0 to disable)
+    cached : function
+        True if time series of station key don't need to be read
+        (i.e. station is in cache or already published)
+
+    Yields
+    ------
+    : tuple
+        (cell_count, et_cell, read_flag) in same order as cell_list
+        read_flag True : time series were read and set on et cell
+        read_flag False : time series could not be read
+        read_flag None : time series were not read (cached station or
+            station read for earlier cell), caller sets them
+
+    Notes
+    -----
+    Each station is read once even if several upcoming cells use it
+    Time series are read without station cache (cells=None) so station
+        cache is only used by caller's thread
+    At most depth stations are read or waiting, so memory is bounded
+    Read errors are raised when the cell is reached
+
+    """
+    if depth < 1:
+        for cell_count, et_cell in cell_list:
+            yield cell_count, et_cell, None
+        return
+
+    executor = ThreadPoolExecutor(max_workers=depth)
+    window = deque()
+    reading = {}
+    cell_iter = iter(cell_list)
+    try:
+        while True:
+            # Current cell and next depth cells
+            while len(window) <= depth:
+                try:
+                    cell_count, et_cell = next(cell_iter)
+                except StopIteration:
+                    break
+                station_key = et_cell.station_key(data)
+                if (station_key in reading or
+                        (cached is not None and cached(station_key))):
+                    future = None
+                else:
+                    logging.debug('  Prefetching station {}'.format(
+                        station_key[0]))
+                    future = executor.submit(
+                        et_cell.set_input_timeseries, cell_count, data, None)
+                    reading[station_key] = future
+                window.append((cell_count, et_cell, station_key, future))
+            if not window:
+                break
+            cell_count, et_cell, station_key, future = window.popleft()
+            if future is None:
+                yield cell_count, et_cell, None
+            else:
+                del reading[station_key]
+                yield cell_count, et_cell, future.result()
+    finally:
+        for future in reading.values():
+            future.cancel()
+        executor.shutdown(wait=True)
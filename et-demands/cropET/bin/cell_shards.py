@@ -0,0 +1,452 @@
+"""cell_shards.py
+Defines shard_cells, shard_path, shard_tasks and merge_shards functions
+Cells are split into shards that are run independently (i.e. on several
+    batch nodes with a shared file system) with --shard I/N
+Shard manifests and columnar output files are merged with:
+    python cell_shards.py -i project.ini -n N
+Called by mod_crop_et.py, run_manifest.py and crop_output.py
+
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+
+import crop_et_data
+import crop_output
+import et_cell
+import run_manifest
+import util
+
+
+def shard_path(file_path, shard):
+    """Path of file written by one shard
+
+    Parameters
+    ---------
+    file_path : str
+        path of file written by run without shards
+    shard : tuple
+        (shard number (1 to N), shard count)
+        None : run isn't sharded
+
+    Returns
+    -------
+    : str
+        i.e. daily_crop_et_shard_2_of_4.parquet
+
+    """
+    if shard is None:
+        return file_path
+    root, ext = os.path.splitext(file_path)
+    return '{}_shard_{}_of_{}{}'.format(root, shard[0], shard[1], ext)
+
+def shard_cells(data, cells, cell_id_list, shard):
+    """Cells of one shard
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    cells : dict
+        ETCellData instance
+    cell_id_list : list
+        cell ids of run
+    shard : tuple
+        (shard number (1 to N), shard count)
+
+    Returns
+    -------
+    : list
+        cell ids of shard (in cell_id_list order)
+
+    Notes
+    -----
+    Cells are assigned largest first to shard with fewest active crops
+        (ties go to lowest cell id and shard number), so every node
+        computes same split without a coordinator
+    Split only depends on cell list and crop flags, so it must be done
+        before completed crops are skipped (--resume)
+
+    """
+    shard_i, shard_n = shard
+    crop_counts = {
+        cell_id: sum(1 for flag in cells.et_cells_dict[
+            cell_id].crop_flags.values() if flag)
+        for cell_id in cell_id_list}
+    shard_crops = [0] * shard_n
+    shard_cell_ids = set()
+    for cell_id in sorted(cell_id_list, key=lambda c: (-crop_counts[c], c)):
+        cell_shard = min(range(shard_n), key=lambda s: (shard_crops[s], s))
+        shard_crops[cell_shard] += crop_counts[cell_id]
+        if cell_shard == shard_i - 1:
+            shard_cell_ids.add(cell_id)
+    logging.warning('  Shard {} of {}: {} of {} cells, {} of {} crops'.format(
+        shard_i, shard_n, len(shard_cell_ids), len(cell_id_list),
+        shard_crops[shard_i - 1], sum(shard_crops)))
+    return [cell_id for cell_id in cell_id_list if cell_id in shard_cell_ids]
+
+def shard_tasks(data, shard_n):
+    """(cell, crop) tasks of each shard
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    shard_n : int
+        shard count
+
+    Returns
+    -------
+    : list
+        set of (cell_id, crop_num) tasks of each shard (shard 1 first)
+
+    Notes
+    -----
+    Cells and crops are filtered as in mod_crop_et.main(), so tasks are
+        the crops each shard run has to complete
+
+    """
+    data.set_crop_params()
+    cells = et_cell.ETCellData()
+    cells.set_cell_properties(data)
+    cells.set_cell_crops(data)
+    cells.set_cell_cuttings(data)
+    cells.filter_crops(data)
+    cells.filter_cells(data)
+    cell_id_list = sorted(cells.et_cells_dict)
+    tasks = []
+    for shard_i in range(1, shard_n + 1):
+        tasks.append(set(
+            (cell_id, crop_num)
+            for cell_id in shard_cells(
+                data, cells, cell_id_list, (shard_i, shard_n))
+            for crop_num in sorted(data.crop_params)
+            if cells.et_cells_dict[cell_id].crop_flags[crop_num] != 0))
+    return tasks
+
+def missing_tasks(shard_i, tasks, completed):
+    """Log tasks that shard didn't complete
+
+    Parameters
+    ---------
+    shard_i : int
+        shard number (1 to N)
+    tasks : set
+        (cell_id, crop_num) tasks of shard (see shard_tasks())
+    completed : set
+        (cell_id, crop_num) tasks found in shard manifest or output
+
+    Returns
+    -------
+    : boolean
+        True if tasks are missing
+
+    """
+    missing = sorted(tasks - completed)
+    if not missing:
+        return False
+    logging.error(
+        '\nERROR: Shard {} is missing {} of {} crops, rerun shard '
+        '(--resume) before merging\n  {}'.format(
+            shard_i, len(missing), len(tasks), '\n  '.join(
+                'CellID {} crop {:02d}'.format(cell_id, crop_num)
+                for cell_id, crop_num in missing)))
+    return True
+
+def merge_manifests(data, shard_n):
+    """Combine manifests of all shards into run manifest
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    shard_n : int
+        shard count
+
+    Returns
+    -------
+    : boolean
+        True if all shard manifests were merged
+
+    Notes
+    -----
+    Merged manifest can be used to resume run without shards (--resume)
+    Nothing is written if a shard didn't complete all of its crops
+
+    """
+    manifest_path = os.path.join(data.project_ws, run_manifest.manifest_name)
+    header = None
+    lines = []
+    for shard_i, tasks in enumerate(shard_tasks(data, shard_n), 1):
+        shard_manifest_path = shard_path(manifest_path, (shard_i, shard_n))
+        if not os.path.isfile(shard_manifest_path):
+            logging.error('\nERROR: Shard manifest {} does not exist'.format(
+                shard_manifest_path))
+            return False
+        shard_header = None
+        completed = set()
+        with open(shard_manifest_path, 'r') as manifest_f:
+            for line in manifest_f:
+                # Last line can be partial if shard was killed
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if shard_header is None:
+                    shard_header = record
+                else:
+                    lines.append(line)
+                    completed.add((record['cell_id'], record['crop']))
+        if shard_header is None:
+            logging.error('\nERROR: Shard manifest {} is empty'.format(
+                shard_manifest_path))
+            return False
+        if header is None:
+            header = shard_header
+        elif shard_header.get('run_hash') != header.get('run_hash'):
+            logging.error(
+                '\nERROR: Shard {} was run with different INI or static '
+                'input files'.format(shard_i))
+            return False
+        logging.warning('  Shard {}: {} completed crops'.format(
+            shard_i, len(completed)))
+        if missing_tasks(shard_i, tasks, completed):
+            return False
+
+    temp_path = '{}.{}.tmp'.format(manifest_path, os.getpid())
+    with open(temp_path, 'w') as manifest_f:
+        manifest_f.write(json.dumps(header) + '\n')
+        manifest_f.writelines(lines)
+    os.replace(temp_path, manifest_path)
+    logging.warning('  Merged manifest: {}'.format(manifest_path))
+    return True
+
+def shard_tables(path):
+    """Read (cell, crop) tables of shard columnar output file
+
+    Parameters
+    ---------
+    path : str
+        shard columnar output file path
+
+    Yields
+    ------
+    : pandas.DataFrame
+
+    Notes
+    -----
+    Parquet files are read one row group at a time, hdf5 files in chunks,
+        so memory doesn't grow with file size
+
+    """
+    if path.endswith('.parquet'):
+        import pyarrow.parquet
+        parquet_file = pyarrow.parquet.ParquetFile(path)
+        for group_i in range(parquet_file.num_row_groups):
+            yield parquet_file.read_row_group(group_i).to_pandas()
+    else:
+        import pandas as pd
+        with pd.HDFStore(path, mode='r') as store:
+            for table in store.select('crop_et', chunksize=1000000):
+                yield table
+
+def shard_keys(path):
+    """(cell, crop) tables of shard columnar output file
+
+    Parameters
+    ---------
+    path : str
+        shard columnar output file path
+
+    Returns
+    -------
+    : set
+        (cell_id, crop_num) of tables in file
+
+    Notes
+    -----
+    Only CellID and Crop columns are read
+
+    """
+    if path.endswith('.parquet'):
+        import pyarrow.parquet
+        keys_df = pyarrow.parquet.read_table(
+            path, columns=['CellID', 'Crop']).to_pandas()
+        cell_ids, crops = keys_df['CellID'], keys_df['Crop']
+    else:
+        import pandas as pd
+        with pd.HDFStore(path, mode='r') as store:
+            cell_ids = store.select_column('crop_et', 'CellID')
+            crops = store.select_column('crop_et', 'Crop')
+    return set(zip(cell_ids.astype(str).tolist(), crops.astype(int).tolist()))
+
+def merge_columnar(data, shard_n):
+    """Combine columnar output files of all shards
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    shard_n : int
+        shard count
+
+    Returns
+    -------
+    : boolean
+        True if all shard files were merged
+
+    Notes
+    -----
+    Shard files are kept, merged files have same layout as output of run
+        without shards (see crop_output.ColumnarOutput)
+    Nothing is written if a shard file is missing crops of shard
+
+    """
+    output_paths = {
+        timestep: [
+            shard_path(crop_output.columnar_path(data, timestep),
+                       (shard_i, shard_n))
+            for shard_i in range(1, shard_n + 1)]
+        for timestep in crop_output.timesteps
+        if crop_output.output_flag(data, timestep)}
+    for timestep, paths in sorted(output_paths.items()):
+        for path in paths:
+            if not os.path.isfile(path):
+                logging.error('\nERROR: Shard output {} does not exist'.format(
+                    path))
+                return False
+    for shard_i, tasks in enumerate(shard_tasks(data, shard_n), 1):
+        for timestep, paths in sorted(output_paths.items()):
+            if missing_tasks(shard_i, tasks, shard_keys(paths[shard_i - 1])):
+                return False
+
+    # Shards use same CellID size (all cells of project)
+    cell_id_size = 1
+    if data.cet_out['file_type'] == 'hdf5':
+        import pandas as pd
+        for paths in output_paths.values():
+            for path in paths:
+                with pd.HDFStore(path, mode='r') as store:
+                    cell_id_size = max(
+                        cell_id_size, store.get_storer('crop_et').table.
+                        coldescrs['CellID'].itemsize)
+
+    columnar_output = crop_output.ColumnarOutput(data, cell_id_size)
+    try:
+        for timestep, paths in sorted(output_paths.items()):
+            for path in paths:
+                for table in shard_tables(path):
+                    columnar_output.append(timestep, table)
+            logging.warning('  Merged {} output: {}'.format(
+                timestep, columnar_output.paths[timestep]))
+    finally:
+        columnar_output.close()
+    return True
+
+def check_csv_output(data, shard_n):
+    """Check that csv output files of all shards exist
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    shard_n : int
+        shard count
+
+    Returns
+    -------
+    : boolean
+        True if all shards wrote output files of all of their crops
+
+    """
+    for shard_i, tasks in enumerate(shard_tasks(data, shard_n), 1):
+        completed = set(
+            (cell_id, crop_num) for cell_id, crop_num in tasks
+            if all(os.path.isfile(output_path)
+                   for output_path in run_manifest.crop_output_paths(
+                       data, cell_id, crop_num)))
+        if missing_tasks(shard_i, tasks, completed):
+            return False
+        logging.warning('  Shard {}: {} completed crops'.format(
+            shard_i, len(completed)))
+    return True
+
+def merge_shards(ini_path, shard_n):
+    """Merge manifests and columnar output files of all shards
+
+    Parameters
+    ---------
+    ini_path : str
+        absolute file path of INI file
+    shard_n : int
+        shard count
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    CSV output files are written per cell and crop and don't need merging,
+        without a manifest only existence of output files is checked
+    Exits with error if a shard didn't finish
+
+    """
+    logging.warning('\nMerging {} shards'.format(shard_n))
+    data = crop_et_data.CropETData()
+    data.read_cet_ini(ini_path)
+    if data.cet_out['file_type'] == 'csv':
+        if data.manifest_flag:
+            if not merge_manifests(data, shard_n):
+                sys.exit()
+        elif not check_csv_output(data, shard_n):
+            sys.exit()
+    elif not merge_columnar(data, shard_n):
+        sys.exit()
+    logging.warning('\nMerge Completed')
+
+def parse_args():
+    """initialize parser
+
+    Parameters
+    ---------
+    None
+
+    Returns
+    -------
+    args : argparser.parse_args method
+
+    Notes
+    -----
+    Uses the argparse module
+
+    """
+    parser = argparse.ArgumentParser(
+        description='Merge Crop ET shards',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        '-i', '--ini', required=True, metavar='PATH',
+        help='Input file')
+    parser.add_argument(
+        '-n', '--shards', required=True, type=int, metavar='N',
+        help='Number of shards of run')
+    parser.add_argument(
+        '-v', '--verbose', action="store_const",
+        dest='log_level', const=logging.INFO, default=logging.WARNING,
+        help="Print info level comments")
+    args = parser.parse_args()
+    if not os.path.isfile(args.ini):
+        parser.error('The file {} does not exist!'.format(args.ini))
+    if args.shards < 1:
+        parser.error('Number of shards must be 1 or greater')
+    args.ini = os.path.abspath(args.ini)
+    return args
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    util.console_logger(log_level=args.log_level)
+    merge_shards(args.ini, args.shards)
@@ -0,0 +1,176 @@
+"""climate_scenarios.py
+Defines read_scenarios, scenario_folder and scenario_data functions
+Scenario mode (--scenarios) runs a list of weather/RefET folders (i.e.
+    future climate scenarios) with one static setup (INI file, crop
+    parameters and coefficients, cell properties, crops and cuttings),
+    output files of each scenario are written to a scenario subfolder of
+    each output folder
+Called by mod_crop_et.py
+
+"""
+
+import copy
+import logging
+import os
+import sys
+import pandas as pd
+
+# Scenario file columns of time series folders (INI option names)
+folder_fields = ['refet_folder', 'weather_folder', 'hist_temps_folder']
+
+
+def read_scenarios(scenarios_path, data):
+    """Read climate scenario list
+
+    Parameters
+    ---------
+    scenarios_path : str
+        CSV file with one row per scenario, Scenario column (scenario name,
+        used as output subfolder name) and refet_folder, weather_folder and
+        optional hist_temps_folder columns
+    data : dict
+        configuration data from INI file
+
+    Returns
+    -------
+    : list
+        configuration data of each scenario (see scenario_data())
+
+    Notes
+    -----
+    Folders can be full paths or relative to project folder
+    Empty values keep the folder of INI file
+
+    """
+    try:
+        scenarios_df = pd.read_csv(
+            scenarios_path, comment='#', dtype=str, keep_default_na=False)
+    except Exception as e:
+        logging.error('\nERROR: Unable to read scenarios {}\n  {}'.format(
+            scenarios_path, e))
+        sys.exit()
+    scenarios_df.columns = [str(c).strip() for c in scenarios_df.columns]
+    if 'Scenario' not in scenarios_df.columns:
+        logging.error('\nERROR: Scenario list must have a Scenario column')
+        sys.exit()
+    unknown = [c for c in scenarios_df.columns
+               if c != 'Scenario' and c not in folder_fields]
+    if unknown:
+        logging.error(
+            '\nERROR: Unknown scenario list columns: {}\n  Columns must be '
+            'Scenario, {}'.format(', '.join(unknown), ', '.join(folder_fields)))
+        sys.exit()
+    if 'hist_temps_folder' in scenarios_df.columns and \
+            data.phenology_option == 0:
+        logging.warning(
+            '  phenology_option is 0, hist_temps_folder is not used')
+
+    names = [name.strip() for name in scenarios_df['Scenario']]
+    if not names:
+        logging.error('\nERROR: Scenario list is empty')
+        sys.exit()
+    for name in names:
+        if (not name or name in ['.', '..'] or os.sep in name or
+                '/' in name):
+            logging.error(
+                '\nERROR: Invalid scenario name "{}", names are used as '
+                'output folder names'.format(name))
+            sys.exit()
+    if len(set(names)) != len(names):
+        logging.error('\nERROR: Scenario names must be unique')
+        sys.exit()
+
+    scenario_list = []
+    for name, folders in zip(names, scenarios_df.to_dict('records')):
+        folders = {
+            field: scenario_folder(data, folders[field].strip())
+            for field in folder_fields
+            if field in folders and folders[field].strip()}
+        scenario_list.append(scenario_data(data, name, folders))
+    logging.warning('  Climate scenarios: {}'.format(', '.join(names)))
+    return scenario_list
+
+def scenario_folder(data, folder):
+    """Full path of scenario time series folder
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    folder : str
+        full path or path relative to project folder
+
+    Returns
+    -------
+    : str
+
+    """
+    if os.path.isdir(folder):
+        return folder
+    elif os.path.isdir(os.path.join(data.project_ws, folder)):
+        return os.path.join(data.project_ws, folder)
+    logging.error('\nERROR: Scenario folder {} does not exist'.format(folder))
+    sys.exit()
+
+def scenario_data(data, scenario, folders):
+    """Configuration data of climate scenario
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    scenario : str
+        scenario name
+    folders : dict
+        full path of scenario time series folders by folder_fields name
+
+    Returns
+    -------
+    : CropETData
+
+    Notes
+    -----
+    Shallow copy, crop parameters and coefficients are shared with data
+    Scenario is part of station key (see ETCell.station_key()), so station
+        cache and climate store never mix time series of scenarios
+    Output, checkpoint and trace folders get a scenario subfolder
+    Run manifest isn't used since crops completed by an earlier run are
+        turned off for all scenarios (see run_manifest.skip_completed())
+
+    """
+    s_data = copy.copy(data)
+    s_data.scenario = scenario
+    s_data.refet = dict(data.refet)
+    s_data.weather = dict(data.weather)
+    s_data.cet_out = dict(data.cet_out)
+    if 'refet_folder' in folders:
+        s_data.refet['ws'] = folders['refet_folder']
+    if 'weather_folder' in folders:
+        s_data.weather['ws'] = folders['weather_folder']
+    if data.phenology_option > 0:
+        s_data.hist_temps = dict(data.hist_temps)
+        if 'hist_temps_folder' in folders:
+            s_data.hist_temps['ws'] = folders['hist_temps_folder']
+    s_data.manifest_flag = False
+    s_data.manifest_path = None
+
+    output_ws_list = []
+    for timestep in ['daily', 'monthly', 'annual']:
+        if data.cet_out['{}_output_flag'.format(timestep)]:
+            s_data.cet_out['{}_output_ws'.format(timestep)] = os.path.join(
+                data.cet_out['{}_output_ws'.format(timestep)], scenario)
+            output_ws_list.append(
+                s_data.cet_out['{}_output_ws'.format(timestep)])
+    if data.gs_output_flag:
+        s_data.gs_output_ws = os.path.join(data.gs_output_ws, scenario)
+        output_ws_list.append(s_data.gs_output_ws)
+    if data.checkpoint_ws is not None:
+        s_data.checkpoint_ws = os.path.join(data.checkpoint_ws, scenario)
+        output_ws_list.append(s_data.checkpoint_ws)
+    if data.trace_ws is not None:
+        s_data.trace_ws = os.path.join(data.trace_ws, scenario)
+        output_ws_list.append(s_data.trace_ws)
+    for output_ws in output_ws_list:
+        if not os.path.isdir(output_ws):
+            os.makedirs(output_ws)
+    return s_data
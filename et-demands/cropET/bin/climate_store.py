@@ -0,0 +1,197 @@
+"""climate_store.py
+Defines input_hash, read_climate_store and write_climate_store functions
+On disk store of processed station time series (NumPy .npz files)
+Called by et_cell.py
+
+"""
+
+import hashlib
+import json
+import logging
+import os
+import numpy as np
+import pandas as pd
+
+# Time series attributes of ETCell saved in store
+store_attrs = ['refet_df', 'climate_df']
+
+
+def store_path(data, station_key):
+    """Path of store file for station key
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    station_key : tuple
+        station key (see ETCell.station_key())
+
+    Returns
+    -------
+    : str
+
+    """
+    key_hash = hashlib.sha1(repr(station_key[1:]).encode()).hexdigest()
+    return os.path.join(data.climate_store_ws, '{}_{}.npz'.format(
+        station_key[0], key_hash[:8]))
+
+def input_hash(data, et_cell, station_key):
+    """Hash of input files and INI options used to process station data
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    et_cell : dict
+        ETCell instance
+    station_key : tuple
+        station key (see ETCell.station_key())
+
+    Returns
+    -------
+    : str
+
+    Notes
+    -----
+    File contents are hashed (not modification times) so copied or touched
+        files don't invalidate the store
+
+    """
+    options = {
+        'station_key': station_key,
+        'refet': data.refet,
+        'weather': data.weather,
+        'start_dt': data.start_dt,
+        'end_dt': data.end_dt,
+        'phenology_option': data.phenology_option,
+        'co2_flag': data.co2_flag,
+        'refet_ratios_path': data.refet_ratios_path}
+    input_paths = [
+        os.path.join(data.refet['ws'],
+                     data.refet['name_format'] % et_cell.refet_id),
+        os.path.join(data.weather['ws'],
+                     data.weather['name_format'] % et_cell.refet_id)]
+    if data.refet_ratios_path:
+        options['et_ratios'] = [
+            data.et_ratios_delimiter, data.et_ratios_header_lines,
+            data.et_ratios_id_field, data.et_ratios_name_field,
+            data.et_ratios_month_field, data.et_ratios_ratio_field]
+        input_paths.append(data.refet_ratios_path)
+    if data.phenology_option > 0:
+        options['hist_temps'] = data.hist_temps
+        input_paths.append(os.path.join(
+            data.hist_temps['ws'],
+            data.hist_temps['name_format'] % et_cell.refet_id))
+
+    sha = hashlib.sha1(
+        json.dumps(options, sort_keys=True, default=str).encode())
+    for input_path in input_paths:
+        try:
+            with open(input_path, 'rb') as input_f:
+                for chunk in iter(lambda: input_f.read(1 << 20), b''):
+                    sha.update(chunk)
+        except IOError:
+            # Missing files are reported when time series are read
+            sha.update(input_path.encode())
+    return sha.hexdigest()
+
+def read_climate_store(data, et_cell, station_key, station_hash):
+    """Set processed station time series on et cell from store
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    et_cell : dict
+        ETCell instance
+    station_key : tuple
+        station key (see ETCell.station_key())
+    station_hash : str
+        hash of input files and INI options (see input_hash())
+
+    Returns
+    -------
+    : boolean
+        True : store file exists and is current
+        False
+
+    """
+    npz_path = store_path(data, station_key)
+    if not os.path.isfile(npz_path):
+        return False
+    try:
+        with np.load(npz_path, allow_pickle=False) as npz:
+            if str(npz['input_hash']) != station_hash:
+                logging.debug('  Climate store is out of date\n  {}'.format(
+                    npz_path))
+                return False
+            store = {}
+            for attr in store_attrs:
+                columns = [str(col) for col in npz[attr + '__columns']]
+                store[attr] = pd.DataFrame(
+                    {col: npz['{}__{}'.format(attr, col_i)]
+                     for col_i, col in enumerate(columns)},
+                    index=pd.DatetimeIndex(
+                        npz[attr + '__index'], name='date'),
+                    columns=columns)
+            store['climate'] = {
+                str(name): npz['climate__' + str(name)]
+                for name in npz['climate__names']}
+    except Exception as e:
+        logging.warning('  Unable to read climate store {}\n  {}'.format(
+            npz_path, e))
+        return False
+    for attr, value in store.items():
+        setattr(et_cell, attr, value)
+    logging.debug('  Read climate store\n  {}'.format(npz_path))
+    return True
+
+def write_climate_store(data, et_cell, station_key, station_hash):
+    """Write processed station time series of et cell to store
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    et_cell : dict
+        ETCell instance
+    station_key : tuple
+        station key (see ETCell.station_key())
+    station_hash : str
+        hash of input files and INI options (see input_hash())
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    Only numeric columns are saved (other columns aren't used by model)
+    File is written to temporary name first so other processes never read
+        partial files
+
+    """
+    arrays = {'input_hash': np.array(station_hash)}
+    for attr in store_attrs:
+        df = getattr(et_cell, attr)
+        columns = [col for col in df.columns
+                   if np.issubdtype(df[col].dtype, np.number)]
+        arrays[attr + '__columns'] = np.array(columns, dtype=str)
+        arrays[attr + '__index'] = df.index.values
+        for col_i, col in enumerate(columns):
+            arrays['{}__{}'.format(attr, col_i)] = df[col].values
+    arrays['climate__names'] = np.array(list(et_cell.climate.keys()))
+    for name, values in et_cell.climate.items():
+        arrays['climate__' + name] = values
+
+    npz_path = store_path(data, station_key)
+    temp_path = '{}.{}.tmp'.format(npz_path, os.getpid())
+    try:
+        with open(temp_path, 'wb') as npz_f:
+            np.savez(npz_f, **arrays)
+        os.replace(temp_path, npz_path)
+    except (IOError, OSError) as e:
+        logging.warning('  Unable to write climate store {}\n  {}'.format(
+            npz_path, e))
+        if os.path.isfile(temp_path):
+            os.remove(temp_path)
@@ -8,7 +8,6 @@ import datetime
 import logging
 import math
 import sys
-import util
 
 import grow_root
 import runoff
@@ -101,81 +100,42 @@ def compute_crop_et(data, et_cell, crop, foo, foo_day, debug_flag=False):
     # Also set up kc_max for non-growing seasons for other crops
     # Kc_max for wintertime land use (Nov-Mar)for non-growing season crops
 
-    if util.is_winter(et_cell, foo_day):
+    # foo_day.winter and foo_day.winter_kc_max are from cell calendar
+    #   (see cell_calendar.CellCalendar)
+
+    if foo_day.winter:
         if crop.class_number not in [44, 45, 46]:
             # Note that these are ETr based.  (Allen 12/2007)
             # Multiply by 1.2 (plus adj?) for ETo base
+            # wscc 1 bare soil (foo.fc is calculated below),
+            #   2 mulched soil, including grain stubble,
+            #   3 dormant turf/sod (winter time)
 
-            if wscc == 1:
-                # bare soil
-                # foo.fc is calculated below
-
-                if data.refet['type'] == 'eto':
-                    kc_max = 1.1
-                elif data.refet['type'] == 'etr':
-                    kc_max = 0.9
-            elif wscc == 2:
-                # Mulched soil, including grain stubble
-
-                if data.refet['type'] == 'eto':
-                    kc_max = 1.0
-                elif data.refet['type'] == 'etr':
-                    kc_max = 0.85
-            elif wscc == 3:
-                # Dormant turf/sod (winter time)
-
-                if data.refet['type'] == 'eto':
-                    kc_max = 0.95
-                elif data.refet['type'] == 'etr':
-                    kc_max = 0.8
-        elif crop.class_number == 44:
-            # Bare soil
-            # Less soil heat in winter.
-
-            if data.refet['type'] == 'eto':
-                # For ETo  (Allen 12/2007)
-
-                kc_max = 1.1
-            elif data.refet['type'] == 'etr':
-                # For ETr (Allen 3/2008)
-
-                kc_max = 0.9
-            foo.fc = 0.0
-        elif crop.class_number == 45:
-            # Mulched soil, including grain stubble
-
-            if data.refet['type'] == 'eto':
-                # For ETo (0.85 * 1.2)  (Allen 12/2007)
-
-                kc_max = 1.0
-            elif data.refet['type'] == 'etr':
-                # For ETr (Allen 3/2008)
-
-                kc_max = 0.85
-            foo.fc = 0.4
-        elif crop.class_number == 46:
-            # Dormant turf/sod (winter time)
-
-            if data.refet['type'] == 'eto':
-                # For ETo (0.8 * 1.2)  (Allen 12/2007)
-
-                kc_max = 0.95
-            elif data.refet['type'] == 'etr':
-                # For ETr (Allen 3/2008)
+            if wscc in foo_day.winter_kc_max:
+                kc_max = foo_day.winter_kc_max[wscc]
+        else:
+            # Bare soil (less soil heat in winter), mulched soil and
+            #   dormant turf/sod use winter kc_max of their cover class
 
-                kc_max = 0.8
-            # Was 0.6
+            kc_max = foo_day.winter_kc_max[crop.class_number - 43]
+            if crop.class_number == 44:
+                foo.fc = 0.0
+            elif crop.class_number == 45:
+                foo.fc = 0.4
+            elif crop.class_number == 46:
+                # Was 0.6
 
-            foo.fc = 0.7
+                foo.fc = 0.7
 
     # added 2/21/08 to make sure that a winter cover class is used if during non-growing season
     # override Kc_bas assigned from kcb_daily() if non-growing season and not water
 
     if (not foo.in_season and
         (crop.class_number < 55 or crop.class_number > 57)):
-        logging.debug(
-            'compute_crop_et(): kc_bas %.6f  kc_bas_wscc %.6f  wscc %.6f' % (
-                foo.kc_bas, foo.kc_bas_wscc[wscc], wscc))
+        if debug_flag:
+            logging.debug(
+                'compute_crop_et(): kc_bas %.6f  kc_bas_wscc %.6f  wscc %.6f' % (
+                    foo.kc_bas, foo.kc_bas_wscc[wscc], wscc))
         # Set higher dormant kc min for warm season turfgrass (Crop 87); added 5/1/2020
         if crop.class_number in [87]:
             foo.kc_bas = 0.25
@@ -369,9 +329,10 @@ def compute_crop_et(data, et_cell, crop, foo, foo_day, debug_flag=False):
 
     foo.depl_zep = foo.depl_zep - foo.ppt_inf + depl_zep_prev
     foo.depl_zep = min(max(foo.depl_zep, 0), foo.tew)
-    logging.debug(
-        ('compute_crop_et(): depl_ze %.6f  depl_zep %.6f') %
-        (foo.depl_ze, foo.depl_zep))
+    if debug_flag:
+        logging.debug(
+            ('compute_crop_et(): depl_ze %.6f  depl_zep %.6f') %
+            (foo.depl_ze, foo.depl_zep))
 
     # reducer coefficient for evaporation based on moisture left
     # This is set up for three stage evaporation
@@ -639,14 +600,16 @@ def compute_crop_et(data, et_cell, crop, foo, foo_day, debug_flag=False):
     # (ptt_inf, irr and dperc_ze were subtracted or added earlier)
 
     foo.depl_ze = depl_ze_prev + e_irr / few + te_irr
-    logging.debug('compute_crop_et(): depl_ze %.6f' % (foo.depl_ze))
+    if debug_flag:
+        logging.debug('compute_crop_et(): depl_ze %.6f' % (foo.depl_ze))
 
     # This next section modified 2/21/08 to keep a days potential E from exceeding
     # Evaporable water available (for coarse soils).  Allen and Huntington
 
     if foo.depl_ze < 0:
         foo.depl_ze = 0.0
-        logging.debug('compute_crop_et(): depl_ze %.6f' % (foo.depl_ze))
+        if debug_flag:
+            logging.debug('compute_crop_et(): depl_ze %.6f' % (foo.depl_ze))
     if foo.depl_ze > foo.tew:
         # use tew here rather than tew2use to allow depl_ze to remain at tew
         #'''  probably not.  if Delast <= 0:    Delast = 0
@@ -658,7 +621,8 @@ def compute_crop_et(data, et_cell, crop, foo, foo_day, debug_flag=False):
         e_irr *= e_factor
         te_irr *= e_factor
         foo.depl_ze = depl_ze_prev + e_irr / few + te_irr  # recalculate
-        logging.debug('compute_crop_et(): depl_ze %.6f' % (foo.depl_ze))
+        if debug_flag:
+            logging.debug('compute_crop_et(): depl_ze %.6f' % (foo.depl_ze))
         if foo.depl_ze > foo.tew + 0.2:
             logging.warning(
                 ('Problem in keeping depl_ze water balance within TEW.' +
@@ -1,9 +1,83 @@
 """compute_crop_gdd.py
 Function for calculating crop growing degree days
-Called by crop_cycle.py
+Defines etref_index, etref_buffer and etref_ring functions for 30 day ETref
+    ring buffer (DayData.etref_array)
+Called by crop_cycle.py, crop_phenology.py, crop_checkpoint.py,
+    crop_cycle_jit.py and crop_cycle_vector.py
 
 """
 
+import numpy as np
+
+# Number of days of running mean ETref (etref_30)
+etref_days = 30
+
+
+def etref_index(sdays):
+    """Ring buffer index of ETref of run day
+
+    Parameters
+    ---------
+    sdays : int
+        run day (1 is first day)
+
+    Returns
+    -------
+    : int
+
+    Notes
+    -----
+    Days 1 to 30 fill buffer, after that each day replaces ETref of 30 days
+        ago, so index only depends on sdays and no position is kept
+
+    """
+    return (sdays - 1) % etref_days
+
+def etref_buffer(etref_array, sdays):
+    """ETref of last 30 days, oldest first
+
+    Parameters
+    ---------
+    etref_array : ndarray
+        ring buffer (see etref_index())
+    sdays : int
+        last run day added to buffer
+
+    Returns
+    -------
+    : ndarray
+
+    Notes
+    -----
+    Buffer state saved in checkpoints (see crop_checkpoint.py), same order
+        as the shifted 30 day array of earlier versions
+
+    """
+    if sdays < etref_days:
+        return np.array(etref_array, dtype=np.float64)
+    return np.roll(np.asarray(etref_array, dtype=np.float64),
+                   -(sdays % etref_days))
+
+def etref_ring(etref_values, sdays):
+    """Ring buffer of ETref of last 30 days (inverse of etref_buffer())
+
+    Parameters
+    ---------
+    etref_values : ndarray
+        ETref of last 30 days, oldest first
+    sdays : int
+        last run day added to buffer
+
+    Returns
+    -------
+    : ndarray
+
+    """
+    if sdays < etref_days:
+        return np.array(etref_values, dtype=np.float64)
+    return np.roll(np.asarray(etref_values, dtype=np.float64),
+                   sdays % etref_days)
+
 def compute_crop_gdd(crop, foo, foo_day):
     """Calculate crop growing degree days
 
@@ -26,17 +100,15 @@ def compute_crop_gdd(crop, foo, foo_day):
         """
 
     # Calculate 30 day ETr each year
-    # Shift entries in 30 day array to add today's ETref
-
-    etref_lost = 0.0
-    if foo_day.sdays > 30:
-        etref_lost = foo_day.etref_array[0]
-        for idx in range(29):    # idx = 1 is 30 days ago
-            foo_day.etref_array[idx] = foo_day.etref_array[idx + 1]
-        foo_day.etref_array[29] = foo_day.etref
+    # Today's ETref replaces ETref of 30 days ago in ring buffer
+
+    etref_i = etref_index(foo_day.sdays)
+    if foo_day.sdays > etref_days:
+        etref_lost = foo_day.etref_array[etref_i]
+        foo_day.etref_array[etref_i] = foo_day.etref
         foo.etref_30 = foo.etref_30 + (foo_day.etref - etref_lost) / 30.
     else:
-        foo_day.etref_array[foo_day.sdays-1] = foo_day.etref
+        foo_day.etref_array[etref_i] = foo_day.etref
         foo.etref_30 = (foo.etref_30 * (foo_day.sdays - 1) + foo_day.etref) / foo_day.sdays
 
     # Reset CGDD if new year
@@ -0,0 +1,295 @@
+"""crop_checkpoint.py
+Defines read_checkpoint, write_checkpoint and crop state functions
+Crop state of each cell and crop is saved at last boundary day (i.e. Dec 31)
+    so later runs with more days only simulate days after it
+Called by crop_cycle.py and crop_cycle_jit.py
+
+"""
+
+import hashlib
+import logging
+import os
+import numpy as np
+
+import compute_crop_gdd
+import crop_cycle_jit
+
+# Changes when saved state or model changes (old checkpoints aren't used)
+checkpoint_version = 1
+
+
+def checkpoint_path(data, et_cell, crop):
+    """Path of checkpoint file of cell and crop
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    et_cell : dict
+        ETCell instance
+    crop : dict
+        CropParameters instance
+
+    Returns
+    -------
+    : str
+
+    """
+    return os.path.join(data.checkpoint_ws, '{}_crop_{:02d}.npz'.format(
+        et_cell.cell_id, int(crop.class_number)))
+
+def last_boundary(data, step_dates):
+    """Index of last boundary day of run
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    step_dates : pandas.DatetimeIndex
+        daily dates of run
+
+    Returns
+    -------
+    : int
+        -1 if there are no boundary days
+
+    """
+    if data.checkpoint_boundary == 'month':
+        boundary_i = np.flatnonzero(step_dates.is_month_end)
+    else:
+        boundary_i = np.flatnonzero(step_dates.is_year_end)
+    if boundary_i.size == 0:
+        return -1
+    return int(boundary_i[-1])
+
+def input_hash(step_dates, n_days, clim, records):
+    """Hash of all model inputs of first n_days of run
+
+    Parameters
+    ---------
+    step_dates : pandas.DatetimeIndex
+        daily dates of run
+    n_days : int
+        number of days saved in checkpoint
+    clim : dict
+        daily climate arrays (see crop_cycle.crop_climate_arrays())
+    records : tuple
+        crop_rec, kcb_curves, kcb_lentry and initial state record
+        (see crop_cycle_jit.crop_records())
+
+    Returns
+    -------
+    : str
+
+    Notes
+    -----
+    Crop parameters, cell properties and options used by the day loop are
+        all in crop records so any change makes checkpoint out of date
+
+    """
+    sha = hashlib.sha1(repr((
+        checkpoint_version, str(step_dates[0]), n_days)).encode())
+    for values in records:
+        sha.update(np.ascontiguousarray(values).tobytes())
+    for field in sorted(clim.keys()):
+        sha.update(np.ascontiguousarray(clim[field][:n_days]).tobytes())
+    return sha.hexdigest()
+
+def read_checkpoint(data, et_cell, crop, step_dates, clim, records):
+    """Read saved crop state of cell and crop
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    et_cell : dict
+        ETCell instance
+    crop : dict
+        CropParameters instance
+    step_dates : pandas.DatetimeIndex
+        daily dates of run
+    clim : dict
+        daily climate arrays (see crop_cycle.crop_climate_arrays())
+    records : tuple
+        crop records of run (see input_hash())
+
+    Returns
+    -------
+    : dict
+        checkpoint (see write_checkpoint())
+        None if there is no checkpoint or it doesn't match run
+
+    Notes
+    -----
+    Checkpoint is used only if run starts on same day, extends past the
+        checkpoint day and all inputs up to checkpoint day are the same
+
+    """
+    npz_path = checkpoint_path(data, et_cell, crop)
+    if not os.path.isfile(npz_path):
+        return None
+    try:
+        with np.load(npz_path, allow_pickle=False) as npz:
+            n_days = int(npz['n_days'])
+            if (n_days >= len(step_dates) or
+                    str(npz['start_date']) != str(step_dates[0].date()) or
+                    str(npz['end_date']) !=
+                    str(step_dates[n_days - 1].date())):
+                logging.info('  Checkpoint dates do not match run\n  {}'.format(
+                    npz_path))
+                return None
+            if str(npz['input_hash']) != input_hash(
+                    step_dates, n_days, clim, records):
+                logging.info('  Checkpoint inputs changed\n  {}'.format(
+                    npz_path))
+                return None
+            checkpoint = {
+                name: npz[name] for name in [
+                    'state', 'etref_array', 'day_state', 'out', 'out_int']}
+    except Exception as e:
+        logging.warning('  Unable to read checkpoint {}\n  {}'.format(
+            npz_path, e))
+        return None
+    checkpoint['n_days'] = n_days
+    logging.info('  Resuming from checkpoint {}'.format(
+        step_dates[n_days - 1].date()))
+    return checkpoint
+
+def write_checkpoint(data, et_cell, crop, step_dates, clim, records,
+                     checkpoint):
+    """Write crop state of cell and crop
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    et_cell : dict
+        ETCell instance
+    crop : dict
+        CropParameters instance
+    step_dates : pandas.DatetimeIndex
+        daily dates of run
+    clim : dict
+        daily climate arrays (see crop_cycle.crop_climate_arrays())
+    records : tuple
+        crop records of run (see input_hash())
+    checkpoint : dict
+        n_days : number of days simulated at checkpoint
+        state : crop state record (crop_cycle_jit.state_dtype)
+        etref_array : ETref of last 30 days, oldest first
+            (see compute_crop_gdd.etref_buffer())
+        day_state : sdays and doy_prev
+        out, out_int : daily outputs of first n_days
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    Daily outputs up to checkpoint are saved so resumed runs write
+        complete output files (monthly, annual and growing season
+        statistics need all days)
+    File is written to temporary name first so other processes never read
+        partial files
+
+    """
+    n_days = checkpoint['n_days']
+    arrays = {
+        'input_hash': np.array(input_hash(step_dates, n_days, clim, records)),
+        'n_days': np.array(n_days),
+        'start_date': np.array(str(step_dates[0].date())),
+        'end_date': np.array(str(step_dates[n_days - 1].date()))}
+    for name in ['state', 'etref_array', 'day_state', 'out', 'out_int']:
+        arrays[name] = checkpoint[name]
+
+    npz_path = checkpoint_path(data, et_cell, crop)
+    temp_path = '{}.{}.tmp'.format(npz_path, os.getpid())
+    try:
+        with open(temp_path, 'wb') as npz_f:
+            np.savez(npz_f, **arrays)
+        os.replace(temp_path, npz_path)
+    except (IOError, OSError) as e:
+        logging.warning('  Unable to write checkpoint {}\n  {}'.format(
+            npz_path, e))
+        if os.path.isfile(temp_path):
+            os.remove(temp_path)
+
+def foo_state(foo):
+    """Crop state record of InitializeCropCycle instance
+
+    Parameters
+    ---------
+    foo : InitializeCropCycle
+        crop state of python day loop
+
+    Returns
+    -------
+    : ndarray
+        crop_cycle_jit.state_dtype record array (length 1)
+
+    Notes
+    -----
+    Python day loop keeps t2_days as T2Days
+
+    """
+    state = np.zeros(1, dtype=crop_cycle_jit.state_dtype)
+    for field in state.dtype.names:
+        if field == 't2_days':
+            state[0][field] = foo.T2Days
+        else:
+            state[0][field] = getattr(foo, field)
+    return state
+
+def set_foo_state(foo, foo_day, checkpoint):
+    """Set saved crop state on python day loop containers
+
+    Parameters
+    ---------
+    foo : InitializeCropCycle
+        crop state of python day loop
+    foo_day : DayData
+        daily crop data of python day loop
+    checkpoint : dict
+        checkpoint (see write_checkpoint())
+
+    Returns
+    -------
+    None
+
+    """
+    state = checkpoint['state'][0]
+    for field in state.dtype.names:
+        if field == 't2_days':
+            foo.T2Days = state[field].item()
+        else:
+            setattr(foo, field, state[field].item())
+    foo_day.sdays = int(checkpoint['day_state'][0])
+    foo_day.etref_array = compute_crop_gdd.etref_ring(
+        checkpoint['etref_array'], foo_day.sdays)
+    foo_day.doy_prev = int(checkpoint['day_state'][1])
+
+def foo_checkpoint(foo, foo_day, n_days):
+    """Checkpoint of python day loop crop state
+
+    Parameters
+    ---------
+    foo : InitializeCropCycle
+        crop state of python day loop
+    foo_day : DayData
+        daily crop data of python day loop
+    n_days : int
+        number of days simulated
+
+    Returns
+    -------
+    : dict
+        checkpoint without daily outputs (see write_checkpoint())
+
+    """
+    return {
+        'n_days': n_days, 'state': foo_state(foo),
+        'etref_array': compute_crop_gdd.etref_buffer(
+            foo_day.etref_array, foo_day.sdays),
+        'day_state': np.array(
+            [foo_day.sdays, foo_day.doy_prev], dtype=np.int64)}
@@ -18,6 +18,9 @@ curve_descs : dict
 
 """
 
+# Daily tables cover 0 to 367 days into season (planting on DOY 0)
+max_season_days = 367
+
 curve_descs = {'1': '1=NCGDD', '2': '2=%PL-EC', '3': '3=%PL-EC+daysafter', '4': '4=%PL-Term'}
 
 class CropCoeff:
@@ -36,10 +39,19 @@ class CropCoeff:
             Crop name
         data : ndarray
             Crop coefficient curve values
+        slope : ndarray
+            Change of value to next curve entry (interpolation slope)
+        season_tables : dict
+            Daily values by days into season for each season length
+        efc_tables : dict
+            Daily values by days into season for each time to EFC
+            (days after EFC basis)
 
     Notes
     -----
     See comments in code
+    Daily tables are built once per season length or time to EFC and are
+        shared by all cells using curve
 
     """
 
@@ -87,6 +99,136 @@ class CropCoeff:
         self.data = values.astype(float)
         self.lentry = len(np.where(self.data > 0.0)[0]) - 1
 
+        # Curves are shared by all cells and must not be modified
+        self.data.setflags(write=False)
+        self.slope = self.data[1:] - self.data[:-1]
+        self.slope.setflags(write=False)
+        self.season_tables = {}
+        self.efc_tables = {}
+
+    def interp(self, x):
+        """Interpolate curve at table positions
+
+        Parameters
+        ----------
+        x : ndarray or float
+            table position (10 entries per season fraction)
+
+        Returns
+        -------
+        : ndarray or float
+
+        Notes
+        -----
+        Same arithmetic as kcb_daily() so values are identical
+        Positions are limited to last curve segment
+            (max_lines_in_crop_curve_table - 1)
+
+        """
+        table_i = np.clip(
+            np.asarray(x).astype(np.int64), 0, self.data.size - 2)
+        return self.data[table_i] + (x - table_i) * self.slope[table_i]
+
+    def season_table(self, season_length):
+        """Daily values by days into season (percent of season basis)
+
+        Parameters
+        ----------
+        season_length : float
+            days from planting to EFC (curve types 2 and 3) or to end of
+            season (curve type 4)
+
+        Returns
+        -------
+        : ndarray
+            value for 0 to max_season_days days into season
+
+        """
+        try:
+            return self.season_tables[season_length]
+        except KeyError:
+            pass
+        days = np.arange(max_season_days + 1, dtype=np.float64)
+        table = self.interp(days / season_length * 10)
+        table.setflags(write=False)
+        self.season_tables[season_length] = table
+        return table
+
+    def season_value(self, season_length, days_into_season):
+        """Value at days into season (percent of season basis)
+
+        Parameters
+        ----------
+        season_length : float
+            see season_table()
+        days_into_season : int
+
+        Returns
+        -------
+        : float
+
+        Notes
+        -----
+        Days outside daily table are interpolated directly
+
+        """
+        if 0 <= days_into_season <= max_season_days:
+            return self.season_table(season_length)[days_into_season]
+        return self.interp(float(days_into_season) / season_length * 10)[()]
+
+    def efc_value(self, time_for_efc, days_into_season):
+        """Value at days into season (days after EFC basis)
+
+        Parameters
+        ----------
+        time_for_efc : float
+            see efc_table()
+        days_into_season : int
+            days into season (at or after EFC)
+
+        Returns
+        -------
+        : float
+
+        Notes
+        -----
+        Days outside daily table are interpolated directly
+
+        """
+        if 0 <= days_into_season <= max_season_days:
+            return self.efc_table(time_for_efc)[days_into_season]
+        return self.interp(
+            float(days_into_season - time_for_efc) / 10 + 11)[()]
+
+    def efc_table(self, time_for_efc):
+        """Daily values by days into season (days after EFC basis)
+
+        Parameters
+        ----------
+        time_for_efc : float
+            days from planting to EFC (curve type 3)
+
+        Returns
+        -------
+        : ndarray
+            value for 0 to max_season_days days into season (only days
+            after EFC are valid)
+
+        Notes
+        -----
+        Days after EFC start at curve entry 11 (10 days per entry)
+
+        """
+        try:
+            return self.efc_tables[time_for_efc]
+        except KeyError:
+            pass
+        days = np.arange(max_season_days + 1, dtype=np.float64)
+        table = self.interp(np.maximum((days - time_for_efc) / 10 + 11, 0))
+        table.setflags(write=False)
+        self.efc_tables[time_for_efc] = table
+        return table
+
 def read_crop_coefs_txt(data):
     """Read crop coefficients from text file
     Parameters
@@ -1,24 +1,30 @@
 """crop_cycle.py
 Defines DayData class
-Defines crop_cycle_mp, crop_cycle, crop_day_loop_mp, crop_day_loop,
-    write_crop_output
+Defines crop_cycle, crop_day_loop_mp, crop_climate_arrays,
+    crop_day_loop, write_crop_output, growing_seasons
 Called by mod_crop_et.py
 
 """
 
 import datetime
 import logging
-import multiprocessing as mp
 import os
 import numpy as np
-import pandas as pd
 import sys
 
 import calculate_height
+import cell_calendar
 import compute_crop_et
 import compute_crop_gdd
+import crop_checkpoint
+import crop_cycle_jit
+import crop_cycle_vector
+import crop_output
+import crop_trace
 from initialize_crop_cycle import InitializeCropCycle
 import kcb_daily
+import open_water
+import run_manifest
 
 
 class DayData:
@@ -36,45 +42,6 @@ class DayData:
     def __init__(self):
         self.etref_array = np.zeros(30)
 
-def crop_cycle_mp(data, et_cell, mp_procs=1):
-    """Compute crop et for all crops using multiprocessing
-
-    Parameters
-    ---------
-    data :
-
-    et_cell :
-
-    mp_procs :
-        number of cores to use for multiprocessing
-
-    Returns
-    -------
-    None
-
-    Notes
-    -----
-    crop_day_loop_mp() will unpack arguments and call crop_day_loop()
-
-    """
-
-    crop_count = 0
-    crop_mp_list = []
-    for crop_num, crop in sorted(et_cell.crop_params.items()):
-        if et_cell.crop_flags[crop_num] != 0:
-
-            # Force debug_flag false when multiprocessing
-            crop_count += 1
-            crop_mp_list.append([crop_count, data, et_cell, crop, False,
-                                 mp_procs])
-    results = []
-    if crop_mp_list:
-        pool = mp.Pool(mp_procs)
-        results = pool.imap(crop_day_loop_mp, crop_mp_list, chunksize=1)
-        pool.close()
-        pool.join()
-        del pool, results
-
 def crop_cycle(data, et_cell, debug_flag=False, mp_procs=1):
     """Compute crop ET for all crops
 
@@ -94,7 +61,12 @@ def crop_cycle(data, et_cell, debug_flag=False, mp_procs=1):
                 logging.debug('  NOT USED')
             continue
         crop_count += 1
-        crop_day_loop(crop_count, data, et_cell, crop, debug_flag, mp_procs)
+        if data.engine == 'jit':
+            crop_cycle_jit.crop_day_loop_jit(
+                crop_count, data, et_cell, crop, debug_flag, mp_procs)
+        else:
+            crop_day_loop(crop_count, data, et_cell, crop, debug_flag,
+                          mp_procs)
 
 def crop_day_loop_mp(tup):
     """Compute crop et for each daily timestep using multiprocessing
@@ -124,12 +96,72 @@ def crop_day_loop_mp(tup):
 
     Notes
     -----
-    Calls crop_day_loop
+    Calls crop_day_loop (or crop_day_loop_jit for the jit engine)
 
     """
 
+    if tup[1].engine == 'jit':
+        return crop_cycle_jit.crop_day_loop_jit(*tup)
     return crop_day_loop(*tup)
 
+def crop_climate_arrays(data, et_cell, crop, foo):
+    """Extract daily climate inputs for crop as NumPy arrays
+
+    Parameters
+    ---------
+    data :
+
+    et_cell :
+
+    crop :
+
+    foo :
+        InitializeCropCycle instance with crop_df and co2 set
+
+    Returns
+    -------
+    clim : dict
+        daily arrays aligned with foo.crop_df index
+
+    Notes
+    -----
+    Columns are pulled out of climate_df once so the day loop can index
+    plain arrays by position instead of doing label lookups every day.
+    Temperature columns are selected by phenology option.
+
+    """
+
+    # Historic (constant) phenology temperatures
+    if data.phenology_option == 1:    # annual crops only
+        hist_flag = crop.is_annual
+    elif data.phenology_option == 2:    # perennial crops only
+        hist_flag = not crop.is_annual
+    else:    # both annual and perennial (0 uses daily temperatures)
+        hist_flag = data.phenology_option not in (0, 1, 2)
+    if hist_flag:
+        temp_fields = ['meant', 'mint', 'maxt', '30t']
+    else:
+        temp_fields = ['tmean', 'tmin', 'tmax', 't30']
+
+    climate_df = et_cell.climate_df.loc[
+        foo.crop_df.index,
+        ['tdew', 'wind', 'ppt', 'rh_min', 'etref', 'snow_depth'] +
+        temp_fields]
+    clim = {
+        'tdew': climate_df['tdew'].values.astype(np.float64),
+        'u2': climate_df['wind'].values.astype(np.float64),
+        'precip': climate_df['ppt'].values.astype(np.float64),
+        'rh_min': climate_df['rh_min'].values.astype(np.float64),
+        'etref': climate_df['etref'].values.astype(np.float64),
+        'snow_depth': climate_df['snow_depth'].values.astype(np.float64),
+        'tmean': climate_df[temp_fields[0]].values.astype(np.float64),
+        'tmin': climate_df[temp_fields[1]].values.astype(np.float64),
+        'tmax': climate_df[temp_fields[2]].values.astype(np.float64),
+        't30': climate_df[temp_fields[3]].values.astype(np.float64)}
+    if data.co2_flag:
+        clim['co2'] = foo.co2.loc[foo.crop_df.index].values.astype(np.float64)
+    return clim
+
 def crop_day_loop(crop_count, data, et_cell, crop, debug_flag=False,
                   mp_procs=1):
     """Compute crop et for each daily timestep
@@ -160,9 +192,16 @@ def crop_day_loop(crop_count, data, et_cell, crop, debug_flag=False,
     -----
     mp_procs always set to 1 if calling directly
     mp_procs can be greater than one if called through crop_day_loop_mp
+    Daily inputs are read from and outputs are written to NumPy arrays
+    Output arrays are copied into foo.crop_df after the day loop
 
     """
 
+    # Open water has no soil water balance, all days are computed at once
+    if open_water.crop_day_loop_open_water(
+            crop_count, data, et_cell, crop, debug_flag, mp_procs):
+        return True
+
     func_str = 'crop_day_loop()'
     if mp_procs == 1:
         logging.warning('Crop {} - {}'.format(crop.class_number, crop.name))
@@ -190,33 +229,89 @@ def crop_day_loop(crop_count, data, et_cell, crop, debug_flag=False,
     foo_day.sdays = 0
     foo_day.doy_prev = 0
 
+    # Daily inputs as arrays (by position, aligned with crop_df)
+    clim = crop_climate_arrays(data, et_cell, crop, foo)
+    step_dates = foo.crop_df.index
+    doy_array = foo.crop_df['doy'].values.astype(np.int64)
+    year_array = step_dates.year.values.astype(np.int64)
+    month_array = step_dates.month.values.astype(np.int64)
+    day_array = step_dates.day.values.astype(np.int64)
+    if debug_flag:
+        ppt_array = et_cell.climate_df.loc[step_dates, 'ppt'].values
+        wind_array = et_cell.climate_df.loc[step_dates, 'wind'].values
+        tdew_array = et_cell.climate_df.loc[step_dates, 'tdew'].values
+        tmax_array = et_cell.climate_df.loc[step_dates, 'tmax'].values
+        tmin_array = et_cell.climate_df.loc[step_dates, 'tmin'].values
+        tmean_array = et_cell.climate_df.loc[step_dates, 'tmean'].values
+        t30_array = et_cell.climate_df.loc[step_dates, 't30'].values
+        etref_array = et_cell.refet_df.loc[step_dates, 'etref'].values
+
+    # Preallocate output arrays
+    n_days = len(step_dates)
+    out = {}
+    for field in ['et_act', 'et_pot', 'et_bas', 'kc_act', 'kc_bas',
+                  'irrigation', 'runoff', 'dperc', 'p_rz', 'p_eft',
+                  'niwr']:
+        out[field] = np.full(n_days, np.nan)
+    out['season'] = np.zeros(n_days, dtype=np.int64)
+    out['cutting'] = np.zeros(n_days, dtype=np.int64)
+
     # At very start for crop, set up for next season
     if not foo.in_season and foo.crop_setup_flag:
         foo.setup_crop(crop)
 
-    for step_dt, step_doy in foo.crop_df[['doy']].iterrows():
+    # Resume from saved crop state and outputs of earlier run
+    start_i = 0
+    checkpoint_i = -1
+    if data.checkpoint_ws is not None:
+        records = crop_cycle_jit.crop_records(data, et_cell, crop, foo)
+        checkpoint = crop_checkpoint.read_checkpoint(
+            data, et_cell, crop, step_dates, clim, records)
+        if checkpoint is not None:
+            start_i = checkpoint['n_days']
+            crop_checkpoint.set_foo_state(foo, foo_day, checkpoint)
+            for field_i, field in enumerate(
+                    crop_cycle_vector.output_fields):
+                out[field][:start_i] = checkpoint['out'][:, field_i]
+            out['season'][:start_i] = checkpoint['out_int'][:, 0]
+            out['cutting'][:start_i] = checkpoint['out_int'][:, 1]
+        checkpoint_i = crop_checkpoint.last_boundary(data, step_dates)
+        if checkpoint_i < start_i:
+            checkpoint_i = -1
+
+    # Day invariant values of cell (shared by all crops of cell)
+    calendar = cell_calendar.cell_calendar(data, et_cell, step_dates)
+    winter_list = calendar.winter.tolist()
+    ts_ta_list = calendar.ts_ta.tolist()
+    gs_early, gs_late = calendar.gs_window(
+        foo.longterm_pl, cell_calendar.gs_limit(data, crop))
+    gs_early_list = gs_early.tolist()
+    gs_late_list = gs_late.tolist()
+    foo_day.winter_kc_max = calendar.winter_kc_max
+
+    # Daily crop state of traced cells and crops (None if not traced)
+    trace = crop_trace.start_trace(data, et_cell, crop, step_dates)
+
+    for step_i in range(start_i, n_days):
+        step_dt = step_dates[step_i]
         if debug_flag:
             logging.debug(
                 '\n{}: DOY {}  Date {}'.format(
-                    func_str, int(step_doy), step_dt.date()))
+                    func_str, int(doy_array[step_i]), step_dt.date()))
 
             # Log RefET values at time step
             logging.debug((
                 '{}: PPT {:.6f}  Wind {:.6f}  ' +
                 'Tdew {:.6f} ETref {:.6f}').format(
-                func_str, et_cell.climate_df.at[step_dt, 'ppt'],
-                et_cell.climate_df.at[step_dt, 'wind'],
-                et_cell.climate_df.at[step_dt, 'tdew'],
-                et_cell.refet_df.at[step_dt, 'etref']))
+                func_str, ppt_array[step_i], wind_array[step_i],
+                tdew_array[step_i], etref_array[step_i]))
 
             # Log climate values at time step
             logging.debug((
                 '{}: tmax {:.6f}  tmin {:.6f}  ' +
                 'tmean {:.6f}  t30 {:.6f}').format(
-                func_str, et_cell.climate_df.at[step_dt, 'tmax'],
-                et_cell.climate_df.at[step_dt, 'tmin'],
-                et_cell.climate_df.at[step_dt, 'tmean'],
-                et_cell.climate_df.at[step_dt, 't30']))
+                func_str, tmax_array[step_i], tmin_array[step_i],
+                tmean_array[step_i], t30_array[step_i]))
 
         # End of season for each crop, set up for non-growing and dormant season
         if not foo.in_season and foo.dormant_setup_flag:
@@ -230,53 +325,29 @@ def crop_day_loop(crop_count, data, et_cell, crop, debug_flag=False,
         # Track variables for each day
         # For now, cast all values to native Python types
         foo_day.sdays += 1
-        foo_day.doy = int(step_doy)
-        foo_day.year = int(step_dt.year)
-        foo_day.month = int(step_dt.month)
-        foo_day.day = int(step_dt.day)
+        foo_day.doy = int(doy_array[step_i])
+        foo_day.year = int(year_array[step_i])
+        foo_day.month = int(month_array[step_i])
+        foo_day.day = int(day_array[step_i])
         foo_day.date = step_dt
-        foo_day.tdew = float(et_cell.climate_df.at[step_dt, 'tdew'])
-        foo_day.u2 = float(et_cell.climate_df.at[step_dt, 'wind'])
-        foo_day.precip = float(et_cell.climate_df.at[step_dt, 'ppt'])
-        foo_day.rh_min = float(et_cell.climate_df.at[step_dt, 'rh_min'])
-        foo_day.etref = float(et_cell.climate_df.at[step_dt, 'etref'])
-        foo_day.snow_depth = float(et_cell.climate_df.at[step_dt, 'snow_depth'])
-        if data.phenology_option == 0:
-            foo_day.tmean = float(et_cell.climate_df.at[step_dt, 'tmean'])
-            foo_day.tmin = float(et_cell.climate_df.at[step_dt, 'tmin'])
-            foo_day.tmax = float(et_cell.climate_df.at[step_dt, 'tmax'])
-            foo_day.t30 = float(et_cell.climate_df.at[step_dt, 't30'])
-        elif data.phenology_option == 1:    # annual crops only
-            if crop.is_annual:
-                foo_day.tmean = float(et_cell.climate_df.at[step_dt, 'meant'])
-                foo_day.tmin = float(et_cell.climate_df.at[step_dt, 'mint'])
-                foo_day.tmax = float(et_cell.climate_df.at[step_dt, 'maxt'])
-                foo_day.t30 = float(et_cell.climate_df.at[step_dt, '30t'])
-            else:
-                foo_day.tmean = float(et_cell.climate_df.at[step_dt, 'tmean'])
-                foo_day.tmin = float(et_cell.climate_df.at[step_dt, 'tmin'])
-                foo_day.tmax = float(et_cell.climate_df.at[step_dt, 'tmax'])
-                foo_day.t30 = float(et_cell.climate_df.at[step_dt, 't30'])
-        elif data.phenology_option == 2:    # perennial crops only
-            if not crop.is_annual:
-                foo_day.tmean = float(et_cell.climate_df.at[step_dt, 'meant'])
-                foo_day.tmin = float(et_cell.climate_df.at[step_dt, 'mint'])
-                foo_day.tmax = float(et_cell.climate_df.at[step_dt, 'maxt'])
-                foo_day.t30 = float(et_cell.climate_df.at[step_dt, '30t'])
-            else:
-                foo_day.tmean = float(et_cell.climate_df.at[step_dt, 'tmean'])
-                foo_day.tmin = float(et_cell.climate_df.at[step_dt, 'tmin'])
-                foo_day.tmax = float(et_cell.climate_df.at[step_dt, 'tmax'])
-                foo_day.t30 = float(et_cell.climate_df.at[step_dt, 't30'])
-        else:    # both annual and perennial
-            foo_day.tmean = float(et_cell.climate_df.at[step_dt, 'meant'])
-            foo_day.tmin = float(et_cell.climate_df.at[step_dt, 'mint'])
-            foo_day.tmax = float(et_cell.climate_df.at[step_dt, 'maxt'])
-            foo_day.t30 = float(et_cell.climate_df.at[step_dt, '30t'])
+        foo_day.tdew = float(clim['tdew'][step_i])
+        foo_day.u2 = float(clim['u2'][step_i])
+        foo_day.precip = float(clim['precip'][step_i])
+        foo_day.rh_min = float(clim['rh_min'][step_i])
+        foo_day.etref = float(clim['etref'][step_i])
+        foo_day.snow_depth = float(clim['snow_depth'][step_i])
+        foo_day.tmean = float(clim['tmean'][step_i])
+        foo_day.tmin = float(clim['tmin'][step_i])
+        foo_day.tmax = float(clim['tmax'][step_i])
+        foo_day.t30 = float(clim['t30'][step_i])
+        foo_day.winter = winter_list[step_i]
+        foo_day.ts_ta = ts_ta_list[step_i]
+        foo_day.gs_early = gs_early_list[step_i]
+        foo_day.gs_late = gs_late_list[step_i]
 
         # Get CO2 correction factor for each day
         if data.co2_flag:
-            foo_day.co2 = float(foo.co2.at[step_dt])
+            foo_day.co2 = float(clim['co2'][step_i])
 
         # Compute crop growing degree days
         compute_crop_gdd.compute_crop_gdd(crop, foo, foo_day)
@@ -292,21 +363,22 @@ def crop_day_loop(crop_count, data, et_cell, crop, debug_flag=False,
         compute_crop_et.compute_crop_et(data, et_cell, crop, foo, foo_day,
                                         debug_flag)
 
-        # Retrieve values from foo_day and write to output data frame
-        # Eventually let compute_crop_et() write directly to output df
-        foo.crop_df.at[step_dt, 'et_act'] = foo.etc_act
-        foo.crop_df.at[step_dt, 'et_pot'] = foo.etc_pot
-        foo.crop_df.at[step_dt, 'et_bas'] = foo.etc_bas
-        foo.crop_df.at[step_dt, 'kc_act'] = foo.kc_act
-        foo.crop_df.at[step_dt, 'kc_bas'] = foo.kc_bas
-        foo.crop_df.at[step_dt, 'irrigation'] = foo.irr_sim
-        foo.crop_df.at[step_dt, 'runoff'] = foo.sro
-        foo.crop_df.at[step_dt, 'dperc'] = foo.dperc
-        foo.crop_df.at[step_dt, 'p_rz'] = foo.p_rz
-        foo.crop_df.at[step_dt, 'p_eft'] = foo.p_eft
-        foo.crop_df.at[step_dt, 'niwr'] = foo.niwr + 0
-        foo.crop_df.at[step_dt, 'season'] = int(foo.in_season)
-        foo.crop_df.at[step_dt, 'cutting'] = int(foo.cutting)
+        # Retrieve values from foo_day and write to output arrays
+        out['et_act'][step_i] = foo.etc_act
+        out['et_pot'][step_i] = foo.etc_pot
+        out['et_bas'][step_i] = foo.etc_bas
+        out['kc_act'][step_i] = foo.kc_act
+        out['kc_bas'][step_i] = foo.kc_bas
+        out['irrigation'][step_i] = foo.irr_sim
+        out['runoff'][step_i] = foo.sro
+        out['dperc'][step_i] = foo.dperc
+        out['p_rz'][step_i] = foo.p_rz
+        out['p_eft'][step_i] = foo.p_eft
+        out['niwr'][step_i] = foo.niwr + 0
+        out['season'][step_i] = int(foo.in_season)
+        out['cutting'][step_i] = int(foo.cutting)
+        if trace is not None:
+            trace.record(step_i, foo, foo_day)
 
         # Write final output file variables to DEBUG file
         if debug_flag:
@@ -323,8 +395,8 @@ def crop_day_loop(crop_count, data, et_cell, crop, debug_flag=False,
 
         # Check that season started
         if foo_day.month == 12 and foo_day.day == 31:
-            season_count = foo.crop_df.loc[
-                str(foo_day.year):str(foo_day.year), 'season'].sum()
+            season_count = out['season'][
+                max(step_i - foo_day.doy + 1, 0):step_i + 1].sum()
             if season_count == 0:
                 logging.warning(
                     '  Crop {} - {} growing season never started'.format(
@@ -334,12 +406,35 @@ def crop_day_loop(crop_count, data, et_cell, crop, debug_flag=False,
                     '  Crop {} - {} growing season active for 1 day'.format(
                         crop.class_number, foo_day.year))
 
+        # Save crop state at last boundary day
+        if step_i == checkpoint_i:
+            checkpoint = crop_checkpoint.foo_checkpoint(
+                foo, foo_day, step_i + 1)
+
+    if checkpoint_i >= 0:
+        checkpoint['out'] = np.column_stack([
+            out[field][:checkpoint_i + 1]
+            for field in crop_cycle_vector.output_fields])
+        checkpoint['out_int'] = np.column_stack([
+            out['season'][:checkpoint_i + 1],
+            out['cutting'][:checkpoint_i + 1]])
+        crop_output.submit(
+            crop_checkpoint.write_checkpoint, data, et_cell, crop,
+            step_dates, clim, records, checkpoint)
+    if trace is not None:
+        crop_output.submit(trace.write)
+
+    # Copy output arrays to crop data frame
+    for field, values in out.items():
+        foo.crop_df[field] = values
+
     # Write output files
     if (data.cet_out['daily_output_flag'] or
             data.cet_out['monthly_output_flag'] or
             data.cet_out['annual_output_flag'] or
             data.gs_output_flag):
         write_crop_output(crop_count, data, et_cell, crop, foo)
+    run_manifest.record_crop(data, et_cell, crop)
     return True
 
 def write_crop_output(crop_count, data, et_cell, crop, foo):
@@ -361,6 +456,14 @@ def write_crop_output(crop_count, data, et_cell, crop, foo):
     -------
     None
 
+    Notes
+    -----
+    Monthly, annual and growing season values are computed from arrays and
+        all files are formatted by crop_output.write_csv()
+    Files are written by background writer if one is running
+        (see crop_output.start_writer())
+    Files are the same as the pandas resample/to_csv version
+
     """
 
     year_field = 'Year'
@@ -393,275 +496,218 @@ def write_crop_output(crop_count, data, et_cell, crop, foo):
     p_rz_fraction_field = 'P_rz_fraction'
     p_eft_fraction_field = 'P_eft_fraction'
 
-    # Merge crop and weather data frames to form daily output
-    if (data.cet_out['daily_output_flag'] or
+    if not (data.cet_out['daily_output_flag'] or
             data.cet_out['monthly_output_flag'] or
             data.cet_out['annual_output_flag'] or
             data.gs_output_flag):
-        daily_output_df = pd.merge(
-            foo.crop_df, et_cell.climate_df[['ppt']],
-            # foo.crop_df, et_cell.climate_df[['ppt', 't30']],
-            left_index=True, right_index=True)
-
-        # Rename output columns
-        daily_output_df.index.rename('Date', inplace=True)
-        daily_output_df[year_field] = daily_output_df.index.year
-        daily_output_df = daily_output_df.rename(columns={
-            'doy': doy_field, 'ppt': precip_field, 'etref': pmet_field,
-            'et_act': etact_field, 'et_pot': etpot_field,
-            'et_bas': etbas_field, 'kc_act': kc_field, 'kc_bas': kcb_field,
-            'niwr': niwr_field, 'irrigation': irrig_field,
-            'runoff': runoff_field, 'dperc': dperc_field,
-            'p_rz': p_rz_field, 'p_eft': p_eft_field,
-            'season': season_field, 'cutting': cutting_field})
-
-    # Compute monthly and annual stats before modifying daily format below
-    if data.cet_out['monthly_output_flag']:
-        monthly_resample_func = {
-            pmet_field: np.sum, etact_field: np.sum, etpot_field: np.sum,
-            etbas_field: np.sum, kc_field: np.mean, kcb_field: np.mean,
-            niwr_field: np.sum, precip_field: np.sum, irrig_field: np.sum,
-            runoff_field: np.sum, dperc_field: np.sum,
-            p_rz_field: np.sum, p_eft_field: np.sum,
-            season_field: np.sum, cutting_field: np.sum}
-        # dri dm approach produces 'TypeError: ("'dict' object is not callable",
-        # a u'occurred at index DOY')
-        monthly_output_df = daily_output_df.resample('MS').apply(
-            monthly_resample_func)
-        # add effective ppt fractions to monthly tables
-        monthly_output_df[p_rz_fraction_field] =\
-            (monthly_output_df[p_rz_field]/monthly_output_df[precip_field]).fillna(0)
-        monthly_output_df[p_eft_fraction_field] =\
-            (monthly_output_df[p_eft_field] / monthly_output_df[precip_field]).fillna(0)
-
-    if data.cet_out['annual_output_flag']:
-        annual_resample_func = {
-            pmet_field: np.sum, etact_field: np.sum, etpot_field: np.sum,
-            etbas_field: np.sum, kc_field: np.mean, kcb_field: np.mean,
-            niwr_field: np.sum, precip_field: np.sum, irrig_field: np.sum,
-            runoff_field: np.sum, dperc_field: np.sum,
-            p_rz_field: np.sum, p_eft_field: np.sum,
-            season_field: np.sum, cutting_field: np.sum}
-        # dri dm approach produces 'TypeError: ("'dict' object is not callable",
-        # a u'occurred at index DOY')
-        annual_output_df = daily_output_df.resample('AS').apply(
-            annual_resample_func)
-        # add effective ppt fractions to annual tables
-        annual_output_df[p_rz_fraction_field] =\
-            (annual_output_df[p_rz_field] / annual_output_df[precip_field]).fillna(0)
-        annual_output_df[p_eft_fraction_field] =\
-            (annual_output_df[p_eft_field] / annual_output_df[precip_field]).fillna(0)
-
-    # Get growing season start and end DOY for each year
-    # Compute growing season length for each year
-    if data.gs_output_flag:
-        # dri dm approach produces 'TypeError: ("'dict' object is not callable",
-        # a u'occurred at index DOY')
-        gs_output_df = daily_output_df.resample('AS').apply(
-            {year_field: np.mean})
-        gs_output_df[gs_start_doy_field] = np.nan
-        gs_output_df[gs_end_doy_field] = np.nan
-        gs_output_df[gs_start_date_field] = None
-        gs_output_df[gs_end_date_field] = None
-        gs_output_df[gs_length_field] = np.nan
-        for year_i, (year, group) in enumerate(daily_output_df.groupby(
-                [year_field])):
-            if not np.any(group[season_field].values):
-                logging.debug('  Skipping, season flag was never set to 1')
-                continue
-            else:
-                season_diff = np.diff(group[season_field].values)
-                try:
-                    start_i = np.where(season_diff == 1)[0][0] + 1
-
-                    # gs_output_pd.set_value(
-                    #     group.index[0], gs_start_doy_field,
-                    #     int(group.ix[start_i, doy_field]))
-                    # Replacement for set_value Future Warning
-                    # gs_output_df.at[group.index[0], gs_start_doy_field] = int(
-                    #     group.ix[start_i, doy_field])
-                    # Replacement for .ix deprecation 4/22/2020
-                    gs_output_df.at[group.index[0], gs_start_doy_field] = int(
-                        group.loc[group.index[start_i], doy_field])
-                except:
-                    # gs_output_pd.set_value(
-                    #     group.index[0], gs_start_doy_field,
-                    #     int(min(group[doy_field].values)))
-                    # Replacement for set_value Future Warning
-                    gs_output_df.at[group.index[0], gs_start_doy_field] = int(
-                        min(group[doy_field].values))
-
-                try:
-                    end_i = np.where(season_diff == -1)[0][0] + 1
-                    # gs_output_pd.set_value(
-                    #     group.index[0], gs_end_doy_field,
-                    #     int(group.ix[end_i, doy_field]))
-                    # Replacement for set_value Future Warning
-                    # gs_output_df.at[group.index[0], gs_end_doy_field] = int(
-                    #     group.ix[end_i, doy_field])
-                    # Replacement for .ix deprecation 4/22/2020
-                    gs_output_df.at[group.index[0], gs_end_doy_field] = int(
-                        group.loc[group.index[end_i], doy_field])
-                except:
-                    # gs_output_pd.set_value(
-                    #     group.index[0], gs_end_doy_field,
-                    #     int(max(group[doy_field].values)))
-                    # Replacement for set_value Future Warning
-                    gs_output_df.at[group.index[0], gs_end_doy_field] = int(
-                        max(group[doy_field].values))
-                del season_diff
-            # gs_output_pd.set_value(
-            #     group.index[0], gs_length_field,
-            #     int(sum(group[season_field].values)))
-            # Replacement for set_value Future Warning
-            gs_output_df.at[group.index[0], gs_length_field] = int(
-                sum(group[season_field].values))
-
-    base_columns = []
-    open_mode = 'w'
-    print_index = True
-    print_header = True
+        return
+
+    # Daily output arrays (crop and weather data on common dates)
+    climate_i = et_cell.climate_df.index.get_indexer(foo.crop_df.index)
+    daily_mask = climate_i >= 0
+    daily_dt = foo.crop_df.index[daily_mask]
+    daily = {
+        field: foo.crop_df[col].values[daily_mask]
+        for col, field in [
+            ('doy', doy_field), ('etref', pmet_field),
+            ('et_act', etact_field), ('et_pot', etpot_field),
+            ('et_bas', etbas_field), ('kc_act', kc_field),
+            ('kc_bas', kcb_field), ('niwr', niwr_field),
+            ('irrigation', irrig_field), ('runoff', runoff_field),
+            ('dperc', dperc_field), ('p_rz', p_rz_field),
+            ('p_eft', p_eft_field), ('season', season_field),
+            ('cutting', cutting_field)]}
+    daily[precip_field] = et_cell.climate_df['ppt'].values[
+        climate_i[daily_mask]]
+    daily[year_field] = daily_dt.year.values
+    daily[month_field] = daily_dt.month.values
+    daily[day_field] = daily_dt.day.values
+
+    # Fields summed and averaged for monthly and annual output
+    sum_fields = [pmet_field, etact_field, etpot_field, etbas_field,
+                  niwr_field, precip_field, irrig_field, runoff_field,
+                  dperc_field, p_rz_field, p_eft_field, season_field,
+                  cutting_field]
+    mean_fields = [kc_field, kcb_field]
+
+    def period_stats(labels):
+        """Sums and means of daily values for each period"""
+        periods, starts, counts = crop_output.period_groups(labels)
+        stats = {}
+        float_fields = [f for f in sum_fields if daily[f].dtype.kind == 'f']
+        if float_fields:
+            sums, nobs = crop_output.group_sums(
+                np.column_stack([daily[f] for f in float_fields]),
+                starts, counts)
+            stats.update(zip(float_fields, sums.T))
+        for f in sum_fields:
+            if f not in stats:
+                stats[f] = crop_output.group_int_sums(daily[f], starts, counts)
+        means = crop_output.group_means(
+            np.column_stack([daily[f].astype(np.float64)
+                             for f in mean_fields]),
+            starts, counts)
+        stats.update(zip(mean_fields, means.T))
+
+        # add effective ppt fractions to monthly and annual tables
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for fraction_field, p_field in [
+                    (p_rz_fraction_field, p_rz_field),
+                    (p_eft_fraction_field, p_eft_field)]:
+                fraction = stats[p_field] / stats[precip_field]
+                stats[fraction_field] = np.where(
+                    np.isnan(fraction), 0, fraction)
+        return periods, starts, counts, stats
+
+    # Daily, monthly and annual statistics use the same output fields
+    stat_fields = [pmet_field, etact_field, etpot_field, etbas_field,
+                   kc_field, kcb_field, precip_field, irrig_field,
+                   runoff_field, dperc_field, p_rz_field, p_eft_field]
+
+    # Columnar output has all fields of every crop (no formatting)
+    columnar_flag = data.cet_out['file_type'] != 'csv'
 
     # Write daily cet
     if data.cet_out['daily_output_flag']:
-        daily_output_df[year_field] = daily_output_df.index.year
-        daily_output_df[month_field] = daily_output_df.index.month
-        daily_output_df[day_field] = daily_output_df.index.day
+        daily_float_format = data.cet_out['daily_float_format']
 
         # format date attributes if values are formatted
-        if data.cet_out['daily_float_format'] is not None:
-            daily_output_df[year_field] = daily_output_df[year_field].map(
-                lambda x: ' %4d' % x)
-            daily_output_df[month_field] = daily_output_df[month_field].map(
-                lambda x: ' %2d' % x)
-            daily_output_df[day_field] = daily_output_df[day_field].map(
-                lambda x: ' %2d' % x)
-            daily_output_df[doy_field] = daily_output_df[doy_field].map(
-                lambda x: ' %3d' % x)
-
-        # This will convert negative "zeros" to positive
-
-        daily_output_df[niwr_field] = np.round(daily_output_df[niwr_field], 6)
-        # daily_output_df[niwr_field] = np.round(
-        # daily_output_df[niwr_field].values, 6)
-        daily_output_df[season_field] = daily_output_df[season_field].map(
-            lambda x: ' %1d' % x)
+        if daily_float_format is not None:
+            date_fmts = [' %4d', ' %2d', ' %2d', ' %3d']
+        else:
+            date_fmts = [None, None, None, None]
         daily_output_path = os.path.join(
             data.cet_out['daily_output_ws'],
             data.cet_out['name_format'].replace(
                  '%c', '%02d' % int(crop.class_number)) % et_cell.cell_id)
 
         # Set output column order
-        daily_output_columns = base_columns + [year_field, month_field,
-                                               day_field, doy_field, pmet_field,
-                                               etact_field, etpot_field,
-                                               etbas_field, kc_field, kcb_field,
-                                               precip_field, irrig_field,
-                                               runoff_field, dperc_field,
-                                               p_rz_field, p_eft_field,
-                                               niwr_field, season_field]
+        if columnar_flag:
+            daily_output_columns = [('Date', daily_dt.values, None)]
+        else:
+            daily_output_columns = [
+                ('Date', [dt.strftime(data.cet_out['daily_date_format'])
+                          for dt in daily_dt.to_pydatetime()], None)]
+        daily_output_columns.extend([
+            (year_field, daily[year_field], date_fmts[0]),
+            (month_field, daily[month_field], date_fmts[1]),
+            (day_field, daily[day_field], date_fmts[2]),
+            (doy_field, daily[doy_field], date_fmts[3])])
+        daily_output_columns.extend(
+            (f, daily[f], None) for f in stat_fields)
+
+        # This will convert negative "zeros" to positive
+        daily_output_columns.append(
+            (niwr_field, np.round(daily[niwr_field], 6), None))
+        daily_output_columns.append(
+            (season_field, daily[season_field], ' %1d'))
 
         # Remove these (instead of appending) to preserve column order
-        if not data.kc_flag:
-            daily_output_columns.remove(kc_field)
-            daily_output_columns.remove(kcb_field)
-        if not data.niwr_flag:
-            daily_output_columns.remove(niwr_field)
+        if not data.kc_flag and not columnar_flag:
+            daily_output_columns = [
+                c for c in daily_output_columns
+                if c[0] not in [kc_field, kcb_field]]
+        if not data.niwr_flag and not columnar_flag:
+            daily_output_columns = [
+                c for c in daily_output_columns if c[0] != niwr_field]
 
         # Most crops do not have cuttings, so append if needed
-        if data.cutting_flag and crop.cutting_crop:
-            daily_output_df[cutting_field] = daily_output_df[cutting_field].map(
-                lambda x: ' %1d' % x)
-            daily_output_columns.append(cutting_field)
-
-        with open(daily_output_path, open_mode, newline='') as daily_output_f:
-            daily_output_f.write('# {0:2d} - {1}\n'.format(
-                crop.class_number, crop.name))
-            daily_output_df.to_csv(
-                daily_output_f, header=print_header, index=print_index,
-                sep=',', columns=daily_output_columns,
-                float_format=data.cet_out['daily_float_format'],
-                date_format=data.cet_out['daily_date_format'])
-        del daily_output_df, daily_output_path, daily_output_columns
+        if columnar_flag or (data.cutting_flag and crop.cutting_crop):
+            daily_output_columns.append(
+                (cutting_field, daily[cutting_field], ' %1d'))
+        if columnar_flag:
+            crop_output.append_table(
+                'daily', et_cell.cell_id, crop.class_number,
+                [c[:2] for c in daily_output_columns])
+        else:
+            crop_output.submit(
+                crop_output.write_csv_file, daily_output_path,
+                '# {0:2d} - {1}\n'.format(crop.class_number, crop.name),
+                daily_output_columns, daily_float_format)
+        del daily_output_path, daily_output_columns
 
     # Write monthly cet
     if data.cet_out['monthly_output_flag']:
-        monthly_output_df[year_field] = monthly_output_df.index.year
-        monthly_output_df[month_field] = monthly_output_df.index.month
-
-        # format date attributes if values are formatted
-        if data.cet_out['monthly_float_format'] is not None:
-            monthly_output_df[year_field] = \
-                monthly_output_df[year_field].map(lambda x: ' %4d' % x)
-            monthly_output_df[month_field] = \
-                monthly_output_df[month_field].map(lambda x: ' %2d' % x)
-            monthly_output_df[season_field] = \
-                monthly_output_df[season_field].map(lambda x: ' %2d' % x)
+        monthly_float_format = data.cet_out['monthly_float_format']
+        periods, starts, counts, monthly = period_stats(
+            daily[year_field] * 12 + daily[month_field] - 1)
+        monthly_year = periods // 12
+        monthly_month = periods % 12 + 1
         monthly_output_path = os.path.join(
             data.cet_out['monthly_output_ws'],
             data.cet_out['name_format'].replace(
                 '%c', '%02d' % int(crop.class_number)) % et_cell.cell_id)
-        monthly_output_columns = base_columns + [year_field, month_field,
-                                                 pmet_field, etact_field,
-                                                 etpot_field, etbas_field,
-                                                 kc_field, kcb_field,
-                                                 precip_field, irrig_field,
-                                                 runoff_field, dperc_field,
-                                                 p_rz_field, p_eft_field,
-                                                 p_rz_fraction_field, p_eft_fraction_field,
-                                                 niwr_field, season_field]
-        if data.cutting_flag and crop.cutting_crop:
-            monthly_output_df[cutting_field] = \
-                monthly_output_df[cutting_field].map(lambda x: ' %1d' % x)
-            monthly_output_columns.append(cutting_field)
-        with open(monthly_output_path, open_mode, newline='') as monthly_output_f:
-            monthly_output_f.write('# {0:2d} - {1}\n'.format(
-                crop.class_number, crop.name))
-            monthly_output_df.to_csv(
-                monthly_output_f, header=print_header,
-                index=print_index, sep=',', columns=monthly_output_columns,
-                float_format=data.cet_out['monthly_float_format'],
-                date_format=data.cet_out['monthly_date_format'])
-        del monthly_output_df, monthly_output_path, monthly_output_columns
+
+        # format date attributes if values are formatted
+        if monthly_float_format is not None:
+            date_fmts = [' %4d', ' %2d', ' %2d']
+        else:
+            date_fmts = [None, None, None]
+        if columnar_flag:
+            monthly_output_columns = [
+                ('Date', (periods - 1970 * 12).astype('datetime64[M]'), None)]
+        else:
+            monthly_output_columns = [
+                ('Date', [datetime.datetime(y, m, 1).strftime(
+                    data.cet_out['monthly_date_format'])
+                          for y, m in zip(monthly_year.tolist(),
+                                          monthly_month.tolist())], None)]
+        monthly_output_columns.extend([
+            (year_field, monthly_year, date_fmts[0]),
+            (month_field, monthly_month, date_fmts[1])])
+        monthly_output_columns.extend(
+            (f, monthly[f], None) for f in stat_fields + [
+                p_rz_fraction_field, p_eft_fraction_field, niwr_field])
+        monthly_output_columns.append(
+            (season_field, monthly[season_field], date_fmts[2]))
+        if columnar_flag or (data.cutting_flag and crop.cutting_crop):
+            monthly_output_columns.append(
+                (cutting_field, monthly[cutting_field], ' %1d'))
+        if columnar_flag:
+            crop_output.append_table(
+                'monthly', et_cell.cell_id, crop.class_number,
+                [c[:2] for c in monthly_output_columns])
+        else:
+            crop_output.submit(
+                crop_output.write_csv_file, monthly_output_path,
+                '# {0:2d} - {1}\n'.format(crop.class_number, crop.name),
+                monthly_output_columns, monthly_float_format)
+        del monthly_output_path, monthly_output_columns, monthly
 
     # Write annual cet
     if data.cet_out['annual_output_flag']:
-        annual_output_df[year_field] = annual_output_df.index.year
-        annual_output_df[season_field] = annual_output_df[season_field].map(
-            lambda x: ' %3d' % x)
+        periods, starts, counts, annual = period_stats(daily[year_field])
         annual_output_path = os.path.join(
             data.cet_out['annual_output_ws'],
             data.cet_out['name_format'].replace(
                 '%c', '%02d' % int(crop.class_number)) % et_cell.cell_id)
-        annual_output_columns = base_columns + [year_field, pmet_field,
-                                                etact_field, etpot_field,
-                                                etbas_field, kc_field,
-                                                kcb_field, precip_field,
-                                                irrig_field, runoff_field,
-                                                dperc_field,
-                                                p_rz_field, p_eft_field,
-                                                p_rz_fraction_field, p_eft_fraction_field,
-                                                niwr_field, season_field]
-        try:
-            annual_output_columns.remove('Date')
-        except:
-            pass
-        if data.cutting_flag and crop.cutting_crop:
-            annual_output_df[cutting_field] = annual_output_df[
-                cutting_field].map(lambda x: ' %2d' % x)
-            annual_output_columns.append(cutting_field)
-        with open(annual_output_path, open_mode, newline='') as annual_output_f:
-            annual_output_f.write('# {0:2d} - {1}\n'.format(
-                crop.class_number, crop.name))
-            annual_output_df.to_csv(
-                annual_output_f, header=print_header,
-                index=False, sep=',', columns=annual_output_columns,
-                float_format=data.cet_out['annual_float_format'],
-                date_format=data.cet_out['annual_date_format'])
-        del annual_output_df, annual_output_path, annual_output_columns
+        annual_output_columns = [(year_field, periods, None)]
+        annual_output_columns.extend(
+            (f, annual[f], None) for f in stat_fields + [
+                p_rz_fraction_field, p_eft_fraction_field, niwr_field])
+        annual_output_columns.append(
+            (season_field, annual[season_field], ' %3d'))
+        if columnar_flag or (data.cutting_flag and crop.cutting_crop):
+            annual_output_columns.append(
+                (cutting_field, annual[cutting_field], ' %2d'))
+        if columnar_flag:
+            crop_output.append_table(
+                'annual', et_cell.cell_id, crop.class_number,
+                [c[:2] for c in annual_output_columns])
+        else:
+            crop_output.submit(
+                crop_output.write_csv_file, annual_output_path,
+                '# {0:2d} - {1}\n'.format(crop.class_number, crop.name),
+                annual_output_columns, data.cet_out['annual_float_format'])
+        del annual_output_path, annual_output_columns, annual
 
+    # Get growing season start and end DOY for each year
+    # Compute growing season length for each year
     # Write growing season statistics
     if data.gs_output_flag:
+        gs_year, gs_start_doy, gs_end_doy, gs_length = growing_seasons(
+            daily_dt, daily[doy_field], daily[season_field])
+
         def doy_2_date(test_year, test_doy):
             try:
                 return datetime.datetime.strptime(
@@ -669,12 +715,28 @@ def write_crop_output(crop_count, data, et_cell, crop, foo):
                         test_doy)), '%Y_%j').date().isoformat()
             except:
                 return 'None'
-        gs_output_df[gs_start_date_field] = \
-            gs_output_df[[year_field, gs_start_doy_field]].apply(
-                lambda s: doy_2_date(*s), axis=1)
-        gs_output_df[gs_end_date_field] = gs_output_df[
-            [year_field, gs_end_doy_field]].apply(
-                lambda s: doy_2_date(*s), axis=1)
+        gs_start_doy = np.array(gs_start_doy, dtype=np.float64)
+        gs_end_doy = np.array(gs_end_doy, dtype=np.float64)
+        gs_output_columns = [
+            (year_field, np.array(gs_year, dtype=np.float64), None),
+            (gs_start_doy_field, gs_start_doy, None),
+            (gs_end_doy_field, gs_end_doy, None),
+            (gs_start_date_field, [
+                doy_2_date(*s) for s in zip(gs_year, gs_start_doy)], None),
+            (gs_end_date_field, [
+                doy_2_date(*s) for s in zip(gs_year, gs_end_doy)], None),
+            (gs_length_field, np.array(gs_length, dtype=np.float64), None)]
+        if columnar_flag:
+            if np.all(np.isnan(gs_start_doy)):
+                logging.info('\nSkipping Growing Season Output for'
+                             ' Cell ID: {} Crop: {:02d}'
+                             .format(et_cell.cell_id, int(crop.class_number)))
+            else:
+                crop_output.append_table(
+                    'gs', et_cell.cell_id, crop.class_number,
+                    [c[:2] for c in gs_output_columns])
+            return
+
         if data.gs_name_format is None:
             # default filename spec
             gs_output_path = os.path.join(
@@ -685,40 +747,106 @@ def write_crop_output(crop_count, data, et_cell, crop, foo):
             gs_output_path = os.path.join(
                 data.gs_output_ws, data.gs_name_format.replace(
                     '%c', '%02d' % int(crop.class_number)) % et_cell.cell_id)
-        gs_output_columns = [
-            year_field, gs_start_doy_field, gs_end_doy_field,
-            gs_start_date_field, gs_end_date_field, gs_length_field]
-        with open(gs_output_path, open_mode, newline='') as gs_output_f:
-            gs_output_f.write(
-                '# {0:2d} - {1}\n'.format(crop.class_number, crop.name))
-            try:
-                gs_start_doy = int(round(
-                    gs_output_df[gs_start_doy_field].mean()))
-            except:
-                gs_start_doy = np.nan
-            try:
-                gs_end_doy = int(round(gs_output_df[gs_end_doy_field].mean()))
-            except:
-                gs_end_doy = np.nan
-            if gs_start_doy is np.nan:
-                logging.info('\nSkipping Growing Season Output for'
-                             ' Cell ID: {} Crop: {:02d}'
-                             .format(et_cell.cell_id, int(crop.class_number)))
-                return
-            gs_start_dt = datetime.datetime.strptime(
-                '2001_{:03d}'. format(gs_start_doy), '%Y_%j')
-            gs_end_dt = datetime.datetime.strptime(
-                '2001_{:03d}'. format(gs_end_doy), '%Y_%j')
-            gs_output_f.write(
-                '# Mean Start Date: {dt.month}/{dt.day}  ({doy})\n'.format(
-                    dt=gs_start_dt, doy=gs_start_doy))
-            gs_output_f.write(
-                '# Mean End Date:   {dt.month}/{dt.day}  ({doy})\n'.format(
-                    dt=gs_end_dt, doy=gs_end_doy))
-            gs_output_df.to_csv(
-                gs_output_f, sep=',', columns=gs_output_columns,
-                date_format='%Y', index=False)
-        del gs_output_df, gs_output_path, gs_output_columns
+        gs_header = '# {0:2d} - {1}\n'.format(crop.class_number, crop.name)
+
+        # Mean of years with a growing season (same as Series.mean())
+        try:
+            gs_start_doy = int(round(
+                np.nansum(gs_start_doy) /
+                np.count_nonzero(~np.isnan(gs_start_doy))))
+        except:
+            gs_start_doy = np.nan
+        try:
+            gs_end_doy = int(round(
+                np.nansum(gs_end_doy) /
+                np.count_nonzero(~np.isnan(gs_end_doy))))
+        except:
+            gs_end_doy = np.nan
+        if gs_start_doy is np.nan:
+            logging.info('\nSkipping Growing Season Output for'
+                         ' Cell ID: {} Crop: {:02d}'
+                         .format(et_cell.cell_id, int(crop.class_number)))
+            crop_output.submit(
+                crop_output.write_csv_file, gs_output_path, gs_header)
+            return
+        gs_start_dt = datetime.datetime.strptime(
+            '2001_{:03d}'. format(gs_start_doy), '%Y_%j')
+        gs_end_dt = datetime.datetime.strptime(
+            '2001_{:03d}'. format(gs_end_doy), '%Y_%j')
+        gs_header += (
+            '# Mean Start Date: {dt.month}/{dt.day}  ({doy})\n'.format(
+                dt=gs_start_dt, doy=gs_start_doy))
+        gs_header += (
+            '# Mean End Date:   {dt.month}/{dt.day}  ({doy})\n'.format(
+                dt=gs_end_dt, doy=gs_end_doy))
+        crop_output.submit(
+            crop_output.write_csv_file, gs_output_path, gs_header,
+            gs_output_columns)
+        del gs_output_path, gs_output_columns
+
+def growing_seasons(daily_dt, doy_array, season_array):
+    """Growing season start and end DOY and length of each year
+
+    Parameters
+    ---------
+    daily_dt : pandas.DatetimeIndex
+        daily dates
+    doy_array : ndarray
+        day of year of daily dates
+    season_array : ndarray
+        daily season flag (1 in season)
+
+    Returns
+    -------
+    : tuple
+        year, start DOY, end DOY and season length lists
+        (NaN for years without a season)
+
+    Notes
+    -----
+    Rows are keyed by first date of each year (as in pandas version,
+        partial first years get an extra row)
+    Used for growing season output and phenology mode (see crop_phenology.py)
+
+    """
+    year_array = daily_dt.year.values
+    periods, starts, counts = crop_output.period_groups(year_array)
+    gs_year = crop_output.group_means(
+        year_array.astype(np.float64)[:, None], starts, counts)[:, 0]
+    gs_dates = [datetime.datetime(y, 1, 1) for y in periods.tolist()]
+    gs_row = {dt: row_i for row_i, dt in enumerate(gs_dates)}
+    gs_year = gs_year.tolist()
+    gs_start_doy = [np.nan] * len(gs_dates)
+    gs_end_doy = [np.nan] * len(gs_dates)
+    gs_length = [np.nan] * len(gs_dates)
+    for start_i, count in zip(starts.tolist(), counts.tolist()):
+        if count == 0:
+            continue
+        group_dt = daily_dt[start_i].to_pydatetime()
+        if group_dt not in gs_row:
+            gs_row[group_dt] = len(gs_year)
+            for gs_list in [gs_year, gs_start_doy, gs_end_doy, gs_length]:
+                gs_list.append(np.nan)
+        row_i = gs_row[group_dt]
+        group_season = season_array[start_i:start_i + count]
+        group_doy = doy_array[start_i:start_i + count]
+        if not np.any(group_season):
+            logging.debug('  Skipping, season flag was never set to 1')
+            continue
+        season_diff = np.diff(group_season)
+        season_start = np.where(season_diff == 1)[0]
+        if len(season_start):
+            gs_start_doy[row_i] = int(group_doy[season_start[0] + 1])
+        else:
+            gs_start_doy[row_i] = int(min(group_doy))
+        season_end = np.where(season_diff == -1)[0]
+        if len(season_end):
+            gs_end_doy[row_i] = int(group_doy[season_end[0] + 1])
+        else:
+            gs_end_doy[row_i] = int(max(group_doy))
+        del season_diff
+        gs_length[row_i] = int(sum(group_season))
+    return gs_year, gs_start_doy, gs_end_doy, gs_length
 
 if __name__ == '__main__':
     pass
@@ -0,0 +1,1467 @@
+"""crop_cycle_jit.py
+Defines crop_day_loop_jit and crop_kernel functions
+Compiled (numba) version of the crop day loop for one cell and crop
+Called by crop_cycle.py
+
+"""
+
+import logging
+import math
+import sys
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+import cell_calendar
+import compute_crop_gdd
+import crop_checkpoint
+import crop_cycle
+import crop_cycle_vector
+import crop_output
+import crop_trace
+import initialize_crop_cycle
+from initialize_crop_cycle import InitializeCropCycle
+import open_water
+import open_water_evap
+import run_manifest
+
+# Crop state record (same names as InitializeCropCycle attributes)
+state_dtype = np.dtype(
+    [(field, np.float64) for field in initialize_crop_cycle.float_fields] +
+    [(field, np.int64) for field in initialize_crop_cycle.int_fields] +
+    [(field, np.bool_) for field in initialize_crop_cycle.bool_fields] +
+    [('t2_days', np.int64)])
+
+# Crop parameter and cell property record
+crop_dtype = np.dtype([
+    ('class_number', np.int64), ('curve_type', np.int64),
+    ('curve_number', np.int64), ('flag', np.int64),
+    ('winter_crop', np.bool_), ('gdd_trigger_doy', np.int64),
+    ('cutting_crop', np.bool_), ('alfalfa_flag', np.bool_),
+    ('cold_shock_flag', np.bool_), ('no_frost_log_flag', np.bool_),
+    ('height_initial', np.float64), ('height_max', np.float64),
+    ('rooting_depth_initial', np.float64),
+    ('rooting_depth_max', np.float64),
+    ('t30_for_pl_or_gu_or_cgdd', np.float64),
+    ('date_of_pl_or_gu', np.float64), ('date_pl_or_gu_int', np.int64),
+    ('tbase', np.float64), ('cgdd_for_efc', np.float64),
+    ('cgdd_for_termination', np.float64), ('time_for_efc', np.float64),
+    ('time_for_harvest', np.float64),
+    ('killing_frost_temperature', np.float64),
+    ('invoke_stress', np.float64), ('kc_max', np.float64),
+    ('wscc', np.int64), ('end_of_root_growth_fraction_time', np.float64),
+    ('days_after_planting_irrigation', np.float64),
+    ('latitude', np.float64), ('dairy_cuttings', np.float64),
+    ('beef_cuttings', np.float64), ('cn2_dormant', np.float64),
+    ('kc_bas_wscc', np.float64), ('max_lines', np.int64),
+    ('gs_limit_flag', np.bool_), ('crop_one_flag', np.bool_),
+    ('crop_one_reducer', np.float64), ('co2_flag', np.bool_),
+    ('refet_type', np.int64), ('runoff_exponent', np.float64)])
+
+# refet_type values
+ETO = 0
+ETR = 1
+
+# Kernel return codes
+ERROR_FLAG = 1
+ERROR_SEASON_LENGTH = 2
+ERROR_DEPL_ZE = 3
+ERROR_DEPL_ZEP = 4
+
+# Daily event bits (logged after the kernel returns)
+EVENT_KILLING_FROST = 1
+EVENT_NO_KILLING_FROST = 2
+EVENT_ADJUST_SEASON = 4
+EVENT_KC_MULT = 8
+EVENT_KS = 16
+
+
+def _jit(func):
+    """Compile function with numba if it is available
+
+    Kernels release the GIL so output files of the previous crop are
+        written by the background writer while the kernel runs
+    """
+    if numba is None:
+        return func
+    return numba.njit(cache=True, nogil=True)(func)
+
+def jit_available():
+    """Check if numba is available for the jit engine
+
+    Returns
+    -------
+    : boolean
+
+    """
+    return numba is not None
+
+@_jit
+def _max(a, b):
+    """Python max(a, b)"""
+    return b if b > a else a
+
+@_jit
+def _min(a, b):
+    """Python min(a, b)"""
+    return b if b < a else a
+
+@_jit
+def setup_crop(foo, crop):
+    """Initialize some variables for beginning of crop seasons
+
+    Notes
+    -----
+    See InitializeCropCycle.setup_crop()
+
+    """
+    zr_dormant = 0.0
+    foo.height_min = crop.height_initial
+    foo.height_max = crop.height_max
+    foo.zr_min = crop.rooting_depth_initial
+    foo.zr_max = crop.rooting_depth_max
+    foo.height = foo.height_min
+    foo.tew = foo.tew2
+    if foo.tew < foo.tew3:
+        foo.tew = foo.tew3
+    foo.fw_irr = foo.fw_std
+    foo.irr_auto = 0.
+    foo.irr_sim = 0.
+    daw3 = foo.aw3 * (foo.zr_max - zr_dormant)
+    taw3 = foo.aw * (foo.zr_max - zr_dormant)
+    daw3 = _max(0., daw3)
+    taw3 = _max(0., taw3)
+    if foo.zr_min > zr_dormant:
+        foo.depl_root = (
+            foo.depl_root + (taw3 - daw3) *
+            (foo.zr_min - zr_dormant) / (foo.zr_max - zr_dormant))
+    elif foo.zr_max > foo.zr_min:
+        daw3 = (
+            daw3 + (zr_dormant - foo.zr_min) / zr_dormant *
+            (foo.aw * zr_dormant - foo.depl_root))
+        foo.depl_root *= foo.zr_min / zr_dormant
+        foo.aw3 = daw3 / (foo.zr_max - foo.zr_min)
+        foo.aw3 = _max(0.0, foo.aw3)
+        if foo.aw3 > foo.aw:
+            foo.aw3 = foo.aw
+        foo.aw3 = _min(foo.aw, foo.aw3)
+    if foo.depl_root < 0.:
+        foo.depl_root = 0.
+    foo.zr = foo.zr_min
+
+@_jit
+def setup_dormant(foo, crop):
+    """Start of dormant season
+
+    Notes
+    -----
+    See InitializeCropCycle.setup_dormant()
+
+    """
+    wscc = crop.wscc
+    if wscc == 1:
+        foo.kc_bas = 0.1
+        foo.fc = 0.
+    elif wscc == 2:
+        foo.kc_bas = 0.1
+        foo.fc = 0.4
+    elif wscc == 3:
+        foo.kc_bas = 0.2
+        foo.fc = 0.7
+    if not np.isnan(crop.cn2_dormant):
+        foo.cn2 = crop.cn2_dormant
+
+    zr_dormant = 0.1
+    ze = 0.1
+    daw3 = foo.aw3 * (foo.zr_max - foo.zr)
+    taw_root = foo.aw * (foo.zr)
+    daw_root = _max(taw_root - foo.depl_root, 0.)
+
+    # zr_dormant is not greater than ze (both 0.1)
+    aw_root = daw_root / foo.zr
+    totwatinzr_dormant = (
+        (foo.totwatin_ze * (1 - (ze - zr_dormant) / ze)) * (1 - foo.fc) +
+        aw_root * zr_dormant * foo.fc)
+    if zr_dormant < foo.zr:
+        if daw_root > totwatinzr_dormant:
+            daw_below = (daw_root - totwatinzr_dormant)
+        else:
+            daw_below = 0.
+        foo.aw3 = (daw_below + daw3) / (foo.zr_max - zr_dormant)
+    foo.depl_root = foo.aw * zr_dormant - totwatinzr_dormant
+    foo.zr = zr_dormant
+    foo.fw_irr = foo.fw_std
+    foo.irr_auto = 0.
+    foo.irr_sim = 0.
+    foo.dormant_setup_flag = False
+    foo.cutting = 0
+
+@_jit
+def calculate_height(foo, crop):
+    """Determine height of crop based on Kc and height limits
+
+    Notes
+    -----
+    See calculate_height.calculate_height()
+
+    """
+    height_prev = foo.height
+    if foo.kc_bas > foo.kc_min and foo.kc_bas_mid > foo.kc_min:
+        foo.height = (
+            crop.height_initial + (foo.kc_bas - foo.kc_min) /
+            (foo.kc_bas_mid - foo.kc_min) *
+            (crop.height_max - crop.height_initial))
+    else:
+        foo.height = crop.height_initial
+    foo.height = _min(
+        _max(crop.height_initial, _max(height_prev, foo.height)),
+        crop.height_max)
+
+@_jit
+def _kcb_interp(kcb_curve, table_i, frac):
+    """Interpolate crop curve"""
+    return (kcb_curve[table_i] + frac *
+            (kcb_curve[table_i + 1] - kcb_curve[table_i]))
+
+@_jit
+def _season_start(foo, crop):
+    """Turn on growing season (kcb_daily cases 1 and 2)"""
+    foo.real_start = True
+    foo.in_season = True
+    foo.stress_event = False
+    foo.dormant_setup_flag = True
+    setup_crop(foo, crop)
+    foo.cycle = 1
+    if crop.date_of_pl_or_gu < 0.0:
+        foo.doy_start_cycle += crop.date_pl_or_gu_int
+        if foo.doy_start_cycle < 1:
+            foo.doy_start_cycle += 365
+
+@_jit
+def kcb_daily(foo, crop, kcb_curves, kcb_lentry, doy, month, day, sdays,
+              tmin, t30, u2, rh_min, etref, co2, owe_kc, pl_or_gu_doy):
+    """Compute basal ET
+
+    Returns
+    -------
+    error, events : int
+
+    Notes
+    -----
+    See kcb_daily.kcb_daily()
+
+    """
+    events = 0
+    if crop.gs_limit_flag:
+        gs_limit = 40
+    else:
+        gs_limit = 365
+    trigger_doy = crop.gdd_trigger_doy
+    curve_i = 0
+
+    # Flag_for_means_to_estimate_pl_or_gu Case 1
+    if crop.flag == 1:
+        if doy < (trigger_doy + 195):
+            if (foo.longterm_pl > 0 and doy > (foo.longterm_pl + 40) and
+                    not foo.real_start):
+                foo.doy_start_cycle = doy
+                foo.real_start = True
+            if (not foo.real_start and
+                    foo.cgdd > crop.t30_for_pl_or_gu_or_cgdd):
+                if foo.longterm_pl > 0 and doy < (foo.longterm_pl - 40):
+                    foo.real_start = False
+                    foo.doy_start_cycle = foo.longterm_pl - 40
+                    if foo.doy_start_cycle < 1:
+                        foo.doy_start_cycle += 365
+                else:
+                    foo.doy_start_cycle = doy
+                    foo.real_start = True
+            if doy == foo.doy_start_cycle:
+                _season_start(foo, crop)
+
+    # Flag_for_means_to_estimate_pl_or_gu Case 2
+    elif crop.flag == 2:
+        if doy < (trigger_doy + 195):
+            if (foo.longterm_pl > 0 and
+                    doy > (foo.longterm_pl + gs_limit) and
+                    not foo.real_start):
+                foo.doy_start_cycle = doy
+                foo.real_start = True
+            if not foo.real_start:
+                if t30 > crop.t30_for_pl_or_gu_or_cgdd:
+                    if (foo.longterm_pl > 0 and
+                            doy < (foo.longterm_pl - gs_limit)):
+                        foo.real_start = False
+                        if crop.gs_limit_flag:
+                            foo.doy_start_cycle = foo.longterm_pl - 40
+                        else:
+                            foo.doy_start_cycle = 1
+                        if foo.doy_start_cycle < 1:
+                            foo.doy_start_cycle += 365
+                    else:
+                        foo.doy_start_cycle = doy
+                        foo.real_start = True
+            if doy == foo.doy_start_cycle:
+                _season_start(foo, crop)
+
+    # Flag_for_means_to_estimate_pl_or_gu Case 3
+    elif crop.flag == 3:
+        if (doy == pl_or_gu_doy or
+                (sdays == 1 and pl_or_gu_doy >= trigger_doy)):
+            foo.doy_start_cycle = pl_or_gu_doy
+            foo.in_season = True
+            foo.stress_event = False
+            foo.dormant_setup_flag = True
+            setup_crop(foo, crop)
+
+    # Flag_for_means_to_estimate_pl_or_gu Case 4
+    elif crop.flag == 4:
+        foo.in_season = True
+        if doy == trigger_doy:
+            foo.stress_event = False
+        foo.dormant_setup_flag = True
+
+    else:
+        return ERROR_FLAG, events
+
+    # Set MAD to MADmid universally at start
+    foo.mad = foo.mad_mid
+    max_i = crop.max_lines - 1
+
+    if foo.in_season:
+        if crop.curve_type == 1:
+            # Normalized cumulative growing degree days
+            if foo.doy_start_cycle == doy:
+                foo.cgdd_at_planting = foo.cgdd
+            cgdd_in_season = _max(0., foo.cgdd - foo.cgdd_at_planting)
+            cgdd_efc = crop.cgdd_for_efc
+            cgdd_term = crop.cgdd_for_termination
+            foo.cutting = 0
+
+            # Special case for ALFALFA hay (typical, beef or dairy)
+            if crop.alfalfa_flag:
+                cgdd_term = crop.cgdd_for_efc
+                if foo.cycle > 1:
+                    cgdd_efc = crop.cgdd_for_termination
+                    cgdd_term = crop.cgdd_for_termination
+                    if crop.class_number == 2:
+                        cuttings = crop.dairy_cuttings
+                    else:
+                        cuttings = crop.beef_cuttings
+                    if foo.cycle < cuttings + 0.01 - 1:
+                        curve_i = 1
+                    else:
+                        curve_i = 2
+            kcb_curve = kcb_curves[curve_i]
+
+            if cgdd_in_season < cgdd_efc:
+                foo.n_cgdd = cgdd_in_season / cgdd_efc
+                int_cgdd = min(max_i, int(foo.n_cgdd * 10))
+                foo.kc_bas = _kcb_interp(
+                    kcb_curve, int_cgdd, foo.n_cgdd * 10 - int_cgdd)
+                foo.mad = foo.mad_ini
+            else:
+                if cgdd_in_season < cgdd_term:
+                    foo.n_cgdd = cgdd_in_season / cgdd_efc
+                    foo.n_cgdd = _max(foo.n_cgdd, 1.)
+                    int_cgdd = min(max_i, int(foo.n_cgdd * 10))
+                    foo.mad = foo.mad_mid
+                    lentry = kcb_lentry[curve_i]
+                    if int_cgdd < lentry:
+                        foo.kc_bas = _kcb_interp(
+                            kcb_curve, int_cgdd, foo.n_cgdd * 10 - int_cgdd)
+                    else:
+                        foo.kc_bas = kcb_curve[lentry]
+                else:
+                    # End of season by exceeding cumGDD for termination
+                    foo.in_season = False
+                    foo.stress_event = False
+                    if crop.cutting_crop:
+                        foo.cutting = 1
+                        foo.cycle += 1
+                        foo.in_season = True
+                        foo.cgdd_at_planting = foo.cgdd
+                        foo.height = foo.height_min
+                        foo.kc_bas = kcb_curve[0]
+
+                # First alfalfa crop (typical production alfalfa)
+                if crop.class_number == 1 and crop.crop_one_flag:
+                    foo.kc_bas *= crop.crop_one_reducer
+
+            # Use this here only to invoke a total length limit
+            days_into_season = doy - foo.doy_start_cycle + 1
+            if days_into_season < 1:
+                days_into_season += 365
+            if (crop.time_for_harvest > 10 and
+                    days_into_season > crop.time_for_harvest):
+                foo.in_season = False
+                foo.stress_event = False
+
+        elif crop.curve_type == 2:
+            # Percent of time from PL to EFC for all season
+            kcb_curve = kcb_curves[curve_i]
+            days_into_season = doy - foo.doy_start_cycle + 1
+            if days_into_season < 1:
+                days_into_season += 365
+            time_for_efc = _max(crop.time_for_efc, 1.)
+            foo.n_pl_ec = float(days_into_season) / time_for_efc
+            npl_ec100 = foo.n_pl_ec * 100
+            if foo.n_pl_ec < 1:
+                foo.mad = foo.mad_ini
+            else:
+                foo.mad = foo.mad_mid
+            if npl_ec100 <= abs(crop.time_for_harvest):
+                int_pl_ec = min(max_i, int(foo.n_pl_ec * 10.))
+                foo.kc_bas = _kcb_interp(
+                    kcb_curve, int_pl_ec, foo.n_pl_ec * 10. - int_pl_ec)
+            else:
+                if crop.time_for_harvest < -0.5:
+                    foo.kc_bas = foo.kc_bas_prev
+                else:
+                    foo.in_season = False
+                    foo.stress_event = False
+
+        elif crop.curve_type == 3:
+            # Percent of time from PL to EFC for before EFC and
+            #   days after EFC after EFC
+            kcb_curve = kcb_curves[curve_i]
+            days_into_season = doy - foo.doy_start_cycle + 1
+            if days_into_season < 1:
+                days_into_season += 365
+            time_for_efc = _max(crop.time_for_efc, 1.)
+            foo.n_pl_ec = float(days_into_season) / time_for_efc
+            if foo.n_pl_ec < 1:
+                int_pl_ec = min(int(foo.n_pl_ec * 10.), max_i)
+                foo.kc_bas = _kcb_interp(
+                    kcb_curve, int_pl_ec, foo.n_pl_ec * 10 - int_pl_ec)
+                foo.mad = foo.mad_ini
+            else:
+                foo.mad = foo.mad_mid
+                days_after_efc = days_into_season - time_for_efc
+                if days_after_efc <= abs(crop.time_for_harvest):
+                    # Start at array index = 11 for 0 days into full cover
+                    n_days_after_efc = float(days_after_efc) / 10 + 11
+                    int_pl_ec = min(int(n_days_after_efc), max_i)
+                    foo.kc_bas = _kcb_interp(
+                        kcb_curve, int_pl_ec, n_days_after_efc - int_pl_ec)
+                elif crop.time_for_harvest < -0.5:
+                    foo.kc_bas = foo.kc_bas_prev
+                else:
+                    foo.in_season = False
+                    foo.stress_event = False
+
+        elif crop.curve_type == 4:
+            # Percent of time from PL to end of season
+            kcb_curve = kcb_curves[curve_i]
+            if foo.doy_start_cycle < (trigger_doy + 195):
+                length_of_season = 2 * (
+                    trigger_doy + 195 - foo.doy_start_cycle)
+            else:
+                return ERROR_SEASON_LENGTH, events
+            if length_of_season > 366:
+                events |= EVENT_ADJUST_SEASON
+                length_of_season = 366
+            if crop.class_number == 47:
+                length_of_season = max(length_of_season, 60)
+                if length_of_season > 90:
+                    length_of_season = 100
+            days_into_season = doy - foo.doy_start_cycle
+            if days_into_season < 0:
+                days_into_season += 365
+            foo.n_pl_ec = float(days_into_season) / length_of_season
+            if foo.n_pl_ec < 0.5:
+                foo.mad = foo.mad_ini
+            else:
+                foo.mad = foo.mad_mid
+            if foo.n_pl_ec <= 1:
+                int_pl_ec = min(max_i, int(foo.n_pl_ec * 10))
+                foo.kc_bas = _kcb_interp(
+                    kcb_curve, int_pl_ec, foo.n_pl_ec * 10 - int_pl_ec)
+            else:
+                foo.in_season = False
+                foo.stress_event = False
+
+        # Discounting for cold shock to alfalfa gets reset on Jan 1
+        if crop.cold_shock_flag:
+            if doy > (trigger_doy + 211):
+                if tmin < -3 and foo.t2_days < 1:
+                    foo.t2_days = 1
+            else:
+                foo.t2_days = 0
+            if foo.t2_days > 0:
+                foo.kc_bas -= foo.t2_days * 0.005
+                if foo.kc_bas < 0.1:
+                    foo.kc_bas = 0.1
+                foo.t2_days += 1
+
+        # Determine if killing frost to cut short
+        if doy > (trigger_doy + 211):
+            if (tmin < crop.killing_frost_temperature and
+                    (crop.class_number < 44 or crop.class_number > 46) and
+                    foo.in_season):
+                events |= EVENT_KILLING_FROST
+                foo.in_season = False
+                foo.stress_event = False
+            elif (crop.no_frost_log_flag and foo.in_season and
+                  month == 12 and day == 31):
+                events |= EVENT_NO_KILLING_FROST
+
+    # Save kc_bas_prev prior to CO2 adjustment to avoid double correction
+    foo.kc_bas_prev = foo.kc_bas
+
+    if (crop.class_number == 44 or crop.class_number == 45 or
+            crop.class_number == 46):
+        foo.kc_bas = 0.1
+        foo.kc_bas_prev = foo.kc_bas
+    elif (crop.class_number == 55 or crop.class_number == 56 or
+          crop.class_number == 57):
+        if crop.class_number == 55:
+            if crop.refet_type == ETO:
+                foo.kc_bas = 1.05
+            elif crop.refet_type == ETR:
+                foo.kc_bas = 0.875
+        elif crop.class_number == 56:
+            foo.kc_bas = owe_kc
+        elif crop.class_number == 57:
+            if crop.refet_type == ETO:
+                foo.kc_bas = 0.85
+            elif crop.refet_type == ETR:
+                foo.kc_bas = 0.7
+
+        # Water has only 'kcb'
+        foo.kc_act = foo.kc_bas
+        foo.kc_pot = foo.kc_bas
+        foo.etc_act = foo.kc_act * etref
+        foo.etc_pot = foo.kc_pot * etref
+        foo.etc_bas = foo.kc_bas * etref
+        foo.kc_bas_prev = foo.kc_bas
+    elif crop.co2_flag:
+        foo.kc_bas_prev = foo.kc_bas
+        foo.kc_bas *= co2
+
+    # Limit crop height for numerical stability
+    foo.height = _max(foo.height, 0.05)
+    if crop.refet_type == ETO:
+        foo.kc_bas = (
+            foo.kc_bas + (0.04 * (u2 - 2) - 0.004 * (rh_min - 45)) *
+            (foo.height / 3) ** 0.3)
+    return 0, events
+
+@_jit
+def runoff(foo, crop, precip):
+    """Curve number method for computing runoff
+
+    Notes
+    -----
+    See runoff.runoff()
+
+    """
+    cn_ii = _min(_max(foo.cn2, 10.), 100.)
+    cn_i = cn_ii / (2.281 - 0.01281 * cn_ii)
+    cn_iii = cn_ii / (0.427 + 0.00573 * cn_ii)
+    awc_iii = 0.5 * foo.rew
+    awc_i = 0.7 * foo.rew + 0.3 * foo.tew
+    if awc_i <= awc_iii:
+        awc_i = awc_iii + 0.01
+    if foo.depl_surface < awc_iii:
+        cn = cn_iii
+    elif foo.depl_surface > awc_i:
+        cn = cn_i
+    else:
+        cn = (
+            ((foo.depl_surface - awc_iii) * cn_i +
+             (awc_i - foo.depl_surface) * cn_iii) / (awc_i - awc_iii))
+    foo.s = 250 * (100 / cn - 1)
+
+    if foo.irr_flag:
+        # Average of 4 previous S values for irrigated crops
+        # Exponent (2) is passed in so pow() is not replaced by x * x
+        exponent = crop.runoff_exponent
+        ppt_net4 = _max(precip - 0.2 * foo.s4, 0.)
+        ppt_net3 = _max(precip - 0.2 * foo.s3, 0.)
+        ppt_net2 = _max(precip - 0.2 * foo.s2, 0.)
+        ppt_net1 = _max(precip - 0.2 * foo.s1, 0.)
+        foo.sro = 0.25 * (
+            ppt_net4 ** exponent / (precip + 0.8 * foo.s4) +
+            ppt_net3 ** exponent / (precip + 0.8 * foo.s3) +
+            ppt_net2 ** exponent / (precip + 0.8 * foo.s2) +
+            ppt_net1 ** exponent / (precip + 0.8 * foo.s1))
+        foo.s4 = foo.s3
+        foo.s3 = foo.s2
+        foo.s2 = foo.s1
+        foo.s1 = foo.s
+    else:
+        ppt_net = _max(precip - 0.2 * foo.s, 0.)
+        foo.sro = ppt_net * ppt_net / (precip + 0.8 * foo.s)
+
+@_jit
+def grow_root(foo, crop):
+    """Determine depth of root zone
+
+    Notes
+    -----
+    See grow_root.grow_root()
+
+    """
+    fractime = 0.
+    if (crop.curve_type == 1 and
+            crop.end_of_root_growth_fraction_time != 0.0):
+        fractime = foo.n_cgdd / crop.end_of_root_growth_fraction_time
+    elif (crop.curve_type > 1 and
+          crop.end_of_root_growth_fraction_time != 0.0):
+        fractime = foo.n_pl_ec / crop.end_of_root_growth_fraction_time
+    fractime = _min(_max(fractime, 0.), 1.)
+    zr_prev = foo.zr
+    foo.zr = (
+        (0.5 + 0.5 * math.sin(3.03 * fractime - 1.47)) *
+        (foo.zr_max - foo.zr_min) + foo.zr_min)
+    delta_zr = foo.zr - zr_prev
+    if delta_zr > 0:
+        foo.depl_root += delta_zr * (foo.aw - foo.aw3)
+    foo.zr = _max(foo.zr, zr_prev)
+
+@_jit
+def compute_crop_et(foo, crop, doy, month, precip, u2, rh_min, etref,
+                    snow_depth):
+    """Crop et computations
+
+    Returns
+    -------
+    error, events : int
+
+    Notes
+    -----
+    See compute_crop_et.compute_crop_et()
+
+    """
+    if (crop.class_number == 55 or crop.class_number == 56 or
+            crop.class_number == 57):
+        return 0, 0
+    class_number = crop.class_number
+    soil_flag = class_number == 44 or class_number == 45 or class_number == 46
+
+    # Maximum Kc when soil is wet
+    foo.height = _max(0.05, foo.height)
+    if crop.refet_type == ETO:
+        kc_max = ((0.04 * (u2 - 2) - 0.004 * (rh_min - 45)) *
+                  (foo.height / 3) ** 0.3)
+        if crop.kc_max > 0.3:
+            kc_max += crop.kc_max
+        else:
+            kc_max += 1.2
+    else:
+        if crop.kc_max > 0.3:
+            kc_max = crop.kc_max
+        else:
+            kc_max = 1.0
+
+    # Bare soil, mulched soil and dormant turf/sod
+    if class_number == 44:
+        foo.fc = 0.0
+    elif class_number == 45:
+        foo.fc = 0.4
+    elif class_number == 46:
+        foo.fc = 0.7
+
+    # Kc max for winter time (Nov-Mar)
+    wscc = crop.wscc
+    if crop.latitude > 0 and (month < 4 or month > 10):
+        if not soil_flag:
+            if wscc == 1:
+                kc_max = 1.1 if crop.refet_type == ETO else 0.9
+            elif wscc == 2:
+                kc_max = 1.0 if crop.refet_type == ETO else 0.85
+            elif wscc == 3:
+                kc_max = 0.95 if crop.refet_type == ETO else 0.8
+        elif class_number == 44:
+            kc_max = 1.1 if crop.refet_type == ETO else 0.9
+            foo.fc = 0.0
+        elif class_number == 45:
+            kc_max = 1.0 if crop.refet_type == ETO else 0.85
+            foo.fc = 0.4
+        elif class_number == 46:
+            kc_max = 0.95 if crop.refet_type == ETO else 0.8
+            foo.fc = 0.7
+
+    # Kc_bas for wintertime land use
+    if not foo.in_season:
+        if class_number == 87:
+            foo.kc_bas = 0.25
+        else:
+            foo.kc_bas = crop.kc_bas_wscc
+
+    # Don't let kc_bas be greater than kc_max
+    kc_max = _max(kc_max, foo.kc_bas + 0.05)
+    foo.kc_min = 0.1
+    if not soil_flag:
+        if kc_max <= foo.kc_min:
+            kc_max = foo.kc_min + 0.001
+        if foo.in_season:
+            if foo.kc_bas > foo.kc_min:
+                foo.fc = (
+                    ((foo.kc_bas - foo.kc_min) / (kc_max - foo.kc_min)) **
+                    (1 + 0.5 * foo.height))
+                foo.fc = _min(foo.fc, 0.99)
+            else:
+                foo.fc = 0.001
+
+    # Compute effective precipitation
+    foo.ppt_inf_prev = foo.ppt_inf
+    foo.ppt_inf = 0.0
+    foo.sro = 0.0
+    if precip > 0:
+        foo.depl_surface = (
+            foo.wt_irr * foo.depl_ze + (1 - foo.wt_irr) * foo.depl_zep)
+        runoff(foo, crop, precip)
+        foo.ppt_inf = precip - foo.sro
+
+    # Only automatic irrigation is simulated
+    if foo.irr_auto > 0:
+        foo.fw_irr = foo.fw_std
+
+    # Water in evaporation layer
+    # round(x, 6) <= 0 is the same as x <= 5E-7
+    watin_ze = foo.tew - foo.depl_ze
+    if watin_ze <= 5E-7:
+        watin_ze = 0.001
+    watin_ze = _min(watin_ze, foo.tew)
+    watin_zep = foo.tew - foo.depl_zep
+    if watin_zep <= 5E-7:
+        watin_zep = 0.001
+    watin_zep = _min(watin_zep, foo.tew)
+
+    # Fraction of ground that is both exposed and wet
+    few = 1 - foo.fc
+    few = _min(_max(few, 0.001), foo.fw_irr)
+    fewp = 1 - foo.fc - few
+    fewp = _max(fewp, 0.001)
+    foo.totwatin_ze = (watin_ze * few + watin_zep * fewp) / (few + fewp)
+
+    # Deep percolation from evaporation layer
+    if foo.fw_irr > 0.0001:
+        fw_irr = foo.fw_irr
+    else:
+        fw_irr = 1.
+    dperc_ze = foo.ppt_inf + foo.irr_sim / fw_irr - foo.depl_ze
+    dperc_ze = _max(dperc_ze, 0.)
+    depl_zep_prev = foo.ppt_inf - foo.depl_zep
+    depl_zep_prev = _max(depl_zep_prev, 0.)
+    foo.depl_ze = foo.depl_ze - foo.ppt_inf - foo.irr_sim / fw_irr + dperc_ze
+    foo.depl_ze = _min(_max(foo.depl_ze, 0.), foo.tew)
+    foo.depl_zep = foo.depl_zep - foo.ppt_inf + depl_zep_prev
+    foo.depl_zep = _min(_max(foo.depl_zep, 0.), foo.tew)
+
+    # Reduce TEW and REW for low evaporative demand
+    if foo.tew3 < 0.1:
+        foo.kr2 = 0.0
+    tew2use = foo.tew2
+    tew3use = foo.tew3
+    rew2use = foo.rew
+    foo.etref_30 = _max(0.1, foo.etref_30)
+    if crop.refet_type == ETO:
+        etr_threshold = 5
+    else:
+        etr_threshold = 4
+    if foo.etref_30 < etr_threshold:
+        tew2use = foo.tew2 * math.sqrt(foo.etref_30 / etr_threshold)
+        tew3use = foo.tew3 * math.sqrt(foo.etref_30 / etr_threshold)
+        if rew2use > 0.8 * tew2use:
+            rew2use = 0.8 * tew2use
+
+    # Evaporation reduction coefficients
+    if foo.depl_ze <= rew2use:
+        kr = 1.
+    elif foo.depl_ze <= tew2use:
+        kr = (foo.kr2 + (1 - foo.kr2) * (tew2use - foo.depl_ze) /
+              (tew2use - rew2use))
+    elif tew3use > tew2use:
+        kr = foo.kr2 * (tew3use - foo.depl_ze) / (tew3use - tew2use)
+    else:
+        kr = 0.0
+    if foo.depl_zep <= rew2use:
+        krp = 1.
+    elif foo.depl_zep <= tew2use:
+        krp = (foo.kr2 + (1 - foo.kr2) * (tew2use - foo.depl_zep) /
+               (tew2use - rew2use))
+    elif tew3use > tew2use:
+        krp = foo.kr2 * (tew3use - foo.depl_zep) / (tew3use - tew2use)
+    else:
+        krp = 0.0
+
+    # Proportion of wetted surface from irrigation
+    if (few * watin_ze + fewp * watin_zep) > 0.0001:
+        foo.wt_irr = few * watin_ze / (few * watin_ze + fewp * watin_zep)
+    else:
+        foo.wt_irr = few * watin_ze
+    foo.wt_irr = _min(_max(foo.wt_irr, 0.), 1.)
+
+    # Evaporation coefficients
+    ke_irr = kr * (kc_max - foo.kc_bas) * foo.wt_irr
+    ke_ppt = krp * (kc_max - foo.kc_bas) * (1 - foo.wt_irr)
+    ke_irr = _min(_max(ke_irr, 0.), few * kc_max)
+    ke_ppt = _min(_max(ke_ppt, 0.), fewp * kc_max)
+    ke = ke_irr + ke_ppt
+
+    # Transpiration coefficient for moisture stress
+    taw = foo.aw * foo.zr
+    taw = _max(taw, 0.001)
+    raw = foo.mad * taw / 100
+    if foo.depl_root > raw:
+        ks = _max((taw - foo.depl_root) / (taw - raw), 0.)
+    else:
+        ks = 1.
+    if crop.invoke_stress < 1:
+        ks = 1.
+    elif crop.invoke_stress == 1:
+        if ks < 0.05 and foo.in_season and foo.kc_bas > 0.3:
+            foo.stress_event = True
+        if foo.stress_event:
+            ks = 0.0
+
+    # Snow adjustment
+    kc_mult = 1.
+    if snow_depth > 0.01:
+        k_rad = (
+            0.000000022 * doy ** 3 - 0.0000242 * doy ** 2 +
+            0.006 * doy + 0.011)
+        albedo_snow = 0.8
+        albedo_soil = 0.25
+        kc_mult = 1 - k_rad + (1 - albedo_snow) / (1 - albedo_soil) * k_rad
+        kc_mult = kc_mult * 0.7
+    ke *= kc_mult
+    ke_irr *= kc_mult
+    ke_ppt *= kc_mult
+
+    # Daily coefficients and ET
+    foo.kc_act = kc_mult * ks * foo.kc_bas + ke
+    foo.kc_pot = foo.kc_bas + ke
+    foo.etc_act = foo.kc_act * etref
+    foo.etc_pot = foo.kc_pot * etref
+    foo.etc_bas = foo.kc_bas * etref
+    e = ke * etref
+    e_irr = ke_irr * etref
+    e_ppt = ke_ppt * etref
+
+    # Transpiration from evaporation layer
+    ze = 0.0001
+    if foo.zr < 0.0001:
+        foo.zr = 0.01
+    kt_prop = (ze / foo.zr) ** 0.6
+    kt_prop = _min(kt_prop, 1.)
+    kt_reducer_denom = _max(1 - foo.depl_root / taw, 0.001)
+    kt_reducer = few * (1 - foo.depl_ze / tew2use) / kt_reducer_denom
+    kt_prop = kt_prop * kt_reducer
+    kt_prop = _min(kt_prop, 1.)
+    te_irr = kc_mult * ks * foo.kc_bas * etref * kt_prop
+    kt_reducer = fewp * (1 - foo.depl_zep / tew2use) / kt_reducer_denom
+    kt_prop = kt_prop * kt_reducer
+    kt_prop = _min(kt_prop, 1.)
+    te_ppt = kc_mult * ks * foo.kc_bas * etref * kt_prop
+
+    # Update depletions of evaporation layer
+    depl_ze_prev = foo.depl_ze
+    depl_zep_prev = foo.depl_zep
+    foo.depl_ze = depl_ze_prev + e_irr / few + te_irr
+    if foo.depl_ze < 0:
+        foo.depl_ze = 0.0
+    if foo.depl_ze > foo.tew:
+        potential_e = foo.depl_ze - depl_ze_prev
+        if potential_e < 0.0001:
+            potential_e = 0.0001
+        e_factor = 1 - (foo.depl_ze - foo.tew) / potential_e
+        e_factor = _min(_max(e_factor, 0.), 1.)
+        e_irr *= e_factor
+        te_irr *= e_factor
+        foo.depl_ze = depl_ze_prev + e_irr / few + te_irr
+        if foo.depl_ze > foo.tew + 0.2:
+            return ERROR_DEPL_ZE, 0
+    foo.depl_zep = depl_zep_prev + e_ppt / fewp + te_ppt
+    foo.depl_zep = _max(foo.depl_zep, 0.)
+    if foo.depl_zep > foo.tew:
+        potential_e = foo.depl_zep - depl_zep_prev
+        if potential_e < 0.0001:
+            potential_e = 0.0001
+        e_factor = 1 - (foo.depl_zep - foo.tew) / potential_e
+        e_factor = _min(_max(e_factor, 0.), 1.)
+        e_ppt *= e_factor
+        te_ppt *= e_factor
+        foo.depl_zep = depl_zep_prev + e_ppt / fewp + te_ppt
+        if foo.depl_zep > foo.tew + 0.2:
+            return ERROR_DEPL_ZEP, 0
+
+    # Recompute evaporation coefficients from adjusted evaporation
+    etref_divisor = etref
+    if etref_divisor < 0.01:
+        etref_divisor = 0.01
+    ke_irr = e_irr / etref_divisor
+    ke_ppt = e_ppt / etref_divisor
+    ke_irr = _min(_max(ke_irr, 0.), 1.5)
+    ke_ppt = _min(_max(ke_ppt, 0.), 1.5)
+    ke = ke_irr + ke_ppt
+    e = ke * etref
+    if kc_mult > 1:
+        return 0, EVENT_KC_MULT
+    if ks > 1:
+        return 0, EVENT_KS
+    foo.kc_act = kc_mult * ks * foo.kc_bas + ke
+    foo.kc_pot = foo.kc_bas + ke
+    foo.etc_act = foo.kc_act * etref
+    foo.etc_pot = foo.kc_pot * etref
+    foo.etc_bas = foo.kc_bas * etref
+    foo.cum_evap_prev = (
+        foo.cum_evap_prev + e_irr - (foo.ppt_inf - depl_zep_prev))
+    foo.cum_evap_prev = _max(foo.cum_evap_prev, 0.)
+
+    # Root zone depletion
+    foo.depl_root += foo.etc_act - foo.ppt_inf
+
+    # Irrigation
+    irr_sim_prev = foo.irr_sim
+    foo.irr_sim = 0.0
+    if foo.irr_flag:
+        doy_to_start_irr = (
+            foo.doy_start_cycle + crop.days_after_planting_irrigation)
+        if doy_to_start_irr > 365:
+            doy_to_start_irr -= 365
+        crop_doy = doy - foo.doy_start_cycle + 1
+        if crop_doy < 1:
+            crop_doy += 365
+        if (crop_doy >= crop.days_after_planting_irrigation and
+                doy >= doy_to_start_irr and foo.in_season and
+                foo.depl_root > raw and foo.kc_bas > 0.22):
+            foo.irr_sim = foo.depl_root
+            foo.irr_sim = _max(foo.irr_sim, foo.irr_min)
+    foo.depl_root -= foo.irr_sim
+    foo.irr_auto = foo.irr_sim
+    if foo.irr_sim > 0:
+        foo.cum_evap = foo.cum_evap_prev
+        foo.cum_evap_prev = 0.0
+
+    # Deep percolation from root zone
+    if ((foo.irr_sim + irr_sim_prev + foo.ppt_inf +
+         foo.ppt_inf_prev) <= 0.0001 or foo.zr < 0.2):
+        if foo.depl_root < 0.0:
+            foo.dperc = -foo.depl_root
+        else:
+            foo.dperc = 0.0
+    else:
+        if foo.depl_root < -20:
+            foo.dperc = -20.0 - foo.depl_root
+        else:
+            foo.dperc = 0.0
+    foo.depl_root += foo.dperc
+
+    # Limit depletion to total available water
+    if crop.invoke_stress > 0.5 and foo.depl_root > taw:
+        foo.etc_act -= (foo.depl_root - taw)
+        foo.etc_act = _max(foo.etc_act, 0.)
+        if etref > 0.1:
+            foo.kc_act = foo.etc_act / etref
+        foo.depl_root = taw
+
+    # Layer 3 below current root zone
+    gross_dperc = foo.dperc + 0.1 * foo.irr_sim
+    daw3 = foo.aw3 * (foo.zr_max - foo.zr)
+    taw3 = foo.aw * (foo.zr_max - foo.zr)
+    daw3 = _max(daw3, 0.)
+    taw3 = _max(taw3, 0.)
+    daw3 += gross_dperc
+    if daw3 > taw3:
+        foo.dperc = daw3 - taw3
+        daw3 = taw3
+    else:
+        foo.dperc = 0.
+    daw3 = _max(daw3, 0.)
+    if foo.zr_max > foo.zr:
+        foo.aw3 = daw3 / (foo.zr_max - foo.zr)
+    else:
+        foo.aw3 = 0.
+
+    # Net irrigation water requirement and effective precipitation
+    if foo.irr_sim > 0:
+        foo.niwr = foo.etc_act - (precip - foo.sro)
+        foo.p_rz = precip - foo.sro
+        foo.p_eft = precip - foo.sro - e
+    else:
+        foo.niwr = foo.etc_act - (precip - foo.sro - foo.dperc)
+        foo.p_rz = precip - foo.sro - foo.dperc
+        foo.p_eft = precip - foo.sro - foo.dperc - e
+    if foo.p_rz <= 0:
+        foo.p_rz = 0.
+    if foo.p_eft <= 0:
+        foo.p_eft = 0.
+
+    if foo.in_season:
+        grow_root(foo, crop)
+    return 0, 0
+
+@_jit
+def crop_kernel(state, crop_rec, kcb_curves, kcb_lentry, etref_array,
+                day_state, start_i, end_i, doy, year, month, day, tmean, tmin,
+                tmax, t30, etref, precip, u2, rh_min, snow_depth, co2, owe_kc,
+                pl_or_gu_doy, out, out_int, events):
+    """Run crop day loop for days start_i to end_i
+
+    Parameters
+    ---------
+    state : ndarray
+        state_dtype record array (length 1), updated in place
+    crop_rec : ndarray
+        crop_dtype record array (length 1)
+    kcb_curves : ndarray
+        crop curve (3 x 35) for base curve and alfalfa cycle curves
+    kcb_lentry : ndarray
+        last non-zero entry of each crop curve
+    etref_array : ndarray
+        ETref of last 30 days, updated in place
+    day_state : ndarray
+        days simulated and day of year of previous day, updated in place
+    start_i, end_i : int
+        first and last (exclusive) day index to simulate
+    doy, year, month, day : ndarray
+        daily dates of all days
+    tmean, tmin, tmax, t30, etref, precip, u2, rh_min, snow_depth, co2 :
+        daily climate inputs
+    owe_kc : ndarray
+        daily open water kc_bas (crop 56 only)
+    pl_or_gu_doy : ndarray
+        planting or green-up day of year by year (case 3 only)
+    out : ndarray
+        daily float outputs (n_days x 11), see output_fields
+    out_int : ndarray
+        daily season and cutting flags (n_days x 2)
+    events : ndarray
+        daily events to log
+
+    Returns
+    -------
+    error, step_i : int
+        non-zero error code and day index of the error
+
+    Notes
+    -----
+    Same state machine as crop_cycle.crop_day_loop()
+    Kernel can be run in segments (i.e. to save state at checkpoints)
+
+    """
+    foo = state[0]
+    crop = crop_rec[0]
+    sdays = day_state[0]
+    doy_prev = day_state[1]
+    year_start = year[0]
+    for step_i in range(start_i, end_i):
+        # End of season for each crop, set up for non-growing and dormant season
+        if not foo.in_season and foo.dormant_setup_flag:
+            setup_dormant(foo, crop)
+        sdays += 1
+        step_doy = doy[step_i]
+
+        # Compute crop growing degree days (see compute_crop_gdd.py)
+        # ETref ring buffer (see compute_crop_gdd.etref_index())
+        etref_i = (sdays - 1) % 30
+        if sdays > 30:
+            etref_lost = etref_array[etref_i]
+            etref_array[etref_i] = etref[step_i]
+            foo.etref_30 = foo.etref_30 + (etref[step_i] - etref_lost) / 30.
+        else:
+            etref_array[etref_i] = etref[step_i]
+            foo.etref_30 = (
+                (foo.etref_30 * (sdays - 1) + etref[step_i]) / sdays)
+        trigger_doy = crop.gdd_trigger_doy
+        if ((crop.winter_crop and
+             (doy_prev < trigger_doy and step_doy >= trigger_doy)) or
+            (not crop.winter_crop and
+             (doy_prev > (trigger_doy + 199) and
+              step_doy < (trigger_doy + 199)))):
+            foo.cgdd = 0.0
+            foo.doy_start_cycle = 0
+            foo.real_start = False
+            foo.in_season = False
+        doy_prev = step_doy
+        if crop.curve_number > 0:
+            if crop.winter_crop:
+                if tmin[step_i] < -4.0:
+                    foo.gdd = 0.0
+                elif tmean[step_i] > crop.tbase:
+                    foo.gdd = tmean[step_i] - crop.tbase
+                else:
+                    foo.gdd = 0.0
+                foo.gdd -= foo.gdd_penalty
+                foo.gdd = _max(foo.gdd, 0.0)
+                foo.cgdd += foo.gdd - foo.cgdd_penalty
+                foo.cgdd = _max(0.0, foo.cgdd)
+                if tmin[step_i] < -10:
+                    foo.gdd_penalty = 5.0
+                else:
+                    foo.gdd_penalty = 0.0
+                if tmin[step_i] < -25 and snow_depth[step_i] <= 0:
+                    foo.cgdd_penalty = foo.cgdd * 0.1
+                else:
+                    foo.cgdd_penalty = 0.0
+            elif crop.tbase < 0:
+                # Corn
+                tmax_prev = tmax[step_i]
+                tmin_prev = tmin[step_i]
+                if tmax[step_i] > 30:
+                    tmax_prev = 30.
+                if tmin[step_i] > 30:
+                    tmin_prev = 30.
+                if tmax[step_i] < -crop.tbase:
+                    tmax_prev = -crop.tbase
+                if tmin[step_i] < -crop.tbase:
+                    tmin_prev = -crop.tbase
+                tmean_prev = 0.5 * (tmax_prev + tmin_prev)
+                foo.cgdd += tmean_prev + crop.tbase
+            elif tmean[step_i] > crop.tbase:
+                foo.gdd = tmean[step_i] - crop.tbase
+                foo.cgdd += foo.gdd
+
+        calculate_height(foo, crop)
+
+        if crop.flag == 3:
+            step_pl_or_gu_doy = pl_or_gu_doy[year[step_i] - year_start]
+        else:
+            step_pl_or_gu_doy = 0
+        error, step_events = kcb_daily(
+            foo, crop, kcb_curves, kcb_lentry, step_doy, month[step_i],
+            day[step_i], sdays, tmin[step_i], t30[step_i], u2[step_i],
+            rh_min[step_i], etref[step_i], co2[step_i], owe_kc[step_i],
+            step_pl_or_gu_doy)
+        if error:
+            return error, step_i
+        events[step_i] = step_events
+        error, step_events = compute_crop_et(
+            foo, crop, step_doy, month[step_i], precip[step_i], u2[step_i],
+            rh_min[step_i], etref[step_i], snow_depth[step_i])
+        if error:
+            return error, step_i
+        events[step_i] |= step_events
+
+        out[step_i, 0] = foo.etc_act
+        out[step_i, 1] = foo.etc_pot
+        out[step_i, 2] = foo.etc_bas
+        out[step_i, 3] = foo.kc_act
+        out[step_i, 4] = foo.kc_bas
+        out[step_i, 5] = foo.irr_sim
+        out[step_i, 6] = foo.sro
+        out[step_i, 7] = foo.dperc
+        out[step_i, 8] = foo.p_rz
+        out[step_i, 9] = foo.p_eft
+        out[step_i, 10] = foo.niwr + 0
+        out_int[step_i, 0] = 1 if foo.in_season else 0
+        out_int[step_i, 1] = foo.cutting
+    day_state[0] = sdays
+    day_state[1] = doy_prev
+    return 0, -1
+
+
+def crop_records(data, et_cell, crop, foo):
+    """Build crop parameter and crop state records for crop_kernel()
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    et_cell : dict
+        ETCell instance
+    crop : dict
+        CropParameters instance
+    foo : InitializeCropCycle
+        crop state after crop_load()
+
+    Returns
+    -------
+    state, crop_rec, kcb_curves, kcb_lentry : ndarray
+
+    """
+    alfalfa_1st = crop.curve_name.upper() == 'ALFALFA 1ST CYCLE'
+    crop_rec = np.zeros(1, dtype=crop_dtype)
+    rec = crop_rec[0]
+    rec['class_number'] = crop.class_number
+    rec['curve_type'] = crop.curve_type
+    rec['curve_number'] = crop.curve_number
+    rec['flag'] = crop.flag_for_means_to_estimate_pl_or_gu
+    rec['winter_crop'] = crop.winter_crop
+    rec['gdd_trigger_doy'] = crop.gdd_trigger_doy
+    rec['cutting_crop'] = crop.cutting_crop
+    rec['alfalfa_flag'] = (
+        (crop.class_number == 1 and data.crop_one_flag) or
+        crop.class_number == 2 or crop.class_number == 3 or
+        (crop.class_number >= 4 and alfalfa_1st))
+    rec['cold_shock_flag'] = (
+        crop.class_number < 4 or (crop.class_number > 3 and alfalfa_1st))
+    rec['no_frost_log_flag'] = (
+        crop.class_number == 2 or crop.class_number == 3 or
+        (crop.class_number > 3 and alfalfa_1st))
+    for field in ['height_initial', 'height_max', 'rooting_depth_initial',
+                  'rooting_depth_max', 't30_for_pl_or_gu_or_cgdd',
+                  'date_of_pl_or_gu', 'tbase', 'cgdd_for_efc',
+                  'cgdd_for_termination', 'time_for_efc', 'time_for_harvest',
+                  'killing_frost_temperature', 'invoke_stress', 'kc_max',
+                  'end_of_root_growth_fraction_time',
+                  'days_after_planting_irrigation']:
+        rec[field] = getattr(crop, field)
+    rec['date_pl_or_gu_int'] = int(crop.date_of_pl_or_gu)
+    rec['wscc'] = crop.winter_surface_cover_class
+    rec['latitude'] = et_cell.latitude
+    rec['dairy_cuttings'] = et_cell.dairy_cuttings
+    rec['beef_cuttings'] = et_cell.beef_cuttings
+    rec['cn2_dormant'] = np.nan
+    try:
+        dormant_crop = et_cell.crop_params[
+            crop.winter_surface_cover_class + 43]
+        if et_cell.stn_hydrogroup == 1:
+            rec['cn2_dormant'] = dormant_crop.cn_coarse_soil
+        elif et_cell.stn_hydrogroup == 2:
+            rec['cn2_dormant'] = dormant_crop.cn_medium_soil
+        elif et_cell.stn_hydrogroup == 3:
+            rec['cn2_dormant'] = dormant_crop.cn_fine_soil
+    except KeyError:
+        pass
+    rec['kc_bas_wscc'] = foo.kc_bas_wscc.get(
+        crop.winter_surface_cover_class, np.nan)
+    rec['max_lines'] = foo.max_lines_in_crop_curve_table
+    rec['gs_limit_flag'] = data.gs_limit_flag
+    rec['crop_one_flag'] = data.crop_one_flag
+    rec['crop_one_reducer'] = data.crop_one_reducer
+    rec['co2_flag'] = data.co2_flag
+    if data.refet['type'] == 'eto':
+        rec['refet_type'] = ETO
+    elif data.refet['type'] == 'etr':
+        rec['refet_type'] = ETR
+    else:
+        logging.error('\nERROR: Unsupported refet type {}'.format(
+            data.refet['type']))
+        sys.exit()
+    rec['runoff_exponent'] = 2.0
+
+    # Crop curves (base curve and two alfalfa cycle curves)
+    kcb_curves = np.zeros((3, foo.max_lines_in_crop_curve_table + 1))
+    kcb_lentry = np.zeros(3, dtype=np.int64)
+    for curve_i in range(3):
+        curve_num = crop.curve_number + curve_i
+        if crop.curve_number > 0 and curve_num in et_cell.crop_coeffs:
+            kcb_curves[curve_i, :] = et_cell.crop_coeffs[curve_num].data
+            kcb_lentry[curve_i] = et_cell.crop_coeffs[curve_num].lentry
+
+    state = np.zeros(1, dtype=state_dtype)
+    for field in crop_cycle_vector.float_fields:
+        state[0][field] = getattr(foo, field)
+    for field in crop_cycle_vector.int_fields:
+        state[0][field] = getattr(foo, field)
+    for field in crop_cycle_vector.bool_fields:
+        state[0][field] = getattr(foo, field)
+    return state, crop_rec, kcb_curves, kcb_lentry
+
+def crop_day_loop_jit(crop_count, data, et_cell, crop, debug_flag=False,
+                      mp_procs=1):
+    """Compute crop et for each daily timestep with compiled kernel
+
+    Parameters
+    ---------
+    crop_count : int
+        count of crop being computed
+    data : dict
+        configuration data from INI file
+    et_cell : dict
+        ETCell instance
+    crop : dict
+        CropParameters instance
+    debug_flag : boolean
+        True : write debug level comments to debug.txt
+        False
+    mp_procs : int
+        number of cores to use for multiprocessing
+
+    Returns
+    -------
+    : boolean
+        True
+
+    Notes
+    -----
+    Falls back to crop_cycle.crop_day_loop() if numba is not installed,
+        in debug mode or if crop is traced (kernel can't write debug
+        comments or trace crop state)
+
+    """
+    if (numba is None or debug_flag or
+            crop_trace.trace_flag(data, et_cell, crop)):
+        return crop_cycle.crop_day_loop(
+            crop_count, data, et_cell, crop, debug_flag, mp_procs)
+
+    # Open water has no soil water balance, all days are computed at once
+    if open_water.crop_day_loop_open_water(
+            crop_count, data, et_cell, crop, debug_flag, mp_procs):
+        return True
+    if mp_procs == 1:
+        logging.warning('Crop {} - {}'.format(crop.class_number, crop.name))
+
+    foo = InitializeCropCycle()
+    foo.crop_load(data, et_cell, crop)
+    if data.co2_flag:
+        foo.setup_co2(et_cell, crop)
+    foo.setup_dataframe(et_cell)
+    if not foo.in_season and foo.crop_setup_flag:
+        foo.setup_crop(crop)
+    state, crop_rec, kcb_curves, kcb_lentry = crop_records(
+        data, et_cell, crop, foo)
+
+    # Daily inputs
+    clim = crop_cycle.crop_climate_arrays(data, et_cell, crop, foo)
+    step_dates = foo.crop_df.index
+    n_days = len(step_dates)
+    doy_array = foo.crop_df['doy'].values.astype(np.int64)
+    year_array = step_dates.year.values.astype(np.int64)
+    month_array = step_dates.month.values.astype(np.int64)
+    day_array = step_dates.day.values.astype(np.int64)
+    if 'co2' in clim.keys():
+        co2_array = clim['co2']
+    else:
+        co2_array = np.ones(n_days)
+
+    # Open water evaporation doesn't depend on crop state
+    owe_kc = np.zeros(n_days)
+    if crop.class_number == 56:
+        calendar = cell_calendar.cell_calendar(data, et_cell, step_dates)
+        foo_day = crop_cycle.DayData()
+        for step_i in range(n_days):
+            foo_day.sdays = step_i + 1
+            foo_day.doy = int(doy_array[step_i])
+            foo_day.year = int(year_array[step_i])
+            foo_day.month = int(month_array[step_i])
+            foo_day.day = int(day_array[step_i])
+            for field in crop_cycle_vector.climate_fields:
+                setattr(foo_day, field, float(clim[field][step_i]))
+            foo_day.ts_ta = float(calendar.ts_ta[step_i])
+            owe_kc[step_i] = open_water_evap.open_water_evap(
+                et_cell, foo_day)
+
+    # Planting or green-up day of year for each year
+    pl_or_gu_doy = np.zeros(
+        year_array[-1] - year_array[0] + 1, dtype=np.int64)
+    if crop.flag_for_means_to_estimate_pl_or_gu == 3:
+        for year_i in range(pl_or_gu_doy.size):
+            pl_or_gu_doy[year_i] = crop_cycle_vector.pl_or_gu_doy(
+                int(year_array[0]) + year_i, crop.date_of_pl_or_gu)
+
+    out = np.full((n_days, len(crop_cycle_vector.output_fields)), np.nan)
+    out_int = np.zeros((n_days, 2), dtype=np.int64)
+    events = np.zeros(n_days, dtype=np.int64)
+    etref_array = np.zeros(30)
+    day_state = np.zeros(2, dtype=np.int64)
+
+    # Resume from saved crop state and outputs of earlier run
+    start_i = 0
+    checkpoint_i = -1
+    if data.checkpoint_ws is not None:
+        records = (state.copy(), crop_rec, kcb_curves, kcb_lentry)
+        checkpoint = crop_checkpoint.read_checkpoint(
+            data, et_cell, crop, step_dates, clim, records)
+        if checkpoint is not None:
+            start_i = checkpoint['n_days']
+            state[:] = checkpoint['state']
+            day_state[:] = checkpoint['day_state']
+            etref_array[:] = compute_crop_gdd.etref_ring(
+                checkpoint['etref_array'], day_state[0])
+            out[:start_i] = checkpoint['out']
+            out_int[:start_i] = checkpoint['out_int']
+        checkpoint_i = crop_checkpoint.last_boundary(data, step_dates)
+        if checkpoint_i < start_i:
+            checkpoint_i = -1
+    if checkpoint_i >= 0:
+        segments = [(start_i, checkpoint_i + 1), (checkpoint_i + 1, n_days)]
+    else:
+        segments = [(start_i, n_days)]
+    for seg_start, seg_end in segments:
+        error, error_i = crop_kernel(
+            state, crop_rec, kcb_curves, kcb_lentry, etref_array, day_state,
+            seg_start, seg_end, doy_array, year_array, month_array,
+            day_array, clim['tmean'], clim['tmin'], clim['tmax'],
+            clim['t30'], clim['etref'], clim['precip'], clim['u2'],
+            clim['rh_min'], clim['snow_depth'], co2_array, owe_kc,
+            pl_or_gu_doy, out, out_int, events)
+        if error:
+            break
+        if seg_end == checkpoint_i + 1:
+            checkpoint = {
+                'n_days': seg_end, 'state': state.copy(),
+                'etref_array': compute_crop_gdd.etref_buffer(
+                    etref_array, day_state[0]),
+                'day_state': day_state.copy(),
+                'out': out[:seg_end].copy(),
+                'out_int': out_int[:seg_end].copy()}
+
+    # Log daily events in the order the python engine would
+    last_i = n_days if not error else error_i + 1
+    log_i = start_i + np.nonzero(
+        (events[start_i:last_i] != 0) |
+        ((month_array[start_i:last_i] == 12) &
+         (day_array[start_i:last_i] == 31)))[0]
+    for step_i in log_i:
+        step_year = int(year_array[step_i])
+        if events[step_i] & EVENT_ADJUST_SEASON:
+            logging.info('ADJUSTING GROWING SEASON (NOT CENTERING ON JULY 15)')
+        if events[step_i] & EVENT_KILLING_FROST:
+            logging.info(
+                "Killing frost for crop %d of %.1f was found on DOY %d of %d" %
+                (crop.class_number, crop.killing_frost_temperature,
+                 doy_array[step_i], step_year))
+        if events[step_i] & EVENT_NO_KILLING_FROST:
+            logging.info("No killing frost in year %d" % (step_year))
+        if events[step_i] & EVENT_KC_MULT:
+            logging.warning("kcmult > 1.")
+        if events[step_i] & EVENT_KS:
+            logging.warning("ks > 1.")
+        if step_i == error_i:
+            break
+        if month_array[step_i] == 12 and day_array[step_i] == 31:
+            season_count = out_int[
+                max(step_i - doy_array[step_i] + 1, 0):step_i + 1, 0].sum()
+            if season_count == 0:
+                logging.warning(
+                    '  Crop {} - {} growing season never started'.format(
+                        crop.class_number, step_year))
+            elif season_count == 1:
+                logging.warning(
+                    '  Crop {} - {} growing season active for 1 day'.format(
+                        crop.class_number, step_year))
+
+    if error == ERROR_FLAG:
+        logging.error(
+            '\nERROR: kcb_daily() Unrecognized ' +
+            'flag_for_means_to_estimate_pl_or_gu value')
+        sys.exit()
+    elif error == ERROR_SEASON_LENGTH:
+        logging.error(
+            ('kc_daily.kcb_daily(): Problem with estimated season ' +
+             'length, crop_curve_type_4, crop {}.' +
+             ' Check T30 (too low) or PL_GU_Date Negative Offset.').format(
+                crop.class_number))
+        sys.exit()
+    elif error == ERROR_DEPL_ZE:
+        logging.error('Problem in keeping depl_ze water balance within TEW')
+        sys.exit()
+    elif error == ERROR_DEPL_ZEP:
+        logging.error('Problem in keeping De water balance within TEW')
+        sys.exit()
+    if checkpoint_i >= 0:
+        crop_output.submit(
+            crop_checkpoint.write_checkpoint, data, et_cell, crop,
+            step_dates, clim, records, checkpoint)
+
+    # Copy output arrays to crop data frame and write output files
+    for field_i, field in enumerate(crop_cycle_vector.output_fields):
+        foo.crop_df[field] = out[:, field_i]
+    foo.crop_df['season'] = out_int[:, 0]
+    foo.crop_df['cutting'] = out_int[:, 1]
+    if (data.cet_out['daily_output_flag'] or
+            data.cet_out['monthly_output_flag'] or
+            data.cet_out['annual_output_flag'] or
+            data.gs_output_flag):
+        crop_cycle.write_crop_output(crop_count, data, et_cell, crop, foo)
+    run_manifest.record_crop(data, et_cell, crop)
+    return True
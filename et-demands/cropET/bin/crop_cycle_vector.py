@@ -0,0 +1,1599 @@
+"""crop_cycle_vector.py
+Defines VectorCropCycle class
+Defines crop_cycle_vector, crop_day_loop_vector, simulate_lanes
+Lockstep (vectorized) version of the crop day loop that advances many
+    et cells running the same crop one day at a time
+Called by mod_crop_et.py
+
+"""
+
+import datetime
+import logging
+import math
+import sys
+import numpy as np
+
+import cell_calendar
+import compute_crop_gdd
+import crop_cycle
+import crop_trace
+from initialize_crop_cycle import (
+    InitializeCropCycle, bool_fields, float_fields, int_fields)
+import open_water
+import open_water_evap
+import run_manifest
+
+# Daily climate inputs (see crop_cycle.crop_climate_arrays())
+climate_fields = ['tdew', 'u2', 'precip', 'rh_min', 'etref', 'snow_depth',
+                  'tmean', 'tmin', 'tmax', 't30']
+
+output_fields = ['et_act', 'et_pot', 'et_bas', 'kc_act', 'kc_bas',
+                 'irrigation', 'runoff', 'dperc', 'p_rz', 'p_eft', 'niwr']
+
+
+def _pymax(a, b):
+    """Element-wise equivalent of Python max(a, b)
+
+    Returns a unless b is greater (keeps the sign of zero of the builtin)
+
+    """
+    return np.where(b > a, b, a)
+
+def _pymin(a, b):
+    """Element-wise equivalent of Python min(a, b)"""
+    return np.where(b < a, b, a)
+
+def _pypow(base, exp):
+    """Element-wise float power computed with Python's ** operator
+
+    Notes
+    -----
+    SIMD builds of np.power can differ from libm pow() in the last bit,
+    use the scalar operator so results match the crop_cycle engine exactly
+
+    """
+    base = np.asarray(base, dtype=np.float64)
+    if np.isscalar(exp):
+        exp = float(exp)
+        return np.array([b ** exp for b in base.tolist()], dtype=np.float64)
+    return np.array(
+        [b ** e for b, e in zip(base.tolist(), np.asarray(exp).tolist())],
+        dtype=np.float64)
+
+def _pysin(x):
+    """Element-wise math.sin()"""
+    x = np.asarray(x, dtype=np.float64)
+    return np.array([math.sin(v) for v in x.ravel().tolist()],
+                    dtype=np.float64).reshape(x.shape)
+
+def _round6_le0(x):
+    """Element-wise round(x, 6) <= 0 using Python's round()"""
+    le0 = x <= 0
+    near = np.abs(x) < 1E-6
+    le0[near] = [round(v, 6) <= 0. for v in x[near].tolist()]
+    return le0
+
+def lane_key(crop):
+    """Structural crop parameters that must be shared by lockstep lanes
+
+    Parameters
+    ---------
+    crop : CropParameters
+
+    Returns
+    -------
+    : tuple
+
+    Notes
+    -----
+    Branches on these values are taken once for all lanes
+    All other crop parameters can vary by lane (i.e. spatial calibration)
+
+    """
+    return (crop.class_number, crop.curve_type,
+            crop.flag_for_means_to_estimate_pl_or_gu, crop.winter_crop,
+            crop.gdd_trigger_doy, crop.cutting_crop,
+            crop.curve_name.upper() == 'ALFALFA 1ST CYCLE')
+
+
+class LaneOutput:
+    """Crop output container for write_crop_output()
+
+    Attributes
+    ----------
+    crop_df : pandas.DataFrame
+        daily crop data
+
+    """
+
+    def __init__(self, crop_df):
+        self.crop_df = crop_df
+
+
+class VectorDayData:
+    """Daily data container for all lanes
+
+    Attributes
+    ----------
+    sdays, doy, doy_prev, year, month, day : int
+        shared by all lanes
+    tdew, u2, precip, rh_min, etref, snow_depth, tmean, tmin, tmax, t30,
+    co2 : ndarray
+        lane values for the current day
+    ts_ta : float
+        open water Ts-Ta shared by all lanes
+    winter, gs_early, gs_late : ndarray
+        lane calendar values for the current day
+        (see cell_calendar.CellCalendar)
+
+    Notes
+    -----
+    Lockstep version of crop_cycle.DayData
+
+    """
+
+    def __init__(self, n_lanes):
+        self.etref_array = np.zeros((30, n_lanes))
+        self.sdays = 0
+        self.doy_prev = 0
+
+    def lane(self, lane_i):
+        """Scalar DayData view of one lane (for scalar functions)"""
+        foo_day = crop_cycle.DayData()
+        for field in ['sdays', 'doy', 'year', 'month', 'day', 'ts_ta']:
+            setattr(foo_day, field, getattr(self, field))
+        for field in climate_fields:
+            setattr(foo_day, field, float(getattr(self, field)[lane_i]))
+        return foo_day
+
+
+class VectorCropCycle:
+    """Structure-of-arrays crop state for lanes running the same crop
+
+    Attributes
+    ----------
+    n : int
+        number of lanes
+    foo_list : list
+        InitializeCropCycle instance for each lane (used for crop_df)
+
+    Notes
+    -----
+    Each lane is one (et_cell, crop) pair and all lanes share the same dates
+    and structural crop parameters (see lane_key())
+    State fields and methods mirror InitializeCropCycle, compute_crop_gdd,
+        calculate_height, kcb_daily, compute_crop_et, runoff and grow_root
+    Per-lane branches are evaluated with boolean masks
+
+    """
+
+    def __init__(self, data, lanes):
+        """Initialize lane state
+
+        Parameters
+        ---------
+        data : dict
+            configuration data from INI file
+        lanes : list
+            (et_cell, crop) tuples
+
+        """
+        self.n = len(lanes)
+        self.lanes = lanes
+        crop = lanes[0][1]
+
+        # Structural crop parameters (shared by all lanes)
+        self.class_number = crop.class_number
+        self.curve_type = crop.curve_type
+        self.flag_for_means_to_estimate_pl_or_gu = \
+            crop.flag_for_means_to_estimate_pl_or_gu
+        self.winter_crop = crop.winter_crop
+        self.gdd_trigger_doy = crop.gdd_trigger_doy
+        self.cutting_crop = crop.cutting_crop
+        alfalfa_1st = crop.curve_name.upper() == 'ALFALFA 1ST CYCLE'
+
+        # Alfalfa hay, cycles and cuttings (kcb_daily curve type 1)
+        self.alfalfa_flag = (
+            (crop.class_number == 1 and data.crop_one_flag) or
+            crop.class_number == 2 or crop.class_number == 3 or
+            (crop.class_number >= 4 and alfalfa_1st))
+
+        # Cold shock discount for alfalfa
+        self.cold_shock_flag = (
+            crop.class_number < 4 or (crop.class_number > 3 and alfalfa_1st))
+        self.no_frost_log_flag = (
+            crop.class_number == 2 or crop.class_number == 3 or
+            (crop.class_number > 3 and alfalfa_1st))
+
+        # Per lane crop parameters
+        def crop_param(name, dtype=np.float64):
+            return np.array([getattr(c, name) for e, c in lanes], dtype=dtype)
+        self.curve_number = crop_param('curve_number', np.int64)
+        self.height_initial = crop_param('height_initial')
+        self.height_max_crop = crop_param('height_max')
+        self.rooting_depth_initial = crop_param('rooting_depth_initial')
+        self.rooting_depth_max = crop_param('rooting_depth_max')
+        self.t30_for_pl_or_gu_or_cgdd = crop_param('t30_for_pl_or_gu_or_cgdd')
+        self.date_of_pl_or_gu = crop_param('date_of_pl_or_gu')
+        self.tbase = crop_param('tbase')
+        self.cgdd_for_efc = crop_param('cgdd_for_efc')
+        self.cgdd_for_termination = crop_param('cgdd_for_termination')
+        self.time_for_efc = crop_param('time_for_efc')
+        self.time_for_harvest = crop_param('time_for_harvest')
+        self.killing_frost_temperature = crop_param(
+            'killing_frost_temperature')
+        self.invoke_stress = crop_param('invoke_stress')
+        self.kc_max_crop = crop_param('kc_max')
+        self.wscc = crop_param('winter_surface_cover_class', np.int64)
+        self.end_of_root_growth_fraction_time = crop_param(
+            'end_of_root_growth_fraction_time')
+        self.days_after_planting_irrigation = crop_param(
+            'days_after_planting_irrigation', np.int64)
+        self.date_pl_or_gu_int = np.array(
+            [int(c.date_of_pl_or_gu) for e, c in lanes], dtype=np.int64)
+
+        # Per lane cell properties
+        self.latitude = np.array([e.latitude for e, c in lanes])
+        self.dairy_cuttings = np.array([e.dairy_cuttings for e, c in lanes])
+        self.beef_cuttings = np.array([e.beef_cuttings for e, c in lanes])
+
+        # Crop curves (base curve and two alfalfa cycle curves) for each lane
+        self.kcb_curves = np.zeros((self.n, 3, 35))
+        self.kcb_slopes = np.zeros((self.n, 3, 34))
+        self.kcb_lentry = np.zeros((self.n, 3), dtype=np.int64)
+        for lane_i, (et_cell, lane_crop) in enumerate(lanes):
+            for curve_i in range(3):
+                curve_num = lane_crop.curve_number + curve_i
+                if lane_crop.curve_number > 0 and \
+                        curve_num in et_cell.crop_coeffs:
+                    self.kcb_curves[lane_i, curve_i, :] = \
+                        et_cell.crop_coeffs[curve_num].data
+                    self.kcb_slopes[lane_i, curve_i, :] = \
+                        et_cell.crop_coeffs[curve_num].slope
+                    self.kcb_lentry[lane_i, curve_i] = \
+                        et_cell.crop_coeffs[curve_num].lentry
+
+        # Dormant season curve number and kc_bas
+        self.cn2_dormant = np.full(self.n, np.nan)
+        for lane_i, (et_cell, lane_crop) in enumerate(lanes):
+            try:
+                dormant_crop = et_cell.crop_params[
+                    lane_crop.winter_surface_cover_class + 43]
+            except KeyError:
+                continue
+            if et_cell.stn_hydrogroup == 1:
+                self.cn2_dormant[lane_i] = dormant_crop.cn_coarse_soil
+            elif et_cell.stn_hydrogroup == 2:
+                self.cn2_dormant[lane_i] = dormant_crop.cn_medium_soil
+            elif et_cell.stn_hydrogroup == 3:
+                self.cn2_dormant[lane_i] = dormant_crop.cn_fine_soil
+
+        # Initial state from the scalar crop cycle initialization
+        self.foo_list = []
+        for et_cell, lane_crop in lanes:
+            foo = InitializeCropCycle()
+            foo.crop_load(data, et_cell, lane_crop)
+            if data.co2_flag:
+                foo.setup_co2(et_cell, lane_crop)
+            foo.setup_dataframe(et_cell)
+            if not foo.in_season and foo.crop_setup_flag:
+                foo.setup_crop(lane_crop)
+            self.foo_list.append(foo)
+        for field in float_fields:
+            setattr(self, field, np.array(
+                [getattr(foo, field) for foo in self.foo_list],
+                dtype=np.float64))
+        for field in int_fields:
+            setattr(self, field, np.array(
+                [getattr(foo, field) for foo in self.foo_list],
+                dtype=np.int64))
+        for field in bool_fields:
+            setattr(self, field, np.array(
+                [getattr(foo, field) for foo in self.foo_list], dtype=bool))
+        self.kc_bas_wscc = np.array(
+            [foo.kc_bas_wscc.get(wscc, np.nan)
+             for foo, wscc in zip(self.foo_list, self.wscc)])
+        self.max_lines_in_crop_curve_table = \
+            self.foo_list[0].max_lines_in_crop_curve_table
+
+        # T2Days is not initialized in the scalar version
+        self.t2_days = np.zeros(self.n, dtype=np.int64)
+
+    def kcb_interp(self, mask, curve_i, table_i, frac):
+        """Interpolate crop curve values for masked lanes
+
+        Parameters
+        ---------
+        mask : ndarray
+            lanes to interpolate
+        curve_i : ndarray
+            curve offset (0, 1, 2) of each lane
+        table_i : ndarray
+            integer index into crop curve for each lane
+        frac : ndarray
+            fractional position between table_i and table_i + 1
+
+        Returns
+        -------
+        : ndarray
+            kc_bas for masked lanes
+
+        """
+        lane_i = np.nonzero(mask)[0]
+        c_i = curve_i[lane_i]
+        t_i = table_i[lane_i]
+        return (self.kcb_curves[lane_i, c_i, t_i] +
+                frac[lane_i] * self.kcb_slopes[lane_i, c_i, t_i])
+
+    def setup_crop(self, mask):
+        """Initialize some variables for beginning of crop seasons
+
+        Parameters
+        ---------
+        mask : ndarray
+            lanes to set up
+
+        Notes
+        -----
+        Lockstep version of InitializeCropCycle.setup_crop()
+
+        """
+        if not mask.any():
+            return
+        zr_dormant = 0.0
+        m = mask
+        self.height_min[m] = self.height_initial[m]
+        self.height_max[m] = self.height_max_crop[m]
+        self.zr_min[m] = self.rooting_depth_initial[m]
+        self.zr_max[m] = self.rooting_depth_max[m]
+        self.height[m] = self.height_min[m]
+        self.tew[m] = self.tew2[m]
+        self.tew[m] = np.where(
+            self.tew[m] < self.tew3[m], self.tew3[m], self.tew[m])
+        self.fw_irr[m] = self.fw_std[m]
+        self.irr_auto[m] = 0
+        self.irr_sim[m] = 0
+        daw3 = self.aw3 * (self.zr_max - zr_dormant)
+        taw3 = self.aw * (self.zr_max - zr_dormant)
+        daw3 = _pymax(0.0, daw3)
+        taw3 = _pymax(0.0, taw3)
+
+        # zr_min is always greater than zr_dormant (0)
+        m = mask & (self.zr_min > zr_dormant)
+        self.depl_root[m] = (
+            self.depl_root[m] + (taw3[m] - daw3[m]) *
+            (self.zr_min[m] - zr_dormant) / (self.zr_max[m] - zr_dormant))
+        m = mask & (self.depl_root < 0.)
+        self.depl_root[m] = 0.
+        self.zr[mask] = self.zr_min[mask]
+
+    def setup_dormant(self, mask):
+        """Start of dormant season
+
+        Parameters
+        ---------
+        mask : ndarray
+            lanes to set up
+
+        Notes
+        -----
+        Lockstep version of InitializeCropCycle.setup_dormant()
+
+        """
+        if not mask.any():
+            return
+        for wscc, kc_bas, fc in [(1, 0.1, 0.), (2, 0.1, 0.4), (3, 0.2, 0.7)]:
+            m = mask & (self.wscc == wscc)
+            self.kc_bas[m] = kc_bas
+            self.fc[m] = fc
+        m = mask & np.isfinite(self.cn2_dormant)
+        self.cn2[m] = self.cn2_dormant[m]
+
+        zr_dormant = 0.1
+        ze = 0.1
+        daw3 = self.aw3 * (self.zr_max - self.zr)
+        taw_root = self.aw * (self.zr)
+        daw_root = _pymax(taw_root - self.depl_root, 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            aw_root = daw_root / self.zr
+
+        # zr_dormant is not greater than ze (both 0.1)
+        # The scalar version fails when zr <= zr_dormant,
+        #   water in zr_dormant is computed the same way for those lanes
+        totwatinzr_dormant = (
+            (self.totwatin_ze * (1 - (ze - zr_dormant) / ze)) * (1 - self.fc) +
+            aw_root * zr_dormant * self.fc)
+        m = mask & (zr_dormant < self.zr)
+        daw_below = np.where(
+            daw_root > totwatinzr_dormant, daw_root - totwatinzr_dormant, 0)
+        self.aw3[m] = (daw_below[m] + daw3[m]) / (self.zr_max[m] - zr_dormant)
+
+        m = mask
+        self.depl_root[m] = self.aw[m] * zr_dormant - totwatinzr_dormant[m]
+        self.zr[m] = zr_dormant
+        self.fw_irr[m] = self.fw_std[m]
+        self.irr_auto[m] = 0
+        self.irr_sim[m] = 0
+        self.dormant_setup_flag[m] = False
+        self.cutting[m] = 0
+
+    def compute_crop_gdd(self, foo_day):
+        """Calculate crop growing degree days
+
+        Parameters
+        ---------
+        foo_day : VectorDayData
+
+        Notes
+        -----
+        Lockstep version of compute_crop_gdd.compute_crop_gdd()
+
+        """
+        # Calculate 30 day ETr each year
+        # Today's ETref replaces ETref of 30 days ago in ring buffer
+        etref_i = compute_crop_gdd.etref_index(foo_day.sdays)
+        if foo_day.sdays > compute_crop_gdd.etref_days:
+            etref_lost = foo_day.etref_array[etref_i].copy()
+            foo_day.etref_array[etref_i] = foo_day.etref
+            self.etref_30 = self.etref_30 + (foo_day.etref - etref_lost) / 30.
+        else:
+            foo_day.etref_array[etref_i] = foo_day.etref
+            self.etref_30 = (
+                (self.etref_30 * (foo_day.sdays - 1) + foo_day.etref) /
+                foo_day.sdays)
+
+        # Reset CGDD if new year
+        trigger_doy = self.gdd_trigger_doy
+        if ((self.winter_crop and
+             (foo_day.doy_prev < trigger_doy and
+              foo_day.doy >= trigger_doy)) or
+            (not self.winter_crop and
+             (foo_day.doy_prev > (trigger_doy + 199) and
+              foo_day.doy < (trigger_doy + 199)))):
+            self.cgdd[:] = 0.0
+            self.doy_start_cycle[:] = 0
+            self.real_start[:] = False
+            self.in_season[:] = False
+        foo_day.doy_prev = foo_day.doy
+
+        # Calculate CGDD since trigger date (only needed if a crop)
+        curve = self.curve_number > 0
+        if not curve.any():
+            return
+        tmean, tmin, tmax = foo_day.tmean, foo_day.tmin, foo_day.tmax
+        if self.winter_crop:
+            # Winter wheat or winter grain
+            gdd = np.where(
+                tmin < -4.0, 0.0,
+                np.where(tmean > self.tbase, tmean - self.tbase, 0.0))
+            gdd = gdd - self.gdd_penalty
+            gdd = _pymax(gdd, 0.0)
+            cgdd = self.cgdd + (gdd - self.cgdd_penalty)
+            cgdd = _pymax(0.0, cgdd)
+            gdd_penalty = np.where(tmin < -10, 5.0, 0.0)
+            cgdd_penalty = np.where(
+                (tmin < -25) & (foo_day.snow_depth <= 0), cgdd * 0.1, 0.0)
+            self.gdd = np.where(curve, gdd, self.gdd)
+            self.cgdd = np.where(curve, cgdd, self.cgdd)
+            self.gdd_penalty = np.where(curve, gdd_penalty, self.gdd_penalty)
+            self.cgdd_penalty = np.where(
+                curve, cgdd_penalty, self.cgdd_penalty)
+            return
+
+        # Corn (tbase is set negative as an indicator)
+        corn = curve & (self.tbase < 0)
+        if corn.any():
+            tmax_prev = np.where(tmax > 30, 30., tmax)
+            tmin_prev = np.where(tmin > 30, 30., tmin)
+            tmax_prev = np.where(tmax < -self.tbase, -self.tbase, tmax_prev)
+            tmin_prev = np.where(tmin < -self.tbase, -self.tbase, tmin_prev)
+            tmean_prev = 0.5 * (tmax_prev + tmin_prev)
+            self.cgdd[corn] += (tmean_prev + self.tbase)[corn]
+
+        # Simple method for all other crops
+        simple = curve & ~corn & (tmean > self.tbase)
+        self.gdd[simple] = (tmean - self.tbase)[simple]
+        self.cgdd[simple] += self.gdd[simple]
+
+    def calculate_height(self):
+        """Determine height of crop based on Kc and height limits
+
+        Notes
+        -----
+        Lockstep version of calculate_height.calculate_height()
+
+        """
+        height_prev = self.height
+        m = (self.kc_bas > self.kc_min) & (self.kc_bas_mid > self.kc_min)
+        height = self.height_initial.copy()
+        height[m] = (
+            self.height_initial[m] + (self.kc_bas[m] - self.kc_min[m]) /
+            (self.kc_bas_mid[m] - self.kc_min[m]) *
+            (self.height_max_crop[m] - self.height_initial[m]))
+        self.height = _pymin(
+            _pymax(self.height_initial, _pymax(height_prev, height)),
+            self.height_max_crop)
+
+    def season_start(self, mask):
+        """Turn on growing season for masked lanes"""
+        self.real_start[mask] = True
+        self.in_season[mask] = True
+        self.stress_event[mask] = False
+        self.dormant_setup_flag[mask] = True
+        self.setup_crop(mask)
+        self.cycle[mask] = 1
+
+        # Some range grasses require backing up 10 days
+        m = mask & (self.date_of_pl_or_gu < 0.0)
+        self.doy_start_cycle[m] += self.date_pl_or_gu_int[m]
+        m = m & (self.doy_start_cycle < 1)
+        self.doy_start_cycle[m] += 365
+
+    def kcb_daily(self, data, foo_day):
+        """Compute basal ET
+
+        Parameters
+        ---------
+        data : dict
+            configuration data from INI file
+        foo_day : VectorDayData
+
+        Notes
+        -----
+        Lockstep version of kcb_daily.kcb_daily()
+
+        """
+        trigger_doy = self.gdd_trigger_doy
+        doy = foo_day.doy
+        flag = self.flag_for_means_to_estimate_pl_or_gu
+
+        # Flag_for_means_to_estimate_pl_or_gu Case 1 and 2
+        if flag in [1, 2]:
+            if doy < (trigger_doy + 195):
+                # Check if getting too late in season
+                # gs_late is doy > longterm_pl + limit
+                #   (see cell_calendar.gs_limit())
+                m = foo_day.gs_late & ~self.real_start
+                self.doy_start_cycle[m] = doy
+                self.real_start[m] = True
+
+                # Start of season has not yet been determined
+                if flag == 1:
+                    m = ~self.real_start & (
+                        self.cgdd > self.t30_for_pl_or_gu_or_cgdd)
+                else:
+                    m = ~self.real_start & (
+                        foo_day.t30 > self.t30_for_pl_or_gu_or_cgdd)
+                early = m & foo_day.gs_early
+                self.real_start[early] = False
+                if flag == 1 or data.gs_limit_flag:
+                    self.doy_start_cycle[early] = self.longterm_pl[early] - 40
+                else:
+                    self.doy_start_cycle[early] = 1
+                self.doy_start_cycle[early & (self.doy_start_cycle < 1)] += 365
+                m = m & ~early
+                self.doy_start_cycle[m] = doy
+                self.real_start[m] = True
+
+                # If season start has been found then turn parameters on
+                self.season_start(doy == self.doy_start_cycle)
+
+        # Flag_for_means_to_estimate_pl_or_gu Case 3
+        elif flag == 3:
+            if foo_day.year != getattr(self, 'pl_or_gu_year', None):
+                self.pl_or_gu_year = foo_day.year
+                self.pl_or_gu_doy = np.array([
+                    pl_or_gu_doy(foo_day.year, crop.date_of_pl_or_gu)
+                    for et_cell, crop in self.lanes], dtype=np.int64)
+            m = ((doy == self.pl_or_gu_doy) |
+                 ((foo_day.sdays == 1) & (self.pl_or_gu_doy >= trigger_doy)))
+            self.doy_start_cycle[m] = self.pl_or_gu_doy[m]
+            self.in_season[m] = True
+            self.stress_event[m] = False
+            self.dormant_setup_flag[m] = True
+            self.setup_crop(m)
+
+        # Flag_for_means_to_estimate_pl_or_gu Case 4
+        elif flag == 4:
+            self.in_season[:] = True
+            if doy == trigger_doy:
+                self.stress_event[:] = False
+            self.dormant_setup_flag[:] = True
+
+        else:
+            logging.error(
+                '\nERROR: kcb_daily() Unrecognized ' +
+                'flag_for_means_to_estimate_pl_or_gu value')
+            sys.exit()
+
+        # Set MAD to MADmid universally at start
+        self.mad = self.mad_mid.copy()
+
+        # In season lanes
+        s = self.in_season.copy()
+        if s.any():
+            self.kcb_in_season(data, foo_day, s)
+
+        # Save kc_bas_prev prior to CO2 adjustment to avoid double correction
+        self.kc_bas_prev = self.kc_bas.copy()
+
+        if self.class_number in [44, 45, 46]:
+            self.kc_bas[:] = 0.1
+            self.kc_bas_prev = self.kc_bas.copy()
+        elif self.class_number in [55, 56, 57]:
+            if self.class_number == 55:
+                if data.refet['type'] == 'eto':
+                    self.kc_bas[:] = 1.05
+                elif data.refet['type'] == 'etr':
+                    self.kc_bas[:] = 0.875
+            elif self.class_number == 56:
+                for lane_i, (et_cell, crop) in enumerate(self.lanes):
+                    self.kc_bas[lane_i] = open_water_evap.open_water_evap(
+                        et_cell, foo_day.lane(lane_i))
+            elif self.class_number == 57:
+                if data.refet['type'] == 'eto':
+                    self.kc_bas[:] = 0.85
+                elif data.refet['type'] == 'etr':
+                    self.kc_bas[:] = 0.7
+
+            # Water has only 'kcb'
+            self.kc_act = self.kc_bas.copy()
+            self.kc_pot = self.kc_bas.copy()
+            self.etc_act = self.kc_act * foo_day.etref
+            self.etc_pot = self.kc_pot * foo_day.etref
+            self.etc_bas = self.kc_bas * foo_day.etref
+            self.kc_bas_prev = self.kc_bas.copy()
+        elif data.co2_flag:
+            self.kc_bas_prev = self.kc_bas.copy()
+            self.kc_bas = self.kc_bas * foo_day.co2
+
+        # Limit crop height for numerical stability
+        self.height = _pymax(self.height, 0.05)
+        if data.refet['type'] == 'eto':
+            self.kc_bas = (
+                self.kc_bas +
+                (0.04 * (foo_day.u2 - 2) - 0.004 * (foo_day.rh_min - 45)) *
+                _pypow(self.height / 3, 0.3))
+
+    def kcb_in_season(self, data, foo_day, s):
+        """Interpolate kc_bas from crop curve for in season lanes
+
+        Parameters
+        ---------
+        data : dict
+            configuration data from INI file
+        foo_day : VectorDayData
+        s : ndarray
+            lanes in season at start of kcb curve logic
+
+        """
+        doy = foo_day.doy
+        trigger_doy = self.gdd_trigger_doy
+        max_i = self.max_lines_in_crop_curve_table - 1
+        curve_i = np.zeros(self.n, dtype=np.int64)
+
+        if self.curve_type == 1:
+            # Normalized cumulative growing degree days
+            m = s & (self.doy_start_cycle == doy)
+            self.cgdd_at_planting[m] = self.cgdd[m]
+            cgdd_in_season = _pymax(0.0, self.cgdd - self.cgdd_at_planting)
+            cgdd_efc = self.cgdd_for_efc.copy()
+            cgdd_term = self.cgdd_for_termination.copy()
+            self.cutting[s] = 0
+
+            # Special case for ALFALFA hay (typical, beef or dairy)
+            if self.alfalfa_flag:
+                cgdd_term = self.cgdd_for_efc.copy()
+                cycle = self.cycle > 1
+                cgdd_efc[cycle] = self.cgdd_for_termination[cycle]
+                cgdd_term[cycle] = self.cgdd_for_termination[cycle]
+                if self.class_number == 2:
+                    cuttings = self.dairy_cuttings
+                else:
+                    cuttings = self.beef_cuttings
+                if self.class_number in [1, 2, 3] or self.cold_shock_flag:
+                    curve_i[cycle] = np.where(
+                        self.cycle[cycle] < cuttings[cycle] + 0.01 - 1, 1, 2)
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                n_cgdd = cgdd_in_season / cgdd_efc
+            dev = s & (cgdd_in_season < cgdd_efc)
+            mid = s & ~dev & (cgdd_in_season < cgdd_term)
+            term = s & ~dev & ~mid
+
+            # Development period
+            if dev.any():
+                self.n_cgdd[dev] = n_cgdd[dev]
+                int_cgdd = np.minimum(
+                    max_i, np.where(dev, self.n_cgdd * 10, 0).astype(np.int64))
+                self.kc_bas[dev] = self.kcb_interp(
+                    dev, curve_i, int_cgdd, self.n_cgdd * 10 - int_cgdd)
+                self.mad[dev] = self.mad_ini[dev]
+
+            # Mid and late season (function is same as for < EFC)
+            if mid.any():
+                self.n_cgdd[mid] = _pymax(n_cgdd, 1)[mid]
+                int_cgdd = np.minimum(
+                    max_i, np.where(mid, self.n_cgdd * 10, 0).astype(np.int64))
+                self.mad[mid] = self.mad_mid[mid]
+                lentry = self.kcb_lentry[np.arange(self.n), curve_i]
+                m = mid & (int_cgdd < lentry)
+                self.kc_bas[m] = self.kcb_interp(
+                    m, curve_i, int_cgdd, self.n_cgdd * 10 - int_cgdd)
+                m = mid & ~(int_cgdd < lentry)
+                lane_i = np.nonzero(m)[0]
+                self.kc_bas[m] = self.kcb_curves[
+                    lane_i, curve_i[lane_i], lentry[lane_i]]
+
+            # End of season by exceeding cumGDD for termination
+            if term.any():
+                self.in_season[term] = False
+                self.stress_event[term] = False
+                if self.cutting_crop:
+                    self.cutting[term] = 1
+                    self.cycle[term] += 1
+                    self.in_season[term] = True
+                    self.cgdd_at_planting[term] = self.cgdd[term]
+                    self.height[term] = self.height_min[term]
+                    lane_i = np.nonzero(term)[0]
+                    self.kc_bas[term] = self.kcb_curves[
+                        lane_i, curve_i[lane_i], 0]
+
+            # First alfalfa crop (typical production alfalfa)
+            #   kcb is only reduced after EFC
+            if self.class_number == 1 and data.crop_one_flag:
+                m = mid | term
+                self.kc_bas[m] *= data.crop_one_reducer
+
+            # Use this here only to invoke a total length limit
+            days_into_season = doy - self.doy_start_cycle + 1
+            days_into_season = np.where(
+                days_into_season < 1, days_into_season + 365,
+                days_into_season)
+            m = s & (self.time_for_harvest > 10) & (
+                days_into_season > self.time_for_harvest)
+            self.in_season[m] = False
+            self.stress_event[m] = False
+
+        elif self.curve_type == 2:
+            # Percent of time from PL to EFC for all season
+            days_into_season = doy - self.doy_start_cycle + 1
+            days_into_season = np.where(
+                days_into_season < 1, days_into_season + 365,
+                days_into_season)
+            time_for_efc = _pymax(self.time_for_efc, 1.)
+            n_pl_ec = days_into_season.astype(np.float64) / time_for_efc
+            self.n_pl_ec[s] = n_pl_ec[s]
+            npl_ec100 = n_pl_ec * 100
+            self.mad[s] = np.where(
+                n_pl_ec < 1, self.mad_ini, self.mad_mid)[s]
+            curve = s & (npl_ec100 <= np.abs(self.time_for_harvest))
+            if curve.any():
+                int_pl_ec = np.minimum(
+                    max_i, np.where(curve, n_pl_ec * 10., 0).astype(np.int64))
+                self.kc_bas[curve] = self.kcb_interp(
+                    curve, curve_i, int_pl_ec, n_pl_ec * 10. - int_pl_ec)
+
+            # Beyond stated end of season
+            m = s & ~curve & (self.time_for_harvest < -0.5)
+            self.kc_bas[m] = self.kc_bas_prev[m]
+            m = s & ~curve & ~(self.time_for_harvest < -0.5)
+            self.in_season[m] = False
+            self.stress_event[m] = False
+
+        elif self.curve_type == 3:
+            # Percent of time from PL to EFC for before EFC and
+            #   days after EFC after EFC
+            days_into_season = doy - self.doy_start_cycle + 1
+            days_into_season = np.where(
+                days_into_season < 1, days_into_season + 365,
+                days_into_season)
+            time_for_efc = _pymax(self.time_for_efc, 1.)
+            n_pl_ec = days_into_season.astype(np.float64) / time_for_efc
+            self.n_pl_ec[s] = n_pl_ec[s]
+            dev = s & (n_pl_ec < 1)
+            if dev.any():
+                int_pl_ec = np.minimum(
+                    np.where(dev, n_pl_ec * 10., 0).astype(np.int64), max_i)
+                self.kc_bas[dev] = self.kcb_interp(
+                    dev, curve_i, int_pl_ec, n_pl_ec * 10 - int_pl_ec)
+                self.mad[dev] = self.mad_ini[dev]
+            late = s & ~dev
+            self.mad[late] = self.mad_mid[late]
+            days_after_efc = days_into_season - time_for_efc
+            curve = late & (days_after_efc <= np.abs(self.time_for_harvest))
+            if curve.any():
+                # Start at array index = 11 for 0 days into full cover
+                n_days_after_efc = days_after_efc / 10 + 11
+                int_pl_ec = np.minimum(
+                    np.where(curve, n_days_after_efc, 0).astype(np.int64),
+                    max_i)
+                self.kc_bas[curve] = self.kcb_interp(
+                    curve, curve_i, int_pl_ec, n_days_after_efc - int_pl_ec)
+            m = late & ~curve & (self.time_for_harvest < -0.5)
+            self.kc_bas[m] = self.kc_bas_prev[m]
+            m = late & ~curve & ~(self.time_for_harvest < -0.5)
+            self.in_season[m] = False
+            self.stress_event[m] = False
+
+        elif self.curve_type == 4:
+            # Percent of time from PL to end of season
+            if np.any(s & (self.doy_start_cycle >= (trigger_doy + 195))):
+                logging.error(
+                    ('kc_daily.kcb_daily(): Problem with estimated season ' +
+                     'length, crop_curve_type_4, crop {}.' +
+                     ' Check T30 (too low) or PL_GU_Date Negative Offset.').format(
+                        self.class_number))
+                sys.exit()
+            length_of_season = 2 * (trigger_doy + 195 - self.doy_start_cycle)
+            if np.any(s & (length_of_season > 366)):
+                logging.info(
+                    'ADJUSTING GROWING SEASON (NOT CENTERING ON JULY 15)')
+            length_of_season = np.where(
+                length_of_season > 366, 366, length_of_season)
+            if self.class_number == 47:
+                length_of_season = np.where(
+                    length_of_season < 60, 60, length_of_season)
+                length_of_season = np.where(
+                    length_of_season > 90, 100, length_of_season)
+            days_into_season = doy - self.doy_start_cycle
+            days_into_season = np.where(
+                days_into_season < 0, days_into_season + 365,
+                days_into_season)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                n_pl_ec = days_into_season / length_of_season
+            self.n_pl_ec[s] = n_pl_ec[s]
+            self.mad[s] = np.where(
+                n_pl_ec < 0.5, self.mad_ini, self.mad_mid)[s]
+            curve = s & (n_pl_ec <= 1)
+            if curve.any():
+                int_pl_ec = np.minimum(
+                    max_i, np.where(curve, n_pl_ec * 10, 0).astype(np.int64))
+                self.kc_bas[curve] = self.kcb_interp(
+                    curve, curve_i, int_pl_ec, n_pl_ec * 10 - int_pl_ec)
+            m = s & ~curve
+            self.in_season[m] = False
+            self.stress_event[m] = False
+
+        # Discounting for cold shock to alfalfa gets reset on Jan 1
+        if self.cold_shock_flag:
+            if doy > (trigger_doy + 211):
+                m = s & (foo_day.tmin < -3) & (self.t2_days < 1)
+                self.t2_days[m] = 1
+            else:
+                self.t2_days[s] = 0
+            m = s & (self.t2_days > 0)
+            if m.any():
+                self.kc_bas[m] -= self.t2_days[m] * 0.005
+                self.kc_bas[m & (self.kc_bas < 0.1)] = 0.1
+                self.t2_days[m] += 1
+
+        # Determine if killing frost to cut short
+        if doy > (trigger_doy + 211):
+            frost = (
+                s & (foo_day.tmin < self.killing_frost_temperature) &
+                self.in_season)
+            if self.class_number in [44, 45, 46]:
+                frost[:] = False
+            for lane_i in np.nonzero(frost)[0]:
+                logging.info(
+                    "Killing frost for crop %d of %.1f was found on DOY %d of %d" %
+                    (self.class_number,
+                     self.killing_frost_temperature[lane_i], doy,
+                     foo_day.year))
+            self.in_season[frost] = False
+            self.stress_event[frost] = False
+            if (self.no_frost_log_flag and foo_day.month == 12 and
+                    foo_day.day == 31):
+                for lane_i in np.nonzero(s & ~frost & self.in_season)[0]:
+                    logging.info("No killing frost in year %d" % (foo_day.year))
+
+    def compute_crop_et(self, data, foo_day):
+        """Crop et computations
+
+        Parameters
+        ---------
+        data : dict
+            configuration data from INI file
+        foo_day : VectorDayData
+
+        Notes
+        -----
+        Lockstep version of compute_crop_et.compute_crop_et()
+
+        """
+        if self.class_number in [55, 56, 57]:
+            return
+        refet_type = data.refet['type']
+
+        # Maximum Kc when soil is wet
+        self.height = _pymax(0.05, self.height)
+        if refet_type == 'eto':
+            kc_max = (
+                (0.04 * (foo_day.u2 - 2) - 0.004 * (foo_day.rh_min - 45)) *
+                _pypow(self.height / 3, 0.3))
+            kc_max = np.where(
+                self.kc_max_crop > 0.3, kc_max + self.kc_max_crop,
+                kc_max + 1.2)
+        elif refet_type == 'etr':
+            kc_max = np.where(self.kc_max_crop > 0.3, self.kc_max_crop, 1.0)
+        else:
+            sys.exit()
+
+        # Bare soil, mulched soil and dormant turf/sod
+        soil_fc = {44: 0.0, 45: 0.4, 46: 0.7}
+        if self.class_number in soil_fc:
+            self.fc[:] = soil_fc[self.class_number]
+
+        # Kc max for winter time (Nov-Mar)
+        wscc_kc_max = cell_calendar.wscc_kc_max
+        if foo_day.winter.any():
+            winter = foo_day.winter
+            if self.class_number not in [44, 45, 46]:
+                for wscc, wscc_kc in wscc_kc_max.items():
+                    if refet_type in wscc_kc:
+                        kc_max = np.where(
+                            winter & (self.wscc == wscc), wscc_kc[refet_type],
+                            kc_max)
+            else:
+                if refet_type in wscc_kc_max[self.class_number - 43]:
+                    kc_max = np.where(
+                        winter,
+                        wscc_kc_max[self.class_number - 43][refet_type],
+                        kc_max)
+                self.fc[winter] = soil_fc[self.class_number]
+
+        # Kc_bas for wintertime land use
+        m = ~self.in_season
+        if self.class_number in [87]:
+            self.kc_bas[m] = 0.25
+        else:
+            self.kc_bas[m] = self.kc_bas_wscc[m]
+
+        # Don't let kc_bas be greater than kc_max
+        kc_max = _pymax(kc_max, self.kc_bas + 0.05)
+        self.kc_min[:] = 0.1
+        if self.class_number not in [44, 45, 46]:
+            kc_max = np.where(
+                kc_max <= self.kc_min, self.kc_min + 0.001, kc_max)
+            m = self.in_season & (self.kc_bas > self.kc_min)
+            if m.any():
+                fc = _pypow(
+                    (self.kc_bas[m] - self.kc_min[m]) /
+                    (kc_max[m] - self.kc_min[m]),
+                    1 + 0.5 * self.height[m])
+                self.fc[m] = _pymin(fc, 0.99)
+            m = self.in_season & ~(self.kc_bas > self.kc_min)
+            self.fc[m] = 0.001
+
+        # Compute effective precipitation (runoff)
+        self.ppt_inf_prev = self.ppt_inf.copy()
+        self.ppt_inf = np.zeros(self.n)
+        self.sro = np.zeros(self.n)
+        m = foo_day.precip > 0
+        if m.any():
+            self.depl_surface[m] = (
+                self.wt_irr * self.depl_ze +
+                (1 - self.wt_irr) * self.depl_zep)[m]
+            self.runoff(foo_day, m)
+            self.ppt_inf[m] = (foo_day.precip - self.sro)[m]
+
+        # Irrigation type (only automatic irrigation is simulated)
+        m = self.irr_auto > 0
+        self.fw_irr[m] = self.fw_std[m]
+
+        # Water in evaporation layer
+        watin_ze = self.tew - self.depl_ze
+        watin_ze = np.where(_round6_le0(watin_ze), 0.001, watin_ze)
+        watin_ze = _pymin(watin_ze, self.tew)
+        watin_zep = self.tew - self.depl_zep
+        watin_zep = np.where(_round6_le0(watin_zep), 0.001, watin_zep)
+        watin_zep = _pymin(watin_zep, self.tew)
+
+        # Fraction of ground that is both exposed and wet
+        few = 1 - self.fc
+        few = _pymin(_pymax(few, 0.001), self.fw_irr)
+        fewp = 1 - self.fc - few
+        fewp = _pymax(fewp, 0.001)
+        self.totwatin_ze = (watin_ze * few + watin_zep * fewp) / (few + fewp)
+
+        # Deep percolation from evaporation layer
+        fw_irr = np.where(self.fw_irr > 0.0001, self.fw_irr, 1)
+        dperc_ze = self.ppt_inf + self.irr_sim / fw_irr - self.depl_ze
+        dperc_ze = _pymax(dperc_ze, 0)
+        depl_zep_prev = self.ppt_inf - self.depl_zep
+        depl_zep_prev = _pymax(depl_zep_prev, 0)
+        self.depl_ze = self.depl_ze - self.ppt_inf - self.irr_sim / fw_irr + dperc_ze
+        self.depl_ze = _pymin(_pymax(self.depl_ze, 0), self.tew)
+        self.depl_zep = self.depl_zep - self.ppt_inf + depl_zep_prev
+        self.depl_zep = _pymin(_pymax(self.depl_zep, 0), self.tew)
+
+        # Reduce TEW and REW for low evaporative demand
+        self.kr2[self.tew3 < 0.1] = 0.0
+        tew2use = self.tew2.copy()
+        tew3use = self.tew3.copy()
+        rew2use = self.rew.copy()
+        self.etref_30 = _pymax(0.1, self.etref_30)
+        if refet_type == 'eto':
+            etr_threshold = 5
+        elif refet_type == 'etr':
+            etr_threshold = 4
+        m = self.etref_30 < etr_threshold
+        if m.any():
+            etref_ratio = np.sqrt(self.etref_30[m] / etr_threshold)
+            tew2use[m] = self.tew2[m] * etref_ratio
+            tew3use[m] = self.tew3[m] * etref_ratio
+            m = m & (rew2use > 0.8 * tew2use)
+            rew2use[m] = 0.8 * tew2use[m]
+
+        # Evaporation reduction coefficients
+        with np.errstate(divide='ignore', invalid='ignore'):
+            kr = self.kr_coefficient(self.depl_ze, rew2use, tew2use, tew3use)
+            krp = self.kr_coefficient(self.depl_zep, rew2use, tew2use, tew3use)
+        wt_irr = few * watin_ze + fewp * watin_zep
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.wt_irr = np.where(
+                wt_irr > 0.0001,
+                few * watin_ze / wt_irr, few * watin_ze)
+        self.wt_irr = _pymin(_pymax(self.wt_irr, 0), 1)
+
+        # Evaporation coefficients
+        ke_irr = kr * (kc_max - self.kc_bas) * self.wt_irr
+        ke_ppt = krp * (kc_max - self.kc_bas) * (1 - self.wt_irr)
+        ke_irr = _pymin(_pymax(ke_irr, 0), few * kc_max)
+        ke_ppt = _pymin(_pymax(ke_ppt, 0), fewp * kc_max)
+        ke = ke_irr + ke_ppt
+
+        # Transpiration coefficient for moisture stress
+        taw = self.aw * self.zr
+        taw = _pymax(taw, 0.001)
+        raw = self.mad * taw / 100
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ks = np.where(
+                self.depl_root > raw,
+                _pymax((taw - self.depl_root) / (taw - raw), 0), 1.)
+        ks = np.where(self.invoke_stress < 1, 1., ks)
+        m = ((self.invoke_stress == 1) & (ks < 0.05) & self.in_season &
+             (self.kc_bas > 0.3))
+        self.stress_event[m] = True
+        ks = np.where((self.invoke_stress == 1) & self.stress_event, 0.0, ks)
+
+        # Snow adjustment
+        kc_mult = np.ones(self.n)
+        m = foo_day.snow_depth > 0.01
+        if m.any():
+            k_rad = (
+                0.000000022 * foo_day.doy ** 3 - 0.0000242 * foo_day.doy ** 2 +
+                0.006 * foo_day.doy + 0.011)
+            albedo_snow = 0.8
+            albedo_soil = 0.25
+            kc_mult[m] = (
+                1 - k_rad + (1 - albedo_snow) / (1 - albedo_soil) * k_rad)
+            kc_mult[m] = kc_mult[m] * 0.7
+        ke = ke * kc_mult
+        ke_irr = ke_irr * kc_mult
+        ke_ppt = ke_ppt * kc_mult
+
+        # Daily coefficients and ET
+        self.kc_act = kc_mult * ks * self.kc_bas + ke
+        self.kc_pot = self.kc_bas + ke
+        self.etc_act = self.kc_act * foo_day.etref
+        self.etc_pot = self.kc_pot * foo_day.etref
+        self.etc_bas = self.kc_bas * foo_day.etref
+        e = ke * foo_day.etref
+        e_irr = ke_irr * foo_day.etref
+        e_ppt = ke_ppt * foo_day.etref
+
+        # Transpiration from evaporation layer
+        ze = 0.0001
+        self.zr[self.zr < 0.0001] = 0.01
+        kt_prop = _pypow(ze / self.zr, 0.6)
+        kt_prop = _pymin(kt_prop, 1)
+        kt_reducer_denom = _pymax(1 - self.depl_root / taw, 0.001)
+        kt_reducer = few * (1 - self.depl_ze / tew2use) / kt_reducer_denom
+        kt_prop = kt_prop * kt_reducer
+        kt_prop = _pymin(kt_prop, 1)
+        te_irr = kc_mult * ks * self.kc_bas * foo_day.etref * kt_prop
+        kt_reducer = fewp * (1 - self.depl_zep / tew2use) / kt_reducer_denom
+        kt_prop = kt_prop * kt_reducer
+        kt_prop = _pymin(kt_prop, 1)
+        te_ppt = kc_mult * ks * self.kc_bas * foo_day.etref * kt_prop
+
+        # Update depletions of evaporation layer
+        depl_ze_prev = self.depl_ze
+        depl_zep_prev = self.depl_zep
+        self.depl_ze = depl_ze_prev + e_irr / few + te_irr
+        self.depl_ze[self.depl_ze < 0] = 0.0
+        m = self.depl_ze > self.tew
+        if m.any():
+            potential_e = self.depl_ze - depl_ze_prev
+            potential_e = np.where(potential_e < 0.0001, 0.0001, potential_e)
+            e_factor = 1 - (self.depl_ze - self.tew) / potential_e
+            e_factor = _pymin(_pymax(e_factor, 0), 1)
+            e_irr = np.where(m, e_irr * e_factor, e_irr)
+            te_irr = np.where(m, te_irr * e_factor, te_irr)
+            self.depl_ze = np.where(
+                m, depl_ze_prev + e_irr / few + te_irr, self.depl_ze)
+            if np.any(m & (self.depl_ze > self.tew + 0.2)):
+                logging.error(
+                    'Problem in keeping depl_ze water balance within TEW')
+                sys.exit()
+        self.depl_zep = depl_zep_prev + e_ppt / fewp + te_ppt
+        self.depl_zep = _pymax(self.depl_zep, 0)
+        m = self.depl_zep > self.tew
+        if m.any():
+            potential_e = self.depl_zep - depl_zep_prev
+            potential_e = np.where(potential_e < 0.0001, 0.0001, potential_e)
+            e_factor = 1 - (self.depl_zep - self.tew) / potential_e
+            e_factor = _pymin(_pymax(e_factor, 0), 1)
+            e_ppt = np.where(m, e_ppt * e_factor, e_ppt)
+            te_ppt = np.where(m, te_ppt * e_factor, te_ppt)
+            self.depl_zep = np.where(
+                m, depl_zep_prev + e_ppt / fewp + te_ppt, self.depl_zep)
+            if np.any(m & (self.depl_zep > self.tew + 0.2)):
+                logging.error(
+                    'Problem in keeping De water balance within TEW')
+                sys.exit()
+
+        # Recompute evaporation coefficients from adjusted evaporation
+        etref_divisor = np.where(foo_day.etref < 0.01, 0.01, foo_day.etref)
+        ke_irr = e_irr / etref_divisor
+        ke_ppt = e_ppt / etref_divisor
+        ke_irr = _pymin(_pymax(ke_irr, 0), 1.5)
+        ke_ppt = _pymin(_pymax(ke_ppt, 0), 1.5)
+        ke = ke_irr + ke_ppt
+        e = ke * foo_day.etref
+        self.kc_act = kc_mult * ks * self.kc_bas + ke
+        self.kc_pot = self.kc_bas + ke
+        self.etc_act = self.kc_act * foo_day.etref
+        self.etc_pot = self.kc_pot * foo_day.etref
+        self.etc_bas = self.kc_bas * foo_day.etref
+        self.cum_evap_prev = (
+            self.cum_evap_prev + e_irr - (self.ppt_inf - depl_zep_prev))
+        self.cum_evap_prev = _pymax(self.cum_evap_prev, 0)
+
+        # Root zone depletion
+        self.depl_root = self.depl_root + (self.etc_act - self.ppt_inf)
+
+        # Irrigation
+        irr_sim_prev = self.irr_sim
+        self.irr_sim = np.zeros(self.n)
+        m = self.irr_flag
+        if m.any():
+            doy_to_start_irr = (
+                self.doy_start_cycle + self.days_after_planting_irrigation)
+            doy_to_start_irr = np.where(
+                doy_to_start_irr > 365, doy_to_start_irr - 365,
+                doy_to_start_irr)
+            crop_doy = foo_day.doy - self.doy_start_cycle + 1
+            crop_doy = np.where(crop_doy < 1, crop_doy + 365, crop_doy)
+            m = (m & (crop_doy >= self.days_after_planting_irrigation) &
+                 (foo_day.doy >= doy_to_start_irr) & self.in_season &
+                 (self.depl_root > raw) & (self.kc_bas > 0.22))
+            self.irr_sim[m] = _pymax(self.depl_root, self.irr_min)[m]
+        self.depl_root = self.depl_root - self.irr_sim
+        self.irr_auto = self.irr_sim.copy()
+        self.irr_sim = self.irr_sim + 0.0
+        m = self.irr_sim > 0
+        self.cum_evap[m] = self.cum_evap_prev[m]
+        self.cum_evap_prev[m] = 0.0
+
+        # Deep percolation from root zone
+        m = (((self.irr_sim + irr_sim_prev + self.ppt_inf +
+               self.ppt_inf_prev) <= 0.0001) | (self.zr < 0.2))
+        self.dperc = np.where(
+            m, np.where(self.depl_root < 0.0, -self.depl_root, 0.0),
+            np.where(self.depl_root < -20, -20.0 - self.depl_root, 0.0))
+        self.depl_root = self.depl_root + self.dperc
+
+        # Limit depletion to total available water
+        m = (self.invoke_stress > 0.5) & (self.depl_root > taw)
+        if m.any():
+            self.etc_act[m] -= (self.depl_root - taw)[m]
+            self.etc_act[m] = _pymax(self.etc_act, 0)[m]
+            mm = m & (foo_day.etref > 0.1)
+            self.kc_act[mm] = (self.etc_act / foo_day.etref)[mm]
+            self.depl_root[m] = taw[m]
+
+        # Layer 3 below current root zone
+        gross_dperc = self.dperc + 0.1 * self.irr_sim
+        daw3 = self.aw3 * (self.zr_max - self.zr)
+        taw3 = self.aw * (self.zr_max - self.zr)
+        daw3 = _pymax(daw3, 0)
+        taw3 = _pymax(taw3, 0)
+        daw3 = daw3 + gross_dperc
+        m = daw3 > taw3
+        self.dperc = np.where(m, daw3 - taw3, 0.)
+        daw3 = np.where(m, taw3, daw3)
+        daw3 = _pymax(daw3, 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.aw3 = np.where(
+                self.zr_max > self.zr, daw3 / (self.zr_max - self.zr), 0.)
+
+        # Net irrigation water requirement and effective precipitation
+        irr = self.irr_sim > 0
+        self.niwr = np.where(
+            irr, self.etc_act - (foo_day.precip - self.sro),
+            self.etc_act - (foo_day.precip - self.sro - self.dperc))
+        self.p_rz = np.where(
+            irr, foo_day.precip - self.sro,
+            foo_day.precip - self.sro - self.dperc)
+        self.p_rz[self.p_rz <= 0] = 0.
+        self.p_eft = np.where(
+            irr, foo_day.precip - self.sro - e,
+            foo_day.precip - self.sro - self.dperc - e)
+        self.p_eft[self.p_eft <= 0] = 0.
+
+        # Grow root zone for in season lanes
+        if self.in_season.any():
+            self.grow_root(self.in_season.copy())
+
+    def kr_coefficient(self, depl, rew2use, tew2use, tew3use):
+        """Evaporation reduction coefficient for depletion of surface layer"""
+        return np.where(
+            depl <= rew2use, 1.,
+            np.where(
+                depl <= tew2use,
+                self.kr2 + (1 - self.kr2) * (tew2use - depl) /
+                (tew2use - rew2use),
+                np.where(
+                    tew3use > tew2use,
+                    self.kr2 * (tew3use - depl) / (tew3use - tew2use), 0.0)))
+
+    def runoff(self, foo_day, mask):
+        """Curve number method for computing runoff
+
+        Parameters
+        ---------
+        foo_day : VectorDayData
+        mask : ndarray
+            lanes with precipitation
+
+        Notes
+        -----
+        Lockstep version of runoff.runoff()
+
+        """
+        cn_ii = _pymin(_pymax(self.cn2, 10), 100)
+        cn_i = cn_ii / (2.281 - 0.01281 * cn_ii)
+        cn_iii = cn_ii / (0.427 + 0.00573 * cn_ii)
+        awc_iii = 0.5 * self.rew
+        awc_i = 0.7 * self.rew + 0.3 * self.tew
+        awc_i = np.where(awc_i <= awc_iii, awc_iii + 0.01, awc_i)
+        ds = self.depl_surface
+        cn = np.where(
+            ds < awc_iii, cn_iii,
+            np.where(ds > awc_i, cn_i,
+                     ((ds - awc_iii) * cn_i + (awc_i - ds) * cn_iii) /
+                     (awc_i - awc_iii)))
+        self.s[mask] = (250 * (100 / cn - 1))[mask]
+        precip = foo_day.precip
+        np_err = np.seterr(divide='ignore', invalid='ignore')
+
+        # Irrigated lanes use average of 4 previous S values
+        m = mask & self.irr_flag
+        if m.any():
+            ppt_net4 = _pymax(precip - 0.2 * self.s4, 0)
+            ppt_net3 = _pymax(precip - 0.2 * self.s3, 0)
+            ppt_net2 = _pymax(precip - 0.2 * self.s2, 0)
+            ppt_net1 = _pymax(precip - 0.2 * self.s1, 0)
+            sro = 0.25 * (
+                _pypow(ppt_net4, 2) / (precip + 0.8 * self.s4) +
+                _pypow(ppt_net3, 2) / (precip + 0.8 * self.s3) +
+                _pypow(ppt_net2, 2) / (precip + 0.8 * self.s2) +
+                _pypow(ppt_net1, 2) / (precip + 0.8 * self.s1))
+            self.sro[m] = sro[m]
+            self.s4[m] = self.s3[m]
+            self.s3[m] = self.s2[m]
+            self.s2[m] = self.s1[m]
+            self.s1[m] = self.s[m]
+        m = mask & ~self.irr_flag
+        if m.any():
+            ppt_net = _pymax(precip - 0.2 * self.s, 0)
+            self.sro[m] = (ppt_net * ppt_net / (precip + 0.8 * self.s))[m]
+        np.seterr(**np_err)
+
+    def grow_root(self, mask):
+        """Determine depth of root zone
+
+        Parameters
+        ---------
+        mask : ndarray
+            lanes in season
+
+        Notes
+        -----
+        Lockstep version of grow_root.grow_root()
+
+        """
+        fractime = np.zeros(self.n)
+        m = mask & (self.end_of_root_growth_fraction_time != 0.0)
+        if self.curve_type == 1:
+            fractime[m] = (
+                self.n_cgdd[m] / self.end_of_root_growth_fraction_time[m])
+        elif self.curve_type > 1:
+            fractime[m] = (
+                self.n_pl_ec[m] / self.end_of_root_growth_fraction_time[m])
+        fractime = _pymin(_pymax(fractime, 0), 1)
+        zr_prev = self.zr[mask]
+        zr = (
+            (0.5 + 0.5 * _pysin(3.03 * fractime[mask] - 1.47)) *
+            (self.zr_max[mask] - self.zr_min[mask]) + self.zr_min[mask])
+        delta_zr = zr - zr_prev
+        depl_root = self.depl_root[mask]
+        m = delta_zr > 0
+        depl_root[m] += delta_zr[m] * (self.aw[mask] - self.aw3[mask])[m]
+        self.depl_root[mask] = depl_root
+        self.zr[mask] = _pymax(zr, zr_prev)
+
+
+def pl_or_gu_doy(year, date_of_pl_or_gu):
+    """Planting or green-up day of year from fractional month
+
+    Parameters
+    ---------
+    year : int
+    date_of_pl_or_gu : float
+        fractional month (4.8333 is April 25th)
+
+    Returns
+    -------
+    : int
+
+    Notes
+    -----
+    Same calculation as flag_for_means_to_estimate_pl_or_gu Case 3 in
+    kcb_daily.kcb_daily()
+
+    """
+    month_of_pl_or_gu = int(date_of_pl_or_gu)
+    day_of_pl_or_gu = int(round(
+        (date_of_pl_or_gu - month_of_pl_or_gu) * 30.4))
+    if day_of_pl_or_gu < 0.5:
+        day_of_pl_or_gu = 15
+    return datetime.datetime(
+        year, month_of_pl_or_gu, day_of_pl_or_gu).timetuple().tm_yday
+
+
+def simulate_lanes(data, lanes):
+    """Run day loop for a set of lanes
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    lanes : list
+        (et_cell, crop) tuples with the same dates and lane_key()
+
+    Returns
+    -------
+    : tuple
+        VectorCropCycle, daily dates and output arrays (n_days x n_lanes)
+        by field (output_fields, season and cutting)
+
+    Notes
+    -----
+    Used by crop_day_loop_vector() and crop_ensemble.py
+
+    """
+    crop = lanes[0][1]
+    foo = VectorCropCycle(data, lanes)
+
+    # Daily inputs (n_days x n_lanes)
+    clim_list = [
+        crop_cycle.crop_climate_arrays(data, et_cell, lane_crop, lane_foo)
+        for (et_cell, lane_crop), lane_foo in zip(lanes, foo.foo_list)]
+    clim = {}
+    for field in clim_list[0].keys():
+        clim[field] = np.column_stack([c[field] for c in clim_list])
+    del clim_list
+    step_dates = foo.foo_list[0].crop_df.index
+    doy_array = foo.foo_list[0].crop_df['doy'].values.astype(np.int64)
+    year_array = step_dates.year.values.astype(np.int64)
+    month_array = step_dates.month.values.astype(np.int64)
+    day_array = step_dates.day.values.astype(np.int64)
+
+    # Preallocate output arrays
+    n_days = len(step_dates)
+    out = {}
+    for field in output_fields:
+        out[field] = np.full((n_days, foo.n), np.nan)
+    out['season'] = np.zeros((n_days, foo.n), dtype=np.int64)
+    out['cutting'] = np.zeros((n_days, foo.n), dtype=np.int64)
+
+    # Day invariant values of lane cells (n_days x n_lanes)
+    calendars = [
+        cell_calendar.cell_calendar(data, et_cell, lane_foo.crop_df.index)
+        for (et_cell, lane_crop), lane_foo in zip(lanes, foo.foo_list)]
+    gs_limit = cell_calendar.gs_limit(data, crop)
+    gs_windows = [
+        calendar.gs_window(longterm_pl, gs_limit)
+        for calendar, longterm_pl in zip(calendars, foo.longterm_pl)]
+    winter_array = np.column_stack([c.winter for c in calendars])
+    gs_early_array = np.column_stack([w[0] for w in gs_windows])
+    gs_late_array = np.column_stack([w[1] for w in gs_windows])
+    ts_ta_list = calendars[0].ts_ta.tolist()
+    del calendars, gs_windows
+
+    foo_day = VectorDayData(foo.n)
+    for step_i in range(n_days):
+        # End of season for each crop, set up for non-growing and dormant season
+        foo.setup_dormant(~foo.in_season & foo.dormant_setup_flag)
+
+        foo_day.sdays += 1
+        foo_day.doy = int(doy_array[step_i])
+        foo_day.year = int(year_array[step_i])
+        foo_day.month = int(month_array[step_i])
+        foo_day.day = int(day_array[step_i])
+        for field in clim.keys():
+            setattr(foo_day, field, clim[field][step_i])
+        foo_day.winter = winter_array[step_i]
+        foo_day.gs_early = gs_early_array[step_i]
+        foo_day.gs_late = gs_late_array[step_i]
+        foo_day.ts_ta = ts_ta_list[step_i]
+
+        foo.compute_crop_gdd(foo_day)
+        foo.calculate_height()
+        foo.kcb_daily(data, foo_day)
+        foo.compute_crop_et(data, foo_day)
+
+        out['et_act'][step_i] = foo.etc_act
+        out['et_pot'][step_i] = foo.etc_pot
+        out['et_bas'][step_i] = foo.etc_bas
+        out['kc_act'][step_i] = foo.kc_act
+        out['kc_bas'][step_i] = foo.kc_bas
+        out['irrigation'][step_i] = foo.irr_sim
+        out['runoff'][step_i] = foo.sro
+        out['dperc'][step_i] = foo.dperc
+        out['p_rz'][step_i] = foo.p_rz
+        out['p_eft'][step_i] = foo.p_eft
+        out['niwr'][step_i] = foo.niwr + 0
+        out['season'][step_i] = foo.in_season
+        out['cutting'][step_i] = foo.cutting
+    return foo, step_dates, out
+
+def crop_day_loop_vector(crop_count, data, lanes, debug_flag=False):
+    """Compute crop et for each daily timestep for a set of lanes
+
+    Parameters
+    ---------
+    crop_count : int
+        count of crop being computed
+    data : dict
+        configuration data from INI file
+    lanes : list
+        (et_cell, crop) tuples with the same dates and lane_key()
+    debug_flag : boolean
+        True : write debug level comments to debug.txt
+        False
+
+    Returns
+    -------
+    : boolean
+        True
+
+    Notes
+    -----
+    Results are identical to running crop_cycle.crop_day_loop() for each lane
+
+    """
+    crop = lanes[0][1]
+    logging.warning('Crop {} - {} ({} cells)'.format(
+        crop.class_number, crop.name, len(lanes)))
+    foo, step_dates, out = simulate_lanes(data, lanes)
+
+    # Check that season started (Dec 31 of each year)
+    doy_array = foo.foo_list[0].crop_df['doy'].values
+    for step_i in np.where(
+            (step_dates.month == 12) & (step_dates.day == 31))[0].tolist():
+        season_count = out['season'][
+            max(step_i - int(doy_array[step_i]) + 1, 0):step_i + 1].sum(axis=0)
+        for lane_i in range(foo.n):
+            if season_count[lane_i] == 0:
+                logging.warning(
+                    '  Crop {} - {} growing season never started'.format(
+                        crop.class_number, step_dates[step_i].year))
+            elif season_count[lane_i] == 1:
+                logging.warning(
+                    '  Crop {} - {} growing season active for 1 day'.format(
+                        crop.class_number, step_dates[step_i].year))
+
+    # Copy output arrays to crop data frames and write output files
+    for lane_i, ((et_cell, lane_crop), lane_foo) in enumerate(
+            zip(lanes, foo.foo_list)):
+        for field, values in out.items():
+            lane_foo.crop_df[field] = values[:, lane_i]
+        if (data.cet_out['daily_output_flag'] or
+                data.cet_out['monthly_output_flag'] or
+                data.cet_out['annual_output_flag'] or
+                data.gs_output_flag):
+            crop_cycle.write_crop_output(
+                crop_count, data, et_cell, lane_crop,
+                LaneOutput(lane_foo.crop_df))
+        run_manifest.record_crop(data, et_cell, lane_crop)
+    return True
+
+def crop_cycle_vector(data, cells, cell_ids, debug_flag=False):
+    """Compute crop ET for all cells using the lockstep engine
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    cells : ETCellData
+        et cells data
+    cell_ids : list
+        et cell ids to process
+    debug_flag : boolean
+        True : write debug level comments to debug.txt
+        False
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    Cells are processed in batches of data.vector_batch_size
+    In streaming mode, crop parameters are also set and released by batch
+    For each crop, cells with the same dates and structural crop parameters
+        are run together as lanes of one VectorCropCycle
+
+    """
+    batch_size = max(int(data.vector_batch_size), 1)
+    cell_count = 0
+    for batch_i in range(0, len(cell_ids), batch_size):
+        batch_cells = []
+        for cell_id in cell_ids[batch_i:batch_i + batch_size]:
+            cell = cells.et_cells_dict[cell_id]
+            logging.warning('CellID: {}'.format(cell_id))
+            cell_count += 1
+            if data.stream_flag:
+                cells.set_cell_crop_params(cell, data)
+            if not cell.set_input_timeseries(cell_count, data, cells):
+                sys.exit()
+            batch_cells.append(cell)
+
+        crop_nums = sorted(set(
+            crop_num for cell in batch_cells
+            for crop_num in cell.crop_params.keys()
+            if cell.crop_flags[crop_num] != 0))
+        for crop_count, crop_num in enumerate(crop_nums):
+            # Group lanes by dates and structural crop parameters
+            lane_groups = {}
+            for cell in batch_cells:
+                if cell.crop_flags[crop_num] == 0:
+                    continue
+                crop = cell.crop_params[crop_num]
+                dates = cell.refet_df.index
+                group_key = (dates[0], dates[-1], len(dates), lane_key(crop))
+                lane_groups.setdefault(group_key, []).append((cell, crop))
+            for group_key, lanes in sorted(
+                    lane_groups.items(), key=lambda x: str(x[0])):
+                # Open water lanes are computed for all days at once
+                lanes = [
+                    (cell, crop) for cell, crop in lanes
+                    if not open_water.crop_day_loop_open_water(
+                        crop_count + 1, data, cell, crop, debug_flag)]
+
+                # Traced lanes are run with python day loop
+                for cell, crop in lanes:
+                    if crop_trace.trace_flag(data, cell, crop):
+                        crop_cycle.crop_day_loop(
+                            crop_count + 1, data, cell, crop, debug_flag)
+                lanes = [
+                    (cell, crop) for cell, crop in lanes
+                    if not crop_trace.trace_flag(data, cell, crop)]
+                if lanes:
+                    crop_day_loop_vector(
+                        crop_count + 1, data, lanes, debug_flag)
+
+        # Release time series (and crop parameters if streaming) for the batch
+        for cell in batch_cells:
+            if data.stream_flag:
+                cells.release_cell(cell)
+                continue
+            for attr in ['refet_df', 'weather_df', 'hist_temps_df',
+                         'climate_df', 'climate', 'calendar']:
+                if hasattr(cell, attr):
+                    delattr(cell, attr)
@@ -0,0 +1,344 @@
+"""crop_ensemble.py
+Defines read_samples, member_crop, member_stats and cell_ensemble functions
+Ensemble mode (--ensemble) runs crop parameter sample members against the
+    climate of each cell, members are lanes of the vector engine
+    (crop_cycle_vector.simulate_lanes()) and only summary statistics of each
+    member are written (ensemble_folder/CELLID_ensemble.csv)
+Called by mod_crop_et.py
+
+"""
+
+from collections import OrderedDict
+import logging
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+import crop_cycle_vector
+import crop_output
+from crop_parameters import CropParametersOverlay
+
+# Summary statistics by output field name
+#   annual : mean annual total of daily output
+#   mean : mean of daily output
+#   gs : mean of growing season values of each year
+ensemble_stat_fields = OrderedDict([
+    ('ETact', ('annual', 'et_act')), ('ETpot', ('annual', 'et_pot')),
+    ('ETbas', ('annual', 'et_bas')), ('Kc', ('mean', 'kc_act')),
+    ('Kcb', ('mean', 'kc_bas')), ('NIWR', ('annual', 'niwr')),
+    ('Irrigation', ('annual', 'irrigation')),
+    ('Runoff', ('annual', 'runoff')), ('DPerc', ('annual', 'dperc')),
+    ('P_rz', ('annual', 'p_rz')), ('P_eft', ('annual', 'p_eft')),
+    ('Season', ('annual', 'season')), ('Cutting', ('annual', 'cutting')),
+    ('Start_DOY', ('gs', 0)), ('End_DOY', ('gs', 1)),
+    ('GS_Length', ('gs', 2))])
+
+# Integer crop parameters that can be sampled with non-integral values
+#   (percentages, not flags, classes or curve numbers)
+continuous_params = ['mad_initial', 'mad_midseason', 'crop_fw']
+
+
+def read_samples(samples_path, data):
+    """Read crop parameter sample matrix
+
+    Parameters
+    ---------
+    samples_path : str
+        CSV file with one row per member, Crop column (crop number),
+        optional Member column (member id) and one column per sampled
+        crop parameter (i.e. t30_for_pl_or_gu_or_cgdd, mad_midseason)
+    data : dict
+        configuration data from INI file
+
+    Returns
+    -------
+    : tuple
+        samples data frame, sampled parameter names
+
+    Notes
+    -----
+    Empty values keep the crop parameter of the cell
+    Statistics of ensemble_stats INI option are checked here
+
+    """
+    unknown = [name for name in data.ensemble_stats
+               if name not in ensemble_stat_fields]
+    if unknown or not data.ensemble_stats:
+        logging.error(
+            '\nERROR: ensemble_stats must be one or more of {}'.format(
+                ', '.join(ensemble_stat_fields)))
+        sys.exit()
+    try:
+        samples_df = pd.read_csv(samples_path, comment='#')
+    except Exception as e:
+        logging.error('\nERROR: Unable to read ensemble samples {}\n  {}'.format(
+            samples_path, e))
+        sys.exit()
+    samples_df.columns = [str(c).strip() for c in samples_df.columns]
+    if 'Crop' not in samples_df.columns:
+        logging.error('\nERROR: Ensemble samples must have a Crop column')
+        sys.exit()
+    if 'Member' not in samples_df.columns:
+        samples_df.insert(0, 'Member', np.arange(1, len(samples_df) + 1))
+    if samples_df['Member'].duplicated().any():
+        logging.error('\nERROR: Ensemble member ids must be unique')
+        sys.exit()
+    param_names = [c for c in samples_df.columns if c not in ['Member', 'Crop']]
+    crop_fields = set()
+    for crop in data.crop_params.values():
+        crop_fields.update(
+            name for name, value in vars(crop).items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool))
+    unknown = [name for name in param_names if name not in crop_fields]
+    if unknown:
+        logging.error(
+            '\nERROR: Unknown crop parameters in ensemble samples: {}'.format(
+                ', '.join(unknown)))
+        sys.exit()
+    missing = sorted(
+        set(samples_df['Crop'].astype(int)) - set(data.crop_params))
+    if missing:
+        logging.error(
+            '\nERROR: Ensemble sample crops not in crop parameters: {}'.format(
+                ', '.join(str(c) for c in missing)))
+        sys.exit()
+    logging.warning('  Ensemble members: {}  Parameters: {}'.format(
+        len(samples_df), ', '.join(param_names)))
+    return samples_df, param_names
+
+def member_crop(crop, params):
+    """Crop parameters of ensemble member
+
+    Parameters
+    ---------
+    crop : CropParameters
+        crop parameters of cell
+    params : dict
+        sampled parameter values (NaN keeps cell value)
+
+    Returns
+    -------
+    : CropParametersOverlay
+
+    Notes
+    -----
+    Integer parameters keep their type if sampled value is integral
+    Integer parameters that are quantities (continuous_params, i.e.
+        mad_midseason) are stored as float otherwise, non-integral values of
+        other integer parameters (flags, classes, curve numbers) are errors
+
+    """
+    member = CropParametersOverlay(crop)
+    for name, value in params.items():
+        if pd.isnull(value):
+            continue
+        value = float(value)
+        if isinstance(getattr(crop, name), int):
+            if value.is_integer():
+                value = int(value)
+            elif name not in continuous_params:
+                logging.error(
+                    '\nERROR: Ensemble sample of integer crop parameter {} '
+                    'must be integral, not {}'.format(name, value))
+                sys.exit()
+        setattr(member, name, value)
+    return member
+
+def member_stats(et_cell, step_dates, out, stat_names):
+    """Summary statistics of each lane
+
+    Parameters
+    ---------
+    et_cell : dict
+        ETCell instance
+    step_dates : pandas.DatetimeIndex
+        daily dates of run
+    out : dict
+        daily output arrays (n_days x n_lanes)
+        (see crop_cycle_vector.simulate_lanes())
+    stat_names : list
+        ensemble_stat_fields names
+
+    Returns
+    -------
+    : dict
+        statistic values (n_lanes) by name
+
+    Notes
+    -----
+    Days without weather data are skipped (same days as output files)
+
+    """
+    daily_mask = et_cell.climate_df.index.get_indexer(step_dates) >= 0
+    daily_dt = step_dates[daily_mask]
+    periods, starts, counts = crop_output.period_groups(daily_dt.year.values)
+    year_mask = counts > 0
+    stats = {}
+    gs_values = None
+    for name in stat_names:
+        stat_type, field = ensemble_stat_fields[name]
+        if stat_type == 'gs':
+            if gs_values is None:
+                gs_values = lane_growing_seasons(
+                    daily_dt.dayofyear.values, out['season'][daily_mask],
+                    starts, counts)
+            values = lane_rows(gs_values[field])
+            with np.errstate(invalid='ignore'):
+                stats[name] = (np.nansum(values, axis=1) /
+                               np.count_nonzero(~np.isnan(values), axis=1))
+            continue
+        values = out[field][daily_mask].astype(np.float64)
+        if stat_type == 'mean':
+            stats[name] = np.nanmean(lane_rows(values), axis=1)
+        else:
+            sums, nobs = crop_output.group_sums(values, starts, counts)
+            stats[name] = lane_rows(sums[year_mask]).mean(axis=1)
+    return stats
+
+def lane_rows(values):
+    """Values of each lane as contiguous rows
+
+    Parameters
+    ---------
+    values : ndarray
+        values (n x n_lanes)
+
+    Returns
+    -------
+    : ndarray
+        values (n_lanes x n)
+
+    Notes
+    -----
+    numpy sums contiguous rows pairwise and columns one row at a time, so
+        lanes are summed as rows to get the same value for any batch size
+
+    """
+    return np.ascontiguousarray(values.T)
+
+def lane_growing_seasons(doy_array, season, starts, counts):
+    """Growing season start and end DOY and length of each year and lane
+
+    Parameters
+    ---------
+    doy_array : ndarray
+        day of year of daily dates
+    season : ndarray
+        daily season flags (n_days x n_lanes)
+    starts, counts : ndarray
+        start index and number of days of each year
+        (see crop_output.period_groups())
+
+    Returns
+    -------
+    : list
+        start DOY, end DOY and season length (n_years x n_lanes, NaN for
+        years without a season)
+
+    Notes
+    -----
+    Lane version of crop_cycle.growing_seasons()
+
+    """
+    n_years, n_lanes = len(starts), season.shape[1]
+    gs_values = [np.full((n_years, n_lanes), np.nan) for i in range(3)]
+    for year_i, (start_i, count) in enumerate(
+            zip(starts.tolist(), counts.tolist())):
+        if count == 0:
+            continue
+        group_season = season[start_i:start_i + count]
+        group_doy = doy_array[start_i:start_i + count]
+        season_diff = np.diff(group_season, axis=0)
+        active = group_season.any(axis=0)
+        for value_i, diff_value, default_doy in [
+                (0, 1, group_doy.min()), (1, -1, group_doy.max())]:
+            found = season_diff == diff_value
+            first_i = found.argmax(axis=0)
+            gs_values[value_i][year_i] = np.where(
+                found.any(axis=0), group_doy[np.minimum(first_i + 1, count - 1)],
+                default_doy)
+        gs_values[2][year_i] = group_season.sum(axis=0)
+        for values in gs_values:
+            values[year_i, ~active] = np.nan
+    return gs_values
+
+def cell_ensemble(data, et_cell, samples_df, param_names):
+    """Run ensemble members for cell and write summary statistics
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    et_cell : dict
+        ETCell instance
+    samples_df : pandas.DataFrame
+        sample matrix (see read_samples())
+    param_names : list
+        sampled parameter names
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    Members with the same structural parameters (see
+        crop_cycle_vector.lane_key()) are run together in batches of
+        data.ensemble_batch_size lanes
+
+    """
+    columns = OrderedDict(
+        [('Crop', []), ('Member', [])] +
+        [(name, []) for name in param_names] +
+        [(name, []) for name in data.ensemble_stats])
+    for crop_num, crop_df in samples_df.groupby(
+            samples_df['Crop'].astype(int), sort=True):
+        if (crop_num not in et_cell.crop_params or
+                et_cell.crop_flags[crop_num] == 0):
+            logging.info('  Crop {} not active, skipping'.format(crop_num))
+            continue
+        crop = et_cell.crop_params[crop_num]
+        logging.warning('Crop {} - {} ({} members)'.format(
+            crop.class_number, crop.name, len(crop_df)))
+
+        # Group members by structural crop parameters
+        lane_groups = OrderedDict()
+        for member_id, params in zip(
+                crop_df['Member'].tolist(),
+                crop_df[param_names].to_dict('records')):
+            member = member_crop(crop, params)
+            lane_groups.setdefault(
+                crop_cycle_vector.lane_key(member), []).append(
+                    (member_id, member))
+
+        batch_size = max(int(data.ensemble_batch_size), 1)
+        for members in lane_groups.values():
+            for batch_i in range(0, len(members), batch_size):
+                batch = members[batch_i:batch_i + batch_size]
+                foo, step_dates, out = crop_cycle_vector.simulate_lanes(
+                    data, [(et_cell, member) for member_id, member in batch])
+                stats = member_stats(
+                    et_cell, step_dates, out, data.ensemble_stats)
+                del foo, out
+                for lane_i, (member_id, member) in enumerate(batch):
+                    columns['Crop'].append(crop_num)
+                    columns['Member'].append(member_id)
+                    for name in param_names:
+                        columns[name].append(getattr(member, name))
+                    for name in data.ensemble_stats:
+                        columns[name].append(stats[name][lane_i])
+
+    if not columns['Crop']:
+        logging.warning('  No ensemble crops active for cell')
+        return
+    output_path = os.path.join(
+        data.ensemble_ws, '{}_ensemble.csv'.format(et_cell.cell_id))
+    header = '# Ensemble summary statistics, CellID {}\n'.format(
+        et_cell.cell_id)
+    crop_output.submit(
+        crop_output.write_csv_file, output_path, header,
+        [(name, np.array(values) if name != 'Member' else
+          [str(v) for v in values], None)
+         for name, values in columns.items()],
+        data.cet_out['annual_float_format'])
@@ -457,7 +457,21 @@ class CropETData:
                 self.gs_output_ws = 'growing_season_stats'
 
         # cet file type specifications
-        self.cet_out['file_type'] = 'csv'
+        #   csv : one file per cell, crop and time step
+        #   parquet, hdf5 : one columnar file per time step for all cells
+        #     and crops (see crop_output.py)
+        try:
+            self.cet_out['file_type'] = config.get(
+                crop_et_sec, 'output_file_type').lower()
+            if self.cet_out['file_type'] in ['', 'none']:
+                self.cet_out['file_type'] = 'csv'
+        except:
+            self.cet_out['file_type'] = 'csv'
+        if self.cet_out['file_type'] not in ['csv', 'parquet', 'hdf5']:
+            logging.error(
+                '\nERROR: output_file_type must be csv, parquet or hdf5, '
+                'not {}'.format(self.cet_out['file_type']))
+            sys.exit()
         # self.cet_out['data_structure_type'] = "DRI"
         self.cet_out['name_format'] = '%s_crop_%c.csv'
         self.cet_out['header_lines'] = 1
@@ -513,6 +527,173 @@ class CropETData:
         except:
             self.gs_limit_flag = True
 
+        # Crop day loop engine
+        #   python : one cell and crop at a time (crop_cycle.py)
+        #   vector : cells run together in lockstep (crop_cycle_vector.py)
+        #   jit : compiled day loop, needs numba (crop_cycle_jit.py)
+        try:
+            self.engine = config.get(crop_et_sec, 'engine').lower()
+        except:
+            self.engine = 'python'
+        if self.engine not in ['python', 'vector', 'jit']:
+            logging.error(
+                '\nERROR: engine must be python, vector or jit, not {}'.format(
+                    self.engine))
+            sys.exit()
+        try:
+            self.vector_batch_size = config.getint(
+                crop_et_sec, 'vector_batch_size')
+        except:
+            self.vector_batch_size = 50
+
+        # Crop parameter ensemble (--ensemble, see crop_ensemble.py)
+        #   summary statistics of each member and members run at once
+        try:
+            self.ensemble_ws = os.path.join(
+                self.project_ws, config.get(crop_et_sec, 'ensemble_folder'))
+        except:
+            self.ensemble_ws = os.path.join(self.project_ws, 'ensemble_stats')
+        try:
+            self.ensemble_stats = [
+                name.strip() for name in
+                config.get(crop_et_sec, 'ensemble_stats').split(',')
+                if name.strip()]
+        except:
+            self.ensemble_stats = ['ETact', 'NIWR', 'Irrigation', 'Start_DOY',
+                                   'End_DOY', 'GS_Length']
+        try:
+            self.ensemble_batch_size = config.getint(
+                crop_et_sec, 'ensemble_batch_size')
+        except:
+            self.ensemble_batch_size = 200
+
+        # Number of weather/RefET stations kept in memory (0 to disable)
+        try:
+            self.station_cache_size = config.getint(
+                crop_et_sec, 'station_cache_size')
+        except:
+            self.station_cache_size = 20
+
+        # Processed station time series saved to disk (None to disable)
+        try:
+            self.climate_store_ws = config.get(
+                crop_et_sec, 'climate_store_folder')
+            if self.climate_store_ws in ['', 'None']:
+                self.climate_store_ws = None
+        except:
+            self.climate_store_ws = None
+        if self.climate_store_ws is not None:
+            self.climate_store_ws = os.path.join(
+                self.project_ws, self.climate_store_ws)
+            if not os.path.isdir(self.climate_store_ws):
+                os.makedirs(self.climate_store_ws)
+
+        # Crop state checkpoints (None to disable)
+        #   State of each cell and crop is saved at last boundary day and
+        #   later runs with same inputs only simulate days after it
+        try:
+            self.checkpoint_ws = config.get(crop_et_sec, 'checkpoint_folder')
+            if self.checkpoint_ws in ['', 'None']:
+                self.checkpoint_ws = None
+        except:
+            self.checkpoint_ws = None
+        if self.checkpoint_ws is not None:
+            self.checkpoint_ws = os.path.join(
+                self.project_ws, self.checkpoint_ws)
+            if not os.path.isdir(self.checkpoint_ws):
+                os.makedirs(self.checkpoint_ws)
+        try:
+            self.checkpoint_boundary = config.get(
+                crop_et_sec, 'checkpoint_boundary').lower()
+        except:
+            self.checkpoint_boundary = 'year'
+        if self.checkpoint_boundary not in ['year', 'month']:
+            logging.error(
+                '\nERROR: checkpoint_boundary must be year or month, '
+                'not {}'.format(self.checkpoint_boundary))
+            sys.exit()
+
+        # Daily crop state traces of selected cells and crops (None to
+        #   disable), replaces debug mode for multiprocessing runs
+        try:
+            self.trace_ws = config.get(crop_et_sec, 'trace_folder')
+            if self.trace_ws in ['', 'None']:
+                self.trace_ws = None
+        except:
+            self.trace_ws = None
+        if self.trace_ws is not None:
+            self.trace_ws = os.path.join(self.project_ws, self.trace_ws)
+            if not os.path.isdir(self.trace_ws):
+                os.makedirs(self.trace_ws)
+        try:
+            self.trace_cells = [
+                cell_id.strip() for cell_id in
+                config.get(crop_et_sec, 'trace_cells').split(',')
+                if cell_id.strip() and cell_id.strip() != 'None']
+        except:
+            self.trace_cells = []
+        try:
+            self.trace_crops = list(util.parse_int_set(
+                config.get(crop_et_sec, 'trace_crops')))
+        except:
+            self.trace_crops = []
+        try:
+            tdt = config.get(crop_et_sec, 'trace_start_date')
+            if tdt == 'None': tdt = None
+        except:
+            tdt = None
+        self.trace_start_dt = None if tdt is None else pd.to_datetime(tdt)
+        try:
+            tdt = config.get(crop_et_sec, 'trace_end_date')
+            if tdt == 'None': tdt = None
+        except:
+            tdt = None
+        self.trace_end_dt = None if tdt is None else pd.to_datetime(tdt)
+
+        # Set crop parameters and time series one cell at a time and
+        #   release them once the cell is processed (bounded memory)
+        try:
+            self.stream_flag = config.getboolean(crop_et_sec, 'stream_flag')
+        except:
+            self.stream_flag = False
+
+        # Number of output files queued for background writer thread
+        #   (0 writes files in crop day loop)
+        try:
+            self.write_queue_size = config.getint(
+                crop_et_sec, 'write_queue_size')
+        except:
+            self.write_queue_size = 8
+        if self.write_queue_size < 0:
+            logging.error(
+                '\nERROR: write_queue_size must be 0 or greater')
+            sys.exit()
+
+        # Number of cells with time series read ahead in background threads
+        #   (0 reads time series when cell is processed)
+        try:
+            self.prefetch_depth = config.getint(crop_et_sec, 'prefetch_depth')
+        except:
+            self.prefetch_depth = 2
+        if self.prefetch_depth < 0:
+            logging.error('\nERROR: prefetch_depth must be 0 or greater')
+            sys.exit()
+
+        # Run manifest of completed cells and crops (csv output only)
+        #   lets failed runs be resumed with --resume
+        try:
+            self.manifest_flag = config.getboolean(
+                crop_et_sec, 'manifest_flag')
+        except:
+            self.manifest_flag = False
+        self.manifest_path = None
+
+        # Shard of cells run by this process (set with --shard)
+        self.shard = None
+
+        # Climate scenario of run (set with --scenarios, see
+        #   climate_scenarios.py)
+        self.scenario = None
 
         # Spatially varying calibration
         try: self.spatial_cal_flag = config.getboolean(crop_et_sec,
@@ -0,0 +1,647 @@
+"""crop_output.py
+Defines period_groups, group_sums, group_means and write_csv functions
+Array based replacements for the pandas resample and to_csv calls used to
+    write crop output files (files are byte for byte the same)
+Defines ColumnarOutput class for single file (parquet or hdf5) output
+Defines AsyncWriter class for writing output files in background thread
+Called by crop_cycle.py and mod_crop_et.py
+
+"""
+
+import logging
+import os
+import queue
+import sys
+import threading
+import numpy as np
+import pandas as pd
+
+import cell_shards
+
+# Time steps of columnar output
+timesteps = ['daily', 'monthly', 'annual', 'gs']
+
+# Columnar output of this process (None in pool workers, tables of
+#   workers are returned to main process)
+columnar_output = None
+_pending_tables = []
+
+# Background writer of this process (None writes files immediately)
+writer = None
+
+
+def period_groups(labels):
+    """Start index and length of each period of sorted daily labels
+
+    Parameters
+    ---------
+    labels : ndarray
+        sorted period number of each day (i.e. year * 12 + month)
+
+    Returns
+    -------
+    : tuple
+        periods (all periods from first to last label), starts, counts
+
+    Notes
+    -----
+    Periods without days are kept (like pandas resample)
+
+    """
+    periods = np.arange(labels[0], labels[-1] + 1)
+    starts = np.searchsorted(labels, periods, side='left')
+    counts = np.searchsorted(labels, periods, side='right') - starts
+    return periods, starts, counts
+
+def group_sums(values, starts, counts):
+    """Period sums and counts of float values
+
+    Parameters
+    ---------
+    values : ndarray
+        daily values (days x fields)
+    starts : ndarray
+        start index of each period
+    counts : ndarray
+        number of days in each period
+
+    Returns
+    -------
+    : tuple
+        sums, number of values (periods x fields)
+
+    Notes
+    -----
+    NaN values are skipped
+    Compensated (Kahan) summation in same order as pandas groupby sum so
+        sums are identical to resample().apply(np.sum)
+    Periods are summed together, one day of the period at a time
+
+    """
+    sums = np.zeros((len(starts), values.shape[1]))
+    comps = np.zeros(sums.shape)
+    nobs = np.zeros(sums.shape, dtype=np.int64)
+    for day_i in range(int(counts.max()) if len(counts) else 0):
+        active = np.flatnonzero(counts > day_i)
+        value = values[starts[active] + day_i]
+        valid = ~np.isnan(value)
+        sum_old = sums[active]
+        y = value - comps[active]
+        t = sum_old + y
+        comps[active] = np.where(valid, t - sum_old - y, comps[active])
+        sums[active] = np.where(valid, t, sum_old)
+        nobs[active] += valid
+    return sums, nobs
+
+def group_means(values, starts, counts):
+    """Period means of float values (NaN if period has no values)
+
+    Parameters
+    ---------
+    values : ndarray
+        daily values (days x fields)
+    starts : ndarray
+        start index of each period
+    counts : ndarray
+        number of days in each period
+
+    Returns
+    -------
+    : ndarray
+        means (periods x fields)
+
+    """
+    sums, nobs = group_sums(values, starts, counts)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(nobs > 0, sums / nobs, np.nan)
+
+def group_int_sums(values, starts, counts):
+    """Period sums of integer values
+
+    Parameters
+    ---------
+    values : ndarray
+        daily values (days)
+    starts : ndarray
+        start index of each period
+    counts : ndarray
+        number of days in each period
+
+    Returns
+    -------
+    : ndarray
+        sums (periods)
+
+    """
+    cumsum = np.concatenate([[0], np.cumsum(values)])
+    return cumsum[starts + counts] - cumsum[starts]
+
+def _quote(value):
+    """Quote field like csv.QUOTE_MINIMAL if it has special characters"""
+    if any(c in value for c in ',"\r\n'):
+        return '"{}"'.format(value.replace('"', '""'))
+    return value
+
+def _column_spec(values, fmt=None, float_format=None):
+    """Format spec and values of output column
+
+    Parameters
+    ---------
+    values : ndarray or list
+        column values
+    fmt : str
+        % format of numeric values (None for default format)
+    float_format : str
+        % format of float values if fmt is None (like pandas to_csv)
+
+    Returns
+    -------
+    : tuple
+        (format spec of row template, list of values)
+
+    Notes
+    -----
+    Default formats are same as pandas to_csv (repr for floats, str for
+        integers), NaN values are written as empty fields
+
+    """
+    values = np.asarray(values)
+    if values.dtype.kind in 'iu':
+        spec, value_list = fmt or '%d', values.tolist()
+    elif values.dtype.kind == 'f':
+        spec, value_list = fmt or float_format or '%r', values.tolist()
+        if np.isnan(values).any():
+            value_list = [_quote(spec % v) if v == v else ''
+                          for v in value_list]
+            spec = '%s'
+    else:
+        spec, value_list = '%s', [_quote(str(v)) for v in values.tolist()]
+    if spec != '%s' and any(c in spec for c in ',"\r\n'):
+        value_list = [_quote(spec % v) for v in value_list]
+        spec = '%s'
+    return spec, value_list
+
+def write_csv(output_f, columns, float_format=None):
+    """Write delimited table of columns to open file
+
+    Parameters
+    ---------
+    output_f : file
+        output file (opened with newline='')
+    columns : list
+        (field name, values, format) for each column
+        values can be ndarray or list of str, format can be None
+    float_format : str
+        % format of float columns without format
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    Each row is formatted with a single % operation from a row template
+        instead of formatting every value separately
+    Lines end with os.linesep like pandas to_csv
+
+    """
+    specs, value_lists = zip(*[
+        _column_spec(values, fmt, float_format)
+        for name, values, fmt in columns])
+    row_fmt = ','.join(specs)
+    output_f.write(','.join(_quote(name) for name, v, f in columns) +
+                   os.linesep)
+    if len(value_lists[0]):
+        output_f.write(os.linesep.join(
+            [row_fmt % row for row in zip(*value_lists)]) + os.linesep)
+
+def write_csv_file(output_path, header, columns=None, float_format=None):
+    """Write output file with comment header and delimited table
+
+    Parameters
+    ---------
+    output_path : str
+        output file path
+    header : str
+        comment lines written before table
+    columns : list
+        (field name, values, format) for each column (None for no table)
+    float_format : str
+        % format of float columns without format
+
+    Returns
+    -------
+    None
+
+    """
+    with open(output_path, 'w', newline='') as output_f:
+        output_f.write(header)
+        if columns is not None:
+            write_csv(output_f, columns, float_format=float_format)
+
+class ColumnarOutput:
+    """Columnar output files of all cells and crops
+
+    Attributes
+    ----------
+    file_type : str
+        parquet or hdf5
+    paths : dict
+        output file path of each time step
+    cell_id_size : int
+        length of longest cell id (hdf5 string column size)
+    writers : dict
+        open parquet writer or hdf5 store of each time step
+
+    Notes
+    -----
+    Each (cell, crop) table is appended as soon as it's done
+    Parquet files get one compressed row group per (cell, crop)
+    HDF5 files get one compressed, chunked table with indexed CellID and
+        Crop columns so slices can be read with where queries
+    Files are only opened by main process (single writer)
+
+    """
+
+    def __init__(self, data, cell_id_size):
+        self.file_type = data.cet_out['file_type']
+        self.paths = {
+            timestep: columnar_path(data, timestep)
+            for timestep in timesteps if output_flag(data, timestep)}
+        self.cell_id_size = cell_id_size
+        self.writers = {}
+        self.schemas = {}
+        if self.file_type == 'parquet':
+            try:
+                import pyarrow
+                import pyarrow.parquet
+            except ImportError:
+                logging.error(
+                    '\nERROR: output_file_type parquet requires pyarrow')
+                sys.exit()
+        elif self.file_type == 'hdf5':
+            try:
+                import tables
+            except ImportError:
+                logging.error(
+                    '\nERROR: output_file_type hdf5 requires pytables')
+                sys.exit()
+
+    def append(self, timestep, table):
+        """Append (cell, crop) table to output file of time step
+
+        Parameters
+        ---------
+        timestep : str
+            daily, monthly, annual or gs
+        table : pandas.DataFrame
+            output table (see append_table())
+
+        Returns
+        -------
+        None
+
+        """
+        if self.file_type == 'parquet':
+            import pyarrow
+            import pyarrow.parquet
+            if timestep not in self.writers:
+                arrow_table = pyarrow.Table.from_pandas(
+                    table, preserve_index=False)
+                self.schemas[timestep] = arrow_table.schema
+                self.writers[timestep] = pyarrow.parquet.ParquetWriter(
+                    self.paths[timestep], arrow_table.schema,
+                    compression='snappy')
+            else:
+                arrow_table = pyarrow.Table.from_pandas(
+                    table, schema=self.schemas[timestep],
+                    preserve_index=False)
+            self.writers[timestep].write_table(arrow_table)
+        else:
+            if timestep not in self.writers:
+                self.writers[timestep] = pd.HDFStore(
+                    self.paths[timestep], mode='w', complevel=5,
+                    complib='zlib')
+            str_cols = [col for col in table.columns
+                        if table[col].dtype == object]
+            min_itemsize = {col: 10 for col in str_cols}
+            min_itemsize['CellID'] = self.cell_id_size
+            self.writers[timestep].append(
+                'crop_et', table, format='table', index=False,
+                data_columns=['CellID', 'Crop'] + [
+                    col for col in str_cols if col != 'CellID'],
+                min_itemsize=min_itemsize)
+
+    def close(self):
+        """Close output files (hdf5 CellID and Crop columns are indexed)"""
+        for writer in self.writers.values():
+            if self.file_type == 'hdf5':
+                writer.create_table_index(
+                    'crop_et', columns=['CellID', 'Crop'], kind='full')
+            writer.close()
+        self.writers = {}
+
+
+def output_flag(data, timestep):
+    """True if output of time step is written"""
+    if timestep == 'gs':
+        return data.gs_output_flag
+    return data.cet_out['{}_output_flag'.format(timestep)]
+
+def columnar_path(data, timestep):
+    """Path of columnar output file of time step
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    timestep : str
+        daily, monthly, annual or gs
+
+    Returns
+    -------
+    : str
+        i.e. daily_stats/daily_crop_et.parquet
+        (daily_stats/daily_crop_et_shard_1_of_4.parquet for shards)
+
+    """
+    if timestep == 'gs':
+        output_ws = data.gs_output_ws
+    else:
+        output_ws = data.cet_out['{}_output_ws'.format(timestep)]
+    ext = {'parquet': '.parquet', 'hdf5': '.h5'}[data.cet_out['file_type']]
+    return cell_shards.shard_path(
+        os.path.join(output_ws, '{}_crop_et{}'.format(timestep, ext)),
+        data.shard)
+
+def open_columnar_output(data, cell_ids):
+    """Open columnar output of run in this process
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    cell_ids : list
+        cell ids of run
+
+    Returns
+    -------
+    None
+
+    """
+    global columnar_output
+    columnar_output = new_columnar_output(data, cell_ids)
+
+def new_columnar_output(data, cell_ids):
+    """Columnar output of run that isn't the output of this process
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    cell_ids : list
+        cell ids of run
+
+    Returns
+    -------
+    : ColumnarOutput
+
+    Notes
+    -----
+    Used when tables of several runs (i.e. climate scenarios) are written
+        by main process, see write_tables()
+
+    """
+    return ColumnarOutput(
+        data, max([len(cell_id) for cell_id in cell_ids] + [1]))
+
+def close_columnar_output():
+    """Write pending tables and close columnar output of this process"""
+    global columnar_output
+    if columnar_output is not None:
+        write_tables(pop_tables())
+        columnar_output.close()
+        columnar_output = None
+
+def append_table(timestep, cell_id, crop_num, columns):
+    """Append (cell, crop) table to columnar output
+
+    Parameters
+    ---------
+    timestep : str
+        daily, monthly, annual or gs
+    cell_id : str
+        ET cell id
+    crop_num : int
+        crop number
+    columns : list
+        (field name, values) for each column
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    Tables are kept (see pop_tables()) if columnar output isn't open in
+        this process (pool workers)
+
+    """
+    table = pd.DataFrame(dict(
+        [('CellID', cell_id), ('Crop', np.int64(crop_num))] + columns),
+        columns=['CellID', 'Crop'] + [name for name, values in columns])
+    if columnar_output is not None:
+        submit(columnar_output.append, timestep, table)
+    else:
+        _pending_tables.append((timestep, table))
+
+def pop_tables():
+    """Remove and return tables not written by this process"""
+    tables = _pending_tables[:]
+    del _pending_tables[:]
+    return tables
+
+def write_tables(tables, output=None):
+    """Append tables of pool worker to columnar output
+
+    Parameters
+    ---------
+    tables : list
+        (timestep, table) of pool worker (see pop_tables())
+    output : ColumnarOutput
+        None [default] : columnar output of this process
+
+    Returns
+    -------
+    None
+
+    """
+    if output is None:
+        output = columnar_output
+    for timestep, table in tables:
+        submit(output.append, timestep, table)
+
+def read_columnar(path, cell_id=None, crop_num=None):
+    """Read slice of columnar output file
+
+    Parameters
+    ---------
+    path : str
+        columnar output file path (see columnar_path())
+    cell_id : str
+        ET cell id (None for all cells)
+    crop_num : int
+        crop number (None for all crops)
+
+    Returns
+    -------
+    : pandas.DataFrame
+
+    Notes
+    -----
+    Only row groups (parquet) or rows (hdf5 where query) of slice are read
+
+    """
+    if path.endswith('.parquet'):
+        filters = []
+        if cell_id is not None:
+            filters.append(('CellID', '==', cell_id))
+        if crop_num is not None:
+            filters.append(('Crop', '==', int(crop_num)))
+        return pd.read_parquet(path, filters=filters or None)
+    where = []
+    if cell_id is not None:
+        where.append('CellID == {!r}'.format(str(cell_id)))
+    if crop_num is not None:
+        where.append('Crop == {:d}'.format(int(crop_num)))
+    return pd.read_hdf(path, 'crop_et', where=where or None)
+
+
+class AsyncWriter:
+    """Background thread that writes output files
+
+    Attributes
+    ----------
+    queue : queue.Queue
+        bounded queue of write jobs (function, arguments)
+    error : str
+        first write error (None if no errors)
+    error_logged : boolean
+        True if error was already logged
+    thread : threading.Thread
+        writer thread
+
+    Notes
+    -----
+    Crop day loop continues with next crop while files of previous crop
+        are written
+    submit() waits when queue is full so output never builds up in memory
+        faster than it's written (back-pressure)
+    Jobs after an error are skipped, error is reported by next submit(),
+        flush() or close()
+
+    """
+
+    def __init__(self, queue_size):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.error = None
+        self.error_logged = False
+        self.thread = threading.Thread(
+            target=self._run, name='cet_writer', daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                self.queue.task_done()
+                break
+            if self.error is None:
+                try:
+                    job[0](*job[1:])
+                except Exception as e:
+                    self.error = '{}: {}'.format(type(e).__name__, e)
+            self.queue.task_done()
+
+    def check(self):
+        """Exit if a write job failed"""
+        if self.error is not None:
+            self.log_error()
+            sys.exit()
+
+    def log_error(self):
+        """Log write error once"""
+        if self.error is not None and not self.error_logged:
+            logging.error('\nERROR: Unable to write output\n  {}'.format(
+                self.error))
+            self.error_logged = True
+
+    def submit(self, func, *args):
+        """Queue write job, waits if queue is full"""
+        self.check()
+        self.queue.put((func,) + args)
+
+    def flush(self):
+        """Wait until all queued jobs are written"""
+        self.queue.join()
+        self.check()
+
+    def close(self):
+        """Write queued jobs and stop thread
+
+        Returns
+        -------
+        : boolean
+            True : all jobs were written
+            False
+
+        """
+        self.queue.put(None)
+        self.thread.join()
+        return self.error is None
+
+
+def start_writer(queue_size):
+    """Start background writer of this process
+
+    Parameters
+    ---------
+    queue_size : int
+        maximum number of queued output files (0 writes files immediately)
+
+    Returns
+    -------
+    None
+
+    """
+    global writer
+    if queue_size > 0:
+        writer = AsyncWriter(queue_size)
+    else:
+        writer = None
+
+def stop_writer():
+    """Write queued files and stop background writer of this process
+
+    Returns
+    -------
+    : boolean
+        True : all files were written
+        False
+
+    """
+    global writer
+    if writer is None:
+        return True
+    closing_writer, writer = writer, None
+    if not closing_writer.close():
+        closing_writer.log_error()
+        return False
+    return True
+
+def submit(func, *args):
+    """Run write job in background writer (or now if there is no writer)"""
+    if writer is None:
+        func(*args)
+    else:
+        writer.submit(func, *args)
@@ -1,6 +1,7 @@
 """crop_parameters.py
-Defines CropParameters class
+Defines CropParameters and CropParametersOverlay classes
 Defines read_crop_parameters to read crop parameters file
+Defines overlay_crop_params to build per cell crop parameters
 Called by crop_et_data.py
 
 """
@@ -153,6 +154,55 @@ class CropParameters:
         # self.cn_medium_soil_winter = int(crop_params_path[30])
         # self.cn_fine_soil_winter   = int(crop_params_path[31])
 
+class CropParametersOverlay:
+    """Per cell crop parameters over shared base crop parameters
+
+    Attributes
+    ----------
+    _base : CropParameters
+        shared crop parameters (not modified)
+
+    Notes
+    -----
+    Attributes set on overlay (i.e. spatial calibration) are only saved in
+        overlay, all other attributes are read from base
+    Replaces copy.deepcopy of crop parameters for each cell
+
+    """
+
+    def __init__(self, base):
+        self._base = base
+
+    def __getattr__(self, name):
+        # Only called for attributes not set on overlay
+        if name == '_base':
+            raise AttributeError(name)
+        return getattr(self._base, name)
+
+    def __str__(self):
+        """ """
+        output = str(self._base)
+        for key, value in self.__dict__.items():
+            if key != '_base':
+                output += "    {k} = {v} (cell)\n".format(k=key, v=value)
+        return output
+
+def overlay_crop_params(crop_params):
+    """Build per cell crop parameters over shared crop parameters
+
+    Attributes
+    ----------
+    crop_params : dict
+        dictionary of crop parameters (CropParameters by crop number)
+
+    Returns
+    -------
+    : dict
+        dictionary of CropParametersOverlay by crop number
+
+    """
+    return {crop_num: CropParametersOverlay(crop)
+            for crop_num, crop in crop_params.items()}
 
 def read_crop_parameters(fn):
     """Read in the crop parameter text file
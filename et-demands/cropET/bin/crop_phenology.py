@@ -0,0 +1,143 @@
+"""crop_phenology.py
+Defines crop_season, crop_phenology and cell_phenology functions
+Phenology mode (--phenology) only simulates season timing (crop GDD
+    and Kcb season start/end logic), soil water balance, runoff and
+    irrigation aren't computed and no output files are written
+Called by mod_crop_et.py
+
+"""
+
+import logging
+import numpy as np
+
+import cell_calendar
+import compute_crop_gdd
+import crop_cycle
+from initialize_crop_cycle import InitializeCropCycle
+import kcb_daily
+
+
+def crop_season(data, et_cell, crop):
+    """Daily season flag of crop
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    et_cell : dict
+        ETCell instance
+    crop : dict
+        CropParameters instance
+
+    Returns
+    -------
+    : tuple
+        daily dates, day of year and season flag (1 in season) arrays
+
+    Notes
+    -----
+    Same day loop as crop_cycle.crop_day_loop() without compute_crop_et()
+    Season start and end only depend on crop GDD, T30, killing frost and
+        crop curve (kcb_daily()), none of which are changed by the water
+        balance, so season flags are the same as the full model
+
+    """
+    foo = InitializeCropCycle()
+    foo.crop_load(data, et_cell, crop)
+    if data.co2_flag:
+        foo.setup_co2(et_cell, crop)
+    foo.setup_dataframe(et_cell)
+    foo_day = crop_cycle.DayData()
+    foo_day.sdays = 0
+    foo_day.doy_prev = 0
+
+    clim = crop_cycle.crop_climate_arrays(data, et_cell, crop, foo)
+    step_dates = foo.crop_df.index
+    doy_array = foo.crop_df['doy'].values.astype(np.int64)
+    year_list = step_dates.year.tolist()
+    month_list = step_dates.month.tolist()
+    day_list = step_dates.day.tolist()
+    clim_lists = {
+        field: clim[field].tolist()
+        for field in ['u2', 'rh_min', 'etref', 'snow_depth', 'tmean', 'tmin',
+                      'tmax', 't30', 'co2'] if field in clim}
+
+    calendar = cell_calendar.cell_calendar(data, et_cell, step_dates)
+    ts_ta_list = calendar.ts_ta.tolist()
+    gs_early, gs_late = calendar.gs_window(
+        foo.longterm_pl, cell_calendar.gs_limit(data, crop))
+    gs_early_list = gs_early.tolist()
+    gs_late_list = gs_late.tolist()
+    foo_day.winter_kc_max = calendar.winter_kc_max
+
+    if not foo.in_season and foo.crop_setup_flag:
+        foo.setup_crop(crop)
+
+    season = np.zeros(len(step_dates), dtype=np.int64)
+    for step_i, doy in enumerate(doy_array.tolist()):
+        if not foo.in_season and foo.dormant_setup_flag:
+            foo.setup_dormant(et_cell, crop)
+        foo_day.sdays += 1
+        foo_day.doy = doy
+        foo_day.year = year_list[step_i]
+        foo_day.month = month_list[step_i]
+        foo_day.day = day_list[step_i]
+        for field, values in clim_lists.items():
+            setattr(foo_day, field, values[step_i])
+        foo_day.ts_ta = ts_ta_list[step_i]
+        foo_day.gs_early = gs_early_list[step_i]
+        foo_day.gs_late = gs_late_list[step_i]
+
+        compute_crop_gdd.compute_crop_gdd(crop, foo, foo_day)
+        kcb_daily.kcb_daily(data, et_cell, crop, foo, foo_day)
+        season[step_i] = foo.in_season
+
+    # Dates with weather data (same days as growing season output)
+    daily_mask = et_cell.climate_df.index.get_indexer(step_dates) >= 0
+    return step_dates[daily_mask], doy_array[daily_mask], season[daily_mask]
+
+def crop_phenology(data, et_cell, crop):
+    """Growing season start and end DOY and length of each year
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    et_cell : dict
+        ETCell instance
+    crop : dict
+        CropParameters instance
+
+    Returns
+    -------
+    : tuple
+        year, start DOY, end DOY and season length lists
+        (see crop_cycle.growing_seasons())
+
+    """
+    return crop_cycle.growing_seasons(*crop_season(data, et_cell, crop))
+
+def cell_phenology(data, et_cell):
+    """Growing seasons of all crops of cell
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    et_cell : dict
+        ETCell instance
+
+    Returns
+    -------
+    : dict
+        growing seasons (see crop_phenology()) by (cell id, crop number)
+
+    """
+    gs_stats = {}
+    for crop_num, crop in sorted(et_cell.crop_params.items()):
+        if et_cell.crop_flags[crop_num] == 0:
+            continue
+        logging.info('Crop {} - {}'.format(crop.class_number, crop.name))
+        gs_stats[(et_cell.cell_id, crop_num)] = crop_phenology(
+            data, et_cell, crop)
+    return gs_stats
@@ -0,0 +1,339 @@
+"""crop_trace.py
+Defines CropTrace class and trace_flag, start_trace and read_trace functions
+Daily crop state of selected cells, crops and dates is saved to binary trace
+    files (trace_folder) so one cell can be debugged inside a full
+    (i.e. multiprocessing) run
+Trace files are viewed or exported to csv with:
+    python crop_trace.py trace_folder/CELLID_crop_NN.npz [-f fields] [-o csv]
+Called by crop_cycle.py, crop_cycle_jit.py, crop_cycle_vector.py and
+    open_water.py
+
+"""
+
+import argparse
+import logging
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+import crop_checkpoint
+import crop_cycle_jit
+import util
+
+# Changes when trace file layout changes
+trace_version = 1
+
+# Daily inputs saved with crop state (DayData attributes)
+input_fields = ['etref', 'precip', 'tmean', 'tmin', 'tmax', 't30', 'u2',
+                'rh_min', 'snow_depth']
+input_dtype = np.dtype([(field, np.float64) for field in input_fields])
+
+# Fields shown by viewer if none are selected
+default_fields = ['in_season', 'kc_bas', 'kc_act', 'etc_act', 'depl_root',
+                  'irr_sim', 'niwr']
+
+
+def trace_flag(data, et_cell, crop):
+    """Check if cell and crop are traced
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    et_cell : dict
+        ETCell instance
+    crop : dict
+        CropParameters instance
+
+    Returns
+    -------
+    : boolean
+
+    Notes
+    -----
+    Traced crops are run with python day loop (engines without a day loop
+        in python check this first)
+
+    """
+    if data.trace_ws is None:
+        return False
+    if data.trace_cells and et_cell.cell_id not in data.trace_cells:
+        return False
+    if data.trace_crops and int(crop.class_number) not in data.trace_crops:
+        return False
+    return True
+
+def trace_path(data, et_cell, crop):
+    """Path of trace file of cell and crop
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    et_cell : dict
+        ETCell instance
+    crop : dict
+        CropParameters instance
+
+    Returns
+    -------
+    : str
+
+    """
+    return os.path.join(data.trace_ws, '{}_crop_{:02d}.npz'.format(
+        et_cell.cell_id, int(crop.class_number)))
+
+
+class CropTrace:
+    """Daily crop state of one cell and crop
+
+    Attributes
+    ----------
+    start_i, end_i : int
+        run day indices of traced dates (end_i exclusive)
+    dates : ndarray
+        traced dates
+    inputs : ndarray
+        daily inputs (input_dtype)
+    state : ndarray
+        crop state at end of day (crop_cycle_jit.state_dtype)
+    recorded : ndarray
+        True for days simulated by this run (days before a checkpoint
+        aren't simulated)
+
+    """
+
+    def __init__(self, data, et_cell, crop, step_dates):
+        """Initialize trace arrays for traced dates
+
+        Parameters
+        ---------
+        data : dict
+            configuration data from INI file
+        et_cell : dict
+            ETCell instance
+        crop : dict
+            CropParameters instance
+        step_dates : pandas.DatetimeIndex
+            daily dates of run
+
+        """
+        self.path = trace_path(data, et_cell, crop)
+        self.cell_id = et_cell.cell_id
+        self.crop_num = int(crop.class_number)
+        self.start_i = 0
+        self.end_i = len(step_dates)
+        if data.trace_start_dt is not None:
+            self.start_i = int(step_dates.searchsorted(data.trace_start_dt))
+        if data.trace_end_dt is not None:
+            self.end_i = int(step_dates.searchsorted(
+                data.trace_end_dt, side='right'))
+        self.end_i = max(self.end_i, self.start_i)
+        n_days = self.end_i - self.start_i
+        self.dates = step_dates[self.start_i:self.end_i].values.astype(
+            'datetime64[D]')
+        self.inputs = np.zeros(n_days, dtype=input_dtype)
+        self.state = np.zeros(n_days, dtype=crop_cycle_jit.state_dtype)
+        self.recorded = np.zeros(n_days, dtype=bool)
+
+    def record(self, step_i, foo, foo_day):
+        """Save crop state at end of day
+
+        Parameters
+        ---------
+        step_i : int
+            run day index
+        foo : InitializeCropCycle
+            crop state of python day loop
+        foo_day : DayData
+            daily crop data of python day loop
+
+        Returns
+        -------
+        None
+
+        """
+        if step_i < self.start_i or step_i >= self.end_i:
+            return
+        trace_i = step_i - self.start_i
+        for field in input_fields:
+            self.inputs[trace_i][field] = getattr(foo_day, field)
+        self.state[trace_i] = crop_checkpoint.foo_state(foo)[0]
+        self.recorded[trace_i] = True
+
+    def write(self):
+        """Write recorded days to trace file
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        File is written to temporary name first so partial files are
+            never read
+
+        """
+        temp_path = '{}.{}.tmp'.format(self.path, os.getpid())
+        try:
+            with open(temp_path, 'wb') as npz_f:
+                np.savez_compressed(
+                    npz_f, version=np.array(trace_version),
+                    cell_id=np.array(self.cell_id),
+                    crop=np.array(self.crop_num),
+                    dates=self.dates[self.recorded],
+                    inputs=self.inputs[self.recorded],
+                    state=self.state[self.recorded])
+            os.replace(temp_path, self.path)
+        except (IOError, OSError) as e:
+            logging.warning('  Unable to write trace {}\n  {}'.format(
+                self.path, e))
+            if os.path.isfile(temp_path):
+                os.remove(temp_path)
+
+def start_trace(data, et_cell, crop, step_dates):
+    """Trace of cell and crop
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    et_cell : dict
+        ETCell instance
+    crop : dict
+        CropParameters instance
+    step_dates : pandas.DatetimeIndex
+        daily dates of run
+
+    Returns
+    -------
+    : CropTrace
+        None if cell and crop aren't traced
+
+    Notes
+    -----
+    Day loop only checks trace for None when tracing is off
+
+    """
+    if not trace_flag(data, et_cell, crop):
+        return None
+    logging.info('  Tracing cell {} crop {}'.format(
+        et_cell.cell_id, crop.class_number))
+    return CropTrace(data, et_cell, crop, step_dates)
+
+def read_trace(path):
+    """Read trace file
+
+    Parameters
+    ---------
+    path : str
+        trace file path
+
+    Returns
+    -------
+    : pandas.DataFrame
+        daily inputs and crop state indexed by date
+
+    """
+    with np.load(path, allow_pickle=False) as npz:
+        if int(npz['version']) != trace_version:
+            raise ValueError('Unsupported trace version {}'.format(
+                int(npz['version'])))
+        trace_df = pd.DataFrame(npz['inputs'])
+        state_df = pd.DataFrame(npz['state'])
+        for field in state_df.columns:
+            trace_df[field] = state_df[field].values
+        trace_df.index = pd.DatetimeIndex(npz['dates'], name='Date')
+        trace_df.insert(0, 'CellID', str(npz['cell_id']))
+        trace_df.insert(1, 'Crop', int(npz['crop']))
+    return trace_df
+
+def parse_args():
+    """initialize parser
+
+    Parameters
+    ---------
+    None
+
+    Returns
+    -------
+    args : argparser.parse_args method
+
+    Notes
+    -----
+    Uses the argparse module
+
+    """
+    parser = argparse.ArgumentParser(
+        description='View or export Crop ET trace files',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        'trace', nargs='+', metavar='PATH',
+        help='Trace file(s)')
+    parser.add_argument(
+        '-f', '--fields', default=','.join(default_fields), metavar='LIST',
+        help='Comma separated fields to show ("all" for all fields)')
+    parser.add_argument(
+        '-s', '--start', default=None, metavar='DATE',
+        help='First date to show (YYYY-MM-DD)')
+    parser.add_argument(
+        '-e', '--end', default=None, metavar='DATE',
+        help='Last date to show (YYYY-MM-DD)')
+    parser.add_argument(
+        '-o', '--output', default=None, metavar='PATH',
+        help='Export selected fields of all trace files to CSV file')
+    parser.add_argument(
+        '-l', '--list', action='store_true', default=False,
+        help='List trace fields')
+    args = parser.parse_args()
+    for path in args.trace:
+        if not os.path.isfile(path):
+            parser.error('The file {} does not exist!'.format(path))
+    return args
+
+def main(args):
+    """View or export trace files
+
+    Parameters
+    ---------
+    args : argparse.Namespace
+        see parse_args()
+
+    Returns
+    -------
+    None
+
+    """
+    trace_df = pd.concat([read_trace(path) for path in args.trace])
+    if args.list:
+        for field in trace_df.columns:
+            print('{:24s} {}'.format(field, trace_df[field].dtype))
+        return
+    if args.fields != 'all':
+        fields = [f.strip() for f in args.fields.split(',') if f.strip()]
+        missing = [f for f in fields if f not in trace_df.columns]
+        if missing:
+            logging.error('\nERROR: Unknown trace fields: {}'.format(
+                ', '.join(missing)))
+            sys.exit()
+        trace_df = trace_df[['CellID', 'Crop'] + [
+            f for f in fields if f not in ['CellID', 'Crop']]]
+    if args.start is not None:
+        trace_df = trace_df[trace_df.index >= pd.Timestamp(args.start)]
+    if args.end is not None:
+        trace_df = trace_df[trace_df.index <= pd.Timestamp(args.end)]
+    if args.output is not None:
+        trace_df.to_csv(args.output)
+        logging.warning('  Exported {} days to {}'.format(
+            len(trace_df), args.output))
+    else:
+        with pd.option_context('display.max_rows', None,
+                               'display.max_columns', None,
+                               'display.width', 200):
+            print(trace_df)
+
+
+if __name__ == '__main__':
+    util.console_logger(log_level=logging.WARNING)
+    main(parse_args())
@@ -1,30 +1,56 @@
 """et_cell.py
-Defines ETCellData class
+Defines ETCellData class and spatial_crop_param_paths function
 Defines crop_cycle_mp, crop_cycle, crop_day_loop_mp, crop_day_loop,
     write_crop_output
 Called by mod_crop_et.py
 
 """
 
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 import datetime
 import logging
 import math
 import os
 import re
 import sys
-import copy
 import numpy as np
 import pandas as pd
 import shapefile
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),
                                              '../../lib')))
+import climate_store
 import crop_et_data
+import crop_parameters
+import csv_ingest
 import util
 
 mpdToMps = 3.2808399 * 5280 / 86400
 
+# Spatial calibration crop parameter files (crop_NN_*.dbf)
+crop_dbf_re = re.compile(r'crop_\d{2}_\w+.dbf$', re.I)
+
+
+def spatial_crop_param_paths(calibration_ws):
+    """Spatial calibration crop parameter files of calibration folder
+
+    Parameters
+    ---------
+    calibration_ws : str
+        spatial calibration folder
+
+    Returns
+    -------
+    : dict
+        file path by crop number
+
+    """
+    return dict([
+        (int(item.split('_')[1]), os.path.join(calibration_ws, item))
+        for item in os.listdir(calibration_ws)
+        if crop_dbf_re.match(item)])
+
+
 class ETCellData():
     """Functions for loading ET Cell data from static text files
 
@@ -42,6 +68,65 @@ class ETCellData():
         self.crop_num_list = []
         self.et_cells_weather_data = {}
         self.et_cells_historic_data = {}
+        self.station_cache = OrderedDict()
+
+    def get_station_data(self, station_key, et_cell):
+        """Set cached station time series on et cell
+
+        Parameters
+        ---------
+        station_key : tuple
+            station key (see ETCell.station_key())
+        et_cell : dict
+            ETCell instance
+
+        Returns
+        -------
+        : boolean
+            True : station time series were found in cache
+            False
+
+        """
+        if station_key not in self.station_cache:
+            return False
+        self.station_cache.move_to_end(station_key)
+        for attr, value in self.station_cache[station_key].items():
+            setattr(et_cell, attr, value)
+        logging.debug('  Using cached station data for {}'.format(
+            station_key[0]))
+        return True
+
+    def set_station_data(self, station_key, et_cell, cache_size):
+        """Save processed station time series of et cell in cache
+
+        Parameters
+        ---------
+        station_key : tuple
+            station key (see ETCell.station_key())
+        et_cell : dict
+            ETCell instance
+        cache_size : int
+            maximum number of stations in cache
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        Least recently used stations are removed when cache is full
+        Cached data frames are shared by cells and must not be modified
+
+        """
+        if cache_size < 1:
+            return
+        self.station_cache[station_key] = {
+            attr: getattr(et_cell, attr)
+            for attr in ['refet_df', 'weather_df', 'hist_temps_df',
+                         'climate_df', 'climate']
+            if hasattr(et_cell, attr)}
+        while len(self.station_cache) > cache_size:
+            self.station_cache.popitem(last=False)
 
     def set_cell_properties(self, data):
         """Extract ET cells properties data from specified file
@@ -64,16 +149,11 @@ class ETCellData():
         logging.info('\nReading ET Cells properties data from\n' +
                      data.cell_properties_path)
         try:
-            # Get list of 0 based line numbers to skip
-            # Ignore header but assume header was set as 1's based index
-            skiprows = [i for i in range(data.cell_properties_header_lines)
-                        if (i + 1) != data.cell_properties_names_line]
-
-            df = pd.read_csv(data.cell_properties_path, engine='python',
-                               header=data.cell_properties_names_line -
-                               len(skiprows) - 1,
-                               skiprows=skiprows,
-                               sep=data.cell_properties_delimiter)
+            df = csv_ingest.read_table(
+                data.cell_properties_path,
+                header_lines=data.cell_properties_header_lines,
+                names_line=data.cell_properties_names_line,
+                delimiter=data.cell_properties_delimiter)
             uc_columns = list(df.columns)
             columns = [x.lower() for x in uc_columns]
 
@@ -185,17 +265,12 @@ class ETCellData():
         logging.info('\nReading cell crop cuttings from\n' +
                      data.cell_cuttings_path)
         try:
-            # Get list of 0 based line numbers to skip
-            # Ignore header but assume header was set as 1's based index
-            skiprows = [i for i in range(data.cell_cuttings_header_lines)
-                        if i + 1 != data.cell_cuttings_names_line]
-
-            df = pd.read_csv(data.cell_cuttings_path, engine='python',
-                               na_values=['NaN'],
-                    header=data.cell_cuttings_names_line -
-                           len(skiprows) - 1,
-                    skiprows =skiprows, sep=data.cell_cuttings_delimiter,
-                    usecols=[0, 1, 2, 3, 4])
+            df = csv_ingest.read_table(
+                data.cell_cuttings_path,
+                header_lines=data.cell_cuttings_header_lines,
+                names_line=data.cell_cuttings_names_line,
+                delimiter=data.cell_cuttings_delimiter,
+                na_values=['NaN'], usecols=[0, 1, 2, 3, 4])
             uc_columns = list(df.columns)
             columns = [x.lower() for x in uc_columns]
             cell_col = columns.index('et cell id')
@@ -346,14 +421,14 @@ class ETCellData():
 
         Notes
         -----
+        Cells share crop_params, per cell changes are saved in overlays
 
         """
         logging.info('\nSetting static crop parameters')
 
-        # copy crop_params
         for cell_id in sorted(self.et_cells_dict.keys()):
             cell = self.et_cells_dict[cell_id]
-            cell.crop_params = copy.deepcopy(crop_params)
+            cell.crop_params = crop_parameters.overlay_crop_params(crop_params)
 
     def set_static_crop_coeffs(self, crop_coeffs):
         """set static crop coefficients
@@ -369,20 +444,22 @@ class ETCellData():
 
         Notes
         -----
+        Crop coefficients don't vary by cell and are shared (not copied)
 
         """
 
         logging.info('Setting static crop coefficients')
         for cell_id in sorted(self.et_cells_dict.keys()):
             cell = self.et_cells_dict[cell_id]
-            cell.crop_coeffs = copy.deepcopy(crop_coeffs)
+            cell.crop_coeffs = crop_coeffs
 
     def set_spatial_crop_params(self, calibration_ws):
         """set spatial crop parameters from spatial calibration
 
         Parameters
         ---------
-        crop_coeffs :
+        calibration_ws : str
+            spatial calibration folder
 
 
         Returns
@@ -395,15 +472,36 @@ class ETCellData():
         """
 
         logging.info('Setting spatially varying crop parameters')
+        self.read_spatial_crop_params(calibration_ws)
+        for cell_id, cell in sorted(self.et_cells_dict.items()):
+            self.apply_spatial_crop_params(cell)
+        return True
+
+    def read_spatial_crop_params(self, calibration_ws):
+        """Read spatial crop parameters from spatial calibration
+
+        Parameters
+        ---------
+        calibration_ws : str
+            spatial calibration folder
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        Values are saved by cell in spatial_crop_params and are applied to
+            crop parameters of each cell by apply_spatial_crop_params()
+
+        """
+
+        self.spatial_crop_params = defaultdict(list)
         cell_id_field = 'CELL_ID'
-        crop_dbf_re = re.compile('crop_\d{2}_\w+.dbf$', re.I)
 
         # Get list of crop parameter shapefiles DBFs
 
-        crop_dbf_dict = dict([
-            (int(item.split('_')[1]), os.path.join(calibration_ws, item))
-            for item in os.listdir(calibration_ws)
-            if crop_dbf_re.match(item)])
+        crop_dbf_dict = spatial_crop_param_paths(calibration_ws)
 
 
         #Check to see if crop_dbf_dict is empty
@@ -515,36 +613,101 @@ class ETCellData():
                         cutting_name = cutting_field_dict[field_name]
                     except:
                         cutting_name = None
-                    if param_name is not None:
-                        try:
-                            setattr(
-                                self.et_cells_dict[cell_id].crop_params[
-                                    crop_num], param_name, float(row_value))
-                            # print(self.et_cells_dict[cell_id].crop_params[
-                            #         crop_num], param_name, float(row_value))
-
-                        except:
-                            logging.warning(
-                                ('  The spatial crop parameter was not '
-                                 'updated\n' + '    cell_id:    {0}\n'
-                                               '    crop_num:   {1}\n' +
-                                 '    field_name: {2}\n    parameter:  {3}').
-                                    format(cell_id, crop_num, field_name,
-                                           param_name))
-                    elif cutting_name is not None:
-                        try:
-                            setattr(
-                                self.et_cells_dict[cell_id],
-                                cutting_name, float(row_value))
-                        except:
-                            logging.warning(
-                                ('  The spatial cutting parameter was not '
-                                 'updated\n' +
-                                 '    cell_id:    {0}\n    crop_num:   {1}\n' +
-                                 '    field_name: {2}\n    parameter:  {3}').
-                                    format(cell_id, crop_num, field_name,
-                                           cutting_name))
-        return True
+                    if param_name is not None or cutting_name is not None:
+                        self.spatial_crop_params[cell_id].append(
+                            (crop_num, field_name, param_name, cutting_name,
+                             row_value))
+
+    def apply_spatial_crop_params(self, et_cell):
+        """Set spatial crop parameters of et cell
+
+        Parameters
+        ---------
+        et_cell : dict
+            ETCell instance (with crop parameters set)
+
+        Returns
+        -------
+        None
+
+        """
+        for crop_num, field_name, param_name, cutting_name, row_value in \
+                self.spatial_crop_params.get(et_cell.cell_id, []):
+            if param_name is not None:
+                try:
+                    setattr(
+                        et_cell.crop_params[crop_num], param_name,
+                        float(row_value))
+                    # print(et_cell.crop_params[
+                    #         crop_num], param_name, float(row_value))
+
+                except:
+                    logging.warning(
+                        ('  The spatial crop parameter was not '
+                         'updated\n' + '    cell_id:    {0}\n'
+                                       '    crop_num:   {1}\n' +
+                         '    field_name: {2}\n    parameter:  {3}').
+                            format(et_cell.cell_id, crop_num, field_name,
+                                   param_name))
+            elif cutting_name is not None:
+                try:
+                    setattr(et_cell, cutting_name, float(row_value))
+                except:
+                    logging.warning(
+                        ('  The spatial cutting parameter was not '
+                         'updated\n' +
+                         '    cell_id:    {0}\n    crop_num:   {1}\n' +
+                         '    field_name: {2}\n    parameter:  {3}').
+                            format(et_cell.cell_id, crop_num, field_name,
+                                   cutting_name))
+
+    def set_cell_crop_params(self, et_cell, data):
+        """Set crop parameters and coefficients of single et cell
+
+        Parameters
+        ---------
+        et_cell : dict
+            ETCell instance
+        data : dict
+            configuration data from INI file
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        Used by streaming mode in place of set_static_crop_params(),
+            set_static_crop_coeffs() and set_spatial_crop_params()
+
+        """
+        et_cell.crop_params = crop_parameters.overlay_crop_params(
+            data.crop_params)
+        et_cell.crop_coeffs = data.crop_coeffs
+        if data.spatial_cal_flag:
+            self.apply_spatial_crop_params(et_cell)
+
+    def release_cell(self, et_cell):
+        """Release crop parameters and time series of processed et cell
+
+        Parameters
+        ---------
+        et_cell : dict
+            ETCell instance
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        Station time series stay in station cache if they are cached
+
+        """
+        for attr in ['crop_params', 'crop_coeffs', 'refet_df', 'weather_df',
+                     'hist_temps_df', 'climate_df', 'climate', 'calendar']:
+            if hasattr(et_cell, attr):
+                delattr(et_cell, attr)
 
 class ETCell():
     """ET cells property container
@@ -713,6 +876,7 @@ class ETCell():
             configuration data from INI file
         cells : dict
             eT cells data
+            None : don't use station cache
 
         Returns
         -------
@@ -720,8 +884,24 @@ class ETCell():
             True
             False
 
+        Notes
+        -----
+        Processed time series are shared by cells with same station key
+        and are read from climate store if it is enabled and current
+
         """
 
+        station_key = self.station_key(data)
+        if cells is not None and cells.get_station_data(station_key, self):
+            return True
+        if data.climate_store_ws is not None:
+            station_hash = climate_store.input_hash(data, self, station_key)
+            if climate_store.read_climate_store(
+                    data, self, station_key, station_hash):
+                if cells is not None:
+                    cells.set_station_data(
+                        station_key, self, data.station_cache_size)
+                return True
         if not self.set_refet_data(data, cells):
             return False
         if data.refet_ratios_path:
@@ -735,8 +915,42 @@ class ETCell():
 
         # Process climate arrays
         self.process_climate(data)
+        if data.climate_store_ws is not None:
+            climate_store.write_climate_store(
+                data, self, station_key, station_hash)
+        if cells is not None:
+            cells.set_station_data(
+                station_key, self, data.station_cache_size)
         return True
 
+    def station_key(self, data):
+        """Key of processed station time series
+
+        Parameters
+        ---------
+        data : dict
+            configuration data from INI file
+
+        Returns
+        -------
+        : tuple
+
+        Notes
+        -----
+        Time series depend on refet_id and aridity rating of cell
+        Air pressure is only needed if tdew is computed from q
+        Climate scenario is added in scenario mode (see climate_scenarios.py)
+
+        """
+        if 'q' in data.weather['fnspec']:
+            station_key = (self.refet_id, self.aridity_rating,
+                           self.air_pressure)
+        else:
+            station_key = (self.refet_id, self.aridity_rating)
+        if data.scenario is not None:
+            station_key += (data.scenario,)
+        return station_key
+
     def set_refet_data(self, data, cells):
         """Read ETo/ETr data file for single station
 
@@ -797,8 +1011,7 @@ class ETCell():
                     field_key, field_units))
 
         # set date attributes
-        self.refet_df['doy'] = [int(ts.strftime('%j')) for ts in
-                                self.refet_df.index]
+        self.refet_df['doy'] = self.refet_df.index.dayofyear
         return True
 
     def SF_P_refet_data(self, data):
@@ -821,15 +1034,13 @@ class ETCell():
                                   % self.refet_id)
         logging.debug('  {0}'.format(refet_path))
 
-        # Get list of 0 based line numbers to skip
-        # Ignore header but assume header was set as a 1's based index
-        skiprows = [i for i in range(data.refet['header_lines'])
-                    if i + 1 != data.refet['names_line']]
+        # Only configured fields are read
         try:
-            self.refet_df = pd.read_csv(
-                refet_path, engine='python',
-                header=data.refet['names_line'] - len(skiprows) - 1,
-                skiprows=skiprows, delimiter=data.refet['delimiter'])
+            self.refet_df = csv_ingest.read_table(
+                refet_path, header_lines=data.refet['header_lines'],
+                names_line=data.refet['names_line'],
+                delimiter=data.refet['delimiter'],
+                fields=data.refet['fields'])
         except IOError:
             logging.error(('  IOError: RefET data file could not be read ' +
                            'and may not exist\n  {}').format(refet_path))
@@ -858,8 +1069,7 @@ class ETCell():
         if data.refet['fields']['date'] is not None:
             self.refet_df['date'] = pd.to_datetime(self.refet_df['date'])
         else:
-            self.refet_df['date'] = self.refet_df[['year', 'month', 'day']].\
-                apply(lambda s: datetime.datetime(*s), axis=1)
+            self.refet_df['date'] = csv_ingest.ymd_datetimes(self.refet_df)
         self.refet_df.set_index('date', inplace=True)
 
         # truncate period
@@ -1042,8 +1252,7 @@ class ETCell():
                               format(field_key, field_units))
 
         # set date attributes
-        self.weather_df['doy'] = [int(ts.strftime('%j')) for ts in
-                                  self.weather_df.index]
+        self.weather_df['doy'] = self.weather_df.index.dayofyear
 
         # Scale wind height to 2m if necessary
         if data.weather['wind_height'] != 2:
@@ -1128,14 +1337,13 @@ class ETCell():
                                     data.weather['name_format'] % self.refet_id)
         logging.debug('  {0}'.format(weather_path))
 
-        # Get list of 0 based line numbers to skip
-        # Ignore header but assume header was set as 1's based index
-        skiprows = [i for i in range(data.weather['header_lines'])
-                    if i+1 != data.weather['names_line']]
+        # Only configured fields (and rh_min) are read
         try:
-            self.weather_df = pd.read_csv(weather_path, engine='python',
-                    header=data.weather['names_line'] - len(skiprows) - 1,
-                    skiprows=skiprows, delimiter=data.weather['delimiter'])
+            self.weather_df = csv_ingest.read_table(
+                weather_path, header_lines=data.weather['header_lines'],
+                names_line=data.weather['names_line'],
+                delimiter=data.weather['delimiter'],
+                fields=data.weather['fields'], extra_fields=['rh_min'])
         except IOError:
             logging.error(('  IOError: Weather data file could not be read ' +
                            'and may not exist\n  {}').format(weather_path))
@@ -1170,9 +1378,8 @@ class ETCell():
         if data.weather['fields']['date'] is not None:
             self.weather_df['date'] = pd.to_datetime(self.weather_df['date'])
         else:
-            self.weather_df['date'] = self.weather_df[['year', 'month',
-                                                       'day']].apply(
-                lambda s: datetime.datetime(*s), axis=1)
+            self.weather_df['date'] = csv_ingest.ymd_datetimes(
+                self.weather_df)
         self.weather_df.set_index('date', inplace=True)
 
         # truncate period
@@ -1236,8 +1443,7 @@ class ETCell():
 
         # set date attributes
 
-        self.hist_temps_df['doy'] = [int(ts.strftime('%j')) for ts in
-                                     self.hist_temps_df.index]
+        self.hist_temps_df['doy'] = self.hist_temps_df.index.dayofyear
         return True
 
     def historical_temps(self, data):
@@ -1262,14 +1468,13 @@ class ETCell():
                                      self.refet_id)
         logging.debug('  {0}'.format(historic_path))
 
-        # Get list of 0 based line numbers to skip
-        # Ignore header but assume header was set as 1's based index
-        skiprows = [i for i in range(data.hist_temps['header_lines'])
-                    if i+1 != data.hist_temps['names_line']]
+        # Only configured fields are read
         try:
-            self.hist_temps_df = pd.read_csv(historic_path, engine='python',
-                    header=data.hist_temps['names_line'] - len(skiprows) - 1,
-                    skiprows=skiprows, delimiter=data.hist_temps['delimiter'])
+            self.hist_temps_df = csv_ingest.read_table(
+                historic_path, header_lines=data.hist_temps['header_lines'],
+                names_line=data.hist_temps['names_line'],
+                delimiter=data.hist_temps['delimiter'],
+                fields=data.hist_temps['fields'])
         except IOError:
             logging.error(('  IOError: historic data file could not be read ' +
                            'and may not exist\n  {}').format(historic_path))
@@ -1301,10 +1506,8 @@ class ETCell():
             self.hist_temps_df['date'] = pd.to_datetime(
                 self.hist_temps_df['date'])
         else:
-            self.hist_temps_df['date'] = self.hist_temps_df[['year',
-                                                             'month',
-                                                             'day']].apply(
-                lambda s: datetime.datetime(*s), axis=1)
+            self.hist_temps_df['date'] = csv_ingest.ymd_datetimes(
+                self.hist_temps_df)
         self.hist_temps_df.set_index('date', inplace=True)
 
         # truncate period
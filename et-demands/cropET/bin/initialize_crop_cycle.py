@@ -1,5 +1,5 @@
 """initialize_crop_cycle.py
-Defines InitializeCropCycle class
+Defines InitializeCropCycle class and crop state field lists
 Called by crop_cycle.py
 
 """
@@ -12,6 +12,21 @@ import sys
 
 de_initial = 10.0  # mm initial depletion for first day of crop
 
+# Crop state fields (vector engine lanes, jit state record, checkpoints)
+float_fields = [
+    'aw', 'aw3', 'cn2', 'cgdd', 'cgdd_at_planting', 'cgdd_penalty',
+    'cum_evap', 'cum_evap_prev', 'depl_root', 'depl_surface', 'depl_ze',
+    'depl_zep', 'dperc', 'etc_act', 'etc_bas', 'etc_pot', 'etref_30', 'fc',
+    'fw_irr', 'fw_spec', 'fw_std', 'gdd', 'gdd_penalty', 'height',
+    'height_max', 'height_min', 'irr_auto', 'irr_min', 'irr_sim', 'kc_act',
+    'kc_bas', 'kc_bas_mid', 'kc_bas_prev', 'kc_min', 'kc_pot', 'kr2', 'mad',
+    'mad_ini', 'mad_mid', 'n_cgdd', 'n_pl_ec', 'niwr', 'p_eft', 'p_rz',
+    'ppt_inf', 'ppt_inf_prev', 'rew', 's', 's1', 's2', 's3', 's4', 'sro',
+    'tew', 'tew2', 'tew3', 'totwatin_ze', 'wt_irr', 'zr', 'zr_max', 'zr_min']
+int_fields = ['cutting', 'cycle', 'doy_start_cycle', 'longterm_pl']
+bool_fields = ['dormant_setup_flag', 'in_season', 'irr_flag', 'real_start',
+               'stress_event']
+
 class InitializeCropCycle:
     def __init__(self):
         """Initialize for crops cycle"""
@@ -95,6 +110,11 @@ class InitializeCropCycle:
         self.dormant_setup_flag = False
         self.crop_setup_flag = True  # flag to setup crop parameter information
 
+        # Only set for flag_for_means_to_estimate_pl_or_gu cases 1 and 2
+        #   (it is not used for the other cases)
+
+        self.longterm_pl = 0
+
         # TP - Looks like its value comes from compute_crop_et(),
         # but needed for setup_dormant() below...
 
@@ -130,7 +150,8 @@ class InitializeCropCycle:
         # self.cutting = np.zeros(20, dtype=np.int)
 
         # TP - Not initialized in VB code, probably should be initialized to 0
-        # self.T2Days = 0
+        # Initialized so crop state checkpoints can save it
+        self.T2Days = 0
 
         # CGM - It doesn't seem like these need to be initialized?
         # self.e = 0.
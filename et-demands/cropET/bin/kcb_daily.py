@@ -45,13 +45,11 @@ def kcb_daily(data, et_cell, crop, foo, foo_day,
     # gs_limit sets the threshold for gs start doy relative to long-term avg
     # flag = True sets gs start doy to +/-40 of long-term avg
     # flag = False applies no limit to gs start doy
-    if data.gs_limit_flag:
-        # 40 allows start day to be +/-40 days of long-term average
-        # 40 is the threshold from original ET Demands code
-        gs_limit = 40
-    else:
-        # 365 days allow for start day to be any doy
-        gs_limit = 365
+    # 40 allows start day to be +/-40 days of long-term average
+    # 40 is the threshold from original ET Demands code
+    # 365 days allow for start day to be any doy
+    # Limit is applied with foo_day.gs_early and foo_day.gs_late
+    #   (see cell_calendar.gs_limit() and CellCalendar.gs_window())
 
 
     # Determine if inside or outside growing period
@@ -90,9 +88,8 @@ def kcb_daily(data, et_cell, crop, foo, foo_day,
             # Check if getting too late in season
             # Season hasn't started yet
             # was longterm_pl + 40 ----4/30/2009
-            if (foo.longterm_pl > 0 and
-                foo_day.doy > (foo.longterm_pl + 40) and
-                not foo.real_start):
+            # gs_late is doy > longterm_pl + 40 (see cell_calendar.gs_window())
+            if foo_day.gs_late and not foo.real_start:
                 foo.doy_start_cycle = foo_day.doy
                 foo.real_start = True
 
@@ -110,7 +107,8 @@ def kcb_daily(data, et_cell, crop, foo, foo_day,
 
                 # This is modelled startup day, but check to see if it is too early
                 # use +/- 40 days from longterm as constraint
-                if foo.longterm_pl > 0 and foo_day.doy < (foo.longterm_pl - 40):
+                # gs_early is doy < longterm_pl - 40
+                if foo_day.gs_early:
                     foo.real_start = False  # too early to start season
                     foo.doy_start_cycle = foo.longterm_pl - 40
                     if foo.doy_start_cycle < 1:
@@ -177,18 +175,18 @@ def kcb_daily(data, et_cell, crop, foo, foo_day,
             # not foo.real_start):
 
             # added gs_limit_flag 8/2020 to allow start doy to extend freely
-            if (foo.longterm_pl > 0 and
-                foo_day.doy > (foo.longterm_pl + gs_limit) and
-                not foo.real_start):
+            # gs_late is doy > longterm_pl + gs_limit
+            if foo_day.gs_late and not foo.real_start:
 
                 # longterm_pl + 40 'it is unseasonably warm (too warm).
                 # Delay start ' set to Doy on 4/29/09 (nuts)
                 foo.doy_start_cycle = foo_day.doy
                 foo.real_start = True     # Harleys Rule
-                logging.debug(
-                    ('kcb_daily(): doy_start_cycle %d  ' +
-                     'It is unseasonably warm (too warm) Harleys Rule') %
-                    (foo.doy_start_cycle))
+                if debug_flag:
+                    logging.debug(
+                        ('kcb_daily(): doy_start_cycle %d  ' +
+                         'It is unseasonably warm (too warm) Harleys Rule') %
+                        (foo.doy_start_cycle))
 
             # Start of season has not yet been determined.
             # Look for it in normal fashion:
@@ -197,7 +195,8 @@ def kcb_daily(data, et_cell, crop, foo, foo_day,
                 if foo_day.t30 > crop.t30_for_pl_or_gu_or_cgdd:  # 'JH,RGA 4/13/09
                     # added gs_limit_flag and theshold options to allow for  start dates
                     # to extend unbounded by long term average
-                    if foo.longterm_pl > 0 and foo_day.doy < (foo.longterm_pl - gs_limit):
+                    # gs_early is doy < longterm_pl - gs_limit
+                    if foo_day.gs_early:
                         foo.real_start = False  # too early to start season
                         if data.gs_limit_flag:
                             foo.doy_start_cycle = foo.longterm_pl - 40
@@ -205,9 +204,10 @@ def kcb_daily(data, et_cell, crop, foo, foo_day,
                             # Set start day to 1 if foo_day is negative and gs_limit_flag is False
                             # Can this be happen?
                             foo.doy_start_cycle = 1
-                        logging.debug(
-                            'kcb_daily(): doy_start_cycle %d  Start is too early' %
-                            (foo.doy_start_cycle))
+                        if debug_flag:
+                            logging.debug(
+                                'kcb_daily(): doy_start_cycle %d  Start is too early' %
+                                (foo.doy_start_cycle))
                         if foo.doy_start_cycle < 1:
                             foo.doy_start_cycle += 365
                     else:
@@ -303,7 +303,8 @@ def kcb_daily(data, et_cell, crop, foo, foo_day,
             foo.dormant_setup_flag = True
             # Initialize rooting depth, etc. for crop
             foo.setup_crop(crop)
-        logging.debug('kcb_daily(): in_season %d' % (foo.in_season))
+        if debug_flag:
+            logging.debug('kcb_daily(): in_season %d' % (foo.in_season))
 
     # Flag_for_means_to_estimate_pl_or_gu Case 4
 
@@ -315,7 +316,8 @@ def kcb_daily(data, et_cell, crop, foo, foo_day,
         if foo_day.doy == crop.gdd_trigger_doy:
             foo.stress_event = False
         foo.dormant_setup_flag = True
-        logging.debug('kcb_daily(): in_season %d' % (foo.in_season))
+        if debug_flag:
+            logging.debug('kcb_daily(): in_season %d' % (foo.in_season))
 
     else:
         logging.error(
@@ -398,11 +400,12 @@ def kcb_daily(data, et_cell, crop, foo, foo_day,
                         else:  # R.Allen 4/1/08
                             # Increment alfalfa curve to fall/winter cycle
                             curve_number = crop.curve_number + 2
-                        logging.debug(
-                            ('kcb_daily(): dairy_cuttings %d  cycle %d  ' +
-                             'crop_curve_number %d  curve_number %d') %
-                            (et_cell.dairy_cuttings, foo.cycle,
-                             crop.curve_number, curve_number))
+                        if debug_flag:
+                            logging.debug(
+                                ('kcb_daily(): dairy_cuttings %d  cycle %d  ' +
+                                 'crop_curve_number %d  curve_number %d') %
+                                (et_cell.dairy_cuttings, foo.cycle,
+                                 crop.curve_number, curve_number))
                     elif (crop.class_number == 1 or crop.class_number == 3 or
                           (crop.class_number >= 4 and
                            crop.curve_name.upper() == "ALFALFA 1ST CYCLE")):
@@ -417,22 +420,22 @@ def kcb_daily(data, et_cell, crop, foo, foo_day,
                         else:
                             # increment alfalfa curve to fall/winter cycle
                             curve_number = crop.curve_number + 2
-                        logging.debug(
-                            ('kcb_daily(): beef_cuttings %d  cycle %d  ' +
-                            'crop_curve_number %d  curve_number %d') %
-                            (et_cell.beef_cuttings, foo.cycle,
-                             crop.curve_number, curve_number))
+                        if debug_flag:
+                            logging.debug(
+                                ('kcb_daily(): beef_cuttings %d  cycle %d  ' +
+                                'crop_curve_number %d  curve_number %d') %
+                                (et_cell.beef_cuttings, foo.cycle,
+                                 crop.curve_number, curve_number))
 
             if cgdd_in_season < cgdd_efc:
                 foo.n_cgdd = cgdd_in_season / cgdd_efc
                 int_cgdd = min(
                     foo.max_lines_in_crop_curve_table - 1,
                     int(foo.n_cgdd * 10))
+                coeff = et_cell.crop_coeffs[curve_number]
                 foo.kc_bas = (
-                    et_cell.crop_coeffs[curve_number].data[int_cgdd] +
-                    (foo.n_cgdd * 10 - int_cgdd) *
-                    (et_cell.crop_coeffs[curve_number].data[int_cgdd+1] -
-                     et_cell.crop_coeffs[curve_number].data[int_cgdd]))
+                    coeff.data[int_cgdd] +
+                    (foo.n_cgdd * 10 - int_cgdd) * coeff.slope[int_cgdd])
                 if debug_flag:
                     logging.debug(
                         'kcb_daily(): kcb %.6f  ncumGDD %d  int_cgdd %d' %
@@ -465,18 +468,18 @@ def kcb_daily(data, et_cell, crop, foo, foo_day,
                         foo.max_lines_in_crop_curve_table - 1,
                         int(foo.n_cgdd * 10))
                     foo.mad = foo.mad_mid
-                    lentry = et_cell.crop_coeffs[curve_number].lentry
+                    coeff = et_cell.crop_coeffs[curve_number]
+                    lentry = coeff.lentry
                     # more entries in kcb array
                     if int_cgdd < lentry:
                         foo.kc_bas = (
-                            et_cell.crop_coeffs[curve_number].data[int_cgdd] +
+                            coeff.data[int_cgdd] +
                             (foo.n_cgdd * 10 - int_cgdd) *
-                            (et_cell.crop_coeffs[curve_number].data[int_cgdd+1] -
-                             et_cell.crop_coeffs[curve_number].data[int_cgdd]))
+                            coeff.slope[int_cgdd])
                     else:
                         # Hold kcb equal to last entry until either cumGDD
                         #   terminations exceeded or killing frost
-                        foo.kc_bas = et_cell.crop_coeffs[curve_number].data[lentry]
+                        foo.kc_bas = coeff.data[lentry]
                     if debug_flag:
                         logging.debug(
                             ('kcb_daily(): kc_bas %.6f  int_cgdd %d  ' +
@@ -488,9 +491,10 @@ def kcb_daily(data, et_cell, crop, foo, foo_day,
                     #   there is no extension past computed end
                     foo.in_season = False
                     foo.stress_event = False
-                    logging.debug(
-                        'kcb_daily(): curve_type 1  in_season %d' %
-                        (foo.in_season))
+                    if debug_flag:
+                        logging.debug(
+                            'kcb_daily(): curve_type 1  in_season %d' %
+                            (foo.in_season))
 
                     if crop.cutting_crop:
                         # (three curves for cycles, two cumGDD's for first and other cycles)
@@ -503,8 +507,9 @@ def kcb_daily(data, et_cell, crop, foo, foo_day,
                         # Increment and reset for next cycle
                         foo.cycle += 1
                         foo.in_season = True
-                        logging.debug(
-                            'kcb_daily(): in_season %d' % (foo.in_season))
+                        if debug_flag:
+                            logging.debug(
+                                'kcb_daily(): in_season %d' % (foo.in_season))
                         # Set basis for next cycle
                         foo.cgdd_at_planting = foo.cgdd
 
@@ -523,7 +528,8 @@ def kcb_daily(data, et_cell, crop, foo, foo_day,
                 if (crop.class_number == 1 and data.crop_one_flag):
                     # xxx...apply only if cropOneToggle is set (4/09)
                     foo.kc_bas *= data.crop_one_reducer
-                    logging.debug('kcb_daily(): kc_bas %.6f' % foo.kc_bas)
+                    if debug_flag:
+                        logging.debug('kcb_daily(): kc_bas %.6f' % foo.kc_bas)
 
             # Use this here only to invoke a total length limit
             days_into_season = foo_day.doy - foo.doy_start_cycle + 1
@@ -537,8 +543,9 @@ def kcb_daily(data, et_cell, crop, foo, foo_day,
                 # End season
                 foo.in_season = False  # This section added Jan. 2007
                 foo.stress_event = False
-                logging.debug(
-                    'kcb_daily(): curve_type 1  in_season %d' % (foo.in_season))
+                if debug_flag:
+                    logging.debug(
+                        'kcb_daily(): curve_type 1  in_season %d' % (foo.in_season))
 
         # crop.curve_type Case 2
 
@@ -563,25 +570,24 @@ def kcb_daily(data, et_cell, crop, foo, foo_day,
             #   exact value for time_for_harvest() and that it is taking absolute value.
             # Use absolute value for time_for_harvest since neg means to run
             #   until frost (Jan. 2007). also changed to <= from <
-            logging.debug(
-                ('kcb_daily(): npl_ec100 %s  time_for_harvest %.6f  ' +
-                 'abs_time_for_harvest %.6f') %
-                (npl_ec100, crop.time_for_harvest, abs(crop.time_for_harvest)))
+            if debug_flag:
+                logging.debug(
+                    ('kcb_daily(): npl_ec100 %s  time_for_harvest %.6f  ' +
+                     'abs_time_for_harvest %.6f') %
+                    (npl_ec100, crop.time_for_harvest, abs(crop.time_for_harvest)))
             # Reverting code to match VB version.
             # Problem is coming from n_pl_ec and npl_ec100 calculation above
             # print(npl_ec100)
             if npl_ec100 <= abs(crop.time_for_harvest):
             # if round(npl_ec100, 4) <= abs(crop.time_for_harvest):
-                int_pl_ec = min(
-                    foo.max_lines_in_crop_curve_table - 1., int(foo.n_pl_ec * 10.))
-
-                foo.kc_bas = (
-                    et_cell.crop_coeffs[curve_number].data[int_pl_ec] +
-                    (foo.n_pl_ec * 10. - int_pl_ec) *
-                    (et_cell.crop_coeffs[curve_number].data[int_pl_ec + 1] -
-                     et_cell.crop_coeffs[curve_number].data[int_pl_ec]))
+                # Daily table of curve (see CropCoeff.season_table())
+                foo.kc_bas = et_cell.crop_coeffs[curve_number].season_value(
+                    crop.time_for_efc, days_into_season)
 
                 if debug_flag:
+                    int_pl_ec = min(
+                        foo.max_lines_in_crop_curve_table - 1.,
+                        int(foo.n_pl_ec * 10.))
                     logging.debug(
                         'kcb_daily(): n_pl_ec0 %d  max_lines_in_crop_curve_table %d' %
                         (foo.n_pl_ec, foo.max_lines_in_crop_curve_table))
@@ -609,12 +615,14 @@ def kcb_daily(data, et_cell, crop, foo, foo_day,
                     # last valid day of stated growing season
 
                     foo.kc_bas = foo.kc_bas_prev
-                    logging.debug('kcb_daily(): kc_bas %.6f' % foo.kc_bas)
+                    if debug_flag:
+                        logging.debug('kcb_daily(): kc_bas %.6f' % foo.kc_bas)
                 else:
                     foo.in_season = False
                     foo.stress_event = False  # reset severe stress event flag
-                    logging.debug(
-                        'kcb_daily(): curve_type 2  in_season %d' % (foo.in_season))
+                    if debug_flag:
+                        logging.debug(
+                            'kcb_daily(): curve_type 2  in_season %d' % (foo.in_season))
 
         # crop.curve_type Case 3
 
@@ -630,18 +638,17 @@ def kcb_daily(data, et_cell, crop, foo, foo_day,
             crop.time_for_efc = max(crop.time_for_efc, 1.)
             foo.n_pl_ec = float(days_into_season) / crop.time_for_efc
             if foo.n_pl_ec < 1:
-                int_pl_ec = min(
-                    int(foo.n_pl_ec * 10.), foo.max_lines_in_crop_curve_table - 1)
-                foo.kc_bas = (
-                    et_cell.crop_coeffs[curve_number].data[int_pl_ec] +
-                    (foo.n_pl_ec * 10 - int_pl_ec) *
-                    (et_cell.crop_coeffs[curve_number].data[int_pl_ec + 1] -
-                     et_cell.crop_coeffs[curve_number].data[int_pl_ec]))
-                logging.debug(
-                    ('kcb_daily(): kc_bas %.6f  n_pl_ec %.6f  ' +
-                     'max_lines_in_crop_curve_table %d  int_pl_ec %d') %
-                    (foo.kc_bas, foo.n_pl_ec,
-                     foo.max_lines_in_crop_curve_table, int_pl_ec))
+                foo.kc_bas = et_cell.crop_coeffs[curve_number].season_value(
+                    crop.time_for_efc, days_into_season)
+                if debug_flag:
+                    int_pl_ec = min(
+                        int(foo.n_pl_ec * 10.),
+                        foo.max_lines_in_crop_curve_table - 1)
+                    logging.debug(
+                        ('kcb_daily(): kc_bas %.6f  n_pl_ec %.6f  ' +
+                         'max_lines_in_crop_curve_table %d  int_pl_ec %d') %
+                        (foo.kc_bas, foo.n_pl_ec,
+                         foo.max_lines_in_crop_curve_table, int_pl_ec))
                 foo.mad = foo.mad_ini
             else:
                 foo.mad = foo.mad_mid
@@ -655,18 +662,18 @@ def kcb_daily(data, et_cell, crop, foo, foo_day,
                 if DaysafterEFC <= abs(crop.time_for_harvest):
                     # Start at array index = 11 for 0 days into full cover
 
-                    nDaysafterEFC = float(DaysafterEFC) / 10 + 11
-                    int_pl_ec = min(
-                        int(nDaysafterEFC), foo.max_lines_in_crop_curve_table - 1)
-                    foo.kc_bas = (
-                        et_cell.crop_coeffs[curve_number].data[int_pl_ec] +
-                        (nDaysafterEFC - int_pl_ec) *
-                        (et_cell.crop_coeffs[curve_number].data[int_pl_ec + 1] -
-                         et_cell.crop_coeffs[curve_number].data[int_pl_ec]))
-                    logging.debug(
-                        ('kcb_daily(): kc_bas %.6f  n_pl_ec %.6f  '
-                         'nDaysafterEFC %.6f  int_pl_ec %.6f') %
-                        (foo.kc_bas, foo.n_pl_ec, nDaysafterEFC, int_pl_ec))
+                    foo.kc_bas = et_cell.crop_coeffs[curve_number].efc_value(
+                        crop.time_for_efc, days_into_season)
+                    if debug_flag:
+                        nDaysafterEFC = float(DaysafterEFC) / 10 + 11
+                        int_pl_ec = min(
+                            int(nDaysafterEFC),
+                            foo.max_lines_in_crop_curve_table - 1)
+                        logging.debug(
+                            ('kcb_daily(): kc_bas %.6f  n_pl_ec %.6f  '
+                             'nDaysafterEFC %.6f  int_pl_ec %.6f') %
+                            (foo.kc_bas, foo.n_pl_ec, nDaysafterEFC,
+                             int_pl_ec))
                 elif crop.time_for_harvest < -0.5:
                     # beyond stated end of season
                     # ------need provision to extend until frost termination
@@ -678,13 +685,15 @@ def kcb_daily(data, et_cell, crop, foo, foo_day,
                     # last valid day of stated growing season
 
                     foo.kc_bas = foo.kc_bas_prev
-                    logging.debug('kcb_daily(): kc_bas %.6f' % foo.kc_bas)
+                    if debug_flag:
+                        logging.debug('kcb_daily(): kc_bas %.6f' % foo.kc_bas)
                 else:
                     foo.in_season = False
                     foo.stress_event = False  # reset severe stress event flag
-                    logging.debug(
-                        'kcb_daily(): curve_type 3  in_season %d' %
-                        (foo.in_season))
+                    if debug_flag:
+                        logging.debug(
+                            'kcb_daily(): curve_type 3  in_season %d' %
+                            (foo.in_season))
 
         # crop.curve_type Case 4
 
@@ -740,24 +749,19 @@ def kcb_daily(data, et_cell, crop, foo, foo_day,
             else:
                 foo.mad = foo.mad_mid
             if foo.n_pl_ec <= 1:
-                int_pl_ec = min(
-                    foo.max_lines_in_crop_curve_table - 1,
-                    int(foo.n_pl_ec * 10))
-                # et_cell.crop_coeffs[curve_number].data[int_pl_ec]
-                foo.kc_bas = (
-                    et_cell.crop_coeffs[curve_number].data[int_pl_ec] +
-                    (foo.n_pl_ec * 10 - int_pl_ec) *
-                    (et_cell.crop_coeffs[curve_number].data[int_pl_ec + 1] -
-                     et_cell.crop_coeffs[curve_number].data[int_pl_ec]))
-                logging.debug('kcb_daily(): kc_bas %.6f' % foo.kc_bas)
+                foo.kc_bas = et_cell.crop_coeffs[curve_number].season_value(
+                    length_of_season, days_into_season)
+                if debug_flag:
+                    logging.debug('kcb_daily(): kc_bas %.6f' % foo.kc_bas)
             else:
                 # Beyond end of season
 
                 foo.in_season = False
                 foo.stress_event = False  # reset severe stress event flag
-                logging.debug(
-                    'kcb_daily(): curve_type 4  in_season %d' %
-                    (foo.in_season))
+                if debug_flag:
+                    logging.debug(
+                        'kcb_daily(): curve_type 4  in_season %d' %
+                        (foo.in_season))
 
         # crop.curve_type end if
 
@@ -779,10 +783,12 @@ def kcb_daily(data, et_cell, crop, foo, foo_day,
                 foo.T2Days = 0 ## Reset discount timer if prior to August
             if foo.T2Days > 0:
                 foo.kc_bas -= foo.T2Days * 0.005  #  was 0.01
-                logging.debug('kcb_daily(): kc_bas %.6f' % foo.kc_bas)
+                if debug_flag:
+                    logging.debug('kcb_daily(): kc_bas %.6f' % foo.kc_bas)
                 if foo.kc_bas < 0.1:
                     foo.kc_bas = 0.1
-                    logging.debug('kcb_daily(): kc_bas %.6f' % foo.kc_bas)
+                    if debug_flag:
+                        logging.debug('kcb_daily(): kc_bas %.6f' % foo.kc_bas)
                 foo.T2Days += 1
 
         # Determine if killing frost to cut short - begin to check after August 1.
@@ -799,7 +805,8 @@ def kcb_daily(data, et_cell, crop, foo, foo_day,
                      foo_day.doy, foo_day.year))
                 foo.in_season = False
                 foo.stress_event = False
-                logging.debug('kcb_daily(): in_season %d' % (foo.in_season))
+                if debug_flag:
+                    logging.debug('kcb_daily(): in_season %d' % (foo.in_season))
 
                 # DEADBEEF - Not currently implemented
                 # Print cutting information to a review file if alfalfa hay
@@ -883,7 +890,8 @@ def kcb_daily(data, et_cell, crop, foo, foo_day,
         elif crop.class_number == 46:
             foo.kc_bas = 0.1  # was 0.3
             # foo.kc_bas_wscc[3] = foo.kc_bas
-        logging.debug('kcb_daily(): kc_bas %.6f' % foo.kc_bas)
+        if debug_flag:
+            logging.debug('kcb_daily(): kc_bas %.6f' % foo.kc_bas)
 
         # Save kcb value for use tomorrow in case curve needs to be extended until frost
         # Save kc_bas_prev prior to CO2 adjustment to avoid double correction
@@ -912,7 +920,8 @@ def kcb_daily(data, et_cell, crop, foo, foo_day,
                 foo.kc_bas = 0.85
             elif data.refet['type'] == 'etr':
                 foo.kc_bas = 0.7
-        logging.debug('kcb_daily(): kc_bas %.6f' % foo.kc_bas)
+        if debug_flag:
+            logging.debug('kcb_daily(): kc_bas %.6f' % foo.kc_bas)
 
         # Water has only 'kcb'
 
@@ -939,9 +948,10 @@ def kcb_daily(data, et_cell, crop, foo, foo_day,
         foo.kc_bas_prev = foo.kc_bas
 
         foo.kc_bas *= foo_day.co2
-        logging.debug(
-            ('compute_crop_et(): co2 %.6f  kc_bas %.6f') %
-            (foo_day.co2, foo.kc_bas))
+        if debug_flag:
+            logging.debug(
+                ('compute_crop_et(): co2 %.6f  kc_bas %.6f') %
+                (foo_day.co2, foo.kc_bas))
 
 
 
@@ -958,9 +968,10 @@ def kcb_daily(data, et_cell, crop, foo, foo_day,
         foo.kc_bas = (
             foo.kc_bas + (0.04 * (foo_day.u2 - 2) - 0.004 * (foo_day.rh_min - 45)) *
             (foo.height / 3) ** 0.3)
-        logging.debug(
-            'kcb_daily(): kcb %.6f  u2 %.6f  rh_min %.6f  height %.6f' %
-            (foo.kc_bas, foo_day.u2, foo_day.rh_min, foo.height))
+        if debug_flag:
+            logging.debug(
+                'kcb_daily(): kcb %.6f  u2 %.6f  rh_min %.6f  height %.6f' %
+                (foo.kc_bas, foo_day.u2, foo_day.rh_min, foo.height))
 
     # ETr basis, therefore, no adjustment to kcb
 
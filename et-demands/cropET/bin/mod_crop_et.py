@@ -5,23 +5,37 @@ called by run_cet.py
 """
 
 import argparse
+from collections import OrderedDict
 import datetime
 import logging
 import multiprocessing as mp
+from multiprocessing.util import Finalize
 import os
 import sys
 import time
 import pandas as pd
 
 
+import cell_prefetch
+import cell_shards
+import climate_scenarios
 import crop_et_data
 import crop_cycle
+import crop_cycle_jit
+import crop_cycle_vector
+import crop_ensemble
+import crop_phenology
+import crop_output
 import et_cell
+import run_manifest
+import shared_climate
 import util
 
 def main(ini_path, log_level=logging.WARNING,
          etcid_to_run='ALL', debug_flag=False,
-         cal_flag=False, mp_procs=1):
+         cal_flag=False, mp_procs=1, engine=None, stream_flag=False,
+         resume_flag=False, shard=None, phenology_flag=False,
+         ensemble_path=None, scenarios_path=None):
     """Main function for running crop ET model
 
     Parameters
@@ -41,6 +55,31 @@ def main(ini_path, log_level=logging.WARNING,
     mp_procs : int
         number of cores to use for multiprocessing
         1 [default]
+    engine : str
+        crop day loop engine (python, vector or jit)
+        None [default] : use engine from INI file
+    stream_flag : boolean
+        True : set crop parameters and time series one cell at a time
+        False [default] : use stream_flag from INI file
+    resume_flag : boolean
+        True : skip cells and crops completed by earlier run of INI file
+            (see run_manifest.py)
+        False [default]
+    shard : tuple
+        (shard number (1 to N), shard count) of cells to run
+        None [default] : run all cells
+    phenology_flag : boolean
+        True : only simulate growing season timing and display mean annual
+            start/end dates (see crop_phenology.py), no output files
+        False [default]
+    ensemble_path : str
+        crop parameter sample matrix file, only summary statistics of each
+            member are written (see crop_ensemble.py)
+        None [default]
+    scenarios_path : str
+        climate scenario list file, each scenario is run with one static
+            setup (see climate_scenarios.py)
+        None [default]
 
     Returns
     -------
@@ -56,8 +95,24 @@ def main(ini_path, log_level=logging.WARNING,
     # Start console logging immediately
     logger = util.console_logger(log_level=log_level)
     logging.warning('\nPython Crop ET')
+    if phenology_flag:
+        cal_flag = True
+        if mp_procs > 1:
+            logging.warning('  Phenology mode, disabling multiprocessing')
+            mp_procs = 1
+    if scenarios_path is not None and (
+            phenology_flag or ensemble_path is not None):
+        logging.error(
+            '\nERROR: Scenario mode can not be combined with phenology or '
+            'ensemble mode')
+        sys.exit()
+    if ensemble_path is not None and mp_procs > 1:
+        logging.warning('  Ensemble mode, disabling multiprocessing')
+        mp_procs = 1
     if debug_flag and mp_procs > 1:
-        logging.warning('  Debug mode, disabling multiprocessing')
+        logging.warning(
+            '  Debug mode, disabling multiprocessing '
+            '(trace_folder traces cells in multiprocessing runs)')
         mp_procs = 1
     if mp_procs > 1:
         logging.warning('  Multiprocessing mode, {0} cores'.format(mp_procs))
@@ -73,6 +128,16 @@ def main(ini_path, log_level=logging.WARNING,
 
     # Read INI file
     data.read_cet_ini(ini_path, debug_flag)
+    if engine is not None:
+        data.engine = engine
+    if stream_flag:
+        data.stream_flag = True
+    if data.engine == 'jit' and not crop_cycle_jit.jit_available():
+        logging.warning('  numba is not installed, using python engine')
+        data.engine = 'python'
+    elif data.engine == 'jit' and debug_flag:
+        logging.warning('  Debug mode, using python engine')
+        data.engine = 'python'
 
     # Start file logging once INI file has been read
     if debug_flag:
@@ -80,7 +145,7 @@ def main(ini_path, log_level=logging.WARNING,
             logger, log_level=logging.DEBUG, output_ws=data.project_ws)
 
     # Growing season summary CSV files must be written
-    if cal_flag:
+    if cal_flag and not phenology_flag:
         logging.warning('  Setting growing_season_stats_flag = True')
         data.gs_output_flag = True
 
@@ -101,88 +166,121 @@ def main(ini_path, log_level=logging.WARNING,
     cells.filter_crops(data)
     cells.filter_cells(data)
 
-    # First apply static crop parameters to all cells
-    # Could "cell" just inherit "data" values instead ????
-    cells.set_static_crop_params(data.crop_params)
-    cells.set_static_crop_coeffs(data.crop_coeffs)
+    if data.stream_flag:
+        # Crop parameters are set as each cell is processed
+        logging.warning('  Streaming mode, processing cells one at a time')
+        if data.spatial_cal_flag:
+            cells.read_spatial_crop_params(data.spatial_cal_ws)
+    else:
+        # First apply static crop parameters to all cells
+        # Could "cell" just inherit "data" values instead ????
+        cells.set_static_crop_params(data.crop_params)
+        cells.set_static_crop_coeffs(data.crop_coeffs)
 
-    # Read spatially varying crop parameters
-    if data.spatial_cal_flag:
-        cells.set_spatial_crop_params(data.spatial_cal_ws)
+        # Read spatially varying crop parameters
+        if data.spatial_cal_flag:
+            cells.set_spatial_crop_params(data.spatial_cal_ws)
 
     # print(cells.et_cells_dict['1067'])
     # print(cells.et_cells_dict['1067'].crop_params)
     # print(cells.et_cells_dict['1067'].crop_params[40])
     # sys.exit()
     # Multiprocessing logic
-    # If cell count is low, process crops in parallel
-    # If cell count is high, process cells in parallel (crops in serial)
+    # All (cell, crop) pairs are processed by one pool of workers
+    # Largest cells are queued first so all cores stay busy
 
-    cell_mp_list, cell_mp_flag, crop_mp_flag = [], False, False
-    if mp_procs > 1:
-        logging.warning("\nSetting multiprocessing logic")
-        # if data.cet_out['data_structure_type'].upper() == 'RDB':
-        #     logging.warning("  Multiprocessing is not available for RDB output")
-        #     mp_procs = 1
-        # else:
-        if etcid_to_run == 'ALL':
-            cells_count = len(cells.et_cells_dict.keys())
-            crops_count = len(cells.crop_num_list)
-            logging.warning('  Cell count: {}'.format(cells_count))
-            logging.warning('  Crop count: {}'.format(crops_count))
-
-            # 0.5 multiplier is to prefer multiprocessing by cell
-            # because of 1 CPU time spent loading/processing weather data
-            # when multiprocessing by crop
-
-            # # Force cell_mp__flag to True for testing
-            # logging.warning("  Multiprocessing by cell")
-            # cell_mp_flag = True
-
-            if (0.5 * cells_count) > crops_count:
-                logging.warning("  Multiprocessing by cell")
-                cell_mp_flag = True
-            else:
-                logging.warning("  Multiprocessing by crop")
-                crop_mp_flag = True
-        else:
-            logging.warning("  Multiprocessing by crop")
-            crop_mp_flag = True
+    cell_id_list = [cell_id for cell_id in sorted(cells.et_cells_dict)
+                    if etcid_to_run in ['ALL', cell_id]]
+    if data.engine == 'vector' and mp_procs > 1:
+        logging.warning('  Vector engine, disabling multiprocessing')
+        mp_procs = 1
+    if data.engine == 'vector' and data.checkpoint_ws is not None:
+        logging.warning('  Vector engine, crop state checkpoints not used')
+        data.checkpoint_ws = None
+
+    # Cells of this shard (see cell_shards.py)
+    if shard is not None:
+        data.shard = shard
+        cell_id_list = cell_shards.shard_cells(
+            data, cells, cell_id_list, shard)
+    run_cell_ids = set(cell_id_list)
+
+    # Phenology mode computes growing seasons in memory
+    if phenology_flag:
+        logging.warning('  Phenology mode, only simulating season timing')
+        logging.warning("")
+        gs_stats = {}
+        for cell in input_cells(data, cells, cell_id_list):
+            gs_stats.update(crop_phenology.cell_phenology(data, cell))
+        logging.warning('\nCROPET Phenology Run Completed')
+        logging.info('\n{} seconds'.format(time.perf_counter()-clock_start))
+        print_gs_summary(data, cells, run_cell_ids, gs_stats=gs_stats)
+        return
+
+    # Ensemble mode only writes summary statistics of each member
+    if ensemble_path is not None:
+        samples_df, param_names = crop_ensemble.read_samples(
+            ensemble_path, data)
+        if not os.path.isdir(data.ensemble_ws):
+            os.makedirs(data.ensemble_ws)
+        logging.warning("")
+        crop_output.start_writer(data.write_queue_size)
+        try:
+            for cell in input_cells(data, cells, cell_id_list):
+                crop_ensemble.cell_ensemble(
+                    data, cell, samples_df, param_names)
+        finally:
+            write_flag = crop_output.stop_writer()
+        if not write_flag:
+            sys.exit()
+        logging.warning('\nCROPET Ensemble Run Completed')
+        logging.info('\n{} seconds'.format(time.perf_counter()-clock_start))
+        return
+
+    # Scenario mode runs each climate scenario with static setup above
+    if scenarios_path is not None:
+        if resume_flag:
+            logging.warning(
+                '  Scenario mode, run manifest not used, unable to resume run')
+        scenario_list = climate_scenarios.read_scenarios(
+            scenarios_path, data)
+        logging.warning("")
+        run_scenarios(scenario_list, cells, cell_id_list, mp_procs, debug_flag)
+        logging.warning('\nCROPET Scenario Run Completed')
+        logging.info('\n{} seconds'.format(time.perf_counter()-clock_start))
+        if cal_flag and data.gs_output_flag:
+            for s_data in scenario_list:
+                logging.warning('\nScenario: {}'.format(s_data.scenario))
+                print_gs_summary(s_data, cells, run_cell_ids)
+        return
+
+    # Completed cells and crops are recorded in run manifest
+    manifest_records = run_manifest.start_manifest(
+        data, ini_path, resume_flag)
+    if manifest_records:
+        cell_id_list, completed = run_manifest.skip_completed(
+            data, cells, cell_id_list, manifest_records)
+    else:
+        completed = set()
+
+    # Single file output of all cells and crops
+    if data.cet_out['file_type'] != 'csv':
+        crop_output.open_columnar_output(
+            data, sorted(cells.et_cells_dict))
 
     """
     Loop through et cells
 
     """
     logging.warning("")
-    cell_count = 0
-    for cell_id, cell in sorted(cells.et_cells_dict.items()):
-        if etcid_to_run == 'ALL' or etcid_to_run == cell_id:
-            logging.info('\nProcessing node id' + cell_id + ' with name ' +
-                         cell.cell_name)
-            cell_count += 1
-            if cell_mp_flag:
-                # Multiprocessing by cell
-                cell_mp_list.append([cell_count, data, cell, mp_procs])
-            elif crop_mp_flag:
-                # Multiprocessing by crop
-                logging.warning('CellID: {}'.format(cell_id))
-                if not cell.set_input_timeseries(cell_count, data, cells):
-                    sys.exit()
-                crop_cycle.crop_cycle_mp(data, cell, mp_procs=mp_procs)
-            else:
-                logging.warning('CellID: {}'.format(cell_id))
-                if not cell.set_input_timeseries(cell_count, data, cells):
-                    sys.exit()
-                crop_cycle.crop_cycle(data, cell, debug_flag=debug_flag)
-
-    # Multiprocess all cells
-    results = []
-    if cell_mp_list:
-        pool = mp.Pool(mp_procs)
-        results = pool.imap(cell_mp, cell_mp_list, chunksize=1)
-        pool.close()
-        pool.join()
-        del pool, results
+    crop_output.start_writer(data.write_queue_size)
+    try:
+        run_cells(data, cells, cell_id_list, mp_procs, debug_flag)
+    finally:
+        write_flag = crop_output.stop_writer()
+        crop_output.close_columnar_output()
+    if not write_flag:
+        sys.exit()
 
     logging.warning('\nCROPET Run Completed')
     logging.info('\n{} seconds'.format(time.perf_counter()-clock_start))
@@ -191,78 +289,529 @@ def main(ini_path, log_level=logging.WARNING,
     # This should be moved to separate function, module, or tool
 
     if cal_flag and data.gs_output_flag:
-        logging.warning('\nMean Annual growing season start/end dates')
-        for cell_id, cell in sorted(cells.et_cells_dict.items()):
-            logging.warning('CellID: {}'.format(cell_id))
-            for crop_num, crop in sorted(cell.crop_params.items()):
-                if cell.crop_flags[crop_num] == 0:
-                    continue
+        print_gs_summary(data, cells, run_cell_ids, completed)
+
+
+def print_gs_summary(data, cells, run_cell_ids, completed=None,
+                     gs_stats=None):
+    """Display mean annual growing season start/end dates to screen
+
+    Parameters
+    ---------
+    data : dict
+        configuration data
+    cells : dict
+        ETCellData instance
+    run_cell_ids : set
+        et cell ids of run
+    completed : set
+        (cell id, crop number) of crops completed by earlier run
+        None [default]
+    gs_stats : dict
+        growing seasons by (cell id, crop number)
+        (see crop_phenology.cell_phenology())
+        None [default] : read growing season output files
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    First year is ignored to match gs summary output csv (added 8/27/2020)
+
+    """
+    if completed is None:
+        completed = set()
+    logging.warning('\nMean Annual growing season start/end dates')
+    for cell_id, cell in sorted(cells.et_cells_dict.items()):
+        if cell_id not in run_cell_ids:
+            continue
+        logging.warning('CellID: {}'.format(cell_id))
+        for crop_num, crop in sorted(data.crop_params.items()):
+            if (cell.crop_flags[crop_num] == 0 and
+                    (cell_id, crop_num) not in completed):
+                continue
+            if gs_stats is not None:
+                gs_year, gs_start_doy, gs_end_doy, gs_length = gs_stats[
+                    (cell_id, crop_num)]
+                gs_df = pd.DataFrame({'Start_DOY': gs_start_doy,
+                                      'End_DOY': gs_end_doy})
+            elif data.cet_out['file_type'] != 'csv':
+                gs_df = crop_output.read_columnar(
+                    crop_output.columnar_path(data, 'gs'),
+                    cell_id, crop_num)
+            else:
                 gs_output_path = os.path.join(
                     data.gs_output_ws, '{0}_gs_crop_{1:02d}.csv'.format(
                         cell_id, int(crop.class_number)))
-                gs_df = pd.read_csv(gs_output_path, header=0, comment='#',
-                                      sep=',')
-                # ignore first year to match gs summary output csv (added 8/27/2020)
-
-                # print(gs_df[1:])
-                gs_start_doy = int(round(gs_df[1:]['Start_DOY'].mean()))
-                gs_end_doy = int(round(gs_df[1:]['End_DOY'].mean()))
-                gs_start_dt = datetime.datetime.strptime(
-                    '2001_{:03d}'.format(gs_start_doy), '%Y_%j')
-                gs_end_dt = datetime.datetime.strptime(
-                    '2001_{:03d}'.format(gs_end_doy), '%Y_%j')
-                logging.warning(
-                    ('  Crop {crop:2d}:' +
-                     '  {start_dt.month}/{start_dt.day} - {end_dt.month}/'
-                     '{end_dt.day}').format(
-                        crop=crop_num, start_dt=gs_start_dt, end_dt=gs_end_dt))
-
-
-def cell_mp(tup):
-    """Pool multiprocessing friendly function
+                gs_df = pd.read_csv(gs_output_path, header=0,
+                                    comment='#', sep=',')
+
+            gs_start_doy = int(round(gs_df[1:]['Start_DOY'].mean()))
+            gs_end_doy = int(round(gs_df[1:]['End_DOY'].mean()))
+            gs_start_dt = datetime.datetime.strptime(
+                '2001_{:03d}'.format(gs_start_doy), '%Y_%j')
+            gs_end_dt = datetime.datetime.strptime(
+                '2001_{:03d}'.format(gs_end_doy), '%Y_%j')
+            logging.warning(
+                ('  Crop {crop:2d}:' +
+                 '  {start_dt.month}/{start_dt.day} - {end_dt.month}/'
+                 '{end_dt.day}').format(
+                    crop=crop_num, start_dt=gs_start_dt, end_dt=gs_end_dt))
+
+def run_cells(data, cells, cell_id_list, mp_procs=1, debug_flag=False):
+    """Compute crop et of all cells with selected engine
+
+    Parameters
+    ---------
+    data : dict
+        configuration data
+    cells : dict
+        ETCellData instance
+    cell_id_list : list
+        cell ids to run
+    mp_procs : int
+        number of processors
+    debug_flag : boolean
+        True : write debug level comments to debug.txt
+        False
+
+    Returns
+    -------
+    None
+
+    """
+    if data.engine == 'vector':
+        crop_cycle_vector.crop_cycle_vector(
+            data, cells, cell_id_list, debug_flag=debug_flag)
+    elif mp_procs > 1:
+        run_pool([(data, cell_id_list)], cells, mp_procs)
+    else:
+        for cell in input_cells(data, cells, cell_id_list):
+            crop_cycle.crop_cycle(data, cell, debug_flag=debug_flag)
+
+def run_scenarios(scenario_list, cells, cell_id_list, mp_procs=1,
+                  debug_flag=False):
+    """Compute crop et of all cells for each climate scenario
 
     Parameters
     ---------
-    tup :
+    scenario_list : list
+        configuration data of each scenario
+        (see climate_scenarios.read_scenarios())
+    cells : dict
+        ETCellData instance
+    cell_id_list : list
+        cell ids to run
+    mp_procs : int
+        number of processors
+    debug_flag : boolean
+        True : write debug level comments to debug.txt
+        False
 
     Returns
     -------
-    :
+    None
 
     Notes
     -----
-    mp.Pool needs all inputs are packed into single tuple
-    Tuple is unpacked and and single processing version of function is called
+    Static setup (crop parameters, coefficients and cells) is shared by all
+        scenarios
+    With multiprocessing, (scenario, cell, crop) tasks of all scenarios are
+        run by one pool, so workers get static setup once
+    Otherwise scenarios are run one after the other
+
+    """
+    columnar_flag = scenario_list[0].cet_out['file_type'] != 'csv'
+    if scenario_list[0].engine != 'vector' and mp_procs > 1:
+        # Tables of all scenarios are written by main process
+        if columnar_flag:
+            outputs = [
+                crop_output.new_columnar_output(
+                    s_data, sorted(cells.et_cells_dict))
+                for s_data in scenario_list]
+        else:
+            outputs = None
+        crop_output.start_writer(scenario_list[0].write_queue_size)
+        try:
+            run_pool([(s_data, cell_id_list) for s_data in scenario_list],
+                     cells, mp_procs, outputs)
+        finally:
+            write_flag = crop_output.stop_writer()
+            for output in outputs or []:
+                output.close()
+        if not write_flag:
+            sys.exit()
+        return
+
+    for s_data in scenario_list:
+        logging.warning('Scenario: {}'.format(s_data.scenario))
+        if columnar_flag:
+            crop_output.open_columnar_output(
+                s_data, sorted(cells.et_cells_dict))
+        crop_output.start_writer(s_data.write_queue_size)
+        try:
+            run_cells(s_data, cells, cell_id_list, 1, debug_flag)
+        finally:
+            write_flag = crop_output.stop_writer()
+            crop_output.close_columnar_output()
+        if not write_flag:
+            sys.exit()
+
+def run_pool(run_list, cells, mp_procs, outputs=None):
+    """Compute crop et of (cell, crop) tasks of one or more runs in pool
+
+    Parameters
+    ---------
+    run_list : list
+        (configuration data, cell ids to run) of each run
+        (more than one run for climate scenarios)
+    cells : dict
+        ETCellData instance
+    mp_procs : int
+        number of processors
+    outputs : list
+        columnar output of each run
+        None [default] : columnar output of this process
+
+    Returns
+    -------
+    None
+
+    """
+    task_lists = [crop_tasks(data, cells, cell_id_list)
+                  for data, cell_id_list in run_list]
+    logging.warning('  Cell count: {}'.format(
+        sum(len(cell_id_list) for data, cell_id_list in run_list)))
+    logging.warning('  Cell/crop count: {}\n'.format(
+        sum(len(crop_task_list) for crop_task_list in task_lists)))
+    crops_left, station_tasks_left = {}, {}
+    for run_i, ((data, cell_id_list), crop_task_list) in enumerate(
+            zip(run_list, task_lists)):
+        for task in crop_task_list:
+            station_key = cells.et_cells_dict[task[1]].station_key(data)
+            crops_left[(run_i, task[1])] = (
+                crops_left.get((run_i, task[1]), 0) + 1)
+            station_tasks_left[station_key] = (
+                station_tasks_left.get(station_key, 0) + 1)
+
+    # Pool is started before any time series are read
+    # so only static data are copied to workers
+    # Streaming mode limits number of stations published ahead of pool
+    data = run_list[0][0]
+    if data.stream_flag:
+        shared = shared_climate.SharedClimate(max_stations=2 * mp_procs)
+    else:
+        shared = shared_climate.SharedClimate()
+    write_failed = mp.Value('b', 0)
+    pool = mp.Pool(mp_procs, initializer=crop_task_init,
+                   initargs=([data for data, cell_id_list in run_list],
+                             cells, mp_procs, write_failed))
+    try:
+        for run_i, cell_id, crop_num, success, tables in \
+                pool.imap_unordered(
+                    crop_task_mp,
+                    pool_tasks(run_list, cells, task_lists, shared),
+                    chunksize=1):
+            if not success:
+                pool.terminate()
+                sys.exit()
+            if tables:
+                crop_output.write_tables(
+                    tables, None if outputs is None else outputs[run_i])
+            data = run_list[run_i][0]
+            logging.info('  CellID {} crop {} done'.format(
+                cell_id, crop_num))
+            crops_left[(run_i, cell_id)] -= 1
+            if crops_left[(run_i, cell_id)] == 0:
+                if data.scenario is None:
+                    logging.warning('CellID: {}'.format(cell_id))
+                else:
+                    logging.warning('Scenario: {}  CellID: {}'.format(
+                        data.scenario, cell_id))
+            station_key = cells.et_cells_dict[cell_id].station_key(data)
+            station_tasks_left[station_key] -= 1
+            if station_tasks_left[station_key] == 0:
+                shared.release(station_key)
+
+        # Workers write their queued files before exiting
+        pool.close()
+        pool.join()
+        if write_failed.value:
+            sys.exit()
+    finally:
+        pool.terminate()
+        pool.join()
+        shared.close()
+        del pool
+
+def pool_tasks(run_list, cells, task_lists, shared):
+    """Generate pool tasks of all runs (see shared_crop_tasks())
+
+    Parameters
+    ---------
+    run_list : list
+        (configuration data, cell ids to run) of each run
+    cells : dict
+        ETCellData instance
+    task_lists : list
+        crop tasks of each run (see crop_tasks())
+    shared : dict
+        SharedClimate instance
+
+    Yields
+    ------
+    : tuple
+        (run index, cell_id, crop_count, crop_num, station_key,
+        station descriptor)
+        None if time series could not be read
 
     """
+    for run_i, ((data, cell_id_list), crop_task_list) in enumerate(
+            zip(run_list, task_lists)):
+        for task in shared_crop_tasks(data, cells, crop_task_list, shared):
+            if task is None:
+                yield None
+                return
+            yield (run_i,) + task
 
-    return cell_sp(*tup)
+def input_cells(data, cells, cell_id_list):
+    """Cells with input time series set, one at a time
+
+    Parameters
+    ---------
+    data : dict
+        configuration data
+    cells : dict
+        ETCellData instance
+    cell_id_list : list
+        et cell ids to run
 
-def cell_sp(cell_count, data, cell, mp_procs=1):
-    """Compute crop cycle for each cell
+    Yields
+    ------
+    : ETCell
+        cell with crop parameters and input time series set
+
+    Notes
+    -----
+    Time series of next cells are read while current cell runs
+    In streaming mode cell is released once caller is done with it
+
+    """
+    for cell_count, cell, read_flag in cell_prefetch.prefetch_cells(
+            data, [(cell_count, cells.et_cells_dict[cell_id])
+                   for cell_count, cell_id in enumerate(cell_id_list, 1)],
+            data.prefetch_depth,
+            cached=lambda station_key: station_key in cells.station_cache):
+        cell_id = cell.cell_id
+        logging.info('\nProcessing node id' + cell_id + ' with name ' +
+                     cell.cell_name)
+        logging.warning('CellID: {}'.format(cell_id))
+        if data.stream_flag:
+            cells.set_cell_crop_params(cell, data)
+        if read_flag is None:
+            read_flag = cell.set_input_timeseries(cell_count, data, cells)
+        elif read_flag:
+            cells.set_station_data(
+                cell.station_key(data), cell, data.station_cache_size)
+        if not read_flag:
+            sys.exit()
+        yield cell
+        if data.stream_flag:
+            cells.release_cell(cell)
+
+def crop_tasks(data, cells, cell_id_list):
+    """Build multiprocessing work queue of (cell, crop) tasks
 
     Parameters
     ---------
-    cell_count : int
-        count of cell being processed
     data : dict
         configuration data
-    cell : dict
-        ETCell instance
+    cells : dict
+        ETCellData instance
+    cell_id_list : list
+        et cell ids to run
+
+    Returns
+    -------
+    : list
+        (cell_count, cell_id, crop_count, crop_num) tuples
+
+    Notes
+    -----
+    Tasks are ordered by estimated cost (active crop count * days)
+    Cells of a station and crops of a cell stay together so station time
+        series are published once and released as soon as possible
+
+    """
+    if data.start_dt is not None and data.end_dt is not None:
+        days = (data.end_dt - data.start_dt).days + 1
+    else:
+        days = 1
+    station_tasks = OrderedDict()
+    for cell_count, cell_id in enumerate(cell_id_list, 1):
+        cell = cells.et_cells_dict[cell_id]
+        crop_num_list = [crop_num for crop_num in sorted(data.crop_params)
+                         if cell.crop_flags[crop_num] != 0]
+        station_tasks.setdefault(cell.station_key(data), []).append(
+            (len(crop_num_list) * days, [
+                (cell_count, cell_id, crop_count, crop_num)
+                for crop_count, crop_num in enumerate(crop_num_list, 1)]))
+
+    # Sorts are stable so equal cost cells stay in cell id order
+    for cell_tasks in station_tasks.values():
+        cell_tasks.sort(key=lambda x: x[0], reverse=True)
+    station_order = sorted(
+        station_tasks.values(), key=lambda x: sum(cost for cost, t in x),
+        reverse=True)
+    return [task for cell_tasks in station_order
+            for cost, tasks in cell_tasks for task in tasks]
+
+def crop_task_init(data_list, cells, mp_procs, write_failed):
+    """Pool initializer, set run data once per worker process
+
+    Parameters
+    ---------
+    data_list : list
+        configuration data of each run (see run_pool())
+    cells : dict
+        ETCellData instance
     mp_procs : int
         number of processors
-        1 [default]
+    write_failed : multiprocessing.Value
+        set to 1 if queued files of worker can't be written at exit
 
     Returns
     -------
     None
 
+    Notes
+    -----
+    Each worker has its own background writer, queued files are written
+        when worker exits (pool.close())
+
     """
-    if not cell.set_input_timeseries(cell_count, data, cell):
-        sys.exit()
+    global _task_data_list, _task_cells, _task_mp_procs, _task_stream_cell
+    _task_data_list, _task_cells, _task_mp_procs = data_list, cells, mp_procs
+    _task_stream_cell = None
+
+    # Output tables are returned to main process (single writer)
+    crop_output.columnar_output = None
+    crop_output.start_writer(data_list[0].write_queue_size)
+    Finalize(None, crop_task_exit, args=(write_failed,), exitpriority=10)
+
+def crop_task_exit(write_failed):
+    """Pool worker exit, write queued output files"""
+    if not crop_output.stop_writer():
+        write_failed.value = 1
+
+def shared_crop_tasks(data, cells, crop_task_list, shared):
+    """Generate pool tasks, publishing station time series as needed
+
+    Parameters
+    ---------
+    data : dict
+        configuration data
+    cells : dict
+        ETCellData instance
+    crop_task_list : list
+        (cell_count, cell_id, crop_count, crop_num) tuples
+    shared : dict
+        SharedClimate instance
+
+    Yields
+    ------
+    : tuple
+        (cell_id, crop_count, crop_num, station_key, station descriptor)
+        None if time series could not be read
+
+    Notes
+    -----
+    Time series of each station are read once (by main process)
+    Time series of next stations are read while current tasks run
+        (see cell_prefetch.py)
+    Tasks only hold small descriptors, workers map published arrays
+
+    """
+    cell_tasks = OrderedDict()
+    for cell_count, cell_id, crop_count, crop_num in crop_task_list:
+        cell_tasks.setdefault((cell_count, cell_id), []).append(
+            (crop_count, crop_num))
+    cell_list = [(cell_count, cells.et_cells_dict[cell_id])
+                 for cell_count, cell_id in cell_tasks]
+
+    # Generator is run by pool thread, exiting there would hang pool
+    try:
+        for cell_count, cell, read_flag in cell_prefetch.prefetch_cells(
+                data, cell_list, data.prefetch_depth,
+                cached=lambda station_key: station_key in shared.stations):
+            station_key = cell.station_key(data)
+            if station_key not in shared.stations:
+                if read_flag is None:
+                    read_flag = cell.set_input_timeseries(
+                        cell_count, data, None)
+                if not read_flag:
+                    yield None
+                    return
+                shared.publish(station_key, cell)
+
+                # Main process doesn't need time series once published
+                for attr in ['refet_df', 'weather_df', 'hist_temps_df',
+                             'climate_df', 'climate']:
+                    if hasattr(cell, attr):
+                        delattr(cell, attr)
+            for crop_count, crop_num in cell_tasks[(cell_count, cell.cell_id)]:
+                yield (cell.cell_id, crop_count, crop_num, station_key,
+                       shared.stations[station_key])
+    except SystemExit:
+        yield None
+
+def crop_task_mp(task):
+    """Compute crop cycle for one (cell, crop) task in pool worker
 
-    print('CellID: {}'.format(cell.cell_id))
-    crop_cycle.crop_cycle(data, cell, debug_flag=False, mp_procs=mp_procs)
+    Parameters
+    ---------
+    task : tuple
+        (run index, cell_id, crop_count, crop_num, station_key,
+        station descriptor)
+
+    Returns
+    -------
+    : tuple
+        (run index, cell_id, crop_num, success, columnar output tables)
+
+    Notes
+    -----
+    Published station time series are attached once per worker and station
+        and are kept in worker's station cache
+    In streaming mode, worker only keeps crop parameters of its last cell
+    Errors are returned to main process instead of exiting worker
+        (pool would wait forever for task of exited worker)
+
+    """
+    if task is None:
+        return None, None, None, False, []
+    global _task_stream_cell
+    run_i, cell_id, crop_count, crop_num, station_key, descriptor = task
+    data = _task_data_list[run_i]
+    cell = _task_cells.et_cells_dict[cell_id]
+    if data.stream_flag and _task_stream_cell is not cell:
+        if _task_stream_cell is not None:
+            _task_cells.release_cell(_task_stream_cell)
+        _task_cells.set_cell_crop_params(cell, data)
+        _task_stream_cell = cell
+    try:
+        if not _task_cells.get_station_data(station_key, cell):
+            shared_climate.attach_station_data(cell, descriptor)
+            _task_cells.set_station_data(
+                station_key, cell, data.station_cache_size)
+        crop_cycle.crop_day_loop_mp(
+            (crop_count, data, cell, cell.crop_params[crop_num],
+             False, _task_mp_procs))
+    except SystemExit:
+        return run_i, cell_id, crop_num, False, []
+    return run_i, cell_id, crop_num, True, crop_output.pop_tables()
 
 def is_valid_file(parser, arg):
     """checks if file is valid
@@ -315,6 +864,30 @@ def is_valid_directory(parser, arg):
     else:
         return arg
 
+def is_valid_shard(parser, arg):
+    """checks if shard is valid
+
+    Parameters
+    ---------
+    parser : argparse.ArgumentParser instance
+
+    arg : str
+        shard number and shard count (i.e. 2/4)
+
+    Returns
+    -------
+    : tuple
+        (shard number, shard count)
+
+    """
+    try:
+        shard_i, shard_n = [int(x) for x in arg.split('/')]
+    except ValueError:
+        parser.error('Shard {} must be formatted as I/N'.format(arg))
+    if not 1 <= shard_i <= shard_n:
+        parser.error('Shard {} must be between 1/N and N/N'.format(arg))
+    return shard_i, shard_n
+
 def parse_args():
     """initialize parser
 
@@ -356,6 +929,33 @@ def parse_args():
     parser.add_argument(
         '--cal', action='store_true', default=False,
         help="Display mean annual start/end dates to screen")
+    parser.add_argument(
+        '--phenology', action='store_true', default=False,
+        help="Only simulate growing season timing and display mean annual "
+             "start/end dates (no output files)")
+    parser.add_argument(
+        '--ensemble', default=None, metavar='PATH',
+        type=lambda x: is_valid_file(parser, x),
+        help="Run crop parameter sample matrix and write summary "
+             "statistics of each member (see crop_ensemble.py)")
+    parser.add_argument(
+        '--scenarios', default=None, metavar='PATH',
+        type=lambda x: is_valid_file(parser, x),
+        help="Run list of climate scenario weather/RefET folders with one "
+             "static setup (see climate_scenarios.py)")
+    parser.add_argument(
+        '--engine', default=None, choices=['python', 'vector', 'jit'],
+        help="Crop day loop engine (overrides INI engine)")
+    parser.add_argument(
+        '--stream', action='store_true', default=False,
+        help="Process cells one at a time with bounded memory")
+    parser.add_argument(
+        '--resume', action='store_true', default=False,
+        help="Skip cells and crops completed by earlier run")
+    parser.add_argument(
+        '--shard', default=None, metavar='I/N',
+        type=lambda x: is_valid_shard(parser, x),
+        help="Run shard I of N shards of cells (see cell_shards.py)")
     args = parser.parse_args()
 
     # Convert INI path to an absolute path if necessary
@@ -368,4 +968,8 @@ if __name__ == '__main__':
     args = parse_args()
     main(ini_path=args.ini, log_level=args.log_level,
          etcid_to_run=args.etcid, cal_flag=args.cal,
-         debug_flag=args.debug, mp_procs=args.multiprocessing)
+         debug_flag=args.debug, mp_procs=args.multiprocessing,
+         engine=args.engine, stream_flag=args.stream,
+         resume_flag=args.resume, shard=args.shard,
+         phenology_flag=args.phenology, ensemble_path=args.ensemble,
+         scenarios_path=args.scenarios)
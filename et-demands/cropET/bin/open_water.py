@@ -0,0 +1,247 @@
+"""open_water.py
+Defines open_water_kc, open_water_outputs and crop_day_loop_open_water
+    functions
+Open water "crops" (55, 56, 57) have no soil water balance, so Kc and ET of
+    all days are computed at once instead of in the day loop
+Called by crop_cycle.py, crop_cycle_jit.py and crop_cycle_vector.py
+
+"""
+
+import logging
+import numpy as np
+
+import cell_calendar
+import crop_cycle
+import crop_cycle_vector
+import crop_trace
+from initialize_crop_cycle import InitializeCropCycle
+import run_manifest
+
+#   55: Open water shallow systems (large ponds, streams)
+#   56: Open water deep systems (lakes, reservoirs)
+#   57: Open water small stock ponds
+water_classes = [55, 56, 57]
+
+# Kc of shallow systems and small stock ponds by refet type
+# Note that these values are substantially different from FAO56
+# etr kc_bas is eto_kc_bas / 1.2 [1.05/1.2 = 0.875]
+water_kc = {55: {'eto': 1.05, 'etr': 0.875},
+            57: {'eto': 0.85, 'etr': 0.7}}
+
+
+def open_water_evap_array(et_cell, clim, ts_ta):
+    """Kc of deep open water for all days
+
+    Parameters
+    ---------
+    et_cell : dict
+        ETCell instance
+    clim : dict
+        daily climate arrays (see crop_cycle.crop_climate_arrays())
+    ts_ta : ndarray
+        open water Ts-Ta (see cell_calendar.CellCalendar)
+
+    Returns
+    -------
+    : ndarray
+
+    Notes
+    -----
+    Array version of open_water_evap.open_water_evap()
+    DEADBEEF - wind variable of aerodynamic estimate is not defined in
+        open_water_evap(), so every day substitutes 0.4 (as if ETref was
+        too close to zero); this keeps the same values until it is defined
+
+    """
+    return np.full(clim['etref'].size, 0.4)
+
+def open_water_flag(data, crop, clim, doy_array, debug_flag=False):
+    """Check if crop can be computed without day loop
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    crop : dict
+        CropParameters instance
+    clim : dict
+        daily climate arrays (see crop_cycle.crop_climate_arrays())
+    doy_array : ndarray
+        day of year of run dates
+    debug_flag : boolean
+        True : day loop is used to write debug comments
+
+    Returns
+    -------
+    : boolean
+
+    Notes
+    -----
+    Season must be on all the time (flag_for_means_to_estimate_pl_or_gu 4)
+        with no killing frost (see kcb_daily()) and crop height must be
+        constant (initial height at or above maximum height)
+
+    """
+    if (debug_flag or crop.class_number not in water_classes or
+            data.refet['type'] not in ['eto', 'etr']):
+        return False
+    if crop.flag_for_means_to_estimate_pl_or_gu != 4:
+        return False
+    if crop.height_initial < crop.height_max:
+        return False
+    frost = ((doy_array > (crop.gdd_trigger_doy + 211)) &
+             (clim['tmin'] < crop.killing_frost_temperature))
+    return not frost.any()
+
+def open_water_kc(data, et_cell, crop, clim, calendar):
+    """Kc of open water for all days
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    et_cell : dict
+        ETCell instance
+    crop : dict
+        CropParameters instance
+    clim : dict
+        daily climate arrays (see crop_cycle.crop_climate_arrays())
+    calendar : CellCalendar
+        calendar of cell for run dates
+
+    Returns
+    -------
+    : ndarray
+
+    """
+    if crop.class_number == 56:
+        # An aerodynamic function is used for deep systems
+        return open_water_evap_array(et_cell, clim, calendar.ts_ta)
+    return np.full(
+        clim['etref'].size, water_kc[crop.class_number][data.refet['type']])
+
+def open_water_outputs(data, et_cell, crop, foo, clim, calendar):
+    """Daily outputs of open water for all days
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    et_cell : dict
+        ETCell instance
+    crop : dict
+        CropParameters instance
+    foo : InitializeCropCycle
+        crop state after crop_load() and setup_crop()
+    clim : dict
+        daily climate arrays (see crop_cycle.crop_climate_arrays())
+    calendar : CellCalendar
+        calendar of cell for run dates
+
+    Returns
+    -------
+    : dict
+        output arrays (same fields as crop_cycle.crop_day_loop())
+
+    Notes
+    -----
+    Same values as kcb_daily() computes for each day
+    Water has only 'kcb', kc_bas output includes the climate adjustment
+        (ETo basis), ET uses unadjusted kc_bas
+    Soil water balance outputs keep their initial values
+        (compute_crop_et() isn't run for water)
+
+    """
+    n_days = clim['etref'].size
+    kc_bas = open_water_kc(data, et_cell, crop, clim, calendar)
+    out = {}
+    out['kc_act'] = kc_bas
+
+    # ETr changed to ETref 12/26/2007
+    out['et_act'] = kc_bas * clim['etref']
+    out['et_pot'] = out['et_act'].copy()
+    out['et_bas'] = out['et_act'].copy()
+
+    # Limit crop height for numerical stability
+    # Height is maximum height every day (see open_water_flag())
+    height = max(crop.height_max, 0.05)
+    if data.refet['type'] == 'eto':
+        out['kc_bas'] = (
+            kc_bas + (0.04 * (clim['u2'] - 2) - 0.004 * (clim['rh_min'] - 45)) *
+            (height / 3) ** 0.3)
+    else:
+        out['kc_bas'] = kc_bas.copy()
+
+    for field, value in [('irrigation', foo.irr_sim), ('runoff', foo.sro),
+                         ('dperc', foo.dperc), ('p_rz', foo.p_rz),
+                         ('p_eft', foo.p_eft), ('niwr', foo.niwr + 0)]:
+        out[field] = np.full(n_days, value, dtype=np.float64)
+    out['season'] = np.ones(n_days, dtype=np.int64)
+    out['cutting'] = np.full(n_days, int(foo.cutting), dtype=np.int64)
+    return out
+
+def crop_day_loop_open_water(crop_count, data, et_cell, crop,
+                             debug_flag=False, mp_procs=1):
+    """Compute open water crop et for all days at once
+
+    Parameters
+    ---------
+    crop_count : int
+        count of crop being computed
+    data : dict
+        configuration data from INI file
+    et_cell : dict
+        ETCell instance
+    crop : dict
+        CropParameters instance
+    debug_flag : boolean
+        True : write debug level comments to debug.txt
+        False
+    mp_procs : int
+        number of cores to use for multiprocessing
+
+    Returns
+    -------
+    : boolean
+        True : crop was computed and written
+        False : crop needs day loop (see open_water_flag()) or is traced
+
+    Notes
+    -----
+    Results are identical to crop_cycle.crop_day_loop()
+    No checkpoints are saved since there is no crop state to resume
+
+    """
+    if (debug_flag or crop.class_number not in water_classes or
+            crop.flag_for_means_to_estimate_pl_or_gu != 4 or
+            crop_trace.trace_flag(data, et_cell, crop)):
+        return False
+
+    foo = InitializeCropCycle()
+    foo.crop_load(data, et_cell, crop)
+    if data.co2_flag:
+        foo.setup_co2(et_cell, crop)
+    foo.setup_dataframe(et_cell)
+    if not foo.in_season and foo.crop_setup_flag:
+        foo.setup_crop(crop)
+    clim = crop_cycle.crop_climate_arrays(data, et_cell, crop, foo)
+    step_dates = foo.crop_df.index
+    doy_array = foo.crop_df['doy'].values.astype(np.int64)
+    if not open_water_flag(data, crop, clim, doy_array, debug_flag):
+        return False
+    if mp_procs == 1:
+        logging.warning('Crop {} - {}'.format(crop.class_number, crop.name))
+
+    calendar = cell_calendar.cell_calendar(data, et_cell, step_dates)
+    out = open_water_outputs(data, et_cell, crop, foo, clim, calendar)
+
+    # Copy output arrays to crop data frame and write output files
+    for field in crop_cycle_vector.output_fields + ['season', 'cutting']:
+        foo.crop_df[field] = out[field]
+    if (data.cet_out['daily_output_flag'] or
+            data.cet_out['monthly_output_flag'] or
+            data.cet_out['annual_output_flag'] or
+            data.gs_output_flag):
+        crop_cycle.write_crop_output(crop_count, data, et_cell, crop, foo)
+    run_manifest.record_crop(data, et_cell, crop)
+    return True
@@ -30,21 +30,15 @@ def open_water_evap(cell, foo_day):
         but foo.pressure is initialized to 0 and never computed
     Air pressure is now computed once in et_cell.init_properties_from_row()
         for each station/cell
+    foo_day.ts_ta is set from cell calendar by caller
 
     """
-    ts_ta_water = [0., 4., 3., 1., 0., 0., 0., 0., 1., 1., 3., 4., 4.]
-
     try:
         # Estimate water temperature
-        # Interpolate value for Ts-Ta
-
-        moa_frac = min(max(foo_day.month + (foo_day.day - 15) / 30.4, 1), 12)
-        moa_base = int(moa_frac)
-        ts_ta = (
-            ts_ta_water[moa_base] +
-            (ts_ta_water[moa_base + 1] - ts_ta_water[moa_base]) *
-            (moa_frac - moa_base))
-        ts = foo_day.tmean + ts_ta
+        # Ts-Ta is interpolated by month once for all days
+        #   (see cell_calendar.CellCalendar)
+
+        ts = foo_day.tmean + foo_day.ts_ta
 
         # For now convert to floats since function is called for every time step
 
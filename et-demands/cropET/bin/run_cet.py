@@ -15,7 +15,9 @@ import tkinter.filedialog
 
 def main(ini_path, bin_ws = '', verbose_flag = False,
         etcid_to_run = 'ALL', cal_flag = False,
-        debug_flag = False, mp_procs = 1):
+        debug_flag = False, mp_procs = 1, engine = None,
+        stream_flag = False, resume_flag = False, shard = None,
+        phenology_flag = False, ensemble_path = None, scenarios_path = None):
     """Wrapper for running crop et model
 
     Arguments
@@ -35,6 +37,20 @@ def main(ini_path, bin_ws = '', verbose_flag = False,
         True : write debug level comments to debug.txt
     mp_procs : int
         number of cores to use
+    engine : str
+        crop day loop engine (python, vector or jit)
+    stream_flag : boolean
+        True : process cells one at a time with bounded memory
+    resume_flag : boolean
+        True : skip cells and crops completed by earlier run
+    shard : str
+        shard of cells to run (i.e. 2/4)
+    phenology_flag : boolean
+        True : only simulate growing season timing (calibration)
+    ensemble_path : str
+        crop parameter sample matrix file (ensemble mode)
+    scenarios_path : str
+        climate scenario list file (scenario mode)
 
     Returns
     -------
@@ -49,6 +65,16 @@ def main(ini_path, bin_ws = '', verbose_flag = False,
     -d, --debug, debug_flag : save debug level comments to debug.txt
     -mp, --multiprocessing, mp_procs : number of processers to use
     --cal, cal_flag : display mean annual start/end dates to screen
+    --engine, engine : crop day loop engine (overrides INI engine)
+    --stream, stream_flag : process cells one at a time (bounded memory)
+    --resume, resume_flag : skip cells and crops completed by earlier run
+    --shard, shard : run shard I of N (merge with cell_shards.py)
+    --phenology, phenology_flag : only simulate growing season timing and
+        display mean annual start/end dates (no output files)
+    --ensemble, ensemble_path : run crop parameter sample matrix and write
+        summary statistics of each member
+    --scenarios, scenarios_path : run list of climate scenario weather/RefET
+        folders with one static setup
 
     """
 
@@ -82,6 +108,20 @@ def main(ini_path, bin_ws = '', verbose_flag = False,
         args_list.append('--cal')
     if mp_procs > 1:
         args_list.extend(['-mp', str(mp_procs)])
+    if engine is not None:
+        args_list.extend(['--engine', engine])
+    if stream_flag:
+        args_list.append('--stream')
+    if resume_flag:
+        args_list.append('--resume')
+    if shard is not None:
+        args_list.extend(['--shard', shard])
+    if phenology_flag:
+        args_list.append('--phenology')
+    if ensemble_path is not None:
+        args_list.extend(['--ensemble', ensemble_path])
+    if scenarios_path is not None:
+        args_list.extend(['--scenarios', scenarios_path])
     subprocess.call(args_list)
 
 def parse_args():
@@ -110,6 +150,27 @@ def parse_args():
     parser.add_argument(
         '--cal', action = 'store_true', default = False,
         help = "Display mean annual start/end dates to screen")
+    parser.add_argument(
+        '--engine', default = None, choices = ['python', 'vector', 'jit'],
+        help = "Crop day loop engine (overrides INI engine)")
+    parser.add_argument(
+        '--stream', action = 'store_true', default = False,
+        help = "Process cells one at a time with bounded memory")
+    parser.add_argument(
+        '--resume', action = 'store_true', default = False,
+        help = "Skip cells and crops completed by earlier run")
+    parser.add_argument(
+        '--shard', default = None, metavar = 'I/N',
+        help = "Run shard I of N shards of cells")
+    parser.add_argument(
+        '--phenology', action = 'store_true', default = False,
+        help = "Only simulate growing season timing (no output files)")
+    parser.add_argument(
+        '--ensemble', default = None, metavar = 'PATH',
+        help = "Run crop parameter sample matrix (summary statistics only)")
+    parser.add_argument(
+        '--scenarios', default = None, metavar = 'PATH',
+        help = "Run list of climate scenarios with one static setup")
     args = parser.parse_args()
 
     # Convert INI path to an absolute path if necessary
@@ -156,4 +217,8 @@ if __name__ == '__main__':
 
     main(ini_path, bin_ws = args.bin, verbose_flag=args.verbose,
         etcid_to_run = args.etcid, cal_flag = args.cal,
-        debug_flag = args.debug, mp_procs=args.multiprocessing)
+        debug_flag = args.debug, mp_procs=args.multiprocessing,
+        engine = args.engine, stream_flag = args.stream,
+        resume_flag = args.resume, shard = args.shard,
+        phenology_flag = args.phenology, ensemble_path = args.ensemble,
+        scenarios_path = args.scenarios)
@@ -0,0 +1,366 @@
+"""run_manifest.py
+Defines start_manifest, record_crop and skip_completed functions
+Run manifest lists completed cells and crops with checksums of their
+    output files so failed runs can be resumed (--resume)
+Called by mod_crop_et.py, crop_cycle.py, crop_cycle_jit.py and
+    crop_cycle_vector.py
+
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+import cell_shards
+import climate_store
+import crop_output
+import et_cell
+
+# Changes when manifest records change (old manifests aren't resumed)
+manifest_version = 1
+manifest_name = 'cet_manifest.jsonl'
+
+# Station input hashes of process (inputs don't change during run)
+station_hashes = {}
+
+
+def file_checksum(file_path):
+    """SHA1 checksum of file contents
+
+    Parameters
+    ---------
+    file_path : str
+
+    Returns
+    -------
+    : str
+        None if file doesn't exist
+
+    """
+    sha = hashlib.sha1()
+    try:
+        with open(file_path, 'rb') as input_f:
+            for chunk in iter(lambda: input_f.read(1 << 20), b''):
+                sha.update(chunk)
+    except IOError:
+        return None
+    return sha.hexdigest()
+
+def run_hash(data, ini_path):
+    """Hash of INI file, static input files and output options of run
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    ini_path : str
+        absolute file path of INI file
+
+    Returns
+    -------
+    : str
+
+    Notes
+    -----
+    Station time series files are checked for each cell when resuming
+        (see climate_store.input_hash()), these include CO2 values (weather
+        fields), CO2 crop lists are INI options
+    Spatial calibration crop parameter files are hashed if spatial
+        calibration is enabled
+
+    """
+    options = {
+        'version': manifest_version,
+        'gs_output_flag': data.gs_output_flag,
+        'file_type': data.cet_out['file_type']}
+    sha = hashlib.sha1(
+        json.dumps(options, sort_keys=True, default=str).encode())
+    for input_path in [ini_path, data.cell_properties_path,
+                       data.cell_crops_path, data.cell_cuttings_path,
+                       data.crop_params_path, data.crop_coefs_path]:
+        sha.update(str(file_checksum(input_path)).encode())
+    if data.spatial_cal_flag and data.spatial_cal_ws is not None:
+        try:
+            crop_dbf_dict = et_cell.spatial_crop_param_paths(
+                data.spatial_cal_ws)
+        except (IOError, OSError):
+            crop_dbf_dict = {}
+        for crop_num, crop_dbf in sorted(crop_dbf_dict.items()):
+            sha.update('{} {}'.format(
+                crop_num, file_checksum(crop_dbf)).encode())
+    return sha.hexdigest()
+
+def crop_output_paths(data, cell_id, crop_num):
+    """Paths of csv output files of cell and crop
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    cell_id : str
+        ET cell id
+    crop_num : int
+        crop class number
+
+    Returns
+    -------
+    : list
+
+    Notes
+    -----
+    Same names as crop_cycle.write_crop_output()
+
+    """
+    cet_name = data.cet_out['name_format'].replace(
+        '%c', '%02d' % int(crop_num)) % cell_id
+    output_paths = []
+    for flag, output_ws in [('daily_output_flag', 'daily_output_ws'),
+                            ('monthly_output_flag', 'monthly_output_ws'),
+                            ('annual_output_flag', 'annual_output_ws')]:
+        if data.cet_out[flag]:
+            output_paths.append(
+                os.path.join(data.cet_out[output_ws], cet_name))
+    if data.gs_output_flag:
+        if data.gs_name_format is None:
+            output_paths.append(os.path.join(
+                data.gs_output_ws, '{0}_gs_crop_{1:02d}.csv'.format(
+                    cell_id, int(crop_num))))
+        else:
+            output_paths.append(os.path.join(
+                data.gs_output_ws, data.gs_name_format.replace(
+                    '%c', '%02d' % int(crop_num)) % cell_id))
+    return output_paths
+
+def start_manifest(data, ini_path, resume_flag=False):
+    """Start run manifest, reading completed crops of earlier run
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    ini_path : str
+        absolute file path of INI file
+    resume_flag : boolean
+        True : keep completed crops of manifest if run inputs are unchanged
+        False : start new manifest
+
+    Returns
+    -------
+    : dict
+        manifest records of completed crops keyed by (cell_id, crop_num)
+
+    Notes
+    -----
+    Manifest is a JSON lines file, first line is header with run hash
+    Each shard has its own manifest (see cell_shards.merge_manifests())
+    Sets data.manifest_path (None if manifest is disabled), so pool
+        workers append records of the crops they compute
+
+    """
+    data.manifest_path = None
+    if not data.manifest_flag:
+        if resume_flag:
+            logging.warning(
+                '  manifest_flag is False, unable to resume run '
+                '(set manifest_flag = True in INI file)')
+        return {}
+    if data.cet_out['file_type'] != 'csv':
+        if resume_flag:
+            logging.warning(
+                '  Run manifest requires csv output, unable to resume run')
+        return {}
+    manifest_path = cell_shards.shard_path(
+        os.path.join(data.project_ws, manifest_name), data.shard)
+    manifest_hash = run_hash(data, ini_path)
+
+    records = {}
+    header = None
+    if resume_flag and os.path.isfile(manifest_path):
+        with open(manifest_path, 'r') as manifest_f:
+            for line in manifest_f:
+                # Last line can be partial if run was killed
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if header is None:
+                    header = record
+                elif 'cell_id' in record:
+                    records[(record['cell_id'], record['crop'])] = record
+    elif resume_flag:
+        logging.warning('  Run manifest {} does not exist'.format(
+            manifest_path))
+
+    if header is not None and header.get('run_hash') == manifest_hash:
+        logging.warning(
+            '  Resuming run, {} completed crops in manifest'.format(
+                len(records)))
+    else:
+        if header is not None:
+            logging.warning(
+                '  INI or static input files changed, running all cells')
+        records = {}
+        with open(manifest_path, 'w') as manifest_f:
+            manifest_f.write(json.dumps({
+                'version': manifest_version, 'run_hash': manifest_hash,
+                'ini_path': ini_path}) + '\n')
+    data.manifest_path = manifest_path
+    return records
+
+def append_record(manifest_path, record):
+    """Append record to manifest file
+
+    Parameters
+    ---------
+    manifest_path : str
+    record : dict
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    Record is appended with one write so records of pool workers
+        don't interleave
+
+    """
+    manifest_fd = os.open(manifest_path, os.O_WRONLY | os.O_APPEND)
+    try:
+        os.write(manifest_fd, (json.dumps(record) + '\n').encode())
+    finally:
+        os.close(manifest_fd)
+
+def crop_record(data, cell_id, crop_num, station_hash):
+    """Manifest record of completed cell and crop
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    cell_id : str
+        ET cell id
+    crop_num : int
+        crop class number
+    station_hash : str
+        hash of station input files (see climate_store.input_hash())
+
+    Returns
+    -------
+    : dict
+
+    """
+    return {
+        'cell_id': cell_id, 'crop': int(crop_num),
+        'station_hash': station_hash,
+        'files': {
+            output_path: file_checksum(output_path)
+            for output_path in crop_output_paths(data, cell_id, crop_num)}}
+
+def record_crop(data, et_cell, crop):
+    """Record completed cell and crop in run manifest
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    et_cell : dict
+        ETCell instance
+    crop : dict
+        CropParameters instance
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    Record is written by background writer after output files of crop
+        (see crop_output.start_writer()), so only crops whose files were
+        all written are recorded
+
+    """
+    if data.manifest_path is None:
+        return
+    crop_output.submit(write_record, data, et_cell, crop.class_number)
+
+def write_record(data, et_cell, crop_num):
+    """Append record of completed cell and crop to run manifest"""
+    append_record(data.manifest_path, crop_record(
+        data, et_cell.cell_id, crop_num, station_input_hash(data, et_cell)))
+
+def station_input_hash(data, et_cell):
+    """Hash of station input files of cell
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    et_cell : dict
+        ETCell instance
+
+    Returns
+    -------
+    : str
+
+    Notes
+    -----
+    Each station is hashed once per process (see station_hashes)
+
+    """
+    station_key = et_cell.station_key(data)
+    if station_key not in station_hashes:
+        station_hashes[station_key] = climate_store.input_hash(
+            data, et_cell, station_key)
+    return station_hashes[station_key]
+
+def skip_completed(data, cells, cell_id_list, records):
+    """Turn off crops completed by earlier run
+
+    Parameters
+    ---------
+    data : dict
+        configuration data from INI file
+    cells : dict
+        ETCellData instance
+    cell_id_list : list
+        cell ids to run
+    records : dict
+        manifest records (see start_manifest())
+
+    Returns
+    -------
+    : list
+        cell ids with crops left to run
+    : set
+        (cell_id, crop_num) of completed crops
+
+    Notes
+    -----
+    Crops are only skipped if station input files are unchanged and all
+        output files match their checksums
+    Completed crops are turned off with crop flags (as filter_crops())
+
+    """
+    completed = set()
+    run_cell_ids = []
+    for cell_id in cell_id_list:
+        cell = cells.et_cells_dict[cell_id]
+        for crop_num, crop_flag in sorted(cell.crop_flags.items()):
+            record = records.get((cell_id, int(crop_num)))
+            if not crop_flag or record is None:
+                continue
+            if (record['station_hash'] !=
+                    station_input_hash(data, cell)):
+                continue
+            if record['files'] != crop_record(
+                    data, cell_id, crop_num, None)['files']:
+                continue
+            cell.crop_flags[crop_num] = False
+            completed.add((cell_id, crop_num))
+        if any(cell.crop_flags.values()):
+            run_cell_ids.append(cell_id)
+    logging.warning('  Skipping {} completed crops, {} cells left'.format(
+        len(completed), len(run_cell_ids)))
+    return run_cell_ids, completed
@@ -71,8 +71,9 @@ def runoff(foo, foo_day, debug_flag=False):
 
     # If irrigations are automatically scheduled, base runoff on an average of
     #   conditions for prior four days to smooth results.
-    logging.debug('runoff(): SRO %.6f  irr_flag %d  S %.6f' % (
-        foo.sro, foo.irr_flag, foo.s))
+    if debug_flag:
+        logging.debug('runoff(): SRO %.6f  irr_flag %d  S %.6f' % (
+            foo.sro, foo.irr_flag, foo.s))
     if foo.irr_flag:
         # Initial abstraction
         ppt_net4 = max(foo_day.precip - 0.2 * foo.s4, 0)
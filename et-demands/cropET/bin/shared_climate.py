@@ -0,0 +1,174 @@
+"""shared_climate.py
+Defines SharedClimate class and attach_station_data function
+Processed station time series are published once as memory mapped
+    NumPy files and attached (without copies) by pool workers
+Called by mod_crop_et.py
+
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+
+# Time series attributes of ETCell shared with workers
+shared_attrs = ['refet_df', 'climate_df']
+
+
+class SharedClimate:
+    """Memory mapped station time series for multiprocessing
+
+    Attributes
+    ----------
+    shared_ws : str
+        temporary folder of memory mapped files
+    stations : dict
+        descriptors of published stations (by station key)
+    station_count : int
+        number of stations published
+    station_slots : threading.Semaphore
+        limits number of published stations (None for no limit)
+
+    Notes
+    -----
+    Memory mapped files are used (not multiprocessing.shared_memory)
+        so Python 3.6 is supported
+    Workers map same pages so climate arrays are only in memory once
+
+    """
+
+    def __init__(self, max_stations=None):
+        self.shared_ws = tempfile.mkdtemp(prefix='cet_climate_')
+        self.stations = {}
+        self.station_count = 0
+        if max_stations is None:
+            self.station_slots = None
+        else:
+            self.station_slots = threading.Semaphore(max_stations)
+
+    def publish(self, station_key, et_cell):
+        """Write station time series of et cell to memory mapped files
+
+        Parameters
+        ---------
+        station_key : tuple
+            station key (see ETCell.station_key())
+        et_cell : dict
+            ETCell instance
+
+        Returns
+        -------
+        : dict
+            station descriptor (small, sent to workers with each task)
+
+        Notes
+        -----
+        Only numeric columns are shared (other columns aren't used by model)
+        Columns of same type are written as one 2D array so data frames
+            can be built on mapped arrays without copying
+        Waits for release() of other station if station limit is reached
+
+        """
+        if self.station_slots is not None:
+            self.station_slots.acquire()
+        self.station_count += 1
+        station_ws = os.path.join(
+            self.shared_ws, '{:06d}'.format(self.station_count))
+        os.makedirs(station_ws)
+        descriptor = {'ws': station_ws}
+        for attr in shared_attrs:
+            df = getattr(et_cell, attr)
+            np.save(os.path.join(station_ws, attr + '__index.npy'),
+                    df.index.values)
+            groups = []
+            for col in df.columns:
+                dtype = df[col].dtype
+                if not np.issubdtype(dtype, np.number):
+                    continue
+                for group_dtype, group_cols in groups:
+                    if group_dtype == dtype:
+                        group_cols.append(col)
+                        break
+                else:
+                    groups.append((dtype, [col]))
+            descriptor[attr] = [group_cols for dtype, group_cols in groups]
+            for group_i, (group_dtype, group_cols) in enumerate(groups):
+                np.save(
+                    os.path.join(station_ws, '{}__{}.npy'.format(attr, group_i)),
+                    np.vstack([df[col].values for col in group_cols]))
+        descriptor['climate'] = list(et_cell.climate.keys())
+        for name, values in et_cell.climate.items():
+            np.save(os.path.join(station_ws, 'climate__' + name + '.npy'),
+                    values)
+        self.stations[station_key] = descriptor
+        return descriptor
+
+    def release(self, station_key):
+        """Remove memory mapped files of station
+
+        Parameters
+        ---------
+        station_key : tuple
+            station key (see ETCell.station_key())
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        Workers that still map files keep their pages until they are done
+        Files that can't be removed yet (Windows) are removed by close()
+
+        """
+        descriptor = self.stations.pop(station_key, None)
+        if descriptor is not None:
+            shutil.rmtree(descriptor['ws'], ignore_errors=True)
+            if self.station_slots is not None:
+                self.station_slots.release()
+
+    def close(self):
+        """Remove temporary folder of memory mapped files"""
+        self.stations = {}
+        shutil.rmtree(self.shared_ws, ignore_errors=True)
+
+
+def attach_station_data(et_cell, descriptor):
+    """Set published station time series on et cell
+
+    Parameters
+    ---------
+    et_cell : dict
+        ETCell instance
+    descriptor : dict
+        station descriptor (see SharedClimate.publish())
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    Arrays are mapped read only so shared data can't be modified by crops
+
+    """
+    station_ws = descriptor['ws']
+    for attr in shared_attrs:
+        index = pd.DatetimeIndex(np.load(
+            os.path.join(station_ws, attr + '__index.npy')), name='date')
+        group_dfs = []
+        for group_i, group_cols in enumerate(descriptor[attr]):
+            values = np.load(
+                os.path.join(station_ws, '{}__{}.npy'.format(attr, group_i)),
+                mmap_mode='r').view(np.ndarray)
+            group_dfs.append(pd.DataFrame(
+                values.T, index=index, columns=group_cols, copy=False))
+        setattr(et_cell, attr, pd.concat(group_dfs, axis=1, copy=False))
+    et_cell.climate = {
+        name: np.load(os.path.join(station_ws, 'climate__' + name + '.npy'),
+                      mmap_mode='r').view(np.ndarray)
+        for name in descriptor['climate']}
+    logging.debug('  Attached shared station data\n  {}'.format(station_ws))
@@ -0,0 +1,143 @@
+"""Shared fixtures of cropET tests
+
+Tiny Upper Red project (2 cells, 4 crops, 2 years) built from the upperred
+    example so model runs take a few seconds
+
+"""
+
+import os
+import shutil
+import sys
+
+import pytest
+
+bin_ws = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'bin'))
+if bin_ws not in sys.path:
+    sys.path.insert(0, bin_ws)
+
+repo_ws = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+example_ws = os.path.join(repo_ws, 'examples', 'upperred')
+template_ws = os.path.join(repo_ws, 'et-demands', 'static')
+
+station_ids = ['TX1761', 'OK4249']
+cell_ids = ['11120201TX', '11130101OK']
+
+ini_template = """[CROP_ET]
+basin_id = URR
+project_folder = {project_ws}
+daily_stats_flag = True
+monthly_stats_flag = True
+annual_stats_flag = True
+growing_season_stats_flag = True
+spatial_cal_flag = False
+cutting_flag = True
+niwr_flag = True
+kc_flag = True
+co2_flag = False
+start_date = 1990-01-01
+end_date = 1991-12-31
+cell_test_list = {cells}
+crop_test_list = 3, 7, 13, 55
+static_folder = static
+daily_output_folder = out/daily_stats
+monthly_output_folder = out/monthly_stats
+annual_output_folder = out/annual_stats
+gs_output_folder = out/growing_season_stats
+cell_properties_name = ETCellsProperties.txt
+cell_crops_name = ETCellsCrops.txt
+cell_cuttings_name = MeanCuttings.txt
+crop_params_name = CropParams.txt
+crop_coefs_name = CropCoefs_eto.txt
+elev_units = Feet
+{extra}
+[REFET]
+refet_type = ETo
+refet_folder = daily_ret
+name_format = %s_URR_2060_S0_RET.csv
+header_lines = 1
+names_line = 1
+delimiter = ,
+date_field = Date
+etref_field = ASCEg
+etref_units = mm/day
+
+[WEATHER]
+weather_folder = daily_ret
+name_format = %s_URR_2060_S0_RET.csv
+header_lines = 1
+names_line = 1
+delimiter = ,
+date_field = Date
+tmin_field = TMin
+tmax_field = TMax
+ppt_field = Precip
+wind_field = Wind
+tdew_field = TDew
+tmin_units = C
+tmax_units = C
+ppt_units = mm
+wind_units = m/s
+tdew_units = C
+wind_height = 2
+"""
+
+
+def write_ini(project_ws, name='cet.ini', extra=''):
+    """Write INI file of tiny project, extra lines go in [CROP_ET]"""
+    ini_path = os.path.join(str(project_ws), name)
+    with open(ini_path, 'w') as ini_f:
+        ini_f.write(ini_template.format(
+            project_ws=str(project_ws), cells=', '.join(cell_ids),
+            extra=extra))
+    return ini_path
+
+def read_outputs(output_ws):
+    """Contents of all output files by relative path"""
+    outputs = {}
+    for root, dirs, files in os.walk(str(output_ws)):
+        for name in files:
+            path = os.path.join(root, name)
+            with open(path, 'rb') as output_f:
+                outputs[os.path.relpath(path, str(output_ws))] = output_f.read()
+    return outputs
+
+
+@pytest.fixture
+def project_ws(tmp_path):
+    """Tiny project folder with cet.ini"""
+    if not os.path.isdir(example_ws):
+        pytest.skip('upperred example not found')
+    static_ws = tmp_path / 'static'
+    static_ws.mkdir()
+    for name in os.listdir(os.path.join(example_ws, 'static')):
+        shutil.copy(os.path.join(example_ws, 'static', name), str(static_ws))
+    shutil.copy(os.path.join(template_ws, 'CropParams.txt'), str(static_ws))
+
+    # Crop coefficient files are cp1252 (read with locale encoding)
+    for name in ['CropCoefs_eto.txt', 'CropCoefs_etr.txt']:
+        with open(str(static_ws / name), encoding='cp1252') as input_f:
+            coefs = input_f.read()
+        with open(str(static_ws / name), 'w') as output_f:
+            output_f.write(coefs)
+
+    # Station files trimmed to run years (plus spin up year)
+    ret_ws = tmp_path / 'daily_ret'
+    ret_ws.mkdir()
+    for station_id in station_ids:
+        name = '{}_URR_2060_S0_RET.csv'.format(station_id)
+        with open(os.path.join(example_ws, 'daily_ret', name)) as input_f, \
+                open(str(ret_ws / name), 'w') as output_f:
+            for line_i, line in enumerate(input_f):
+                if line_i == 0 or line[:4] in ['1989', '1990', '1991']:
+                    output_f.write(line)
+    write_ini(tmp_path)
+    return tmp_path
+
+def run_model(project_ws, ini_name='cet.ini', **kwargs):
+    """Run crop et model of tiny project, return output files"""
+    import mod_crop_et
+    output_ws = os.path.join(str(project_ws), 'out')
+    if os.path.isdir(output_ws):
+        shutil.rmtree(output_ws)
+    mod_crop_et.main(os.path.join(str(project_ws), ini_name), **kwargs)
+    return read_outputs(output_ws)
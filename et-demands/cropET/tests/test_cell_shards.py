@@ -0,0 +1,62 @@
+import json
+import os
+
+import pytest
+
+import cell_shards
+import crop_et_data
+import mod_crop_et
+import run_manifest
+from conftest import run_model, write_ini
+
+
+def shard_manifest_path(project_ws, shard):
+    return cell_shards.shard_path(
+        os.path.join(str(project_ws), run_manifest.manifest_name), shard)
+
+
+def test_shard_outputs_match_full_run(project_ws):
+    full = run_model(project_ws)
+    shard_1 = run_model(project_ws, shard=(1, 2))
+    shard_2 = run_model(project_ws, shard=(2, 2))
+    assert shard_1 and shard_2
+    assert not set(shard_1) & set(shard_2)
+    assert dict(shard_1, **shard_2) == full
+
+
+def test_merge_manifests_requires_all_crops(project_ws):
+    ini_path = write_ini(project_ws, extra='manifest_flag = True')
+    run_model(project_ws, shard=(1, 2))
+    with pytest.raises(SystemExit):
+        cell_shards.merge_shards(ini_path, 2)
+    assert not os.path.isfile(
+        os.path.join(str(project_ws), run_manifest.manifest_name))
+
+    # Shard 2 is killed after its first crop
+    mod_crop_et.main(ini_path, shard=(2, 2))
+    with open(shard_manifest_path(project_ws, (2, 2))) as manifest_f:
+        lines = manifest_f.readlines()
+    with open(shard_manifest_path(project_ws, (2, 2)), 'w') as manifest_f:
+        manifest_f.writelines(lines[:2])
+    with pytest.raises(SystemExit):
+        cell_shards.merge_shards(ini_path, 2)
+
+    mod_crop_et.main(ini_path, shard=(2, 2), resume_flag=True)
+    cell_shards.merge_shards(ini_path, 2)
+    with open(os.path.join(
+            str(project_ws), run_manifest.manifest_name)) as manifest_f:
+        records = [json.loads(line) for line in manifest_f][1:]
+    data = crop_et_data.CropETData()
+    data.read_cet_ini(ini_path)
+    tasks = cell_shards.shard_tasks(data, 2)
+    assert set((r['cell_id'], r['crop']) for r in records) == \
+        tasks[0] | tasks[1]
+
+
+def test_merge_checks_csv_output_without_manifest(project_ws):
+    ini_path = os.path.join(str(project_ws), 'cet.ini')
+    run_model(project_ws, shard=(1, 2))
+    with pytest.raises(SystemExit):
+        cell_shards.merge_shards(ini_path, 2)
+    mod_crop_et.main(ini_path, shard=(2, 2))
+    cell_shards.merge_shards(ini_path, 2)
@@ -0,0 +1,39 @@
+import os
+
+import pytest
+
+import crop_checkpoint
+import crop_cycle_jit
+from conftest import run_model, write_ini
+
+
+@pytest.mark.parametrize('engine', ['python', 'jit'])
+def test_checkpoint_round_trip(project_ws, engine, monkeypatch):
+    if engine == 'jit' and not crop_cycle_jit.jit_available():
+        pytest.skip('numba is not installed')
+    full = run_model(project_ws, engine=engine)
+
+    ini_path = write_ini(project_ws, 'checkpoint.ini',
+                         'checkpoint_folder = checkpoints')
+    with open(ini_path) as ini_f:
+        ini = ini_f.read()
+    with open(ini_path, 'w') as ini_f:
+        ini_f.write(ini.replace('end_date = 1991-12-31',
+                                'end_date = 1990-12-31'))
+    run_model(project_ws, 'checkpoint.ini', engine=engine)
+    checkpoint_ws = os.path.join(str(project_ws), 'checkpoints')
+    assert os.listdir(checkpoint_ws)
+
+    # Second run starts from checkpoints of first run (except crops with
+    #   long-term planting dates, computed from all years of run)
+    loaded = []
+    read_checkpoint = crop_checkpoint.read_checkpoint
+    def count_checkpoints(*args):
+        checkpoint = read_checkpoint(*args)
+        loaded.append(checkpoint is not None)
+        return checkpoint
+    monkeypatch.setattr(crop_checkpoint, 'read_checkpoint', count_checkpoints)
+    with open(ini_path, 'w') as ini_f:
+        ini_f.write(ini)
+    assert run_model(project_ws, 'checkpoint.ini', engine=engine) == full
+    assert any(loaded)
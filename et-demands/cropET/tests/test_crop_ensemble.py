@@ -0,0 +1,31 @@
+import os
+
+import pytest
+
+import crop_et_data
+import crop_ensemble
+
+
+@pytest.fixture
+def crop(project_ws):
+    data = crop_et_data.CropETData()
+    data.read_cet_ini(os.path.join(str(project_ws), 'cet.ini'))
+    data.set_crop_params()
+    return data.crop_params[3]
+
+
+def test_member_crop_keeps_sampled_values(crop):
+    member = crop_ensemble.member_crop(crop, {
+        'mad_midseason': 47.3, 'mad_initial': 40.0, 'kc_max': 1.1,
+        'height_max': float('nan')})
+    assert member.mad_midseason == 47.3
+    assert member.mad_initial == 40
+    assert isinstance(member.mad_initial, int)
+    assert member.kc_max == 1.1
+    assert member.height_max == crop.height_max
+    assert isinstance(crop.mad_midseason, int)
+
+
+def test_member_crop_rejects_fractional_flags(crop):
+    with pytest.raises(SystemExit):
+        crop_ensemble.member_crop(crop, {'curve_type': 1.5})
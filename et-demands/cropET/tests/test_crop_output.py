@@ -0,0 +1,40 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import crop_output
+
+
+@pytest.fixture
+def columns():
+    return [
+        ('Date', ['1990-01-01', '1990-01-02', '1990-01-03'], None),
+        ('Year', np.array([1990, 1990, 1990]), None),
+        ('ETact', np.array([0.1, np.nan, 2.0 / 3]), None),
+        ('Kc', np.array([1.0, 0.25, 1e-7]), None),
+        ('Note', ['a,b', 'say "hi"', 'plain'], None)]
+
+
+def pandas_csv(columns, float_format=None):
+    output_df = pd.DataFrame(
+        dict((name, values) for name, values, fmt in columns),
+        columns=[name for name, values, fmt in columns])
+    output_f = io.StringIO()
+    output_df.to_csv(output_f, index=False, float_format=float_format)
+    return output_f.getvalue()
+
+
+@pytest.mark.parametrize('float_format', [None, '%.6f', '%10.4f'])
+def test_write_csv_matches_pandas(columns, float_format):
+    output_f = io.StringIO()
+    crop_output.write_csv(output_f, columns, float_format=float_format)
+    assert output_f.getvalue() == pandas_csv(columns, float_format)
+
+
+def test_write_csv_without_rows(columns):
+    columns = [(name, values[:0], fmt) for name, values, fmt in columns]
+    output_f = io.StringIO()
+    crop_output.write_csv(output_f, columns)
+    assert output_f.getvalue() == pandas_csv(columns)
@@ -0,0 +1,20 @@
+import pytest
+
+import crop_cycle_jit
+
+from conftest import run_model
+
+
+@pytest.fixture
+def python_output(project_ws):
+    return run_model(project_ws, engine='python')
+
+
+def test_vector_engine_matches_python(project_ws, python_output):
+    assert run_model(project_ws, engine='vector') == python_output
+
+
+def test_jit_engine_matches_python(project_ws, python_output):
+    if not crop_cycle_jit.jit_available():
+        pytest.skip('numba is not installed')
+    assert run_model(project_ws, engine='jit') == python_output
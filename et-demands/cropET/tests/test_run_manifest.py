@@ -0,0 +1,25 @@
+import os
+
+import mod_crop_et
+from conftest import read_outputs, run_model, write_ini
+
+
+def test_resume_skips_completed_crops(project_ws):
+    ini_path = write_ini(project_ws, extra='manifest_flag = True')
+    full = run_model(project_ws)
+    output_ws = os.path.join(str(project_ws), 'out')
+
+    # Mark files of first run, remove output of one crop
+    removed = os.path.join('daily_stats', '11130101OK_crop_07.csv')
+    for rel_path in full:
+        os.utime(os.path.join(output_ws, rel_path), (0, 0))
+    os.remove(os.path.join(output_ws, removed))
+
+    mod_crop_et.main(ini_path, resume_flag=True)
+    assert read_outputs(output_ws) == full
+    rerun = sorted(
+        rel_path for rel_path in full
+        if os.path.getmtime(os.path.join(output_ws, rel_path)) != 0)
+    assert removed in rerun
+    assert all('11130101OK' in rel_path and 'crop_07' in rel_path
+               for rel_path in rerun)
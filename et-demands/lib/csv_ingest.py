@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+
+# Fast reading of delimited text input files
+
+import logging
+
+import pandas as pd
+
+def header_skiprows(header_lines, names_line):
+    """Get header row and rows to skip from INI header settings
+
+        Args:
+            header_lines: number of header lines
+            names_line: 1's based line number of field names
+
+        Returns:
+            tuple: header (0 based row of field names after skipped rows),
+                skiprows (0 based line numbers to skip)
+        """
+    # Ignore header but assume header was set as 1's based index
+    skiprows = [i for i in range(header_lines) if i + 1 != names_line]
+    return names_line - len(skiprows) - 1, skiprows
+
+def field_filter(fields, extra_fields=()):
+    """Column filter that keeps configured fields
+
+        Args:
+            fields: dictionary of field keys and field names (from INI)
+            extra_fields: other field names to keep if present
+
+        Returns:
+            function: True for field names and keys (missing fields are
+                not an error so estimated or unused fields are allowed)
+        """
+    keep = set(fields.keys()) | set(extra_fields)
+    keep.update(name for name in fields.values() if name is not None)
+    return lambda col: col in keep
+
+def read_table(file_path, header_lines=1, names_line=1, delimiter=',',
+               fields=None, extra_fields=(), **kwargs):
+    """Read delimited text file with compiled (C) parser
+
+        Args:
+            file_path: path of delimited text file
+            header_lines: number of header lines
+            names_line: 1's based line number of field names
+            delimiter: field delimiter
+            fields: dictionary of field keys and names to read
+                (None reads all fields)
+            extra_fields: other field names to read if present
+            kwargs: other pd.read_csv keyword arguments
+
+        Returns:
+            dataframe
+
+        Notes:
+            C parser default float converter gives same values as python
+                parser (round_trip doesn't)
+            Python parser is only used if C parser fails (malformed files)
+            IOError is raised to caller
+        """
+    header, skiprows = header_skiprows(header_lines, names_line)
+    if fields is not None and 'usecols' not in kwargs:
+        kwargs['usecols'] = field_filter(fields, extra_fields)
+    try:
+        return pd.read_csv(
+            file_path, engine='c', header=header, skiprows=skiprows,
+            sep=delimiter, **kwargs)
+    except (pd.errors.ParserError, ValueError, UnicodeDecodeError) as e:
+        logging.debug(
+            '  C parser failed, reading with python parser\n  {}'.format(e))
+    return pd.read_csv(
+        file_path, engine='python', header=header, skiprows=skiprows,
+        sep=delimiter, **kwargs)
+
+def ymd_datetimes(df, fields=('year', 'month', 'day')):
+    """Build datetimes from date part columns
+
+        Args:
+            df: dataframe with date part columns
+            fields: date part column names (year, month, day, hour, minute)
+
+        Returns:
+            series of datetimes
+
+        Notes:
+            Vectorized replacement for
+            df[fields].apply(lambda s: datetime.datetime(*s), axis=1)
+        """
+    return pd.to_datetime(df[list(fields)])
@@ -13,6 +13,8 @@ import numpy as np
 import openpyxl as op
 from openpyxl.utils.dataframe import dataframe_to_rows
 
+import csv_ingest
+
 def is_leap_year(year_to_test):
     """Test if year is a leap year
     
@@ -215,11 +217,9 @@ def ReadOneColumnSlot(file_path, header_lines, names_line, stationToRead,
     lc_station = stationToRead.lower()
     lc_param = parameterToRead.lower()
     try:
-        # Get list of 0 based line numbers to skip - Ignore header but assume header was set as 1's based index
-        data_skip = [i for i in range(header_lines) if i + 1 != names_line]
-        input_df = pd.read_csv(file_path, engine = 'python',
-                header = names_line - len(data_skip) - 1, skiprows = data_skip, 
-                sep = valuesSeparator, na_values = mia_value)
+        input_df = csv_ingest.read_table(file_path,
+                header_lines = header_lines, names_line = names_line,
+                delimiter = valuesSeparator, na_values = mia_value)
         if input_df.empty:
             logging.error("No data read in file" + file_path)
             return return_df
@@ -256,8 +256,7 @@ def ReadOneColumnSlot(file_path, header_lines, names_line, stationToRead,
                 pydt = pd.to_datetime(datetime.datetime(2000, wyem, 1, pydt.hour, pydt.minute))
                 pydt = pd.to_datetime(datetime.datetime(pydt.year, pydt.month, pydt.days_in_month, pydt.hour, pydt.minute))
                 input_df['day'] = pydt.days_in_month
-            input_df['date'] = input_df[['year', 'month', 'day']].apply(
-                lambda s : datetime.datetime(*s),axis = 1)
+            input_df['date'] = csv_ingest.ymd_datetimes(input_df)
             input_df['date'] = pd.to_datetime(input_df['date'])
             input_df.set_index('date', inplace = True)
         
@@ -349,8 +348,8 @@ def ReadOneTextRDB(file_path, header_lines, names_line, stationToRead,
         if names_line == 0:
             # default column names and locations
             
-            input_df = pd.read_csv(file_path, engine = 'python',
-                    header = None, sep = valuesSeparator, na_values = mia_value)
+            input_df = pd.read_csv(file_path, header = None,
+                    sep = valuesSeparator, na_values = mia_value)
             if input_df.empty:
                 logging.error("No data read in file" + file_path)
                 return return_df
@@ -363,11 +362,9 @@ def ReadOneTextRDB(file_path, header_lines, names_line, stationToRead,
         else:
             # dynamic column names and location
             
-            # Get list of 0 based line numbers to skip - Ignore header but assume header was set as 1's based index
-            data_skip = [i for i in range(header_lines) if i + 1 != names_line]
-            input_df = pd.read_csv(file_path, engine = 'python',
-                    header = names_line - len(data_skip) - 1, skiprows = data_skip, 
-                    na_values = mia_value, sep = valuesSeparator)
+            input_df = csv_ingest.read_table(file_path,
+                    header_lines = header_lines, names_line = names_line,
+                    delimiter = valuesSeparator, na_values = mia_value)
             if input_df.empty:
                 logging.error("No data read in file" + file_path)
                 return return_df
@@ -535,7 +532,7 @@ def ReadOneExcelColumn(file_path, ws_name, header_lines, names_line, stationToRe
         else:
             input_df['hour'] = 0
             input_df['minute'] = 0
-        input_df['Date'] = input_df[['year', 'month', 'day', 'hour', 'minute']].apply(lambda s : datetime.datetime(*s),axis = 1)
+        input_df['Date'] = csv_ingest.ymd_datetimes(input_df, ['year', 'month', 'day', 'hour', 'minute'])
         input_df.reset_index('date', inplace = True, drop = True)
         input_df.set_index('Date', inplace = True)
         input_df.drop(['year', 'month', 'day', 'hour', 'minute'], axis = 1, inplace = True)
@@ -632,11 +629,9 @@ def ColumnSlotToDataframe(file_path, header_lines, names_line,
     """
     return_df = None
     try:
-        # Get list of 0 based line numbers to skip - Ignore header but assume header was set as 1's based index
-        data_skip = [i for i in range(header_lines) if i + 1 != names_line]
-        input_df = pd.read_csv(file_path, engine = 'python',
-                header = names_line - len(data_skip) - 1, skiprows = data_skip, 
-                sep = valuesSeparator, na_values = mia_value)
+        input_df = csv_ingest.read_table(file_path,
+                header_lines = header_lines, names_line = names_line,
+                delimiter = valuesSeparator, na_values = mia_value)
         if input_df.empty:
             logging.error("No data read in file" + file_path)
             return return_df
@@ -668,8 +663,7 @@ def ColumnSlotToDataframe(file_path, header_lines, names_line,
                 pydt = pd.to_datetime(datetime.datetime(2000, wyem, 1, pydt.hour, pydt.minute))
                 pydt = pd.to_datetime(datetime.datetime(pydt.year, pydt.month, pydt.days_in_month, pydt.hour, pydt.minute))
                 input_df['day'] = pydt.days_in_month
-            input_df['date'] = input_df[['year', 'month', 'day']].apply(
-                lambda s : datetime.datetime(*s),axis = 1)
+            input_df['date'] = csv_ingest.ymd_datetimes(input_df)
             input_df['date'] = pd.to_datetime(input_df['date'])
             input_df.set_index('date', inplace = True)
         
@@ -730,8 +724,8 @@ def TextRDBToDataframe(file_path, header_lines, names_line,
         if names_line == 0:
             # default column names and locations
             
-            input_df = pd.read_csv(file_path, engine = 'python',
-                    header = None, sep = valuesSeparator, na_value = mia_value)
+            input_df = pd.read_csv(file_path, header = None,
+                    sep = valuesSeparator, na_values = mia_value)
             if input_df.empty:
                 logging.error("No data read in file" + file_path)
                 return return_df
@@ -744,11 +738,9 @@ def TextRDBToDataframe(file_path, header_lines, names_line,
         else:
             # dynamic column names and location
             
-            # Get list of 0 based line numbers to skip - Ignore header but assume header was set as 1's based index
-            data_skip = [i for i in range(header_lines) if i + 1 != names_line]
-            input_df = pd.read_csv(file_path, engine = 'python',
-                    header = names_line - len(data_skip) - 1, skiprows = data_skip, 
-                    na_values = mia_value, sep = valuesSeparator)
+            input_df = csv_ingest.read_table(file_path,
+                    header_lines = header_lines, names_line = names_line,
+                    delimiter = valuesSeparator, na_values = mia_value)
             if input_df.empty:
                 logging.error("No data read in file" + file_path)
                 return return_df
@@ -909,7 +901,7 @@ def ExcelWorksheetToDataframe(file_path, ws_name, header_lines, names_line,
         else:
             input_df['hour'] = 0
             input_df['minute'] = 0
-        input_df['Date'] = input_df[['year', 'month', 'day', 'hour', 'minute']].apply(lambda s : datetime.datetime(*s),axis = 1)
+        input_df['Date'] = csv_ingest.ymd_datetimes(input_df, ['year', 'month', 'day', 'hour', 'minute'])
         input_df.reset_index('date', inplace = True, drop = True)
         input_df.set_index('Date', inplace = True)
         input_df.drop(['year', 'month', 'day', 'hour', 'minute'], axis = 1, inplace = True)
@@ -1404,7 +1396,7 @@ def wb_output_via_df_dict_xlsxwriter(wb_path, ws_names, new_data_dict,
                         else:
                             existing_df['hour'] = 0
                             existing_df['minute'] = 0
-                        existing_df['Date'] = existing_df[['year', 'month', 'day', 'hour', 'minute']].apply(lambda s : datetime.datetime(*s),axis = 1)
+                        existing_df['Date'] = csv_ingest.ymd_datetimes(existing_df, ['year', 'month', 'day', 'hour', 'minute'])
                         existing_df.reset_index('date', inplace = True, drop = True)
                         existing_df.set_index('Date', inplace = True)
                         existing_df.drop(['year', 'month', 'day', 'hour', 'minute'], axis = 1, inplace = True)
@@ -1624,7 +1616,7 @@ def wb_output_via_df_dict_openpyxl(wb_path, ws_names, new_data_dict,
                 else:
                     existing_df['hour'] = 0
                     existing_df['minute'] = 0
-                existing_df['Date'] = existing_df[['year', 'month', 'day', 'hour', 'minute']].apply(lambda s : datetime.datetime(*s),axis = 1)
+                existing_df['Date'] = csv_ingest.ymd_datetimes(existing_df, ['year', 'month', 'day', 'hour', 'minute'])
                 existing_df.reset_index('date', inplace = True, drop = True)
                 existing_df.set_index('Date', inplace = True)
                 existing_df.drop(['year', 'month', 'day', 'hour', 'minute'], axis = 1, inplace = True)
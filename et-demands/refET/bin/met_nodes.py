@@ -12,6 +12,7 @@ import numpy as np
 import pandas as pd
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../lib')))
+import csv_ingest
 import ref_et_data
 import ret_utils
 
@@ -66,10 +67,10 @@ class MetNodesData():
                         header = cfg.mnmd_names_line - len(data_skip) - 1,
                         skiprows = data_skip, na_values = ['NaN'])
             else:
-#                df = pd.read_csv(cfg.met_nodes_meta_data_path, engine = 'python',
-                df = pd.read_csv(cfg.met_nodes_meta_data_path, engine = 'python',
-                        header = cfg.mnmd_names_line - len(data_skip) - 1,
-                        skiprows = data_skip, sep = cfg.mnmd_delimiter, na_values = ['NaN'])
+                df = csv_ingest.read_table(cfg.met_nodes_meta_data_path,
+                        header_lines = cfg.mnmd_header_lines,
+                        names_line = cfg.mnmd_names_line,
+                        delimiter = cfg.mnmd_delimiter, na_values = ['NaN'])
             uc_columns = list(df.columns)
             columns = [x.lower() for x in uc_columns]
             try:
@@ -486,14 +487,11 @@ class MetNode():
             logging.error('ERROR:  input met file {} does not exist'.format(input_met_path))
             return False
         logging.debug('  {0}'.format(input_met_path))
-        # Get list of 0 based line numbers to skip
-        # Ignore header but assume header was set as 1's based index
-        data_skip = [i for i in range(cfg.input_met['header_lines']) if i + 1 != cfg.input_met['names_line']]
-#        self.input_met_df = pd.read_csv(input_met_path, engine = 'python',
-        self.input_met_df = pd.read_csv(input_met_path, engine = 'python',
-                header = cfg.input_met['names_line'] - len(data_skip) - 1,
-                skiprows = data_skip, sep = cfg.input_met['delimiter'],
-                na_values = 'NaN')
+        # All fields are read since input met fields are passed to output
+        self.input_met_df = csv_ingest.read_table(input_met_path,
+                header_lines = cfg.input_met['header_lines'],
+                names_line = cfg.input_met['names_line'],
+                delimiter = cfg.input_met['delimiter'], na_values = 'NaN')
         logging.debug('  Columns: {0}'.format(', '.join(list(self.input_met_df.columns))))
 
         # Check fields
@@ -516,11 +514,10 @@ class MetNode():
             self.input_met_df['date'] = pd.to_datetime(self.input_met_df['date'])
         else:
             if cfg.time_step == 'day':
-                self.input_met_df['date'] = self.input_met_df[['year', 'month', 'day']].apply(
-                    lambda s : datetime.datetime(*s),axis = 1)
+                self.input_met_df['date'] = csv_ingest.ymd_datetimes(self.input_met_df)
             else:
-                self.input_met_df['date'] = self.input_met_df[['year', 'month', 'day', 'hour']].apply(
-                    lambda s : datetime.datetime(*s),axis = 1)
+                self.input_met_df['date'] = csv_ingest.ymd_datetimes(
+                    self.input_met_df, ['year', 'month', 'day', 'hour'])
         self.input_met_df.set_index('date', inplace = True)
 
         # verify period